@@ -1,9 +1,11 @@
+import json
 import logging
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from linebot.v3.messaging import (
     ImageMessage,
     MessagingApi,
+    MulticastRequest,
     PushMessageRequest,
     QuickReply,
     QuickReplyItem,
@@ -15,6 +17,7 @@ from linebot.v3.messaging import (
 )
 from linebot.v3.webhooks import MessageEvent, TextMessageContent
 
+from app.core.config import settings
 from application.services.line_bot import get_messaging_api  # Legacy helper for now
 from domain.models.game_result import GameResult
 
@@ -27,6 +30,8 @@ class LineClient:
     Implements MessagingPort.
     """
 
+    MULTICAST_LIMIT = 500  # LINE multicast: max user IDs per request
+
     def __init__(self):
         # We rely on the global get_messaging_api for now to avoid refactoring config loading yet
         pass
@@ -87,6 +92,130 @@ class LineClient:
                 logger.error(f"Text Fallback Push also failed: {e2}")
                 return False
 
+    async def queue_reply(self, token: str, result: GameResult, user_id: str | None = None) -> bool:
+        """
+        Hands a reply to the outbound delivery queue (rate limited, retried, dead-lettered).
+        If the reply token is rejected and `user_id` is known, the queue pushes instead.
+        With LINE_DELIVERY_QUEUE_ENABLED off, sends inline with the same reply -> push fallback.
+        """
+        if settings.LINE_DELIVERY_QUEUE_ENABLED:
+            from adapters.perception.line_delivery import line_delivery_queue
+
+            line_delivery_queue.reply(token, self._to_line_messages(result), user_id, fallback_text=result.text)
+            return True
+        try:
+            return await self.send_reply(token, result)
+        except Exception as e:
+            if not user_id:
+                raise
+            logger.warning(f"Reply failed ({e}), attempting Push to {user_id}")
+            return await self.send_push(user_id, result)
+
+    async def queue_push(self, user_id: str, result: GameResult) -> bool:
+        if settings.LINE_DELIVERY_QUEUE_ENABLED:
+            from adapters.perception.line_delivery import line_delivery_queue
+
+            line_delivery_queue.push(user_id, self._to_line_messages(result), fallback_text=result.text)
+            return True
+        return await self.send_push(user_id, result)
+
+    async def queue_messages(self, user_id: str, messages: List[Any]) -> bool:
+        """Pushes ready-made LINE message objects (scheduler briefings, nudges)."""
+        if settings.LINE_DELIVERY_QUEUE_ENABLED:
+            from adapters.perception.line_delivery import line_delivery_queue
+
+            line_delivery_queue.push(user_id, messages)
+            return True
+        api = get_messaging_api()
+        if not api:
+            return False
+        await api.push_message(PushMessageRequest(to=user_id, messages=messages))
+        return True
+
+    async def queue_deliveries(self, deliveries: Sequence[Tuple[str, List[Any]]]) -> Dict[str, int]:
+        """`deliver`, but through the delivery queue: the plan is enqueued and sent by the worker."""
+        if not settings.LINE_DELIVERY_QUEUE_ENABLED:
+            return await self.deliver(deliveries)
+        from adapters.perception.line_delivery import line_delivery_queue
+
+        multicasts, pushes = self.plan_delivery(deliveries)
+        for recipients, messages in multicasts:
+            line_delivery_queue.multicast(recipients, messages)
+        for user_id, messages in pushes:
+            line_delivery_queue.push(user_id, messages)
+        return {
+            "recipients": sum(len(to) for to, _ in multicasts) + len(pushes),
+            "multicast_calls": len(multicasts),
+            "push_calls": len(pushes),
+            "queued": len(multicasts) + len(pushes),
+        }
+
+    def _fingerprint(self, messages: Sequence[Any]) -> str:
+        """Byte-identical payloads share a fingerprint (model objects are compared by their JSON)."""
+        return json.dumps(
+            [m.to_dict() if hasattr(m, "to_dict") else m for m in messages],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+
+    def plan_delivery(
+        self, deliveries: Sequence[Tuple[str, List[Any]]]
+    ) -> Tuple[List[Tuple[List[str], List[Any]]], List[Tuple[str, List[Any]]]]:
+        """
+        Groups recipients by identical payload.
+        Returns (multicast batches of <= MULTICAST_LIMIT user IDs, per-user pushes for unique payloads).
+        """
+        groups: Dict[str, Tuple[List[str], List[Any]]] = {}
+        for user_id, messages in deliveries:
+            key = self._fingerprint(messages)
+            recipients, _ = groups.setdefault(key, ([], messages))
+            if user_id not in recipients:
+                recipients.append(user_id)
+
+        multicasts, pushes = [], []
+        for recipients, messages in groups.values():
+            if len(recipients) == 1:
+                pushes.append((recipients[0], messages))
+                continue
+            for i in range(0, len(recipients), self.MULTICAST_LIMIT):
+                multicasts.append((recipients[i : i + self.MULTICAST_LIMIT], messages))
+        return multicasts, pushes
+
+    async def deliver(self, deliveries: Sequence[Tuple[str, List[Any]]]) -> Dict[str, int]:
+        """
+        Sends (user_id, messages) pairs with as few API calls as possible:
+        identical content goes out via multicast, personalized content via push.
+        Failures are counted per recipient; one failed call does not stop the rest.
+        """
+        stats = {"recipients": 0, "multicast_calls": 0, "push_calls": 0, "failed": 0}
+        api = get_messaging_api()
+        if not api:
+            return stats
+
+        multicasts, pushes = self.plan_delivery(deliveries)
+        for recipients, messages in multicasts:
+            stats["recipients"] += len(recipients)
+            stats["multicast_calls"] += 1
+            try:
+                await api.multicast(MulticastRequest(to=recipients, messages=messages))
+            except Exception as e:
+                stats["failed"] += len(recipients)
+                logger.error(f"LINE multicast to {len(recipients)} users failed: {e}")
+        for user_id, messages in pushes:
+            stats["recipients"] += 1
+            stats["push_calls"] += 1
+            try:
+                await api.push_message(PushMessageRequest(to=user_id, messages=messages))
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(f"LINE push to {user_id} failed: {e}")
+        return stats
+
+    async def broadcast_same(self, user_ids: Sequence[str], messages: List[Any]) -> Dict[str, int]:
+        """Same messages to every user in `user_ids`."""
+        return await self.queue_deliveries([(user_id, messages) for user_id in user_ids])
+
     def _to_line_messages(self, result: GameResult) -> List[Any]:
         """
         Converts a single GameResult into a list of LINE messages.
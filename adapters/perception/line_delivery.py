@@ -0,0 +1,348 @@
+"""
+Outbound LINE Delivery Queue
+
+Webhook handlers and the scheduler enqueue messages here instead of calling
+the Messaging API inline. A single worker drains the queue:
+
+- Rate limit: a token bucket (`LINE_RATE_LIMIT_PER_SECOND`, burst
+  `LINE_RATE_LIMIT_BURST`) spaces out API calls. Replies are dequeued before
+  pushes because reply tokens expire quickly.
+- Quota: push/multicast recipients count against the channel's monthly quota.
+  The remaining quota is re-read every `LINE_QUOTA_REFRESH_SECONDS` and
+  tracked locally in between; once it runs out, pushes are dead-lettered
+  instead of failing one by one at LINE.
+- Retries: 429 and 5xx responses (and network errors) are retried with
+  exponential backoff and jitter. A `Retry-After` header is honored exactly,
+  and a 429 also pauses the token bucket so other messages wait too. The
+  message is put back on the queue once its delay has passed; the worker keeps
+  draining in the meantime, so one failing push cannot hold up fresh replies.
+- Dead letters: messages that still fail (or are rejected outright) are stored
+  in `line_dead_letters`; `replay_dead_letters` re-enqueues the retryable ones
+  (quota, network, 429/5xx), at most `LINE_DEAD_LETTER_MAX_REPLAYS` times each.
+"""
+
+import asyncio
+import datetime
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+from linebot.v3.messaging import (
+    Message,
+    MulticastRequest,
+    PushMessageRequest,
+    ReplyMessageRequest,
+    TextMessage,
+)
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.delivery import LineDeadLetter
+from application.services.line_bot import get_messaging_api
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; `acquire` waits for one token."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            now = self._clock()
+            if now < self._paused_until:
+                await self._sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1 - 1e-9:  # Float refill can land a hair under 1
+                self.tokens = max(0.0, self.tokens - 1)
+                return
+            await self._sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stops handing out tokens for `seconds` (LINE told us to back off) and empties the bucket."""
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self.tokens = 0.0
+        self._updated = self._paused_until
+
+
+@dataclass
+class OutboundMessage:
+    kind: str  # "reply" | "push" | "multicast"
+    to: List[str]
+    messages: List[Any]
+    reply_token: Optional[str] = None
+    fallback_text: Optional[str] = None  # Plain-text push if LINE rejects the rich payload
+    attempts: int = 0
+    dead_letter_id: Optional[str] = None  # Set when replaying a dead letter
+
+    @property
+    def priority(self) -> int:
+        return 0 if self.kind == "reply" else 1
+
+    @property
+    def quota_cost(self) -> int:
+        return 0 if self.kind == "reply" else len(self.to)  # Replies are free
+
+
+class LineDeliveryQueue:
+    def __init__(
+        self,
+        api_factory: Callable[[], Any] | None = None,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._api_factory = api_factory or get_messaging_api
+        self._session_factory = session_factory
+        self._sleep = sleep
+        self._clock = clock
+        self.bucket = TokenBucket(settings.LINE_RATE_LIMIT_PER_SECOND, settings.LINE_RATE_LIMIT_BURST, clock, sleep)
+        self._queue: asyncio.PriorityQueue | None = None
+        self._worker: asyncio.Task | None = None
+        self._retries: Set[asyncio.Task] = set()  # Messages waiting out their backoff before re-entering the queue
+        self._seq = itertools.count()
+        self._quota_remaining: Optional[int] = None  # None = unlimited / unknown
+        self._quota_checked_at: Optional[float] = None
+        self.stats = {"sent": 0, "retried": 0, "dead_lettered": 0, "fallbacks": 0}
+
+    # --- Producer side ---
+
+    def enqueue(self, item: OutboundMessage) -> OutboundMessage:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._queue.put_nowait((item.priority, next(self._seq), item))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return item
+
+    def reply(self, token: str, messages: List[Any], user_id: str | None = None, fallback_text: str | None = None):
+        return self.enqueue(
+            OutboundMessage("reply", [user_id] if user_id else [], messages, token, fallback_text=fallback_text)
+        )
+
+    def push(self, user_id: str, messages: List[Any], fallback_text: str | None = None):
+        return self.enqueue(OutboundMessage("push", [user_id], messages, fallback_text=fallback_text))
+
+    def multicast(self, user_ids: List[str], messages: List[Any]):
+        return self.enqueue(OutboundMessage("multicast", list(user_ids), messages))
+
+    async def drain(self) -> None:
+        """Waits until everything enqueued so far (retries included) was sent or dead-lettered."""
+        while self._queue is not None:
+            await self._queue.join()
+            if not self._retries:
+                return
+            await asyncio.gather(*list(self._retries), return_exceptions=True)
+
+    async def stop(self) -> None:
+        await self.drain()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    # --- Worker ---
+
+    async def _run(self) -> None:
+        while True:
+            _, _, item = await self._queue.get()
+            try:
+                await self._deliver(item)
+            except Exception as e:
+                logger.error(f"LINE delivery worker error: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, item: OutboundMessage) -> None:
+        api = self._api_factory()
+        if not api:
+            logger.warning("Line Messaging API not initialized; dropping outbound message.")
+            return
+
+        if item.quota_cost and not await self._has_quota(api, item.quota_cost):
+            await self._dead_letter(item, None, "quota_exhausted")
+            return
+
+        while True:
+            await self.bucket.acquire()
+            item.attempts += 1
+            try:
+                await self._send(api, item)
+            except Exception as e:
+                status = getattr(e, "status", None)
+                if item.kind == "reply" and item.to and status == 400:
+                    # Reply token expired or already used: the user still gets it as a push
+                    item.kind, item.reply_token = "push", None
+                    self.stats["fallbacks"] += 1
+                    if not await self._has_quota(api, item.quota_cost):
+                        await self._dead_letter(item, status, "quota_exhausted")
+                        return
+                    continue
+                if item.kind == "push" and status == 400 and item.fallback_text:
+                    item.messages = [
+                        TextMessage(text=f"{item.fallback_text}\n\n(⚠️ Display Error: Rich content failed)")
+                    ]
+                    item.fallback_text = None
+                    self.stats["fallbacks"] += 1
+                    continue
+                if (
+                    status is None or status in RETRYABLE_STATUS
+                ) and item.attempts < settings.LINE_DELIVERY_MAX_ATTEMPTS:
+                    delay = self._retry_delay(e, item.attempts)
+                    if status == 429:
+                        self.bucket.pause(delay)
+                    self.stats["retried"] += 1
+                    logger.warning(f"LINE {item.kind} failed ({status}); retry {item.attempts} in {delay:.1f}s")
+                    self._retry_later(item, delay)
+                    return
+                await self._dead_letter(item, status, str(e))
+                return
+            self.stats["sent"] += 1
+            if self._quota_remaining is not None:
+                self._quota_remaining -= item.quota_cost
+            if item.dead_letter_id:
+                await self._mark_replayed(item.dead_letter_id)
+            return
+
+    def _retry_later(self, item: OutboundMessage, delay: float) -> None:
+        task = asyncio.create_task(self._requeue_after(item, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue_after(self, item: OutboundMessage, delay: float) -> None:
+        await self._sleep(delay)
+        self.enqueue(item)
+
+    async def _send(self, api, item: OutboundMessage) -> None:
+        if item.kind == "reply":
+            await api.reply_message(ReplyMessageRequest(reply_token=item.reply_token, messages=item.messages))
+        elif item.kind == "multicast":
+            await api.multicast(MulticastRequest(to=item.to, messages=item.messages))
+        else:
+            await api.push_message(PushMessageRequest(to=item.to[0], messages=item.messages))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        headers = getattr(error, "headers", None) or {}
+        retry_after = headers.get("Retry-After") or headers.get("retry-after")
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        base = min(MAX_BACKOFF_SECONDS, 2 ** (attempt - 1))
+        return base + random.uniform(0, base / 2)
+
+    async def _has_quota(self, api, cost: int) -> bool:
+        now = self._clock()
+        if self._quota_checked_at is None or now - self._quota_checked_at >= settings.LINE_QUOTA_REFRESH_SECONDS:
+            try:
+                quota = await api.get_message_quota()
+                if quota.type == "none":
+                    self._quota_remaining = None
+                else:
+                    used = await api.get_message_quota_consumption()
+                    self._quota_remaining = (quota.value or 0) - (used.total_usage or 0)
+                self._quota_checked_at = now
+            except Exception as e:
+                # Unknown quota must not block delivery; LINE rejects over-quota pushes itself
+                logger.warning(f"LINE quota lookup failed: {e}")
+                self._quota_checked_at = now
+        return self._quota_remaining is None or self._quota_remaining >= cost
+
+    # --- Dead letters ---
+
+    def _sessions(self) -> Callable[[], AsyncSession]:
+        if self._session_factory is None:
+            from app.core.database import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    async def _dead_letter(self, item: OutboundMessage, status: int | None, error: str) -> None:
+        self.stats["dead_lettered"] += 1
+        logger.error(f"LINE {item.kind} to {len(item.to)} recipient(s) dead-lettered ({status}): {error}")
+        if item.kind == "reply" and not item.to:
+            return  # Nobody to push to later
+        kind = "push" if item.kind == "reply" else item.kind
+        payload = [m.to_dict() if hasattr(m, "to_dict") else m for m in item.messages]
+        try:
+            async with self._sessions()() as session:
+                row = await session.get(LineDeadLetter, item.dead_letter_id) if item.dead_letter_id else None
+                if row is None:
+                    row = LineDeadLetter(kind=kind, recipients=item.to, messages=payload, attempts=0)
+                    session.add(row)
+                row.status_code = status
+                row.error = error[:2000]
+                row.attempts = (row.attempts or 0) + item.attempts
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to store LINE dead letter: {e}")
+
+    async def _mark_replayed(self, dead_letter_id: str) -> None:
+        try:
+            async with self._sessions()() as session:
+                row = await session.get(LineDeadLetter, dead_letter_id)
+                if row is not None:
+                    row.replayed_at = datetime.datetime.now(datetime.timezone.utc)
+                    await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to mark LINE dead letter {dead_letter_id} replayed: {e}")
+
+    async def replay_dead_letters(self, session: AsyncSession, limit: int = 100) -> int:
+        """
+        Re-enqueues the oldest unreplayed dead letters that may still go through. Rejections
+        (400/401/403/404: bad payload, blocked user) and rows replayed
+        `LINE_DEAD_LETTER_MAX_REPLAYS` times stay in the table for inspection. Returns how many
+        were queued.
+        """
+        stmt = (
+            select(LineDeadLetter)
+            .where(
+                LineDeadLetter.replayed_at.is_(None),
+                LineDeadLetter.replays < settings.LINE_DEAD_LETTER_MAX_REPLAYS,
+                or_(LineDeadLetter.status_code.is_(None), LineDeadLetter.status_code.in_(RETRYABLE_STATUS)),
+            )
+            .order_by(LineDeadLetter.created_at)
+            .limit(limit)
+        )
+        rows = (await session.execute(stmt)).scalars().all()
+        for row in rows:
+            row.replays = (row.replays or 0) + 1
+        await session.commit()  # Counted before sending, so a crash mid-replay still uses up a replay
+        for row in rows:
+            messages = [Message.from_dict(m) for m in row.messages or []]
+            self.enqueue(OutboundMessage(row.kind, list(row.recipients or []), messages, dead_letter_id=row.id))
+        return len(rows)
+
+
+line_delivery_queue = LineDeliveryQueue()
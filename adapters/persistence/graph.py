@@ -0,0 +1,23 @@
+from app.core.config import settings
+from domain.ports.graph_port import GraphPort
+
+
+def get_graph_adapter() -> GraphPort:
+    """The GraphPort singleton of the configured GRAPH_BACKEND ("kuzu" or "sql")."""
+    if settings.GRAPH_BACKEND == "sql":
+        from adapters.persistence.sql_graph.adapter import get_sql_graph_adapter
+
+        return get_sql_graph_adapter()
+    if settings.GRAPH_BACKEND != "kuzu":
+        raise ValueError(f"Unknown GRAPH_BACKEND {settings.GRAPH_BACKEND!r}; expected 'kuzu' or 'sql'")
+
+    if settings.KUZU_SIDECAR_SOCKET:
+        # The graph lives in the sidecar process; this worker only talks to it
+        from adapters.persistence.kuzu.sidecar_client import get_kuzu_sidecar_client
+
+        return get_kuzu_sidecar_client()
+
+    # Imported lazily: Kuzu holds a file lock, and the sql backend never needs it
+    from adapters.persistence.kuzu.adapter import get_kuzu_adapter
+
+    return get_kuzu_adapter()
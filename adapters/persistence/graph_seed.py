@@ -0,0 +1,45 @@
+"""
+Graph Seed Data
+
+NPCs, the concepts they react to, and the default user, seeded by every
+GraphPort backend on initialization.
+"""
+
+CONCEPTS = [
+    ("Procrastination", "拖延任務和責任"),
+    ("Discipline", "自律和堅持"),
+    ("Exercise", "身體鍛鍊"),
+    ("Learning", "學習新知識"),
+    ("Meditation", "冥想和內省"),
+    ("Action", "立即行動"),
+    ("Laziness", "懶惰和懈怠"),
+    ("Strategy", "策略思考"),
+]
+
+# (name, role, mood, personality); the NPC id is the lowercased name
+NPCS = [
+    ("Viper", "Strict Mentor", "Stern", "Competitor"),
+    ("Sage", "Wise Elder", "Calm", "Guide"),
+    ("Ember", "Energetic Coach", "Excited", "Support"),
+    ("Shadow", "Mysterious Guide", "Neutral", "Observer"),
+]
+
+# (npc_id, edge type, concept name)
+PREFERENCES = [
+    ("viper", "HATES", "Procrastination"),
+    ("viper", "LIKES", "Discipline"),
+    ("viper", "LIKES", "Exercise"),
+    ("sage", "LIKES", "Learning"),
+    ("sage", "LIKES", "Meditation"),
+    ("sage", "HATES", "Laziness"),
+    ("ember", "LIKES", "Action"),
+    ("ember", "LIKES", "Exercise"),
+    ("ember", "HATES", "Laziness"),
+    ("shadow", "LIKES", "Strategy"),
+    ("shadow", "CARES_ABOUT", "Learning"),
+]
+
+# NPC -> Concept edge type -> key in the NPC context
+PREFERENCE_KEYS = {"LIKES": "likes", "HATES": "hates", "CARES_ABOUT": "cares_about"}
+
+DEFAULT_USER = ("u_player", "Player")
@@ -1,17 +1,39 @@
 import asyncio
+import copy
 import logging
 import os
+import re
+import threading
+import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 
 import kuzu
 
+from adapters.persistence.graph_seed import PREFERENCE_KEYS
+from adapters.persistence.kuzu.event_sink import KuzuEventSink
+from adapters.persistence.kuzu.pool import KuzuConnectionPool
+from adapters.persistence.kuzu.prepared import PreparedConnection, identifier
+from adapters.persistence.kuzu.recent_events import RecentEventCache
+from adapters.persistence.kuzu.retention import KuzuEventRetention
+from adapters.persistence.kuzu.schema import migrate
+from adapters.persistence.kuzu.unlock_frontier import UnlockFrontier
 from app.core.config import settings
 from domain.ports.graph_port import GraphPort
 
 logger = logging.getLogger(__name__)
 
+# Clauses that make a free-form query a write (routed to the single-writer lane)
+_WRITE_CLAUSE = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|ALTER|COPY|INSTALL|LOAD)\b", re.IGNORECASE)
+# Labels whose nodes/edges make up the static NPC catalog
+_CATALOG_LABELS = ("NPC", "Concept")
+_CATALOG_PATTERN = re.compile(r":\s*(NPC|Concept)\b")
+# Free-form writes the unlock frontier cannot follow incrementally
+_QUEST_GRAPH_PATTERN = re.compile(r":\s*(Quest|REQUIRES)\b")
+_COMPLETED_PATTERN = re.compile(r":\s*COMPLETED\b")
+_EVENT_PATTERN = re.compile(r":\s*(Event|TRIGGERED_BY)\b")
+
 
 class KuzuAdapter(GraphPort):
     def __init__(self, db_path: str = None):
@@ -23,17 +45,59 @@ class KuzuAdapter(GraphPort):
         self.db = None
         self.conn = None
         self._initialized = False
+        self.startup_timings: Dict[str, float] = {}  # ms per startup phase, from the last _init_sync
+        self._prepared: Optional[PreparedConnection] = None  # Statement cache for self.conn
+        self.pool: Optional[KuzuConnectionPool] = None  # Read lane + single-writer lane
+        self.event_sink: Optional[KuzuEventSink] = None
+        # Newest events per user, so history reads on every chat turn skip the graph
+        self.recent_events = RecentEventCache(
+            per_user=settings.KUZU_RECENT_EVENTS_PER_USER,
+            max_bytes=int(settings.KUZU_RECENT_EVENTS_BUDGET_MB * 1024 * 1024),
+        )
+        self.retention = KuzuEventRetention(self)
 
-        # In-memory caches for graph traversal optimization
-        self._quest_dependencies: Dict[str, Set[str]] = {}
-        self._quest_dependency_nodes: Set[str] = set()
-        self._completed: Dict[str, Set[str]] = {}
+        # Quest dependency DAG + per-user unlock frontier, maintained on writes
+        self.unlocks = UnlockFrontier(max_users=settings.KUZU_UNLOCK_CACHE_USERS)
+
+        # NPCs and their concept edges, keyed by NPC name; loaded once, dropped on any write touching them
+        self._npc_catalog: Optional[Dict[str, Dict[str, Any]]] = None
+        self._npc_catalog_version = 0
+        self._npc_catalog_lock = threading.Lock()
 
     def _ensure_initialized(self):
         """Guarantee connection is ready for sync helpers."""
         if not self._initialized or self.conn is None:
             self._init_sync()
 
+    def _statements(self) -> PreparedConnection:
+        """Prepared-statement cache of the calling pool thread's connection (self.conn outside the pool)."""
+        self._ensure_initialized()
+        pooled = self.pool.current() if self.pool else None
+        if pooled is not None:
+            return pooled
+        if self._prepared is None or self._prepared.conn is not self.conn:
+            self._prepared = PreparedConnection(self.conn)
+        return self._prepared
+
+    def _open_pooled_connection(self) -> PreparedConnection:
+        return PreparedConnection(kuzu.Connection(self.db))
+
+    def _run(self, lane: str, fn, *args):
+        """Runs `fn(*args)` on a pooled connection of `lane` ("read" or "write") and waits for it."""
+        self._ensure_initialized()
+        if self.pool is None:
+            return fn(*args)
+        return getattr(self.pool, lane)(lambda _conn: fn(*args))
+
+    async def _run_async(self, lane: str, fn, *args):
+        self._ensure_initialized()
+        if self.pool is None:
+            return await asyncio.to_thread(fn, *args)
+        return await getattr(self.pool, f"run_{lane}")(lambda _conn: fn(*args))
+
+    def _is_write(self, cypher: str) -> bool:
+        return bool(_WRITE_CLAUSE.search(cypher))
+
     async def initialize(self):
         """
         Async initialization of the database connection and schema.
@@ -52,132 +116,59 @@ class KuzuAdapter(GraphPort):
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
         try:
+            started = time.perf_counter()
             self.db = kuzu.Database(self.db_path)
             self.conn = kuzu.Connection(self.db)
+            self.startup_timings["open"] = self._elapsed_ms(started)
             self._initialize_schema_sync()
+            if self.pool is None:
+                pool_started = time.perf_counter()
+                self.pool = KuzuConnectionPool(self._open_pooled_connection, settings.KUZU_READ_POOL_SIZE)
+                self.startup_timings["pool"] = self._elapsed_ms(pool_started)
+            self.startup_timings["total"] = self._elapsed_ms(started)
             self._initialized = True
+            logger.info(f"KuzuDB ready in {self.startup_timings['total']} ms: {self.startup_timings}")
         except Exception as e:
             logger.error(f"KuzuDB Connection Failed: {e}")
             raise
 
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
     def _initialize_schema_sync(self):
-        """Idempotent schema initialization (Sync)"""
+        """Applies the schema/seed migrations the graph has not seen yet (see schema.py)."""
         # Ensure conn is available (though this is called from init_sync where it is set)
         if self.conn is None:
             raise RuntimeError("Connection failed to initialize")
 
         try:
-            # 1. Self-Healing: Check for corruption
-            try:
-                self.conn.execute("MATCH (u:User) RETURN count(u) LIMIT 1")
-                self.conn.execute("MERGE (u:User {name: 'SchemaCheck'})")
-            except Exception:
-                logger.warning("User table missing or unreadable; attempting non-destructive re-init")
-
-            # 2. Schema Creation Helper
-            def safe_create(query):
-                try:
-                    self.conn.execute(query)
-                except RuntimeError as re:
-                    if "already exists" in str(re):
-                        pass
-                    else:
-                        logger.warning(f"Failed to exec {query}: {re}")
-
-            # Define Schema
-            safe_create("CREATE NODE TABLE User(id STRING, name STRING, PRIMARY KEY (id))")
-            safe_create(
-                "CREATE NODE TABLE NPC(id STRING, name STRING, role STRING, personality STRING, mood STRING, PRIMARY KEY (id))"
-            )
-            safe_create("CREATE NODE TABLE Concept(name STRING, description STRING, PRIMARY KEY (name))")
-            safe_create("CREATE NODE TABLE Quest(id STRING, title STRING, status STRING, PRIMARY KEY (id))")
-            safe_create("CREATE NODE TABLE Location(name STRING, description STRING, PRIMARY KEY (name))")
-            safe_create(
-                "CREATE NODE TABLE Event(id STRING, type STRING, content STRING, timestamp INT64, metadata STRING, PRIMARY KEY (id))"
-            )
-
-            # Relationships
-            safe_create("CREATE REL TABLE HATES(FROM NPC TO Concept)")
-            safe_create("CREATE REL TABLE LIKES(FROM NPC TO Concept)")
-            safe_create("CREATE REL TABLE CARES_ABOUT(FROM NPC TO Concept)")
-            safe_create("CREATE REL TABLE LOCATED_AT(FROM NPC TO Location)")
-            safe_create("CREATE REL TABLE INTERACTED_WITH(FROM User TO NPC, timestamp STRING)")
-            safe_create("CREATE REL TABLE COMPLETED(FROM User TO Quest, timestamp STRING)")
-            safe_create("CREATE REL TABLE FAILED(FROM User TO Quest, timestamp STRING)")
-            safe_create("CREATE REL TABLE VISITED(FROM User TO Location, count INT)")
-            safe_create("CREATE REL TABLE TRIGGERED_BY(FROM Event TO User)")
-            safe_create("CREATE REL TABLE PERFORMED(FROM User TO Event)")
-            safe_create("CREATE REL TABLE WITNESSED(FROM NPC TO Event)")
-            safe_create("CREATE REL TABLE INVOLVED(FROM Event TO NPC)")
-            safe_create("CREATE REL TABLE REQUIRES(FROM Quest TO Quest)")
-            safe_create("CREATE REL TABLE KNOWS(FROM User TO NPC, intimacy INT64, last_interaction INT64)")
-            safe_create("CREATE REL TABLE REMEMBERED(FROM NPC TO Event)")
-
-            # Seed Data
-            self._seed_initial_data_sync()
-            logger.info("KuzuDB Schema Initialized.")
-
+            applied = migrate(PreparedConnection(self.conn), self.startup_timings)
+            if applied:
+                self.invalidate_npc_catalog()
+                logger.info(f"KuzuDB Schema migrated to v{applied[-1].version}.")
         except Exception as e:
             logger.error(f"Schema Init Failed: {e}")
 
-    def _seed_initial_data_sync(self):
-        """Seed NPCs and initial concepts (Sync)"""
-        assert self.conn is not None
-        concepts = [
-            ("Procrastination", "拖延任務和責任"),
-            ("Discipline", "自律和堅持"),
-            ("Exercise", "身體鍛鍊"),
-            ("Learning", "學習新知識"),
-            ("Meditation", "冥想和內省"),
-            ("Action", "立即行動"),
-            ("Laziness", "懶惰和懈怠"),
-            ("Strategy", "策略思考"),
-        ]
-        for name, desc in concepts:
-            self.conn.execute(f"MERGE (c:Concept {{name: '{name}'}}) ON CREATE SET c.description = '{desc}'")
-
-        npcs = [
-            ("Viper", "Strict Mentor", "Stern", "Competitor"),
-            ("Sage", "Wise Elder", "Calm", "Guide"),
-            ("Ember", "Energetic Coach", "Excited", "Support"),
-            ("Shadow", "Mysterious Guide", "Neutral", "Observer"),
-        ]
-        for name, role, mood, personality in npcs:
-            nid = name.lower()
-            self.conn.execute(
-                f"MERGE (n:NPC {{id: '{nid}'}}) "
-                f"ON CREATE SET n.name = '{name}', n.role = '{role}', n.mood = '{mood}', n.personality = '{personality}' "
-                f"ON MATCH SET n.role = '{role}', n.mood = '{mood}'"
-            )
-
-        preferences = [
-            ("viper", "HATES", "Procrastination"),
-            ("viper", "LIKES", "Discipline"),
-            ("viper", "LIKES", "Exercise"),
-            ("sage", "LIKES", "Learning"),
-            ("sage", "LIKES", "Meditation"),
-            ("sage", "HATES", "Laziness"),
-            ("ember", "LIKES", "Action"),
-            ("ember", "LIKES", "Exercise"),
-            ("ember", "HATES", "Laziness"),
-            ("shadow", "LIKES", "Strategy"),
-            ("shadow", "CARES_ABOUT", "Learning"),
-        ]
-        for npc_id, rel, concept in preferences:
-            self.conn.execute(
-                f"MATCH (n:NPC {{id: '{npc_id}'}}), (c:Concept {{name: '{concept}'}}) MERGE (n)-[:{rel}]->(c)"
-            )
-
-        # Default User
-        self.conn.execute("MERGE (u:User {id: 'u_player'}) ON CREATE SET u.name = 'Player'")
-
     # --- Public API (sync for test compatibility) ---
 
-    def query(self, cypher: str) -> List[Any]:
-        """Execute a Cypher query synchronously"""
-        return self._query_sync(cypher)
-
-    def _query_sync(self, cypher: str) -> List[Any]:
+    def query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Execute a Cypher query synchronously (pass values as `$name` parameters)"""
+        if not self._is_write(cypher):
+            return self._run("read", self._query_sync, cypher, params)
+        try:
+            return self._run("write", self._query_sync, cypher, params)
+        finally:
+            if _CATALOG_PATTERN.search(cypher):
+                self.invalidate_npc_catalog()
+            if _QUEST_GRAPH_PATTERN.search(cypher):
+                self.unlocks.invalidate()
+            elif _COMPLETED_PATTERN.search(cypher):
+                self.unlocks.invalidate_users()
+            if _EVENT_PATTERN.search(cypher):
+                self.recent_events.invalidate()
+
+    def _query_sync(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
         if not self.conn:
             # Just in case (though initialize should be called)
             logger.warning("Kuzu query called before initialization, triggering init...")
@@ -186,55 +177,115 @@ class KuzuAdapter(GraphPort):
         # Mypy assertion
         assert self.conn is not None
 
-        result = self.conn.execute(cypher)
-        output = []
-        while result.has_next():
-            row = result.get_next()
-            output.append(row)
-        return output
+        return self._statements().rows(cypher, params)
 
     def add_node(self, label: str, properties: Dict[str, Any]) -> bool:
-        return self._add_node_sync(label, properties)
+        return self._run("write", self._add_node_sync, label, properties)
 
     def _add_node_sync(self, label: str, properties: Dict[str, Any]) -> bool:
         self._ensure_initialized()
         assert self.conn is not None
         try:
+            label = identifier(label)
             key_field = "id" if "id" in properties else "name"
             key_val = properties.get(key_field)
+            # Values were always written as strings; keep that for the STRING-typed schema
+            params = {f"p_{identifier(k)}": str(v) for k, v in properties.items()}
 
             if key_val:
-                setters = ", ".join([f"n.{k} = '{v}'" for k, v in properties.items() if k != key_field])
-                cypher = f"MERGE (n:{label} {{{key_field}: '{key_val}'}})"
+                setters = ", ".join([f"n.{k} = $p_{k}" for k in properties if k != key_field])
+                cypher = f"MERGE (n:{label} {{{key_field}: $p_{key_field}}})"
                 if setters:
                     cypher += f" SET {setters}"
             else:
-                props_str = ", ".join([f"{k}: '{v}'" for k, v in properties.items()])
+                props_str = ", ".join([f"{k}: $p_{k}" for k in properties])
                 cypher = f"CREATE (n:{label} {{{props_str}}})"
-            self.conn.execute(cypher)
+            self._statements().execute(cypher, params)
+            if label in _CATALOG_LABELS:
+                self.invalidate_npc_catalog()
+            if label == "Quest" and key_field == "id" and key_val:
+                self.unlocks.add_quest(str(key_val), properties.get("title"))
+            elif label == "Quest":
+                self.unlocks.invalidate()
             return True
         except Exception as e:
             logger.error(f"Failed to add node: {e}")
             return False
 
     def record_user_event(self, user_id: str, event_type: str, metadata: Dict[str, Any]) -> bool:
-        return self._record_user_event_sync(user_id, event_type, metadata)
+        """
+        With KUZU_WRITE_BEHIND_ENABLED the event is queued for the graph-writer thread
+        (returns False only if the queue is full); otherwise it is written inline.
+        """
+        row = self._event_row(user_id, event_type, metadata)
+        if settings.KUZU_WRITE_BEHIND_ENABLED:
+            accepted = self._get_event_sink().submit(row)
+        else:
+            accepted = self._run("write", self._record_user_event_sync, row)
+        if accepted:
+            self.recent_events.append(row["user_id"], self._history_entry(row))
+        return accepted
+
+    def _event_row(self, user_id: str, event_type: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": str(user_id),
+            "type": event_type,
+            "timestamp": int(datetime.now().timestamp()),
+            "metadata": str(metadata),
+        }
+
+    def _get_event_sink(self) -> KuzuEventSink:
+        if self.event_sink is None:
+            self.event_sink = KuzuEventSink(
+                self._write_events_sync,
+                max_queue=settings.KUZU_EVENT_QUEUE_SIZE,
+                flush_interval=settings.KUZU_EVENT_FLUSH_SECONDS,
+                batch_size=settings.KUZU_EVENT_BATCH_SIZE,
+                spill_path=settings.KUZU_EVENT_SPILL_PATH or None,
+            )
+            self.event_sink.start()
+        return self.event_sink
+
+    def close(self) -> None:
+        """Writes out whatever is still queued, then stops the pool threads (shutdown)."""
+        if self.event_sink is not None:
+            self.event_sink.stop()
+            self.event_sink = None
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def _write_events_sync(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Batch write for the event sink, through the single-writer lane.
+        Idempotent on the event id, so replayed journal entries are not duplicated.
+        """
+        self._run("write", self._write_event_batch, events)
 
-    def _record_user_event_sync(self, user_id: str, event_type: str, metadata: Dict[str, Any]) -> bool:
+    def _write_event_batch(self, events: List[Dict[str, Any]]) -> None:
+        statements = self._statements()
+        statements.execute(
+            "UNWIND $user_ids AS uid MERGE (u:User {id: uid})",
+            {"user_ids": sorted({e["user_id"] for e in events})},
+        )
+        statements.execute(
+            "UNWIND $events AS ev MATCH (u:User {id: ev.user_id}) "
+            "OPTIONAL MATCH (x:Event {id: ev.id}) WITH ev, u, x WHERE x IS NULL "
+            "CREATE (e:Event {id: ev.id, type: ev.type, timestamp: ev.timestamp, metadata: ev.metadata})"
+            "-[:TRIGGERED_BY]->(u)",
+            {"events": events},
+        )
+
+    def _record_user_event_sync(self, row: Dict[str, Any]) -> bool:
         self._ensure_initialized()
         assert self.conn is not None
         try:
-            event_id = str(uuid.uuid4())[:8]
-            timestamp = int(datetime.now().timestamp())
-            metadata_str = str(metadata).replace("'", "\\'")
-
-            self.conn.execute(f"MERGE (u:User {{id: '{user_id}'}})")
-            self.conn.execute(
-                f"CREATE (e:Event {{id: '{event_id}', type: '{event_type}', "
-                f"timestamp: {timestamp}, metadata: '{metadata_str}'}})"
-            )
-            self.conn.execute(
-                f"MATCH (e:Event {{id: '{event_id}'}}), (u:User {{id: '{user_id}'}}) CREATE (e)-[:TRIGGERED_BY]->(u)"
+            self._statements().execute(
+                "MERGE (u:User {id: $user_id}) "
+                "CREATE (e:Event {id: $id, type: $type, timestamp: $timestamp, metadata: $metadata})"
+                "-[:TRIGGERED_BY]->(u)",
+                row,
             )
             return True
         except Exception as e:
@@ -242,22 +293,31 @@ class KuzuAdapter(GraphPort):
             return False
 
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        return self._get_user_history_sync(user_id, limit)
+        """Newest events first; served from the recent-event buffer when it is warm."""
+        cached = self.recent_events.get(str(user_id), limit)
+        if cached is not None:
+            return cached
+        return self._run("read", self._get_user_history_sync, user_id, limit)
+
+    def _history_entry(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": row["id"], "type": row["type"], "timestamp": row["timestamp"], "metadata": row["metadata"]}
 
     def _get_user_history_sync(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         self._ensure_initialized()
         assert self.conn is not None
         try:
-            result = self.conn.execute(
-                f"MATCH (e:Event)-[:TRIGGERED_BY]->(u:User {{id: '{user_id}'}}) "
-                f"RETURN e.id, e.type, e.timestamp, e.metadata "
-                f"ORDER BY e.timestamp DESC LIMIT {limit}"
+            # Read a full buffer's worth so the next turns are answered from memory
+            warming = limit <= self.recent_events.per_user
+            rows = self._statements().rows(
+                "MATCH (e:Event)-[:TRIGGERED_BY]->(u:User {id: $user_id}) "
+                "RETURN e.id, e.type, e.timestamp, e.metadata "
+                "ORDER BY e.timestamp DESC LIMIT $limit",
+                {"user_id": str(user_id), "limit": int(self.recent_events.per_user if warming else limit)},
             )
-            events = []
-            while result.has_next():
-                row = result.get_next()
-                events.append({"id": row[0], "type": row[1], "timestamp": row[2], "metadata": row[3]})
-            return events
+            events = [{"id": row[0], "type": row[1], "timestamp": row[2], "metadata": row[3]} for row in rows]
+            if warming:
+                events = self.recent_events.warm(str(user_id), events)
+            return events[: max(0, limit)]
         except Exception as e:
             logger.error(f"Failed to get user history: {e}")
             return []
@@ -265,55 +325,55 @@ class KuzuAdapter(GraphPort):
     # Alias for compatibility (updated to async alias)
     query_recent_context = get_user_history
 
+    def compact_events(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Rolls events past KUZU_EVENT_RETENTION_DAYS into daily summaries and deletes them (blocking)."""
+        return self.retention.run(now)
+
     def add_quest_dependency(self, child_quest_id: str, parent_quest_id: str) -> bool:
-        return self._add_quest_dependency_sync(child_quest_id, parent_quest_id)
+        return self._run("write", self._add_quest_dependency_sync, child_quest_id, parent_quest_id)
 
     def _add_quest_dependency_sync(self, child_quest_id: str, parent_quest_id: str) -> bool:
         # Simplified sync version of original logic
         self._ensure_initialized()
         assert self.conn is not None
         try:
-            self.conn.execute(f"MERGE (c:Quest {{id: '{child_quest_id}'}})")
-            self.conn.execute(f"MERGE (p:Quest {{id: '{parent_quest_id}'}})")
-            self.conn.execute(
-                f"MATCH (c:Quest {{id: '{child_quest_id}'}}), (p:Quest {{id: '{parent_quest_id}'}}) "
-                f"CREATE (c)-[:REQUIRES]->(p)"
+            self._statements().execute(
+                "MERGE (c:Quest {id: $child_id}) MERGE (p:Quest {id: $parent_id}) CREATE (c)-[:REQUIRES]->(p)",
+                {"child_id": child_quest_id, "parent_id": parent_quest_id},
             )
-            self._quest_dependencies.setdefault(child_quest_id, set()).add(parent_quest_id)
-            self._quest_dependency_nodes.update([child_quest_id, parent_quest_id])
+            self.unlocks.add_dependency(child_quest_id, parent_quest_id)
             return True
         except Exception as e:
             logger.error(f"Failed to add quest dependency: {e}")
             return False
 
     def get_unlockable_templates(self, user_id: str) -> List[Dict[str, Any]]:
-        return self._get_unlockable_templates_sync(user_id)
-
-    def _get_unlockable_templates_sync(self, user_id: str) -> List[Dict[str, Any]]:
-        # (Keeping original logic but ensuring it uses self.conn)
-        # Simplified for brevity in this refactor, but essentially same as before
-        self._ensure_initialized()
-        assert self.conn is not None
+        """Quests whose prerequisites the user has all completed (and that they have not completed)."""
         try:
-            # completed = self._completed.get(user_id, set())  # Note: cache might be stale in multi-process, but okay for MVP
-
-            query = (
-                f"MATCH (q:Quest) "
-                f"WHERE NOT EXISTS {{ MATCH (u:User {{id: '{user_id}'}})-[:COMPLETED]->(q) }} "
-                f"RETURN q.id, q.title"
-            )
-            candidates = self._query_sync(query)
-
-            unlockables = []
-            for row in candidates:
-                q_id, q_title = row[0], row[1]
-                unlockables.append({"id": q_id, "title": q_title, "type": "BASE", "prereq_count": 0, "chain": False})
-
+            unlockables = self.unlocks.unlockable(str(user_id))
+            if unlockables is None:
+                # Seeding reads on the writer lane so no write can land between the read and the cache fill
+                unlockables = self._run("write", self._seed_unlocks_sync, str(user_id))
             return unlockables
         except Exception as e:
             logger.error(f"Unlockables failed: {e}")
             return []
 
+    def _seed_unlocks_sync(self, user_id: str) -> List[Dict[str, Any]]:
+        self._ensure_initialized()
+        statements = self._statements()
+        if not self.unlocks.loaded:
+            self.unlocks.load(
+                statements.rows(
+                    "MATCH (q:Quest) OPTIONAL MATCH (q)-[:REQUIRES]->(p:Quest) RETURN q.id, q.title, collect(p.id)"
+                )
+            )
+        completed = statements.rows(
+            "MATCH (u:User {id: $user_id})-[:COMPLETED]->(q:Quest) RETURN DISTINCT q.id", {"user_id": user_id}
+        )
+        self.unlocks.seed_user(user_id, [row[0] for row in completed])
+        return self.unlocks.unlockable(user_id) or []
+
     async def add_relationship(
         self,
         from_label: str,
@@ -325,8 +385,9 @@ class KuzuAdapter(GraphPort):
         from_key_field: str = "name",
         to_key_field: str = "name",
     ) -> bool:
-        # Kuzu connection is not thread-safe; offload to thread pool
-        return await asyncio.to_thread(
+        # Kuzu connections are not thread-safe; run on the pool's writer connection
+        return await self._run_async(
+            "write",
             self._add_relationship_sync,
             from_label,
             from_key,
@@ -352,72 +413,126 @@ class KuzuAdapter(GraphPort):
         self._ensure_initialized()
         assert self.conn is not None
         try:
+            params = {"from_key": from_key, "to_key": to_key}
             props_str = ""
             if properties:
-                props_str = " {" + ", ".join([f"{k}: '{v}'" for k, v in properties.items()]) + "}"
+                params.update({f"p_{identifier(k)}": str(v) for k, v in properties.items()})
+                props_str = " {" + ", ".join([f"{k}: $p_{k}" for k in properties]) + "}"
 
             cypher = (
-                f"MATCH (a:{from_label} {{{from_key_field}: '{from_key}'}}), "
-                f"(b:{to_label} {{{to_key_field}: '{to_key}'}}) "
-                f"CREATE (a)-[:{rel_type}{props_str}]->(b)"
+                f"MATCH (a:{identifier(from_label)} {{{identifier(from_key_field)}: $from_key}}), "
+                f"(b:{identifier(to_label)} {{{identifier(to_key_field)}: $to_key}}) "
+                f"CREATE (a)-[:{identifier(rel_type)}{props_str}]->(b)"
             )
-            self.conn.execute(cypher)
+            self._statements().execute(cypher, params)
             if rel_type == "COMPLETED" and from_label == "User" and to_label == "Quest":
-                self._completed.setdefault(from_key, set()).add(to_key)
+                if from_key_field == "id" and to_key_field == "id":
+                    self.unlocks.complete(str(from_key), str(to_key))
+                else:
+                    self.unlocks.invalidate_users()
+            elif rel_type == "REQUIRES" and from_key_field == "id" and to_key_field == "id":
+                self.unlocks.add_dependency(str(from_key), str(to_key))
+            elif rel_type == "REQUIRES":
+                self.unlocks.invalidate()
+            if from_label in _CATALOG_LABELS and to_label in _CATALOG_LABELS:
+                self.invalidate_npc_catalog()
             return True
         except Exception as e:
             logger.error(f"Failed to add relationship: {e}")
             return False
 
-    async def get_npc_context(self, npc_name: str) -> Dict[str, Any]:
-        return await asyncio.to_thread(self._get_npc_context_sync, npc_name)
+    # --- NPC catalog ---
+
+    def invalidate_npc_catalog(self) -> None:
+        """Drops the cached catalog; the next read reloads it."""
+        with self._npc_catalog_lock:
+            self._npc_catalog = None
+            self._npc_catalog_version += 1
+
+    def get_npc_catalog(self) -> List[Dict[str, Any]]:
+        catalog = self._npc_catalog
+        if catalog is None:
+            catalog = self._run("read", self._load_npc_catalog_sync)
+        return copy.deepcopy(list(catalog.values()))
 
-    def _get_npc_context_sync(self, npc_name: str) -> Dict[str, Any]:
+    def _load_npc_catalog_sync(self) -> Dict[str, Dict[str, Any]]:
+        """One query for every NPC with its LIKES/HATES/CARES_ABOUT concepts."""
         self._ensure_initialized()
-        assert self.conn is not None
-        try:
-            result = self.conn.execute(
-                f"MATCH (n:NPC {{name: '{npc_name}'}}) RETURN n.name, n.role, n.mood, n.personality"
-            )
-            npc_data = {
-                "name": npc_name,
-                "role": "",
-                "mood": "",
-                "personality": "",
-                "likes": [],
-                "hates": [],
-                "cares_about": [],
-            }
-
-            if result.has_next():
-                row = result.get_next()
-                npc_data["name"] = row[0]
-                npc_data["role"] = row[1]
-                npc_data["mood"] = row[2]
-                npc_data["personality"] = row[3] if len(row) > 3 else ""
-
-            likes_result = self.conn.execute(
-                f"MATCH (n:NPC {{name: '{npc_name}'}})-[:LIKES]->(c:Concept) RETURN c.name"
-            )
-            while likes_result.has_next():
-                npc_data["likes"].append(likes_result.get_next()[0])
+        version = self._npc_catalog_version
+        rows = self._statements().rows(
+            "MATCH (n:NPC) OPTIONAL MATCH (n)-[r]->(c:Concept) "
+            "RETURN n.id, n.name, n.role, n.mood, n.personality, collect([label(r), c.name])"
+        )
+        catalog: Dict[str, Dict[str, Any]] = {}
+        for npc_id, name, role, mood, personality, edges in rows:
+            npc = {"id": npc_id, "name": name, "role": role or "", "mood": mood or "", "personality": personality or ""}
+            npc.update({key: [] for key in PREFERENCE_KEYS.values()})
+            for rel, concept in edges or []:
+                if rel in PREFERENCE_KEYS and concept is not None:
+                    npc[PREFERENCE_KEYS[rel]].append(concept)
+            catalog[name or npc_id] = npc
+
+        with self._npc_catalog_lock:
+            # A write that landed while we were reading has already invalidated this snapshot
+            if version == self._npc_catalog_version:
+                self._npc_catalog = catalog
+        return catalog
+
+    def get_npc_contexts(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        contexts = self.get_npc_catalog()
+        if user_id is None:
+            return contexts
+        relationships = self._run("read", self._get_npc_relationships_sync, str(user_id))
+        for npc in contexts:
+            npc.update(relationships.get(npc["id"], {"intimacy": 0, "last_interaction": None}))
+        return contexts
+
+    def _get_npc_relationships_sync(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """The user's KNOWS edge to every NPC, as one query (NPCs they never met come back empty)."""
+        self._ensure_initialized()
+        rows = self._statements().rows(
+            "MATCH (n:NPC) OPTIONAL MATCH (u:User {id: $user_id})-[k:KNOWS]->(n) "
+            "RETURN n.id, collect(k.intimacy), collect(k.last_interaction)",
+            {"user_id": user_id},
+        )
+        return {
+            npc_id: {"intimacy": max(intimacy or [0]), "last_interaction": max(seen) if seen else None}
+            for npc_id, intimacy, seen in rows
+        }
 
-            hates_result = self.conn.execute(
-                f"MATCH (n:NPC {{name: '{npc_name}'}})-[:HATES]->(c:Concept) RETURN c.name"
-            )
-            while hates_result.has_next():
-                npc_data["hates"].append(hates_result.get_next()[0])
+    def adjust_npc_intimacy(self, user_id: str, npc_id: str, delta: int) -> bool:
+        return self._run("write", self._adjust_npc_intimacy_sync, str(user_id), npc_id, int(delta))
 
-            cares_result = self.conn.execute(
-                f"MATCH (n:NPC {{name: '{npc_name}'}})-[:CARES_ABOUT]->(c:Concept) RETURN c.name"
+    def _adjust_npc_intimacy_sync(self, user_id: str, npc_id: str, delta: int) -> bool:
+        self._ensure_initialized()
+        try:
+            self._statements().execute(
+                "MERGE (u:User {id: $user_id}) "
+                "MERGE (n:NPC {id: $npc_id}) "
+                "MERGE (u)-[r:KNOWS]->(n) "
+                "ON CREATE SET u.name = 'Unknown', n.name = $npc_id, r.intimacy = 0, r.last_interaction = $ts "
+                "ON MATCH SET r.intimacy = r.intimacy + $delta, r.last_interaction = $ts",
+                {"user_id": user_id, "npc_id": npc_id, "ts": int(time.time()), "delta": delta},
             )
-            while cares_result.has_next():
-                npc_data["cares_about"].append(cares_result.get_next()[0])
+            catalog = self._npc_catalog
+            if catalog is not None and not any(npc["id"] == npc_id for npc in catalog.values()):
+                self.invalidate_npc_catalog()  # The MERGE created a new NPC
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update NPC relationship: {e}")
+            return False
 
-            return npc_data
+    async def get_npc_context(self, npc_name: str) -> Dict[str, Any]:
+        try:
+            catalog = self._npc_catalog
+            if catalog is None:
+                catalog = await self._run_async("read", self._load_npc_catalog_sync)
+            npc = catalog.get(npc_name)
+            if npc is not None:
+                return copy.deepcopy(npc)
         except Exception as e:
             logger.error(f"Failed to get NPC context: {e}")
-            return {"name": npc_name, "role": "Unknown", "mood": "Neutral", "likes": [], "hates": [], "cares_about": []}
+        return {"name": npc_name, "role": "Unknown", "mood": "Neutral", "likes": [], "hates": [], "cares_about": []}
 
 
 _kuzu_instance = None
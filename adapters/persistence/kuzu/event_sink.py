@@ -0,0 +1,185 @@
+"""
+Write-behind Event Sink for the Kuzu graph
+
+`record_user_event` used to run three Cypher statements (MERGE user, CREATE
+event, MATCH+CREATE edge) synchronously on the event loop for every message.
+The sink turns it into a non-blocking `put` on a bounded queue; a dedicated
+graph-writer thread drains the queue and writes everything collected during a
+flush interval (or up to a batch size) with one UNWIND statement pair.
+
+When the queue is full the event is dropped and counted rather than blocking
+the caller. A batch whose write fails is kept and retried with exponential
+backoff (up to `MAX_BACKOFF_SECONDS`); new events wait in the queue meanwhile.
+With a spill path configured, accepted events are also appended to a
+JSON-lines journal that is replayed on start (writes are idempotent on the
+event id) and truncated only after a successful write has caught up, so
+neither a process crash nor a graph error loses journaled events.
+"""
+
+import collections
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class KuzuEventSink:
+    LATENCY_WINDOW = 256  # Flushes kept for the latency percentiles
+    MAX_BACKOFF_SECONDS = 30.0
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Dict[str, Any]]], None],
+        max_queue: int = 10000,
+        flush_interval: float = 0.5,
+        batch_size: int = 500,
+        spill_path: Optional[str] = None,
+    ):
+        self.write_batch = write_batch
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.spill_path = spill_path
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()  # Orders journal appends against truncation
+        self._spill = None
+        self._thread: Optional[threading.Thread] = None
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stopping = threading.Event()  # Cuts a retry backoff short on stop()
+        self._latencies: collections.deque = collections.deque(maxlen=self.LATENCY_WINDOW)
+        # "failed" counts failed flush attempts; their events are retried, not lost
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0, "replayed": 0}
+
+    # --- Producer side (event loop) ---
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        if self.spill_path:
+            self._replay_spill()
+            self._spill = open(self.spill_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="kuzu-graph-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """Queues one event without blocking. Returns False if it was dropped (queue full)."""
+        if self._thread is None:
+            self.start()
+        with self._lock:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+            self._idle.clear()
+            self.stats["enqueued"] += 1
+            if self._spill:
+                self._spill.write(json.dumps(event, ensure_ascii=False) + "\n")
+                self._spill.flush()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Blocks until everything queued so far is written (or `timeout`). For shutdown and tests."""
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass  # A full queue means the writer is backing off; it sees `_stopping` instead
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Graph writer still busy after {timeout}s; {self._queue.qsize()} events left unwritten")
+        self._thread = None
+        with self._lock:
+            if self._spill:
+                self._spill.close()
+                self._spill = None
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        snapshot: Dict[str, Any] = dict(self.stats)
+        snapshot["queue_depth"] = self._queue.qsize()
+        snapshot["queue_capacity"] = self._queue.maxsize
+        snapshot["flush_p50_ms"] = round(latencies[len(latencies) // 2], 2) if latencies else 0.0
+        snapshot["flush_max_ms"] = round(latencies[-1], 2) if latencies else 0.0
+        return snapshot
+
+    # --- Writer thread ---
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        failures = 0
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if failures:
+                # Backing off: leave new events in the (bounded) queue and retry the same batch
+                self._stopping.wait(max(0.0, deadline - time.monotonic()))
+                if self._stopping.is_set():
+                    self._flush(batch)  # Last try; on failure the journal keeps the events for the next start
+                    return
+                item = None
+            else:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+                if item is _STOP or (item is None and self._stopping.is_set()):
+                    self._flush(batch)
+                    return
+                if item is not None:
+                    batch.append(item)
+            if failures or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if self._flush(batch):
+                    batch, failures = [], 0
+                    deadline = time.monotonic() + self.flush_interval
+                else:
+                    failures += 1
+                    deadline = time.monotonic() + min(self.MAX_BACKOFF_SECONDS, self.flush_interval * 2**failures)
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> bool:
+        """Writes `batch`; False (batch to be retried) if the write failed."""
+        if batch:
+            started = time.perf_counter()
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Graph event flush failed ({len(batch)} events); retrying: {e}")
+                return False
+            finally:
+                self.stats["flushes"] += 1
+                self._latencies.append((time.perf_counter() - started) * 1000)
+            self.stats["written"] += len(batch)
+        with self._lock:
+            if self._queue.empty():
+                if self._spill:
+                    self._spill.truncate(0)
+                self._idle.set()
+        return True
+
+    def _replay_spill(self) -> None:
+        """Re-queues events journaled by a previous process that never reached the graph."""
+        if not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self._queue.put_nowait(json.loads(line))
+                except (ValueError, queue.Full):
+                    continue
+                self._idle.clear()
+                self.stats["replayed"] += 1
+        if self.stats["replayed"]:
+            logger.info(f"Replaying {self.stats['replayed']} journaled graph events")
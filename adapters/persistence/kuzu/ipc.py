@@ -0,0 +1,43 @@
+"""
+Graph Sidecar Wire Format
+
+Frames on the sidecar's Unix socket are a 4-byte big-endian length followed
+by a compact JSON object:
+
+- Request: {"id": 7, "op": "get_user_history", "args": [...], "kwargs": {...}}
+- Batch: {"id": 8, "op": "batch", "args": [[[op, args, kwargs], ...]]}, run back to back on one thread
+- Response: {"id": 7, "ok": true, "result": ...} or {"id": 7, "ok": false, "error": "..."}
+
+Responses carry the request id and may arrive out of order, so a client can
+pipeline any number of requests on one connection.
+"""
+
+import asyncio
+import json
+import struct
+from typing import Any, Dict, Optional
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    # default=str: Kuzu rows may hold dates/UUIDs; they cross the socket as strings
+    body = json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+    if len(body) > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {len(body)} bytes exceeds {MAX_FRAME_BYTES}")
+    return _HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """The next message, or None once the peer closed the connection between frames."""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return json.loads(await reader.readexactly(length))
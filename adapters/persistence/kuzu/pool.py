@@ -0,0 +1,127 @@
+"""
+Kuzu Connection Pool
+
+A `kuzu.Connection` must not be used from two threads at once, and the adapter
+used to share one across every `asyncio.to_thread` caller (GraphService,
+ContextService, the nerves API). The pool opens connections on the shared
+`kuzu.Database` and pins each one to a thread of a dedicated executor:
+
+- Read lane: `size` threads, one connection each, so reads run in parallel.
+- Write lane: a single thread with its own connection. Kuzu allows one write
+  transaction at a time, so serializing writes here avoids write-write
+  conflicts instead of surfacing them as errors.
+
+Every task records how long it waited for a thread and how long it ran, as
+fixed-bucket histograms reported by `metrics()`.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            count = sum(self.counts)
+            labels = [f"le_{b}" for b in self.bounds] + ["inf"]
+            return {
+                "count": count,
+                "avg_ms": round(self.total_ms / count, 3) if count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class KuzuConnectionPool:
+    def __init__(self, connect: Callable[[], Any], size: int = 4):
+        """`connect` opens one connection; it is called once in every pool thread."""
+        self.connect = connect
+        self.size = max(1, size)
+        self._local = threading.local()
+        self._readers = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="kuzu-read", initializer=self._open_connection
+        )
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="kuzu-write", initializer=self._open_connection
+        )
+        self._lanes = {"read": self._readers, "write": self._writer}
+        self._wait = {lane: LatencyHistogram() for lane in self._lanes}
+        self._latency = {lane: LatencyHistogram() for lane in self._lanes}
+        self._pending = {lane: 0 for lane in self._lanes}
+        self._lock = threading.Lock()
+
+    def _open_connection(self) -> None:
+        self._local.conn = self.connect()
+
+    def current(self):
+        """The connection pinned to the calling pool thread (None outside the pool)."""
+        return getattr(self._local, "conn", None)
+
+    def _task(self, lane: str, fn: Callable, args: tuple, submitted: float) -> Any:
+        started = time.perf_counter()
+        self._wait[lane].observe((started - submitted) * 1000)
+        try:
+            return fn(self._local.conn, *args)
+        finally:
+            self._latency[lane].observe((time.perf_counter() - started) * 1000)
+            with self._lock:
+                self._pending[lane] -= 1
+
+    def submit(self, lane: str, fn: Callable, *args) -> Future:
+        """Runs `fn(conn, *args)` on the lane's pinned connection."""
+        with self._lock:
+            self._pending[lane] += 1
+        return self._lanes[lane].submit(self._task, lane, fn, args, time.perf_counter())
+
+    def _call(self, lane: str, fn: Callable, args: tuple) -> Any:
+        conn = self.current()
+        if conn is not None and threading.current_thread().name.startswith(f"kuzu-{lane}"):
+            return fn(conn, *args)  # Already on this lane: waiting on it could deadlock
+        return self.submit(lane, fn, *args).result()
+
+    def read(self, fn: Callable, *args) -> Any:
+        """Blocking read for sync callers."""
+        return self._call("read", fn, args)
+
+    def write(self, fn: Callable, *args) -> Any:
+        """Blocking write through the single-writer lane."""
+        return self._call("write", fn, args)
+
+    async def run_read(self, fn: Callable, *args) -> Any:
+        return await asyncio.wrap_future(self.submit("read", fn, *args))
+
+    async def run_write(self, fn: Callable, *args) -> Any:
+        return await asyncio.wrap_future(self.submit("write", fn, *args))
+
+    def shutdown(self) -> None:
+        for executor in self._lanes.values():
+            executor.shutdown(wait=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        lanes: List[str] = list(self._lanes)
+        return {
+            "size": {"read": self.size, "write": 1},
+            "pending": dict(self._pending),
+            "wait_ms": {lane: self._wait[lane].snapshot() for lane in lanes},
+            "query_ms": {lane: self._latency[lane].snapshot() for lane in lanes},
+        }
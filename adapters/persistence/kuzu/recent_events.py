@@ -0,0 +1,129 @@
+"""
+Recent Event Cache
+
+`get_user_history` / `query_recent_context` ran an ORDER BY timestamp DESC
+LIMIT over all of a user's Event nodes, and ContextService and the narrator
+call them on every chat turn. The cache keeps a bounded ring buffer of each
+user's newest events in memory:
+
+- Writes: `record_user_event` appends the event as it is accepted (before the
+  write-behind flush reaches Kuzu).
+- Reads: a warm buffer answers any `limit` up to its capacity without touching
+  the graph. A cold buffer is warmed with one Kuzu read, merged by event id
+  with whatever was appended while it was cold.
+- Budget: buffers are charged an estimated size per event; the least recently
+  used users are evicted once the total exceeds `max_bytes`.
+"""
+
+import collections
+import itertools
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+# Rough per-event overhead of the dict, its keys and the int timestamp
+_EVENT_OVERHEAD = 400
+
+
+def _event_size(event: Dict[str, Any]) -> int:
+    return _EVENT_OVERHEAD + sum(sys.getsizeof(v) for v in event.values() if isinstance(v, str))
+
+
+class _Buffer:
+    __slots__ = ("events", "warm", "size")
+
+    def __init__(self, capacity: int):
+        self.events: collections.deque = collections.deque(maxlen=capacity)  # Oldest -> newest
+        self.warm = False  # Holds the newest `capacity` events the graph has for this user
+        self.size = 0
+
+
+class RecentEventCache:
+    def __init__(self, per_user: int = 50, max_bytes: int = 16 * 1024 * 1024):
+        self.per_user = max(1, per_user)
+        self.max_bytes = max(1, max_bytes)
+        self._buffers: "collections.OrderedDict[str, _Buffer]" = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, user_id: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Newest-first events, or None if the graph has to be read (cold buffer or limit > capacity)."""
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            if buffer is None or not buffer.warm or limit > self.per_user:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self._buffers.move_to_end(user_id)
+            return [dict(event) for event in itertools.islice(reversed(buffer.events), max(0, limit))]
+
+    def append(self, user_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            buffer = self._buffer(user_id)
+            self._push(buffer, dict(event))
+            self._evict()
+
+    def warm(self, user_id: str, newest_first: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fills the buffer from a graph read of the newest `per_user` events. Returns them newest-first."""
+        with self._lock:
+            buffer = self._buffer(user_id)
+            merged = {event["id"]: dict(event) for event in newest_first}
+            for event in buffer.events:  # Appended while cold; may not have reached the graph yet
+                merged.setdefault(event["id"], event)
+            ordered = sorted(merged.values(), key=lambda e: e.get("timestamp") or 0)
+            buffer.events.clear()
+            self._bytes -= buffer.size
+            buffer.size = 0
+            for event in ordered:
+                self._push(buffer, event)
+            buffer.warm = True
+            self._evict()
+            return [dict(event) for event in reversed(buffer.events)]
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drops one user's buffer, or every buffer (e.g. after events were deleted)."""
+        with self._lock:
+            users = [user_id] if user_id is not None else list(self._buffers)
+            for uid in users:
+                buffer = self._buffers.pop(uid, None)
+                if buffer is not None:
+                    self._bytes -= buffer.size
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+                "users": len(self._buffers),
+                "events": sum(len(b.events) for b in self._buffers.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    # --- Internals (hold the lock) ---
+
+    def _buffer(self, user_id: str) -> _Buffer:
+        buffer = self._buffers.get(user_id)
+        if buffer is None:
+            buffer = self._buffers[user_id] = _Buffer(self.per_user)
+        self._buffers.move_to_end(user_id)
+        return buffer
+
+    def _push(self, buffer: _Buffer, event: Dict[str, Any]) -> None:
+        if len(buffer.events) == buffer.events.maxlen:
+            dropped = _event_size(buffer.events[0])
+            buffer.size -= dropped
+            self._bytes -= dropped
+        buffer.events.append(event)
+        size = _event_size(event)
+        buffer.size += size
+        self._bytes += size
+
+    def _evict(self) -> None:
+        # Never evict the most recently used buffer, even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._buffers) > 1:
+            _, buffer = self._buffers.popitem(last=False)
+            self._bytes -= buffer.size
+            self.stats["evictions"] += 1
@@ -0,0 +1,208 @@
+"""
+Graph Event Retention
+
+Every message adds an `Event` node and a `TRIGGERED_BY` edge, and nothing
+deleted them, so the graph file, its WAL and history reads grew without
+bound. Retention rolls events older than `KUZU_EVENT_RETENTION_DAYS` up into
+one `DailySummary` node per user and UTC day (event count, counts by event
+type, and how often each seeded Concept is named in the metadata), then
+deletes the raw events and checkpoints the WAL.
+
+Work is done in chunks of `KUZU_EVENT_COMPACTION_BATCH_SIZE` events, oldest
+first, on the adapter's single-writer lane, so a day's summary is rewritten
+only where a chunk boundary splits it. Each chunk folds its rollup into the
+stored summaries and deletes its events in one transaction, so a crash never
+loses a rolled-up count or counts an event twice. Other graph writes are
+interleaved between chunks.
+
+Kuzu does not shrink the database file: the first compaction checkpoints the
+deletes into it, and later events reuse the freed pages, so the file
+plateaus instead of growing with every message. `bytes_reclaimed` reports
+the measured change of file + WAL, which can be negative on that first run.
+"""
+
+import collections
+import datetime
+import json
+import logging
+import os
+import re
+import statistics
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from adapters.persistence.kuzu.adapter import KuzuAdapter
+
+logger = logging.getLogger(__name__)
+
+_OLD_EVENTS = (
+    "MATCH (e:Event)-[:TRIGGERED_BY]->(u:User) WHERE e.timestamp < $cutoff "
+    "RETURN e.id, u.id, e.type, e.timestamp, e.metadata ORDER BY e.timestamp LIMIT $limit"
+)
+_HISTORY_PROBE = (
+    "MATCH (e:Event)-[:TRIGGERED_BY]->(u:User {id: $user_id}) "
+    "RETURN e.id, e.type, e.timestamp, e.metadata ORDER BY e.timestamp DESC LIMIT 10"
+)
+
+
+class KuzuEventRetention:
+    PROBE_RUNS = 5  # History reads timed before and after; the median is reported
+
+    def __init__(self, adapter: "KuzuAdapter"):
+        self.adapter = adapter
+        self.last_run: Dict[str, Any] = {}
+
+    def run(self, now: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+        """Compacts every event older than the retention window. Blocking; call from a worker thread."""
+        t0 = time.perf_counter()
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        cutoff = int((now - datetime.timedelta(days=settings.KUZU_EVENT_RETENTION_DAYS)).timestamp())
+        batch_size = max(1, settings.KUZU_EVENT_COMPACTION_BATCH_SIZE)
+
+        stats: Dict[str, Any] = {"events_deleted": 0, "summaries_written": 0, "chunks": 0, "users": 0}
+        self.adapter._run("write", self._checkpoint)  # Measure against a checkpointed file, not a WAL
+        stats["bytes_before"] = self.database_bytes()
+        probe_user = self.adapter._run("read", self._busiest_user, cutoff)
+        stats["history_ms_before"] = self._probe(probe_user)
+
+        concepts = [row[0] for row in self.adapter.query("MATCH (c:Concept) RETURN c.name")]
+        users: set = set()
+        while True:
+            deleted, summaries, chunk_users = self.adapter._run(
+                "write", self._compact_chunk, cutoff, batch_size, concepts
+            )
+            if not deleted:
+                break
+            stats["events_deleted"] += deleted
+            stats["summaries_written"] += summaries
+            stats["chunks"] += 1
+            users.update(chunk_users)
+            if deleted < batch_size:
+                break
+
+        if stats["events_deleted"]:
+            self.adapter._run("write", self._checkpoint)
+            for user_id in users:
+                self.adapter.recent_events.invalidate(user_id)
+        stats["users"] = len(users)
+        stats["bytes_after"] = self.database_bytes()
+        stats["bytes_reclaimed"] = stats["bytes_before"] - stats["bytes_after"]
+        stats["history_ms_after"] = self._probe(probe_user)
+        stats["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+
+        self.last_run = stats
+        if stats["events_deleted"]:
+            logger.info("Graph event retention: %s", stats)
+        return stats
+
+    def database_bytes(self) -> int:
+        """Size of the database file (or directory) plus its WAL."""
+        total = 0
+        for path in (self.adapter.db_path, f"{self.adapter.db_path}.wal"):
+            if os.path.isdir(path):
+                for root, _, files in os.walk(path):
+                    total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+            elif os.path.exists(path):
+                total += os.path.getsize(path)
+        return total
+
+    # --- Graph work (runs on a pool lane) ---
+
+    def _busiest_user(self, cutoff: int) -> Optional[str]:
+        rows = self.adapter._statements().rows(
+            "MATCH (e:Event)-[:TRIGGERED_BY]->(u:User) WHERE e.timestamp < $cutoff "
+            "RETURN u.id, count(*) AS n ORDER BY n DESC LIMIT 1",
+            {"cutoff": cutoff},
+        )
+        return rows[0][0] if rows else None
+
+    def _probe(self, user_id: Optional[str]) -> float:
+        if user_id is None:
+            return 0.0
+
+        def timed() -> float:
+            started = time.perf_counter()
+            self.adapter._statements().rows(_HISTORY_PROBE, {"user_id": user_id})
+            return (time.perf_counter() - started) * 1000
+
+        samples = [self.adapter._run("read", timed) for _ in range(self.PROBE_RUNS)]
+        return round(statistics.median(samples), 3)
+
+    def _compact_chunk(self, cutoff: int, batch_size: int, concepts: List[str]) -> Tuple[int, int, set]:
+        statements = self.adapter._statements()
+        rows = statements.rows(_OLD_EVENTS, {"cutoff": cutoff, "limit": batch_size})
+        if not rows:
+            return 0, 0, set()
+
+        rollup = self._rollup(rows, concepts)
+        stored = statements.rows(
+            "UNWIND $ids AS sid MATCH (d:DailySummary {id: sid}) "
+            "RETURN d.id, d.events, d.type_counts, d.concept_counts",
+            {"ids": list(rollup)},
+        )
+        for summary_id, events, type_counts, concept_counts in stored:
+            summary = rollup[summary_id]
+            summary["events"] += events or 0
+            summary["type_counts"].update(json.loads(type_counts or "{}"))
+            summary["concept_counts"].update(json.loads(concept_counts or "{}"))
+
+        summaries = [
+            {
+                **summary,
+                "type_counts": json.dumps(dict(summary["type_counts"]), ensure_ascii=False),
+                "concept_counts": json.dumps(dict(summary["concept_counts"].most_common()), ensure_ascii=False),
+            }
+            for summary in rollup.values()
+        ]
+        conn = statements.conn
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            statements.execute(
+                "UNWIND $summaries AS s MERGE (d:DailySummary {id: s.id}) "
+                "SET d.user_id = s.user_id, d.day = s.day, d.events = s.events, "
+                "d.type_counts = s.type_counts, d.concept_counts = s.concept_counts",
+                {"summaries": summaries},
+            )
+            statements.execute(
+                "UNWIND $summaries AS s MATCH (d:DailySummary {id: s.id}), (u:User {id: s.user_id}) "
+                "OPTIONAL MATCH (d)-[x:SUMMARIZES]->(u) WITH d, u, x WHERE x IS NULL "
+                "CREATE (d)-[:SUMMARIZES]->(u)",
+                {"summaries": summaries},
+            )
+            statements.execute(
+                "UNWIND $ids AS eid MATCH (e:Event {id: eid}) DETACH DELETE e", {"ids": [row[0] for row in rows]}
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows), len(summaries), {row[1] for row in rows}
+
+    def _rollup(self, rows: List[Any], concepts: List[str]) -> Dict[str, Dict[str, Any]]:
+        rollup: Dict[str, Dict[str, Any]] = {}
+        # Whole words of the event's metadata only: the type ("ACTION") or "interaction" must not count "Action"
+        patterns = [(c, re.compile(rf"\b{re.escape(c)}\b", re.IGNORECASE)) for c in concepts if c]
+        for _, user_id, event_type, timestamp, metadata in rows:
+            day = datetime.datetime.fromtimestamp(timestamp or 0, datetime.timezone.utc).date().isoformat()
+            summary_id = f"{user_id}:{day}"
+            summary = rollup.get(summary_id)
+            if summary is None:
+                summary = rollup[summary_id] = {
+                    "id": summary_id,
+                    "user_id": user_id,
+                    "day": day,
+                    "events": 0,
+                    "type_counts": collections.Counter(),
+                    "concept_counts": collections.Counter(),
+                }
+            summary["events"] += 1
+            summary["type_counts"][event_type or "UNKNOWN"] += 1
+            text = str(metadata or "")
+            summary["concept_counts"].update(c for c, pattern in patterns if pattern.search(text))
+        return rollup
+
+    def _checkpoint(self) -> None:
+        self.adapter._statements().conn.execute("CHECKPOINT")
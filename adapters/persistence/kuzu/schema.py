@@ -0,0 +1,145 @@
+"""
+Graph Schema Migrations
+
+Startup used to attempt every CREATE NODE/REL TABLE (catching "already
+exists") and re-MERGE every seeded NPC and concept, on every boot. The graph
+now carries a `SchemaVersion` marker node: initialization reads it once and
+applies only the migrations above it, so a warm start is a single read.
+
+Migrations are append-only. Change the schema or the seed data by adding a
+step with the next version, never by editing one that has shipped. Steps
+use IF NOT EXISTS / MERGE, so graphs created before the marker existed
+(version 0) upgrade in place, and a step cut short by a crash is re-run.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from adapters.persistence.graph_seed import CONCEPTS, DEFAULT_USER, NPCS, PREFERENCES
+from adapters.persistence.kuzu.prepared import PreparedConnection, identifier
+
+logger = logging.getLogger(__name__)
+
+_MARKER_ID = "graph"
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[PreparedConnection], None]
+
+
+def _create(statements: PreparedConnection, *ddl: str) -> None:
+    for statement in ddl:
+        statements.conn.execute(statement)
+
+
+def _core_schema(statements: PreparedConnection) -> None:
+    _create(
+        statements,
+        "CREATE NODE TABLE IF NOT EXISTS User(id STRING, name STRING, PRIMARY KEY (id))",
+        "CREATE NODE TABLE IF NOT EXISTS NPC(id STRING, name STRING, role STRING, personality STRING, mood STRING, "
+        "PRIMARY KEY (id))",
+        "CREATE NODE TABLE IF NOT EXISTS Concept(name STRING, description STRING, PRIMARY KEY (name))",
+        "CREATE NODE TABLE IF NOT EXISTS Quest(id STRING, title STRING, status STRING, PRIMARY KEY (id))",
+        "CREATE NODE TABLE IF NOT EXISTS Location(name STRING, description STRING, PRIMARY KEY (name))",
+        "CREATE NODE TABLE IF NOT EXISTS Event(id STRING, type STRING, content STRING, timestamp INT64, "
+        "metadata STRING, PRIMARY KEY (id))",
+        "CREATE REL TABLE IF NOT EXISTS HATES(FROM NPC TO Concept)",
+        "CREATE REL TABLE IF NOT EXISTS LIKES(FROM NPC TO Concept)",
+        "CREATE REL TABLE IF NOT EXISTS CARES_ABOUT(FROM NPC TO Concept)",
+        "CREATE REL TABLE IF NOT EXISTS LOCATED_AT(FROM NPC TO Location)",
+        "CREATE REL TABLE IF NOT EXISTS INTERACTED_WITH(FROM User TO NPC, timestamp STRING)",
+        "CREATE REL TABLE IF NOT EXISTS COMPLETED(FROM User TO Quest, timestamp STRING)",
+        "CREATE REL TABLE IF NOT EXISTS FAILED(FROM User TO Quest, timestamp STRING)",
+        "CREATE REL TABLE IF NOT EXISTS VISITED(FROM User TO Location, count INT)",
+        "CREATE REL TABLE IF NOT EXISTS TRIGGERED_BY(FROM Event TO User)",
+        "CREATE REL TABLE IF NOT EXISTS PERFORMED(FROM User TO Event)",
+        "CREATE REL TABLE IF NOT EXISTS WITNESSED(FROM NPC TO Event)",
+        "CREATE REL TABLE IF NOT EXISTS INVOLVED(FROM Event TO NPC)",
+        "CREATE REL TABLE IF NOT EXISTS REQUIRES(FROM Quest TO Quest)",
+        "CREATE REL TABLE IF NOT EXISTS KNOWS(FROM User TO NPC, intimacy INT64, last_interaction INT64)",
+        "CREATE REL TABLE IF NOT EXISTS REMEMBERED(FROM NPC TO Event)",
+    )
+
+
+def _daily_summaries(statements: PreparedConnection) -> None:
+    _create(
+        statements,
+        "CREATE NODE TABLE IF NOT EXISTS DailySummary(id STRING, user_id STRING, day STRING, events INT64, "
+        "type_counts STRING, concept_counts STRING, PRIMARY KEY (id))",
+        "CREATE REL TABLE IF NOT EXISTS SUMMARIZES(FROM DailySummary TO User)",
+    )
+
+
+def _seed(statements: PreparedConnection) -> None:
+    for name, description in CONCEPTS:
+        statements.execute(
+            "MERGE (c:Concept {name: $name}) ON CREATE SET c.description = $description",
+            {"name": name, "description": description},
+        )
+    for name, role, mood, personality in NPCS:
+        statements.execute(
+            "MERGE (n:NPC {id: $id}) "
+            "ON CREATE SET n.name = $name, n.role = $role, n.mood = $mood, n.personality = $personality "
+            "ON MATCH SET n.role = $role, n.mood = $mood",
+            {"id": name.lower(), "name": name, "role": role, "mood": mood, "personality": personality},
+        )
+    for npc_id, rel, concept in PREFERENCES:
+        statements.execute(
+            f"MATCH (n:NPC {{id: $npc_id}}), (c:Concept {{name: $concept}}) MERGE (n)-[:{identifier(rel)}]->(c)",
+            {"npc_id": npc_id, "concept": concept},
+        )
+    user_id, user_name = DEFAULT_USER
+    statements.execute("MERGE (u:User {id: $id}) ON CREATE SET u.name = $name", {"id": user_id, "name": user_name})
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "core_schema", _core_schema),
+    Migration(2, "daily_summaries", _daily_summaries),
+    Migration(3, "seed_npcs_and_concepts", _seed),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def read_version(statements: PreparedConnection) -> int:
+    try:
+        rows = statements.rows("MATCH (v:SchemaVersion {id: $id}) RETURN v.version", {"id": _MARKER_ID})
+    except RuntimeError:  # Binder exception: no marker table yet
+        return 0
+    return int(rows[0][0]) if rows else 0
+
+
+def migrate(statements: PreparedConnection, timings: Dict[str, float]) -> List[Migration]:
+    """Applies the migrations above the stored version, in order. Returns those applied; fills `timings` (ms)."""
+    started = time.perf_counter()
+    version = read_version(statements)
+    timings["schema_version"] = _elapsed_ms(started)
+    logger.info(f"Kuzu startup: schema version {version} read in {timings['schema_version']} ms")
+    if version > LATEST_VERSION:
+        logger.warning(f"Graph schema v{version} is newer than this build (v{LATEST_VERSION}); leaving it as is")
+
+    pending = [m for m in MIGRATIONS if m.version > version]
+    if pending:
+        statements.conn.execute(
+            "CREATE NODE TABLE IF NOT EXISTS SchemaVersion(id STRING, version INT64, applied_at INT64, PRIMARY KEY (id))"
+        )
+    for migration in pending:
+        started = time.perf_counter()
+        migration.apply(statements)
+        # Recorded per step, so a crash part-way resumes at the first unapplied step
+        statements.execute(
+            "MERGE (v:SchemaVersion {id: $id}) SET v.version = $version, v.applied_at = $applied_at",
+            {"id": _MARKER_ID, "version": migration.version, "applied_at": int(time.time())},
+        )
+        timings[f"migration_{migration.version}_{migration.name}"] = _elapsed_ms(started)
+        logger.info(
+            f"Kuzu startup: migration {migration.version} ({migration.name}) applied in "
+            f"{timings[f'migration_{migration.version}_{migration.name}']} ms"
+        )
+    return pending
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
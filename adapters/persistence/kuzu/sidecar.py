@@ -0,0 +1,188 @@
+"""
+Graph Sidecar
+
+Hosts the one KuzuAdapter of a deployment in a dedicated process, so several
+API workers can share the embedded graph (Kuzu holds a file lock) and graph
+query CPU stays off the request event loops. Workers set
+`KUZU_SIDECAR_SOCKET` and talk to it through `KuzuSidecarClient`.
+
+- Requests arrive on a Unix socket (mode 0600) in the frames of `ipc.py`.
+  Each request is dispatched as its own task, so pipelined reads from one
+  connection run in parallel on the adapter's read lanes.
+- A batch frame runs its calls back to back on one thread. Clients use it to
+  ship buffered `record_user_event` calls, which land in the adapter's
+  write-behind queue.
+- Event retention runs here, once a day, instead of in every worker.
+
+Run: python -m adapters.persistence.kuzu.sidecar [socket_path]
+Then: KUZU_SIDECAR_SOCKET=<socket_path> uvicorn app.main:app --workers N
+"""
+
+import asyncio
+import datetime
+import inspect
+import logging
+import os
+import signal
+import stat
+import sys
+from typing import Any, Dict, List, Optional, Set
+
+from adapters.persistence.kuzu.ipc import encode_frame, read_frame
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# KuzuAdapter methods a client may call (lifecycle methods like close stay with the sidecar)
+OPS = {
+    "query",
+    "add_node",
+    "add_relationship",
+    "get_npc_context",
+    "get_npc_contexts",
+    "get_npc_catalog",
+    "adjust_npc_intimacy",
+    "record_user_event",
+    "get_user_history",
+    "add_quest_dependency",
+    "get_unlockable_templates",
+    "compact_events",
+    "initialize",
+}
+
+
+class KuzuSidecarServer:
+    def __init__(self, adapter: Any, socket_path: str):
+        self.adapter = adapter
+        self.socket_path = socket_path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.stats = {"connections": 0, "requests": 0, "batched_calls": 0, "errors": 0}
+
+    async def start(self) -> None:
+        await self.adapter.initialize()
+        if os.path.exists(self.socket_path) and stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+            os.unlink(self.socket_path)  # Left behind by a sidecar that did not shut down cleanly
+        if os.path.dirname(self.socket_path):
+            os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Graph sidecar listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):  # wait_closed() waits for open connections
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._tasks):
+            task.cancel()
+        # Flushes the write-behind queue and stops the pool threads
+        await asyncio.to_thread(self.adapter.close)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def run(self) -> None:
+        """Serves until SIGINT/SIGTERM, compacting old events daily."""
+        await self.start()
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stopped.set)
+        if settings.KUZU_EVENT_RETENTION_DAYS > 0:
+            self._spawn(self._retention_loop())
+        await stopped.wait()
+        await self.stop()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _retention_loop(self) -> None:
+        while True:
+            await asyncio.sleep(24 * 3600)
+            try:
+                await asyncio.to_thread(self.adapter.compact_events)
+            except Exception as e:
+                logger.error(f"Graph retention failed: {e}")
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats["connections"] += 1
+        self._writers.add(writer)
+        write_lock = asyncio.Lock()
+        try:
+            while True:
+                request = await read_frame(reader)
+                if request is None:
+                    break
+                self._spawn(self._respond(request, writer, write_lock))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            logger.warning(f"Graph sidecar connection dropped: {e}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, request: Dict[str, Any], writer: asyncio.StreamWriter, write_lock: asyncio.Lock) -> None:
+        self.stats["requests"] += 1
+        try:
+            response = {"id": request.get("id"), "ok": True, "result": await self._dispatch(request)}
+        except Exception as e:
+            self.stats["errors"] += 1
+            response = {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+        if writer.is_closing():
+            return
+        async with write_lock:
+            writer.write(encode_frame(response))
+            await writer.drain()
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Any:
+        op, args, kwargs = request.get("op"), request.get("args") or [], request.get("kwargs") or {}
+        if op == "batch":
+            return await asyncio.to_thread(self._run_batch, *args)
+        method = self._method(op)
+        if op == "compact_events" and args and args[0]:
+            args = [datetime.datetime.fromisoformat(args[0])]
+        if inspect.iscoroutinefunction(method):
+            return await method(*args, **kwargs)
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    def _method(self, op: Any):
+        if op not in OPS:
+            raise ValueError(f"Unsupported graph sidecar op {op!r}")
+        return getattr(self.adapter, op)
+
+    def _run_batch(self, calls: List[Any]) -> List[Any]:
+        """Runs blocking calls in order; a failing call yields None without stopping the batch."""
+        results = []
+        for op, args, kwargs in calls:
+            self.stats["batched_calls"] += 1
+            try:
+                method = self._method(op)
+                if inspect.iscoroutinefunction(method):
+                    raise ValueError(f"{op} cannot be batched")
+                results.append(method(*args, **kwargs))
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Graph sidecar batch call {op} failed: {e}")
+                results.append(None)
+        return results
+
+
+def main():
+    from adapters.persistence.kuzu.adapter import KuzuAdapter
+
+    socket_path = sys.argv[1] if len(sys.argv) > 1 else settings.KUZU_SIDECAR_SOCKET
+    if not socket_path:
+        raise SystemExit(
+            "Usage: python -m adapters.persistence.kuzu.sidecar <socket_path> (or set KUZU_SIDECAR_SOCKET)"
+        )
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    asyncio.run(KuzuSidecarServer(KuzuAdapter(), socket_path).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Graph Sidecar Client
+
+KuzuAdapter's interface, served by the graph sidecar over its Unix socket
+(see `sidecar.py`). Selected by setting `KUZU_SIDECAR_SOCKET`; it never
+imports or opens Kuzu, so any number of workers can run it.
+
+- One connection per process, driven by a private event loop thread. Calls
+  from any thread are pipelined on it and matched to responses by id, so a
+  slow graph query never holds up other requests or the caller's event loop.
+- `record_user_event` only buffers the event and returns; the buffer is
+  shipped as one batch frame every `KUZU_SIDECAR_FLUSH_SECONDS`. A history
+  read flushes it first, so a user always sees their own events.
+- Errors mirror KuzuAdapter: writes return False and history/unlock reads an
+  empty list when the sidecar cannot be reached; `query` raises.
+"""
+
+import asyncio
+import collections
+import itertools
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from adapters.persistence.kuzu.ipc import encode_frame, read_frame
+from app.core.config import settings
+from domain.ports.graph_port import GraphPort
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TIMEOUT = object()  # KUZU_SIDECAR_TIMEOUT; compact_events waits without a limit
+
+
+class KuzuSidecarError(RuntimeError):
+    """An adapter call failed inside the sidecar."""
+
+
+class KuzuSidecarClient(GraphPort):
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        self.socket_path = socket_path or settings.KUZU_SIDECAR_SOCKET
+        self.timeout = timeout or settings.KUZU_SIDECAR_TIMEOUT
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        # Owned by the loop thread
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        # [user_id, type, metadata] waiting for the next batch frame (appended from any thread)
+        self._events: collections.deque = collections.deque()
+        self.stats = {"requests": 0, "batches": 0, "events": 0, "dropped": 0, "errors": 0, "connects": 0}
+
+    # --- Loop thread ---
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="graph-sidecar", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _call(self, op: str, *args, timeout: Any = _DEFAULT_TIMEOUT, **kwargs) -> Any:
+        """Blocking call from any thread except the loop thread."""
+        future = asyncio.run_coroutine_threadsafe(self._request(op, list(args), kwargs, timeout), self._ensure_loop())
+        return future.result()
+
+    async def _call_async(self, op: str, *args, **kwargs) -> Any:
+        future = asyncio.run_coroutine_threadsafe(self._request(op, list(args), kwargs), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def _call_or(self, default: Any, op: str, *args, **kwargs) -> Any:
+        try:
+            return self._call(op, *args, **kwargs)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Graph sidecar {op} failed: {e}")
+            return default
+
+    async def _connection(self) -> asyncio.StreamWriter:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.socket_path), timeout=self.timeout
+                )
+                self._reader, self._writer = reader, writer
+                self.stats["connects"] += 1
+                asyncio.get_running_loop().create_task(self._read_responses(reader, writer))
+        return self._writer
+
+    async def _request(self, op: str, args: List[Any], kwargs: Dict[str, Any], timeout: Any = _DEFAULT_TIMEOUT) -> Any:
+        writer = await self._connection()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.stats["requests"] += 1
+        try:
+            writer.write(encode_frame({"id": request_id, "op": op, "args": args, "kwargs": kwargs}))
+            await writer.drain()
+            response = await asyncio.wait_for(future, self.timeout if timeout is _DEFAULT_TIMEOUT else timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if not response.get("ok"):
+            raise KuzuSidecarError(response.get("error"))
+        return response.get("result")
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                response = await read_frame(reader)
+                if response is None:
+                    break
+                future = self._pending.get(response.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            logger.warning(f"Graph sidecar connection lost: {e}")
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._reader = self._writer = None
+            # Requests sent on this connection will never be answered; the next call reconnects
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(ConnectionError("Graph sidecar connection lost"))
+
+    # --- Batched event writes ---
+
+    def _start_flusher(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        # Exits once the buffer is empty; the next record_user_event starts it again
+        while self._events:
+            await asyncio.sleep(settings.KUZU_SIDECAR_FLUSH_SECONDS)
+            if not await self._flush():
+                await asyncio.sleep(1.0)  # Sidecar down: back off instead of reconnecting every tick
+
+    async def _flush(self) -> bool:
+        """Ships every buffered event, one batch frame per KUZU_EVENT_BATCH_SIZE. False if the sidecar is down."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            while self._events:
+                calls = []
+                while self._events and len(calls) < settings.KUZU_EVENT_BATCH_SIZE:
+                    calls.append(["record_user_event", self._events.popleft(), {}])
+                try:
+                    await self._request("batch", [calls], {})
+                    self.stats["batches"] += 1
+                except Exception as e:
+                    # Keep the events for the next flush
+                    self._events.extendleft(reversed([args for _, args, _ in calls]))
+                    self.stats["errors"] += 1
+                    logger.warning(f"Graph sidecar event batch failed: {e}")
+                    return False
+        return True
+
+    async def _history(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        await self._flush()
+        return await self._request("get_user_history", [user_id, limit], {})
+
+    # --- KuzuAdapter interface ---
+
+    async def initialize(self):
+        await self._call_async("initialize")
+
+    def close(self) -> None:
+        """Ships buffered events, then drops the connection and the loop thread (not the sidecar)."""
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(self.timeout)
+        except Exception as e:
+            logger.warning(f"Graph sidecar client shutdown: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+        self._loop.close()
+        self._loop = self._thread = None
+        self._connect_lock = self._flush_lock = self._flush_task = None
+
+    async def _shutdown(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        if self._events and not await self._flush():
+            self.stats["dropped"] += len(self._events)
+            logger.error(f"Graph sidecar unreachable; dropped {len(self._events)} buffered events")
+            self._events.clear()
+        if self._writer is not None:
+            self._writer.close()
+
+    def query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        return self._call("query", cypher, params)
+
+    def add_node(self, label: str, properties: Dict[str, Any]) -> bool:
+        return bool(self._call_or(False, "add_node", label, properties))
+
+    async def add_relationship(
+        self,
+        from_label: str,
+        from_key: str,
+        rel_type: str,
+        to_label: str,
+        to_key: str,
+        properties: Dict[str, Any] = None,
+        from_key_field: str = "name",
+        to_key_field: str = "name",
+    ) -> bool:
+        try:
+            return bool(
+                await self._call_async(
+                    "add_relationship",
+                    from_label,
+                    from_key,
+                    rel_type,
+                    to_label,
+                    to_key,
+                    properties,
+                    from_key_field,
+                    to_key_field,
+                )
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Graph sidecar add_relationship failed: {e}")
+            return False
+
+    async def get_npc_context(self, npc_name: str) -> Dict[str, Any]:
+        try:
+            return await self._call_async("get_npc_context", npc_name)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Graph sidecar get_npc_context failed: {e}")
+        return {"name": npc_name, "role": "Unknown", "mood": "Neutral", "likes": [], "hates": [], "cares_about": []}
+
+    def get_npc_contexts(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._call("get_npc_contexts", user_id)
+
+    def get_npc_catalog(self) -> List[Dict[str, Any]]:
+        return self._call("get_npc_catalog")
+
+    def adjust_npc_intimacy(self, user_id: str, npc_id: str, delta: int) -> bool:
+        return bool(self._call_or(False, "adjust_npc_intimacy", user_id, npc_id, delta))
+
+    def record_user_event(self, user_id: str, event_type: str, metadata: Dict[str, Any]) -> bool:
+        """Buffers the event for the next batch frame; False only if the buffer is full."""
+        loop = self._ensure_loop()
+        if len(self._events) >= settings.KUZU_EVENT_QUEUE_SIZE:
+            self.stats["dropped"] += 1
+            return False
+        # The adapter stores str(metadata); stringify here so any value survives the JSON frame unchanged
+        self._events.append([str(user_id), event_type, str(metadata)])
+        self.stats["events"] += 1
+        loop.call_soon_threadsafe(self._start_flusher)
+        return True
+
+    def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._history(str(user_id), limit), self._ensure_loop())
+            return future.result()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Graph sidecar get_user_history failed: {e}")
+            return []
+
+    # Alias for compatibility (same as KuzuAdapter)
+    query_recent_context = get_user_history
+
+    def compact_events(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        return self._call("compact_events", now.isoformat() if now else None, timeout=None)
+
+    def add_quest_dependency(self, child_quest_id: str, parent_quest_id: str) -> bool:
+        return bool(self._call_or(False, "add_quest_dependency", child_quest_id, parent_quest_id))
+
+    def get_unlockable_templates(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._call_or([], "get_unlockable_templates", user_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "connected": self._writer is not None,
+            "in_flight": len(self._pending),
+            "buffered_events": len(self._events),
+        }
+
+
+_client_instance = None
+
+
+def get_kuzu_sidecar_client() -> KuzuSidecarClient:
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = KuzuSidecarClient()
+    return _client_instance
@@ -0,0 +1,154 @@
+"""
+Incremental Quest Unlock Frontier
+
+`get_unlockable_templates` used to scan every Quest node with a NOT EXISTS
+pattern on each daily batch. The frontier keeps the REQUIRES graph in memory
+as adjacency sets (child -> prerequisites, prerequisite -> dependents) and,
+per user, a counter of prerequisites still missing for every quest. A quest
+is on the user's frontier when it is not completed and its counter is zero.
+
+Completing a quest removes it from the frontier and decrements the counters
+of its dependents, so an unlock query costs O(frontier) and a completion
+O(dependents) instead of a graph scan. A user's counters are seeded once from
+their COMPLETED edges on first use; the least recently used users are evicted
+beyond `max_users`.
+"""
+
+import collections
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class _UserFrontier:
+    __slots__ = ("completed", "remaining", "frontier")
+
+    def __init__(self):
+        self.completed: Set[str] = set()
+        self.remaining: Dict[str, int] = {}  # Quest id -> prerequisites not completed yet
+        self.frontier: Set[str] = set()
+
+
+class UnlockFrontier:
+    def __init__(self, max_users: int = 10000):
+        self.max_users = max(1, max_users)
+        self.loaded = False
+        self.titles: Dict[str, Optional[str]] = {}
+        self.requires: Dict[str, Set[str]] = {}  # Child -> prerequisites
+        self.dependents: Dict[str, Set[str]] = {}  # Prerequisite -> children
+        self._users: "collections.OrderedDict[str, _UserFrontier]" = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    # --- Dependency graph ---
+
+    def load(self, quests: Iterable[tuple]) -> None:
+        """Replaces the graph with `(quest_id, title, prerequisite_ids)` rows and drops every user."""
+        with self._lock:
+            self.titles, self.requires, self.dependents = {}, {}, {}
+            self._users.clear()
+            for quest_id, title, prerequisites in quests:
+                self.titles[quest_id] = title
+                for parent in prerequisites or []:
+                    if parent is not None:
+                        self._link(quest_id, parent)
+            self.loaded = True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.loaded = False
+            self._users.clear()
+
+    def invalidate_users(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def _link(self, child: str, parent: str) -> bool:
+        self.titles.setdefault(child, None)
+        self.titles.setdefault(parent, None)
+        if parent in self.requires.get(child, ()):
+            return False
+        self.requires.setdefault(child, set()).add(parent)
+        self.dependents.setdefault(parent, set()).add(child)
+        return True
+
+    def add_quest(self, quest_id: str, title: Optional[str] = None) -> None:
+        with self._lock:
+            if not self.loaded:
+                return
+            is_new = quest_id not in self.titles
+            if title is not None or is_new:
+                self.titles[quest_id] = title
+            if is_new:
+                for user in self._users.values():
+                    user.remaining[quest_id] = 0  # No prerequisites yet
+                    user.frontier.add(quest_id)
+
+    def add_dependency(self, child: str, parent: str) -> None:
+        with self._lock:
+            if not self.loaded:
+                return
+            for quest_id in (child, parent):
+                self.add_quest(quest_id)
+            if not self._link(child, parent):
+                return
+            for user in self._users.values():
+                if parent not in user.completed:
+                    user.remaining[child] = user.remaining.get(child, 0) + 1
+                    user.frontier.discard(child)
+
+    # --- Per-user state ---
+
+    def seed_user(self, user_id: str, completed: Iterable[str]) -> None:
+        """Builds the user's counters from their completed quests (O(quests + dependencies))."""
+        with self._lock:
+            if not self.loaded:
+                return
+            user = _UserFrontier()
+            user.completed = {quest_id for quest_id in completed if quest_id in self.titles}
+            for quest_id in self.titles:
+                if quest_id in user.completed:
+                    continue
+                missing = len(self.requires.get(quest_id, set()) - user.completed)
+                user.remaining[quest_id] = missing
+                if missing == 0:
+                    user.frontier.add(quest_id)
+            self._users[user_id] = user
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def complete(self, user_id: str, quest_id: str) -> None:
+        """Applies one COMPLETED edge. Users not seeded yet pick it up from the graph when they are."""
+        with self._lock:
+            user = self._users.get(user_id) if self.loaded else None
+            if user is None or quest_id in user.completed or quest_id not in self.titles:
+                return
+            user.completed.add(quest_id)
+            user.frontier.discard(quest_id)
+            user.remaining.pop(quest_id, None)
+            for child in self.dependents.get(quest_id, ()):
+                if child in user.completed:
+                    continue
+                user.remaining[child] = max(0, user.remaining.get(child, 1) - 1)
+                if user.remaining[child] == 0:
+                    user.frontier.add(child)
+
+    def unlockable(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        """The user's frontier as template dicts, or None if the user is not seeded."""
+        with self._lock:
+            user = self._users.get(user_id) if self.loaded else None
+            if user is None:
+                return None
+            self._users.move_to_end(user_id)
+            templates = []
+            for quest_id in sorted(user.frontier):
+                prereq_count = len(self.requires.get(quest_id, ()))
+                templates.append(
+                    {
+                        "id": quest_id,
+                        "title": self.titles.get(quest_id),
+                        "type": "CHAIN" if prereq_count else "BASE",
+                        "prereq_count": prereq_count,
+                        "chain": bool(prereq_count),
+                    }
+                )
+            return templates
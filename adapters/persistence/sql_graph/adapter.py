@@ -0,0 +1,480 @@
+"""
+Relational Graph Adapter
+
+GraphPort on plain SQL tables, selected with `GRAPH_BACKEND=sql`. Kuzu is an
+embedded database behind a file lock, so only one process can open it and the
+app is pinned to a single uvicorn worker; these tables can be shared by any
+number of workers.
+
+- Nodes and edges live in `graph_nodes` / `graph_edges`, keyed like the Kuzu
+  schema (`id`, or `name` for Concept and Location), with an index for each
+  edge direction.
+- Events live in `graph_events`, indexed by (user_id, timestamp), so a history
+  read is one index range scan.
+- Traversals are joins: NPC knowledge and a user's KNOWS edges are one query
+  each, unlock checks are NOT EXISTS joins, and a recursive CTE walks the
+  REQUIRES chain to reject dependencies that would close a cycle.
+
+Works on SQLite and Postgres through a synchronous engine on
+`GRAPH_DATABASE_URL` (default: `DATABASE_URL` with its sync driver; Postgres
+uses psycopg). Every worker reads the same rows, so nothing is cached per
+process. Free-form Cypher (`query`) is not supported.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, create_engine, event, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine, make_url
+
+from adapters.persistence.graph_seed import CONCEPTS, DEFAULT_USER, NPCS, PREFERENCE_KEYS, PREFERENCES
+from app.core.config import settings
+from app.models.base import Base
+from app.models.graph import GraphEdge, GraphEvent, GraphNode
+from domain.ports.graph_port import CypherNotSupportedError, GraphPort
+
+logger = logging.getLogger(__name__)
+
+nodes = GraphNode.__table__
+edges = GraphEdge.__table__
+events = GraphEvent.__table__
+
+# Labels whose Kuzu primary key is `name` rather than `id`
+_NAME_KEYED = ("Concept", "Location")
+# Async drivers of DATABASE_URL -> the sync driver used here
+_SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql+psycopg",
+    "postgresql": "postgresql+psycopg",
+    "postgres": "postgresql+psycopg",
+}
+
+
+def sync_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{_SYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")  # Readers in other workers do not block the writer
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _key_field(label: str) -> str:
+    return "name" if label in _NAME_KEYED else "id"
+
+
+class SqlGraphAdapter(GraphPort):
+    def __init__(self, database_url: Optional[str] = None):
+        self.database_url = sync_database_url(
+            database_url or settings.GRAPH_DATABASE_URL or settings.SQLALCHEMY_DATABASE_URI
+        )
+        self.engine: Optional[Engine] = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    # --- Lifecycle ---
+
+    async def initialize(self):
+        """Creates missing tables and seeds NPCs/concepts. Safe to call multiple times (idempotent)."""
+        if self._initialized:
+            return
+        await asyncio.to_thread(self._init_sync)
+
+    def _init_sync(self):
+        with self._init_lock:
+            if self._initialized:
+                return
+            if self.engine is None:
+                self.engine = self._create_engine()
+            # Alembic creates these on the main database; a separate GRAPH_DATABASE_URL starts empty
+            Base.metadata.create_all(self.engine, tables=[nodes, edges, events])
+            with self.engine.begin() as conn:
+                self._seed_sync(conn)
+            self._initialized = True
+            logger.info("SQL graph backend initialized.")
+
+    def _create_engine(self) -> Engine:
+        url = make_url(self.database_url)
+        if url.get_backend_name() != "sqlite":
+            return create_engine(url, pool_pre_ping=True, pool_recycle=300)
+        if url.database and url.database != ":memory:" and os.path.dirname(url.database):
+            os.makedirs(os.path.dirname(url.database), exist_ok=True)
+        # Wait for another worker's write lock instead of failing with "database is locked"
+        engine = create_engine(url, connect_args={"timeout": 30})
+        event.listen(engine, "connect", _sqlite_pragmas)
+        return engine
+
+    def _ensure_initialized(self) -> Engine:
+        if not self._initialized:
+            self._init_sync()
+        assert self.engine is not None
+        return self.engine
+
+    def close(self) -> None:
+        if self.engine is not None:
+            self.engine.dispose()
+
+    def _seed_sync(self, conn: Connection) -> None:
+        for name, description in CONCEPTS:
+            self._merge_node(conn, "Concept", name, {"name": name, "description": description}, overwrite=False)
+        for name, role, mood, personality in NPCS:
+            self._merge_node(conn, "NPC", name.lower(), {"name": name, "personality": personality}, overwrite=False)
+            self._merge_node(conn, "NPC", name.lower(), {"role": role, "mood": mood})
+        for npc_id, rel_type, concept in PREFERENCES:
+            self._merge_edge(
+                conn,
+                self._find_node(conn, "NPC", "id", npc_id),
+                rel_type,
+                self._find_node(conn, "Concept", "name", concept),
+            )
+        user_id, user_name = DEFAULT_USER
+        self._merge_node(conn, "User", user_id, {"name": user_name}, overwrite=False)
+
+    # --- Rows ---
+
+    def _insert(self, conn: Connection, table):
+        return (sqlite_insert if conn.dialect.name == "sqlite" else pg_insert)(table)
+
+    def _merge_node(
+        self, conn: Connection, label: str, key: str, properties: Dict[str, Any], overwrite: bool = True
+    ) -> int:
+        """Upserts a node and returns its row id. `overwrite=False` only fills properties the node lacks."""
+        row = conn.execute(
+            select(nodes.c.id, nodes.c.properties).where(nodes.c.label == label, nodes.c.key == key)
+        ).first()
+        if row is None:
+            values = {_key_field(label): key, **properties}
+            stmt = self._insert(conn, nodes).values(label=label, key=key, name=values.get("name"), properties=values)
+            conn.execute(stmt.on_conflict_do_nothing(index_elements=["label", "key"]))
+            return conn.execute(select(nodes.c.id).where(nodes.c.label == label, nodes.c.key == key)).scalar_one()
+
+        current = row.properties or {}
+        merged = {**current, **properties} if overwrite else {**properties, **current}
+        if merged != current:
+            conn.execute(update(nodes).where(nodes.c.id == row.id).values(name=merged.get("name"), properties=merged))
+        return row.id
+
+    def _find_node(self, conn: Connection, label: str, key_field: str, value: Any) -> Optional[int]:
+        if key_field == _key_field(label):
+            column = nodes.c.key
+        elif key_field == "name":
+            column = nodes.c.name
+        else:
+            raise ValueError(f"{label} nodes can only be matched by {_key_field(label)!r} or 'name'")
+        return conn.execute(
+            select(nodes.c.id).where(nodes.c.label == label, column == str(value)).order_by(nodes.c.id).limit(1)
+        ).scalar()
+
+    def _merge_edge(
+        self, conn: Connection, from_id: int, rel_type: str, to_id: int, properties: Optional[Dict[str, Any]] = None
+    ) -> None:
+        stmt = self._insert(conn, edges).values(
+            from_id=from_id, rel_type=rel_type, to_id=to_id, properties=dict(properties or {})
+        )
+        if properties:
+            # Kuzu's CREATE adds a parallel edge; here the edge is unique and takes the newest properties
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["from_id", "rel_type", "to_id"], set_={"properties": stmt.excluded.properties}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["from_id", "rel_type", "to_id"])
+        conn.execute(stmt)
+
+    # --- GraphPort ---
+
+    def query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        raise CypherNotSupportedError("The SQL graph backend does not run Cypher; use the GraphPort methods")
+
+    def add_node(self, label: str, properties: Dict[str, Any]) -> bool:
+        try:
+            engine = self._ensure_initialized()
+            key_field = "id" if "id" in properties else "name"
+            key = properties.get(key_field)
+            # Values were always written as strings; keep that so both backends return the same types
+            values = {k: str(v) for k, v in properties.items()}
+            with engine.begin() as conn:
+                self._merge_node(conn, label, str(key) if key else str(uuid.uuid4()), values)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add node: {e}")
+            return False
+
+    async def add_relationship(
+        self,
+        from_label: str,
+        from_key: str,
+        rel_type: str,
+        to_label: str,
+        to_key: str,
+        properties: Dict[str, Any] = None,
+        from_key_field: str = "name",
+        to_key_field: str = "name",
+    ) -> bool:
+        return await asyncio.to_thread(
+            self._add_relationship_sync,
+            from_label,
+            from_key,
+            rel_type,
+            to_label,
+            to_key,
+            properties,
+            from_key_field,
+            to_key_field,
+        )
+
+    def _add_relationship_sync(
+        self,
+        from_label: str,
+        from_key: str,
+        rel_type: str,
+        to_label: str,
+        to_key: str,
+        properties: Dict[str, Any] = None,
+        from_key_field: str = "name",
+        to_key_field: str = "name",
+    ) -> bool:
+        try:
+            engine = self._ensure_initialized()
+            with engine.begin() as conn:
+                from_id = self._find_node(conn, from_label, from_key_field, from_key)
+                to_id = self._find_node(conn, to_label, to_key_field, to_key)
+                if from_id is None or to_id is None:
+                    return False
+                self._merge_edge(conn, from_id, rel_type, to_id, {k: str(v) for k, v in (properties or {}).items()})
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add relationship: {e}")
+            return False
+
+    def get_npc_contexts(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        engine = self._ensure_initialized()
+        with engine.connect() as conn:
+            return list(self._npc_contexts(conn, user_id=user_id).values())
+
+    async def get_npc_context(self, npc_name: str) -> Dict[str, Any]:
+        try:
+            contexts = await asyncio.to_thread(self._get_npc_context_sync, npc_name)
+            if npc_name in contexts:
+                return contexts[npc_name]
+        except Exception as e:
+            logger.error(f"Failed to get NPC context: {e}")
+        return {"name": npc_name, "role": "Unknown", "mood": "Neutral", "likes": [], "hates": [], "cares_about": []}
+
+    def _get_npc_context_sync(self, npc_name: str) -> Dict[str, Dict[str, Any]]:
+        engine = self._ensure_initialized()
+        with engine.connect() as conn:
+            return {npc["name"]: npc for npc in self._npc_contexts(conn, name=npc_name).values()}
+
+    def _npc_contexts(
+        self, conn: Connection, name: Optional[str] = None, user_id: Optional[str] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """NPCs with their LIKES/HATES/CARES_ABOUT concepts (one join), plus the user's KNOWS edges (one join)."""
+        npc, concept, pref = nodes.alias("n"), nodes.alias("c"), edges.alias("e")
+        stmt = (
+            select(npc.c.id, npc.c.key, npc.c.name, npc.c.properties, pref.c.rel_type, concept.c.key)
+            .select_from(
+                npc.outerjoin(
+                    pref, and_(pref.c.from_id == npc.c.id, pref.c.rel_type.in_(list(PREFERENCE_KEYS)))
+                ).outerjoin(concept, and_(concept.c.id == pref.c.to_id, concept.c.label == "Concept"))
+            )
+            .where(npc.c.label == "NPC")
+            .order_by(npc.c.id, pref.c.id)
+        )
+        if name is not None:
+            stmt = stmt.where(npc.c.name == name)
+
+        contexts: Dict[int, Dict[str, Any]] = {}
+        for node_id, npc_id, npc_name, properties, rel_type, concept_name in conn.execute(stmt):
+            context = contexts.get(node_id)
+            if context is None:
+                properties = properties or {}
+                context = contexts[node_id] = {
+                    "id": npc_id,
+                    "name": npc_name or npc_id,
+                    "role": properties.get("role") or "",
+                    "mood": properties.get("mood") or "",
+                    "personality": properties.get("personality") or "",
+                    **{key: [] for key in PREFERENCE_KEYS.values()},
+                }
+            if rel_type in PREFERENCE_KEYS and concept_name is not None:
+                context[PREFERENCE_KEYS[rel_type]].append(concept_name)
+
+        if user_id is not None and contexts:
+            user, knows = nodes.alias("u"), edges.alias("k")
+            known = {
+                to_id: properties or {}
+                for to_id, properties in conn.execute(
+                    select(knows.c.to_id, knows.c.properties)
+                    .select_from(knows.join(user, user.c.id == knows.c.from_id))
+                    .where(user.c.label == "User", user.c.key == str(user_id), knows.c.rel_type == "KNOWS")
+                )
+            }
+            for node_id, context in contexts.items():
+                properties = known.get(node_id, {})
+                seen = properties.get("last_interaction")
+                context["intimacy"] = int(properties.get("intimacy") or 0)
+                context["last_interaction"] = int(seen) if seen is not None else None
+        return contexts
+
+    def adjust_npc_intimacy(self, user_id: str, npc_id: str, delta: int) -> bool:
+        try:
+            engine = self._ensure_initialized()
+            ts = int(time.time())
+            with engine.begin() as conn:
+                user = self._merge_node(conn, "User", str(user_id), {"name": "Unknown"}, overwrite=False)
+                npc = self._merge_node(conn, "NPC", npc_id, {"name": npc_id}, overwrite=False)
+                # Locks the edge on Postgres, so concurrent workers add their deltas one after the other
+                row = conn.execute(
+                    select(edges.c.id, edges.c.properties)
+                    .where(edges.c.from_id == user, edges.c.rel_type == "KNOWS", edges.c.to_id == npc)
+                    .with_for_update()
+                ).first()
+                if row is None:
+                    self._merge_edge(conn, user, "KNOWS", npc, {"intimacy": 0, "last_interaction": ts})
+                else:
+                    properties = dict(row.properties or {})
+                    properties["intimacy"] = int(properties.get("intimacy") or 0) + int(delta)
+                    properties["last_interaction"] = ts
+                    conn.execute(update(edges).where(edges.c.id == row.id).values(properties=properties))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update NPC relationship: {e}")
+            return False
+
+    def record_user_event(self, user_id: str, event_type: str, metadata: Dict[str, Any]) -> bool:
+        try:
+            engine = self._ensure_initialized()
+            with engine.begin() as conn:
+                conn.execute(
+                    self._insert(conn, nodes)
+                    .values(label="User", key=str(user_id), name=None, properties={"id": str(user_id)})
+                    .on_conflict_do_nothing(index_elements=["label", "key"])
+                )
+                conn.execute(
+                    events.insert().values(
+                        id=str(uuid.uuid4()),
+                        user_id=str(user_id),
+                        type=event_type,
+                        timestamp=int(datetime.now().timestamp()),
+                        metadata=str(metadata),
+                    )
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to record user event: {e}")
+            return False
+
+    def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Newest events first (one range scan of ix_graph_events_user_timestamp)."""
+        try:
+            engine = self._ensure_initialized()
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    select(events.c.id, events.c.type, events.c.timestamp, events.c.metadata)
+                    .where(events.c.user_id == str(user_id))
+                    .order_by(events.c.timestamp.desc(), events.c.id.desc())
+                    .limit(max(0, limit))
+                )
+                return [{"id": row[0], "type": row[1], "timestamp": row[2], "metadata": row[3]} for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to get user history: {e}")
+            return []
+
+    # Alias for compatibility (same as KuzuAdapter)
+    query_recent_context = get_user_history
+
+    def add_quest_dependency(self, child_quest_id: str, parent_quest_id: str) -> bool:
+        try:
+            engine = self._ensure_initialized()
+            with engine.begin() as conn:
+                child = self._merge_node(conn, "Quest", child_quest_id, {})
+                parent = self._merge_node(conn, "Quest", parent_quest_id, {})
+                if child == parent or self._requires(conn, parent, child):
+                    logger.warning(f"Quest dependency {child_quest_id} -> {parent_quest_id} would form a cycle")
+                    return False
+                self._merge_edge(conn, child, "REQUIRES", parent)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add quest dependency: {e}")
+            return False
+
+    def _requires(self, conn: Connection, quest: int, prerequisite: int) -> bool:
+        """Whether `quest` transitively requires `prerequisite` (recursive CTE over REQUIRES edges)."""
+        chain = (
+            select(edges.c.to_id.label("quest_id"))
+            .where(edges.c.from_id == quest, edges.c.rel_type == "REQUIRES")
+            .cte("chain", recursive=True)
+        )
+        step = edges.alias("step")
+        chain = chain.union(  # UNION (not ALL) stops on rows already seen
+            select(step.c.to_id).where(step.c.from_id == chain.c.quest_id, step.c.rel_type == "REQUIRES")
+        )
+        return conn.execute(select(exists().where(chain.c.quest_id == prerequisite))).scalar()
+
+    def get_unlockable_templates(self, user_id: str) -> List[Dict[str, Any]]:
+        """Quests whose prerequisites the user has all completed (and that they have not completed)."""
+        try:
+            engine = self._ensure_initialized()
+            quest, requires, done = nodes.alias("q"), edges.alias("r"), edges.alias("d")
+            user = select(nodes.c.id).where(nodes.c.label == "User", nodes.c.key == str(user_id)).scalar_subquery()
+
+            def completed(quest_column):
+                return (
+                    select(done.c.id)
+                    .where(done.c.from_id == user, done.c.rel_type == "COMPLETED", done.c.to_id == quest_column)
+                    .exists()
+                )
+
+            prereq_count = (
+                select(func.count())
+                .select_from(requires)
+                .where(requires.c.from_id == quest.c.id, requires.c.rel_type == "REQUIRES")
+                .scalar_subquery()
+            )
+            pending = edges.alias("p")
+            blocked = (
+                select(pending.c.id)
+                .where(pending.c.from_id == quest.c.id, pending.c.rel_type == "REQUIRES", ~completed(pending.c.to_id))
+                .exists()
+            )
+            stmt = (
+                select(quest.c.key, quest.c.properties, prereq_count)
+                .where(quest.c.label == "Quest", ~completed(quest.c.id), ~blocked)
+                .order_by(quest.c.key)
+            )
+            with engine.connect() as conn:
+                return [
+                    {
+                        "id": key,
+                        "title": (properties or {}).get("title"),
+                        "type": "CHAIN" if count else "BASE",
+                        "prereq_count": count,
+                        "chain": bool(count),
+                    }
+                    for key, properties, count in conn.execute(stmt)
+                ]
+        except Exception as e:
+            logger.error(f"Unlockables failed: {e}")
+            return []
+
+
+_sql_graph_instance = None
+
+
+def get_sql_graph_adapter() -> SqlGraphAdapter:
+    global _sql_graph_instance
+    if _sql_graph_instance is None:
+        _sql_graph_instance = SqlGraphAdapter()
+    return _sql_graph_instance
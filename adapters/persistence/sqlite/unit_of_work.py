@@ -1,26 +1,66 @@
-from typing import Optional
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.ports.unit_of_work import UnitOfWork
 
+logger = logging.getLogger(__name__)
+
+SideEffect = Tuple[Callable[..., Awaitable[Any]], tuple, dict]
+
 
 class SqlAlchemyUnitOfWork(UnitOfWork):
-    def __init__(self, session_factory):
+    """
+    One transaction, one commit.
+    Either opens its own session (`session_factory`) or wraps a caller's session (`session=`).
+    Nested `async with` blocks on the same instance join the outer transaction; only the
+    outermost exit commits. Side effects queued with `add_post_commit` (graph sync, narrative)
+    run after a successful commit, outside the write lock; their failures are logged, not raised.
+    """
+
+    def __init__(self, session_factory=None, session: Optional[AsyncSession] = None):
         self.session_factory = session_factory
-        self.session: Optional[AsyncSession] = None
+        self.session: Optional[AsyncSession] = session
+        self._owns_session = session is None
+        self._depth = 0
+        self._post_commit: List[SideEffect] = []
 
     async def __aenter__(self):
-        self.session = self.session_factory()
+        if self._depth == 0 and self._owns_session:
+            self.session = self.session_factory()
+        self._depth += 1
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        if exc_type:
-            await self.rollback()
-        else:
-            await self.commit()
+        self._depth -= 1
+        if self._depth > 0:
+            return  # Inner block: the outermost exit decides
+
+        try:
+            if exc_type:
+                self._post_commit.clear()
+                await self.rollback()
+            else:
+                await self.commit()
+        finally:
+            if self._owns_session:
+                await self.session.close()
+
+        if not exc_type:
+            await self.run_post_commit()
+
+    def add_post_commit(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Queues `await fn(*args, **kwargs)` to run after the commit."""
+        self._post_commit.append((fn, args, kwargs))
 
-        await self.session.close()
+    async def run_post_commit(self) -> None:
+        effects, self._post_commit = self._post_commit, []
+        for fn, args, kwargs in effects:
+            try:
+                await fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Post-commit side effect {getattr(fn, '__name__', fn)} failed: {e}")
 
     async def commit(self):
         await self.session.commit()
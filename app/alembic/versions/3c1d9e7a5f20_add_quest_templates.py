@@ -0,0 +1,50 @@
+"""Add quest_templates library
+
+Revision ID: 3c1d9e7a5f20
+Revises: 2b786d4b3b8a
+Create Date: 2026-01-24 10:05:12.331904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1d9e7a5f20"
+down_revision: Union[str, Sequence[str], None] = "2b786d4b3b8a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "quest_templates",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("title_pattern", sa.String(), nullable=False),
+        sa.Column("description_pattern", sa.String(), nullable=True),
+        sa.Column("params", sa.JSON(), nullable=True),
+        sa.Column("difficulty_tier", sa.String(), nullable=True),
+        sa.Column("xp_reward", sa.Integer(), nullable=True),
+        sa.Column("themes", sa.JSON(), nullable=True),
+        sa.Column("sample_count", sa.Integer(), nullable=True),
+        sa.Column("completed_count", sa.Integer(), nullable=True),
+        sa.Column("completion_rate", sa.Float(), nullable=True),
+        sa.Column("last_mined_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quest_templates_fingerprint", "quest_templates", ["fingerprint"], unique=True)
+    op.create_index("ix_quest_templates_difficulty_tier", "quest_templates", ["difficulty_tier"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_quest_templates_difficulty_tier", table_name="quest_templates")
+    op.drop_index("ix_quest_templates_fingerprint", table_name="quest_templates")
+    op.drop_table("quest_templates")
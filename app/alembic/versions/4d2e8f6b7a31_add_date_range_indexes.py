@@ -0,0 +1,34 @@
+"""Add date range indexes for quests and daily outcomes
+
+Revision ID: 4d2e8f6b7a31
+Revises: 3c1d9e7a5f20
+Create Date: 2026-01-26 09:12:44.518203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4d2e8f6b7a31"
+down_revision: Union[str, Sequence[str], None] = "3c1d9e7a5f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Quests: Daily / weekly lookups filter user_id + half-open created_at range
+    op.create_index("ix_quests_user_created", "quests", ["user_id", "created_at"], unique=False)
+
+    # Daily Outcomes: DDA check (user_id + date + is_global)
+    op.create_index(
+        "ix_daily_outcomes_user_date_global", "daily_outcomes", ["user_id", "date", "is_global"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_daily_outcomes_user_date_global", table_name="daily_outcomes")
+    op.drop_index("ix_quests_user_created", table_name="quests")
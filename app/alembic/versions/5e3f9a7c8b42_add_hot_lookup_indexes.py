@@ -0,0 +1,51 @@
+"""Add composite indexes for hot per-user lookups
+
+Revision ID: 5e3f9a7c8b42
+Revises: 4d2e8f6b7a31
+Create Date: 2026-01-27 10:03:18.227561
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "5e3f9a7c8b42"
+down_revision: Union[str, Sequence[str], None] = "4d2e8f6b7a31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Found by tests/system/test_query_plan_regression.py (name, table, columns)
+INDEXES = [
+    ("ix_action_logs_user_timestamp", "action_logs", ["user_id", "timestamp"]),
+    ("ix_conversation_logs_user_created", "conversation_logs", ["user_id", "created_at"]),
+    ("ix_habit_states_user_tag", "habit_states", ["user_id", "habit_tag"]),
+    ("ix_push_profiles_user_id", "push_profiles", ["user_id"]),
+    ("ix_rivals_user_id", "rivals", ["user_id"]),
+    ("ix_user_items_user_item", "user_items", ["user_id", "item_id"]),
+    ("ix_user_buffs_user_expires", "user_buffs", ["user_id", "expires_at"]),
+    ("ix_user_talents_user_talent", "user_talents", ["user_id", "talent_id"]),
+    ("ix_lore_progress_user_series", "lore_progress", ["user_id", "series"]),
+]
+
+
+def _has_index(table: str, name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return name in [ix["name"] for ix in inspector.get_indexes(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        if not _has_index(table, name):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        if _has_index(table, name):
+            op.drop_index(name, table_name=table)
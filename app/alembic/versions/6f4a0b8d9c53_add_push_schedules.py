@@ -0,0 +1,43 @@
+"""Add push_schedules due-time index
+
+Revision ID: 6f4a0b8d9c53
+Revises: 5e3f9a7c8b42
+Create Date: 2026-01-28 08:41:37.905126
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6f4a0b8d9c53"
+down_revision: Union[str, Sequence[str], None] = "5e3f9a7c8b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows are filled by the scheduler's backfill on its first tick
+    op.create_table(
+        "push_schedules",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("push_type", sa.String(), nullable=False),
+        sa.Column("next_push_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "push_type", name="uq_push_schedules_user_type"),
+    )
+    op.create_index("ix_push_schedules_next_push_at", "push_schedules", ["next_push_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_push_schedules_next_push_at", table_name="push_schedules")
+    op.drop_table("push_schedules")
@@ -0,0 +1,37 @@
+"""Add scheduler_leases for leader election and sharding
+
+Revision ID: 7a5b1c9e0d64
+Revises: 6f4a0b8d9c53
+Create Date: 2026-01-29 11:26:03.418270
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a5b1c9e0d64"
+down_revision: Union[str, Sequence[str], None] = "6f4a0b8d9c53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("holder", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_index("ix_scheduler_leases_expires_at", "scheduler_leases", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_scheduler_leases_expires_at", table_name="scheduler_leases")
+    op.drop_table("scheduler_leases")
@@ -0,0 +1,43 @@
+"""Add prepared_briefings for pre-rendered morning pushes
+
+Revision ID: 9c7d3e1a2f86
+Revises: 8b6c2d0f1e75
+Create Date: 2026-01-31 09:41:15.227604
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c7d3e1a2f86"
+down_revision: Union[str, Sequence[str], None] = "8b6c2d0f1e75"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "prepared_briefings",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("push_type", sa.String(), nullable=False),
+        sa.Column("fire_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("messages", sa.JSON(), nullable=False),
+        sa.Column(
+            "rendered_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "push_type", name="uq_prepared_briefings_user_type"),
+    )
+    op.create_index("ix_prepared_briefings_fire_at", "prepared_briefings", ["fire_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_prepared_briefings_fire_at", table_name="prepared_briefings")
+    op.drop_table("prepared_briefings")
@@ -0,0 +1,46 @@
+"""Add users.last_rollover_date for the nightly daily rollover
+
+Revision ID: ad8e4f2b3a97
+Revises: 9c7d3e1a2f86
+Create Date: 2026-02-01 08:52:30.114093
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "ad8e4f2b3a97"
+down_revision: Union[str, Sequence[str], None] = "9c7d3e1a2f86"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = inspect(op.get_bind())
+    return column in [c["name"] for c in inspector.get_columns(table)]
+
+
+def _has_index(table: str, name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    return name in {ix["name"] for ix in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_column("users", "last_rollover_date"):
+        op.add_column("users", sa.Column("last_rollover_date", sa.Date(), nullable=True))
+    if not _has_index("users", "ix_users_tz_rollover"):
+        op.create_index("ix_users_tz_rollover", "users", ["push_timezone", "last_rollover_date"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_index("users", "ix_users_tz_rollover"):
+        op.drop_index("ix_users_tz_rollover", table_name="users")
+    if _has_column("users", "last_rollover_date"):
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.drop_column("last_rollover_date")
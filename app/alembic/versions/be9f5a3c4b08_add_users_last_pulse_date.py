@@ -0,0 +1,37 @@
+"""Add users.last_pulse_date for the once-per-day message checks
+
+Revision ID: be9f5a3c4b08
+Revises: ad8e4f2b3a97
+Create Date: 2026-02-02 10:05:41.530917
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "be9f5a3c4b08"
+down_revision: Union[str, Sequence[str], None] = "ad8e4f2b3a97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = inspect(op.get_bind())
+    return column in [c["name"] for c in inspector.get_columns(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_column("users", "last_pulse_date"):
+        op.add_column("users", sa.Column("last_pulse_date", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_column("users", "last_pulse_date"):
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.drop_column("last_pulse_date")
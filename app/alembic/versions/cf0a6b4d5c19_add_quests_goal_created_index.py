@@ -0,0 +1,35 @@
+"""Add ix_quests_goal_created for the executive stagnation scan
+
+Revision ID: cf0a6b4d5c19
+Revises: be9f5a3c4b08
+Create Date: 2026-02-03 09:12:27.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "cf0a6b4d5c19"
+down_revision: Union[str, Sequence[str], None] = "be9f5a3c4b08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index(table: str, name: str) -> bool:
+    inspector = inspect(op.get_bind())
+    return name in {ix["name"] for ix in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_index("quests", "ix_quests_goal_created"):
+        op.create_index("ix_quests_goal_created", "quests", ["goal_id", "created_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_index("quests", "ix_quests_goal_created"):
+        op.drop_index("ix_quests_goal_created", table_name="quests")
@@ -0,0 +1,72 @@
+"""Add graph_nodes, graph_edges and graph_events for the SQL graph backend
+
+Revision ID: d7e2f1a9c3b4
+Revises: cf0a6b4d5c19
+Create Date: 2026-02-04 10:21:45.118204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e2f1a9c3b4"
+down_revision: Union[str, Sequence[str], None] = "cf0a6b4d5c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    # SqlGraphAdapter.initialize() creates these tables itself when they are missing
+    return inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_table("graph_nodes"):
+        op.create_table(
+            "graph_nodes",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("label", sa.String(), nullable=False),
+            sa.Column("key", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("properties", sa.JSON(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("label", "key", name="uq_graph_nodes_label_key"),
+        )
+        op.create_index("ix_graph_nodes_label_name", "graph_nodes", ["label", "name"], unique=False)
+    if not _has_table("graph_edges"):
+        op.create_table(
+            "graph_edges",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("from_id", sa.Integer(), nullable=False),
+            sa.Column("rel_type", sa.String(), nullable=False),
+            sa.Column("to_id", sa.Integer(), nullable=False),
+            sa.Column("properties", sa.JSON(), nullable=False),
+            sa.ForeignKeyConstraint(["from_id"], ["graph_nodes.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["to_id"], ["graph_nodes.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("from_id", "rel_type", "to_id", name="uq_graph_edges_from_rel_to"),
+        )
+        op.create_index("ix_graph_edges_to_rel", "graph_edges", ["to_id", "rel_type"], unique=False)
+    if not _has_table("graph_events"):
+        op.create_table(
+            "graph_events",
+            sa.Column("id", sa.String(), nullable=False),
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("timestamp", sa.BigInteger(), nullable=False),
+            sa.Column("metadata", sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_graph_events_user_timestamp", "graph_events", ["user_id", "timestamp"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("graph_events", "graph_edges", "graph_nodes"):
+        if _has_table(table):
+            op.drop_table(table)
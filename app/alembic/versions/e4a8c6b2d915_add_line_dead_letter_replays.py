@@ -0,0 +1,37 @@
+"""Add line_dead_letters.replays to cap dead letter replays
+
+Revision ID: e4a8c6b2d915
+Revises: d7e2f1a9c3b4
+Create Date: 2026-02-06 09:41:18.204733
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a8c6b2d915"
+down_revision: Union[str, Sequence[str], None] = "d7e2f1a9c3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = inspect(op.get_bind())
+    return column in [c["name"] for c in inspector.get_columns(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_column("line_dead_letters", "replays"):
+        op.add_column("line_dead_letters", sa.Column("replays", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_column("line_dead_letters", "replays"):
+        with op.batch_alter_table("line_dead_letters") as batch_op:
+            batch_op.drop_column("replays")
@@ -0,0 +1,39 @@
+"""Add quests.paused_at so PAUSED quests expire from when they were paused
+
+Revision ID: f5b9d3c7e1a2
+Revises: e4a8c6b2d915
+Create Date: 2026-02-07 10:12:45.518390
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+# revision identifiers, used by Alembic.
+revision: str = "f5b9d3c7e1a2"
+down_revision: Union[str, Sequence[str], None] = "e4a8c6b2d915"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = inspect(op.get_bind())
+    return column in [c["name"] for c in inspector.get_columns(table)]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _has_column("quests", "paused_at"):
+        op.add_column("quests", sa.Column("paused_at", sa.DateTime(timezone=True), nullable=True))
+        # The pause time of existing rows is unknown; give them a full expiry window from now
+        op.execute("UPDATE quests SET paused_at = CURRENT_TIMESTAMP WHERE status = 'PAUSED'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_column("quests", "paused_at"):
+        with op.batch_alter_table("quests") as batch_op:
+            batch_op.drop_column("paused_at")
@@ -83,7 +83,7 @@ async def _send_friendly_error_reply(reply_token: str, error_code: str = "UH_OH"
             msg_text = f"🔧 系統異常 (ID: {req_id})\n守護精靈正在搶修連線... 請稍後再試。"
 
         result = GameResult(text=msg_text)
-        await line_client.send_reply(reply_token, result)
+        await line_client.queue_reply(reply_token, result)
     except Exception:
         logger.error("Critical: Failed to send error reply", exc_info=True)
 
@@ -154,11 +154,13 @@ if webhook_handler:
         # Check for Help/Manual (Legacy Intercept)
         if user_text.lower() in ["help", "manual", "menu", "幫助", "說明", "選單"]:
             try:
-                from linebot.v3.messaging import FlexMessage, ReplyMessageRequest
+                from linebot.v3.messaging import FlexMessage
 
+                from adapters.perception.line_client import line_client
                 from app.core.container import container
                 from application.services.flex_renderer import flex_renderer
                 from application.services.help_service import help_service
+                from domain.models.game_result import GameResult
 
                 async with app.core.database.AsyncSessionLocal() as session:
                     # Get user context
@@ -166,14 +168,10 @@ if webhook_handler:
                     help_data = await help_service.get_dynamic_help(session, user)
                     flex = flex_renderer.render_help_card(help_data)
 
-                    # Direct Reply
-                    api = get_messaging_api()
-                    if api:
-                        await api.reply_message(
-                            ReplyMessageRequest(
-                                reply_token=reply_token, messages=[FlexMessage(alt_text="提示", contents=flex)]
-                            )
-                        )
+                    help_result = GameResult(
+                        text="提示", metadata={"flex_message": FlexMessage(alt_text="提示", contents=flex)}
+                    )
+                    await line_client.queue_reply(reply_token, help_result, user_id)
                 return
             except Exception as e:
                 logger.error(f"Help command failed: {e}")
@@ -188,11 +186,7 @@ if webhook_handler:
             async with app.core.database.AsyncSessionLocal() as session:
                 game_result = await game_loop.process_message(session, user_id, user_text)
 
-            try:
-                await line_client.send_reply(reply_token, game_result)
-            except Exception as reply_err:
-                logger.warning(f"Reply failed ({reply_err}), attempting Push to {user_id}")
-                await line_client.send_push(user_id, game_result)
+            await line_client.queue_reply(reply_token, game_result, user_id)  # Falls back to push
 
         except Exception as e:
             logger.error(f"Message handling failed: {e}", exc_info=True)
@@ -231,7 +225,7 @@ if webhook_handler:
                 else:
                     game_result = GameResult(text="⚠️ 無法讀取圖片內容，請再試一次。")
 
-                await line_client.send_reply(reply_token, game_result)
+                await line_client.queue_reply(reply_token, game_result, user_id)
 
         except Exception as e:
             logger.error(f"Image handling failed: {e}", exc_info=True)
@@ -390,7 +384,7 @@ if webhook_handler:
                 else:
                     result = GameResult(text=response_text)
 
-                await line_client.send_reply(reply_token, result)
+                await line_client.queue_reply(reply_token, result, user_id)
 
         except Exception as e:
             logger.error(f"Postback handling failed: {e}", exc_info=True)
@@ -417,7 +411,7 @@ if webhook_handler:
 
             # Welcome message
             result = GameResult(text="🎮 歡迎來到 LifeOS！\n\n點擊下方選單開始你的冒險。")
-            await line_client.send_reply(reply_token, result)
+            await line_client.queue_reply(reply_token, result, user_id)
 
         except Exception as e:
             logger.error(f"Follow handling failed: {e}", exc_info=True)
@@ -40,8 +40,26 @@ class Settings(BaseSettings):
         logging.warning("⚠️ No DATABASE_URL found using SQLite (dev mode). Persistence NOT guaranteed.")
         return "sqlite+aiosqlite:///./data/game.db"
 
+    # Graph backend
+    GRAPH_BACKEND: str = "kuzu"  # "kuzu" (embedded file, single worker) or "sql" (relational tables, multi-worker)
+    GRAPH_DATABASE_URL: Optional[str] = None  # sql backend database; defaults to DATABASE_URL with a sync driver
+
     # Kuzu Graph DB
     KUZU_DATABASE_PATH: str = "./data/lifegame_graph"
+    KUZU_READ_POOL_SIZE: int = 4  # Graph read connections (one thread each); writes use one extra writer
+    KUZU_UNLOCK_CACHE_USERS: int = 10000  # Users whose quest unlock frontier is kept in memory (LRU)
+    KUZU_RECENT_EVENTS_PER_USER: int = 50  # Newest graph events buffered per user for history reads
+    KUZU_RECENT_EVENTS_BUDGET_MB: float = 16  # Memory budget of those buffers; LRU users evicted beyond it
+    KUZU_EVENT_RETENTION_DAYS: int = 90  # Older graph events are rolled into daily summaries (0 disables)
+    KUZU_EVENT_COMPACTION_BATCH_SIZE: int = 1000  # Events summarized + deleted per write transaction
+    KUZU_WRITE_BEHIND_ENABLED: bool = True  # Queue record_user_event for the graph-writer thread
+    KUZU_EVENT_QUEUE_SIZE: int = 10000  # Events buffered before new ones are dropped
+    KUZU_EVENT_FLUSH_SECONDS: float = 0.5  # Writer flush interval (one batched write per interval)
+    KUZU_EVENT_BATCH_SIZE: int = 500  # Flush early once this many events are waiting
+    KUZU_EVENT_SPILL_PATH: Optional[str] = None  # JSON-lines journal replayed after a crash; unset = off
+    KUZU_SIDECAR_SOCKET: Optional[str] = None  # Unix socket of the graph sidecar; set = workers use it instead of Kuzu
+    KUZU_SIDECAR_TIMEOUT: float = 10.0  # Seconds a worker waits for a sidecar response
+    KUZU_SIDECAR_FLUSH_SECONDS: float = 0.05  # Buffered record_user_event calls are sent as one batch this often
 
     # Vector Memory (Chroma)
     CHROMA_DB_PATH: str = "./data/chroma_db"
@@ -55,6 +73,12 @@ class Settings(BaseSettings):
     # Line Bot
     LINE_CHANNEL_ACCESS_TOKEN: Optional[str] = None
     LINE_CHANNEL_SECRET: Optional[str] = None
+    LINE_DELIVERY_QUEUE_ENABLED: bool = True  # Handlers/scheduler enqueue; one worker sends
+    LINE_RATE_LIMIT_PER_SECOND: float = 20.0  # Token bucket refill rate for outbound calls
+    LINE_RATE_LIMIT_BURST: int = 40
+    LINE_DELIVERY_MAX_ATTEMPTS: int = 5  # Then the message goes to line_dead_letters
+    LINE_QUOTA_REFRESH_SECONDS: int = 600  # Monthly push quota re-read interval
+    LINE_DEAD_LETTER_MAX_REPLAYS: int = 3  # Hourly replays per retryable dead letter before it is left alone
 
     # Google Gemini
     GOOGLE_API_KEY: Optional[str] = None
@@ -64,6 +88,9 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: Optional[str] = None
     OPENROUTER_MODEL: str = "google/gemini-3-flash-preview"
     AI_REQUEST_TIMEOUT_SECONDS: float = 10.0  # Increased for stability
+    QUEST_TEMPLATE_LIBRARY_ENABLED: bool = True  # Fill daily slots from mined templates
+    QUEST_BATCH_SIZE: int = 8  # User profiles packed into one scheduled generation prompt
+    QUEST_BATCH_TIMEOUT_SECONDS: float = 30.0
 
     @field_validator("OPENROUTER_API_KEY")
     @classmethod
@@ -88,6 +115,18 @@ class Settings(BaseSettings):
     )
     ENABLE_SCHEDULER: bool = False
     SCHEDULER_INTERVAL_SECONDS: int = 60
+    SCHEDULER_PUSH_CONCURRENCY: int = 10  # Push workers per tick, each with its own DB session
+    SCHEDULER_MODE: str = "leader"  # "leader": one instance runs all jobs; "sharded": users split across instances
+    SCHEDULER_LEASE_TTL_SECONDS: int = 180  # Leader/member lease lifetime; renewed every TTL/3
+    SCHEDULER_INSTANCE_ID: Optional[str] = None  # Defaults to hostname:pid
+    PUSH_CATCHUP_GRACE_MINUTES: int = 60  # Late ticks still send pushes that fell due within this window
+    PUSH_PRERENDER_LEAD_MINUTES: int = 45  # Render morning briefings (incl. TTS) this early; 0 = at fire time
+    EXECUTIVE_CONCURRENCY: int = 4  # Executive remediation workers (bridge quests call the LLM)
+    QUEST_SWEEP_BATCH_SIZE: int = 500  # Quests moved per UPDATE/commit by the lifecycle sweeper
+    QUEST_PENDING_EXPIRY_DAYS: int = 2  # Never-accepted quests -> EXPIRED (0 = keep)
+    QUEST_ACTIVE_EXPIRY_DAYS: int = 14  # Accepted but unfinished quests -> FAILED (0 = keep)
+    QUEST_PAUSED_EXPIRY_DAYS: int = 14  # Quests paused by the rescue protocol -> EXPIRED (0 = keep)
+    DAILY_ROLLOVER_ENABLED: bool = True  # Nightly set-based HP drain/rival/outcomes (with ENABLE_SCHEDULER)
     LOG_LEVEL: str = "INFO"
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
@@ -97,5 +136,10 @@ class Settings(BaseSettings):
         """Compat alias for legacy code."""
         return self.DATABASE_URL or "sqlite+aiosqlite:///./data/game.db"
 
+    @property
+    def DAILY_ROLLOVER_ACTIVE(self) -> bool:
+        """The nightly rollover only runs inside the scheduler; without it the per-message daily paths stay on."""
+        return self.ENABLE_SCHEDULER and self.DAILY_ROLLOVER_ENABLED
+
 
 settings = Settings()
@@ -1,4 +1,4 @@
-from adapters.persistence.kuzu.adapter import get_kuzu_adapter
+from adapters.persistence.graph import get_graph_adapter
 from application.services.brain_service import BrainService
 from application.services.graph_service import GraphService
 from application.services.user_service import UserService
@@ -27,13 +27,14 @@ class Container:
     @property
     def graph_service(self) -> GraphService:
         if not self._graph_service:
-            # Inject KuzuAdapter (Infrastructure) into GraphService (Application)
-            self._graph_service = GraphService(self.kuzu_adapter)
+            # Inject the configured graph adapter (Infrastructure) into GraphService (Application)
+            self._graph_service = GraphService(self.graph_adapter)
         return self._graph_service
 
     @property
-    def kuzu_adapter(self):
-        return get_kuzu_adapter()
+    def graph_adapter(self):
+        """KuzuAdapter or SqlGraphAdapter, per GRAPH_BACKEND."""
+        return get_graph_adapter()
 
 
 # Global Container Instance
@@ -0,0 +1,44 @@
+"""
+Timezone-aware day boundaries for date-range queries.
+
+Timestamps are stored in UTC, so "today" for a user must be turned into a
+half-open UTC range `[start, end)` before it reaches SQL. Comparing the raw
+column against bounds (instead of wrapping it in `func.date(...)`) keeps the
+predicate sargable, so composite indexes like `(user_id, created_at)` apply.
+"""
+
+import datetime
+from zoneinfo import ZoneInfo
+
+DEFAULT_TIMEZONE = "Asia/Taipei"  # Matches User.push_timezone default
+
+
+def safe_zoneinfo(tz_name: str | None) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+    except Exception:
+        return ZoneInfo("UTC")
+
+
+def local_today(tz_name: str | None = None, now: datetime.datetime | None = None) -> datetime.date:
+    """The calendar date in `tz_name` at `now` (defaults to the current instant)."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.astimezone(safe_zoneinfo(tz_name)).date()
+
+
+def local_range(
+    start_day: datetime.date, end_day: datetime.date, tz_name: str | None = None
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """UTC bounds of local days `[start_day, end_day)` in `tz_name`."""
+    tz = safe_zoneinfo(tz_name)
+    start = datetime.datetime.combine(start_day, datetime.time.min, tzinfo=tz)
+    end = datetime.datetime.combine(end_day, datetime.time.min, tzinfo=tz)
+    return start.astimezone(datetime.timezone.utc), end.astimezone(datetime.timezone.utc)
+
+
+def local_day_range(
+    day: datetime.date | None = None, tz_name: str | None = None
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """UTC bounds of a single local day (defaults to today in `tz_name`)."""
+    day = day or local_today(tz_name)
+    return local_range(day, day + datetime.timedelta(days=1), tz_name)
@@ -25,6 +25,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # from application.services.brain_service import brain_service # Use container
 # from application.services.user_service import user_service # Use container
+from adapters.persistence.kuzu.event_sink import KuzuEventSink
+from adapters.persistence.kuzu.pool import KuzuConnectionPool
+from adapters.persistence.kuzu.recent_events import RecentEventCache
+from adapters.persistence.kuzu.sidecar_client import KuzuSidecarClient
 from app.core.container import container
 from app.core.database import AsyncSessionLocal
 from app.core.dispatcher import dispatcher
@@ -32,12 +36,13 @@ from application.services.boss_service import boss_service
 from application.services.crafting_service import crafting_service
 from application.services.flex_renderer import flex_renderer
 
-# from adapters.persistence.kuzu.adapter import get_kuzu_adapter # Use container
+# from adapters.persistence.graph import get_graph_adapter # Use container
 # Services (Lifted from Lazy Imports)
 from application.services.game_loop import game_loop
 from application.services.hp_service import hp_service
 from application.services.inventory_service import inventory_service
 from application.services.lore_service import lore_service
+from application.services.pulse_service import pulse_service
 from application.services.quest_service import quest_service
 from application.services.shop_service import shop_service
 
@@ -79,14 +84,14 @@ async def lifespan(app: FastAPI):
             # Don't raise, try to start anyway to allow /health
             pass
 
-    # KuzuDB Initialization (Async & Lazy)
-    if settings.KUZU_DATABASE_PATH:
+    # Graph Initialization (Async & Lazy)
+    if settings.GRAPH_BACKEND == "sql" or settings.KUZU_DATABASE_PATH:
         try:
             # DI: Use Container
-            await container.kuzu_adapter.initialize()
-            logging.info("KuzuDB Async Adapter Initialized.")
+            await container.graph_adapter.initialize()
+            logging.info(f"Graph Adapter Initialized ({settings.GRAPH_BACKEND}).")
         except Exception as e:
-            logging.error(f"KuzuDB Init Failed: {e}")
+            logging.error(f"Graph Init Failed: {e}")
 
     # Start DDA Scheduler (if enabled)
     if settings.ENABLE_SCHEDULER:
@@ -104,9 +109,25 @@ async def lifespan(app: FastAPI):
         try:
             from application.services.scheduler import dda_scheduler
             dda_scheduler.shutdown()
+            await dda_scheduler.release_leases()
         except Exception:
             pass
 
+    # Flush outbound LINE messages still waiting in the delivery queue
+    if settings.LINE_DELIVERY_QUEUE_ENABLED:
+        try:
+            from adapters.perception.line_delivery import line_delivery_queue
+
+            await asyncio.wait_for(line_delivery_queue.stop(), timeout=10)
+        except Exception as e:
+            logging.warning(f"LINE delivery queue shutdown: {e}")
+
+    # Write graph events still waiting in the write-behind queue, then stop the graph pool
+    try:
+        await asyncio.to_thread(container.graph_adapter.close)
+    except Exception as e:
+        logging.warning(f"Graph adapter shutdown: {e}")
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -180,11 +201,8 @@ async def handle_ai_analysis(session, user_id: str, text: str) -> GameResult:
     # DI: Usage
     user = await container.user_service.get_or_create_user(session, user_id)
 
-    # 1. HP Drain
-    try:
-        drain_amount = await hp_service.calculate_daily_drain(session, user)
-    except Exception:
-        drain_amount = 0
+    # 1. HP Drain (nightly rollover, or the game loop's once-per-day pulse)
+    drain_amount = 0 if settings.DAILY_ROLLOVER_ACTIVE else pulse_service.todays_drain(user)
 
     # 2. Viper/Quest Push
     pushed_quests = quest_service.trigger_push_quests(session, user_id)
@@ -232,7 +250,8 @@ async def handle_ai_analysis(session, user_id: str, text: str) -> GameResult:
         await session.commit()
 
     # Record Event to Graph (DI)
-    container.kuzu_adapter.record_user_event(
+    await asyncio.to_thread(
+        container.graph_adapter.record_user_event,
         user_id,
         "ACTION",
         {
@@ -264,8 +283,11 @@ async def handle_ai_analysis(session, user_id: str, text: str) -> GameResult:
                 logger.info("Tool: create_goal - Done")
                 flex_msg = flex_renderer.render_goal_card(title=title, category=category)
                 tool_flex_messages.append(flex_msg)
-                container.kuzu_adapter.record_user_event(
-                    user_id, "AI_TOOL_CALL", {"tool": "create_goal", "title": title}
+                await asyncio.to_thread(
+                    container.graph_adapter.record_user_event,
+                    user_id,
+                    "AI_TOOL_CALL",
+                    {"tool": "create_goal", "title": title},
                 )
 
             elif tool_name == "start_challenge":
@@ -277,8 +299,11 @@ async def handle_ai_analysis(session, user_id: str, text: str) -> GameResult:
                 xp = getattr(quest, "xp_reward", 50)
                 flex_msg = flex_renderer.render_quest_brief(title=title, difficulty=difficulty, xp_reward=xp)
                 tool_flex_messages.append(flex_msg)
-                container.kuzu_adapter.record_user_event(
-                    user_id, "AI_TOOL_CALL", {"tool": "start_challenge", "title": title}
+                await asyncio.to_thread(
+                    container.graph_adapter.record_user_event,
+                    user_id,
+                    "AI_TOOL_CALL",
+                    {"tool": "start_challenge", "title": title},
                 )
 
         except Exception as e:
@@ -397,8 +422,8 @@ async def handle_checkin(session: AsyncSession, user_id: str, text: str) -> Game
         user.xp = (user.xp or 0) + 5
         await session.commit()
 
-        # Record to Graph (Sync call)
-        container.kuzu_adapter.record_user_event(user_id, "CHECKIN", {"gold": 10, "xp": 5})
+        # Record to Graph (off the event loop: the SQL backend writes synchronously)
+        await asyncio.to_thread(container.graph_adapter.record_user_event, user_id, "CHECKIN", {"gold": 10, "xp": 5})
 
         return GameResult(
             text="✅ 簽到成功！+10 金幣 +5 經驗值",
@@ -645,6 +670,18 @@ async def health_check():
             # Check Connection
             await session.execute(text("SELECT 1"))
             health_status["database"] = "connected"
+            health_status["pulse"] = pulse_service.metrics()
+            event_sink = getattr(container.graph_adapter, "event_sink", None)
+            if isinstance(event_sink, KuzuEventSink):
+                health_status["graph_events"] = event_sink.metrics()
+            graph_pool = getattr(container.graph_adapter, "pool", None)
+            if isinstance(graph_pool, KuzuConnectionPool):
+                health_status["graph_pool"] = graph_pool.metrics()
+            recent_events = getattr(container.graph_adapter, "recent_events", None)
+            if isinstance(recent_events, RecentEventCache):
+                health_status["graph_recent_events"] = recent_events.metrics()
+            if isinstance(container.graph_adapter, KuzuSidecarClient):
+                health_status["graph_sidecar"] = container.graph_adapter.metrics()
 
             # Check Schema
             try:
@@ -1,11 +1,14 @@
 from app.models.action_log import ActionLog
 from app.models.base import Base
 from app.models.conversation_log import ConversationLog
-from app.models.dda import CompletionLog, DailyOutcome, HabitState, PushProfile
+from app.models.dda import CompletionLog, DailyOutcome, HabitState, PreparedBriefing, PushProfile, PushSchedule
+from app.models.delivery import LineDeadLetter
 from app.models.dungeon import Dungeon, DungeonStage
 from app.models.gamification import Boss, Item, Recipe, RecipeIngredient, UserBuff, UserItem
+from app.models.graph import GraphEdge, GraphEvent, GraphNode
 from app.models.lore import LoreEntry, LoreProgress
-from app.models.quest import Goal, Quest, Rival
+from app.models.quest import Goal, Quest, QuestTemplate, Rival
+from app.models.scheduler import SchedulerLease
 from app.models.talent import TalentTree, UserTalent
 from app.models.user import User
 
@@ -19,6 +22,9 @@ __all__ = [
     "DailyOutcome",
     "CompletionLog",
     "PushProfile",
+    "PushSchedule",
+    "PreparedBriefing",
+    "LineDeadLetter",
     "Dungeon",
     "DungeonStage",
     "Item",
@@ -27,11 +33,16 @@ __all__ = [
     "Recipe",
     "RecipeIngredient",
     "Boss",
+    "GraphNode",
+    "GraphEdge",
+    "GraphEvent",
     "LoreEntry",
     "LoreProgress",
     "Quest",
     "Goal",
+    "QuestTemplate",
     "Rival",
+    "SchedulerLease",
     "TalentTree",
     "UserTalent",
 ]
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
@@ -9,6 +9,7 @@ from app.models.base import Base
 
 class ActionLog(Base):
     __tablename__ = "action_logs"
+    __table_args__ = (Index("ix_action_logs_user_timestamp", "user_id", "timestamp"),)  # Recent-actions window
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(String, ForeignKey("users.id"), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.sql import func
 
 from app.models.base import Base
@@ -6,6 +6,7 @@ from app.models.base import Base
 
 class ConversationLog(Base):
     __tablename__ = "conversation_logs"
+    __table_args__ = (Index("ix_conversation_logs_user_created", "user_id", "created_at"),)  # Chat history
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), index=True)
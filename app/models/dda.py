@@ -9,8 +9,10 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    UniqueConstraint,
 )
 from sqlalchemy.sql import func, text
 
@@ -19,6 +21,7 @@ from app.models.base import Base
 
 class HabitState(Base):
     __tablename__ = "habit_states"
+    __table_args__ = (Index("ix_habit_states_user_tag", "user_id", "habit_tag"),)
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
 
@@ -41,6 +44,7 @@ class HabitState(Base):
 
 class DailyOutcome(Base):
     __tablename__ = "daily_outcomes"
+    __table_args__ = (Index("ix_daily_outcomes_user_date_global", "user_id", "date", "is_global"),)  # DDA check
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     habit_tag = Column(String, nullable=True)
@@ -65,6 +69,7 @@ class CompletionLog(Base):
 
 class PushProfile(Base):
     __tablename__ = "push_profiles"
+    __table_args__ = (Index("ix_push_profiles_user_id", "user_id"),)
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     morning_time = Column(String, default="08:00")
@@ -78,3 +83,34 @@ class PushProfile(Base):
 
     # Legacy field
     preferred_time = Column(String, default="09:00")
+
+
+class PushSchedule(Base):
+    """Due-time index: next UTC send time per user and push type (morning/midday/night)."""
+
+    __tablename__ = "push_schedules"
+    __table_args__ = (
+        UniqueConstraint("user_id", "push_type", name="uq_push_schedules_user_type"),
+        Index("ix_push_schedules_next_push_at", "next_push_at"),
+    )
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    push_type = Column(String, nullable=False)
+    next_push_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PreparedBriefing(Base):
+    """Push payload rendered ahead of its fire time (LINE message dicts, audio included)."""
+
+    __tablename__ = "prepared_briefings"
+    __table_args__ = (
+        UniqueConstraint("user_id", "push_type", name="uq_prepared_briefings_user_type"),
+        Index("ix_prepared_briefings_fire_at", "fire_at"),
+    )
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    push_type = Column(String, nullable=False)
+    fire_at = Column(DateTime(timezone=True), nullable=False)  # The push_schedules.next_push_at it was built for
+    messages = Column(JSON, nullable=False)
+    rendered_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,22 @@
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class LineDeadLetter(Base):
+    __tablename__ = "line_dead_letters"
+    __table_args__ = (Index("ix_line_dead_letters_replayed_created", "replayed_at", "created_at"),)  # Replay scan
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)  # "push" | "multicast" | "reply"
+    recipients = Column(JSON, nullable=False)  # LINE user IDs
+    messages = Column(JSON, nullable=False)  # Serialized LINE message objects
+    status_code = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    replays = Column(Integer, nullable=False, default=0, server_default="0")  # Capped by LINE_DEAD_LETTER_MAX_REPLAYS
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    replayed_at = Column(DateTime(timezone=True), nullable=True)
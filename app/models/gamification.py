@@ -10,6 +10,7 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -55,6 +56,7 @@ class Item(Base):
 
 class UserItem(Base):
     __tablename__ = "user_items"
+    __table_args__ = (Index("ix_user_items_user_item", "user_id", "item_id"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), index=True)
@@ -70,6 +72,7 @@ class UserItem(Base):
 
 class UserBuff(Base):
     __tablename__ = "user_buffs"
+    __table_args__ = (Index("ix_user_buffs_user_expires", "user_id", "expires_at"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), index=True)
@@ -0,0 +1,44 @@
+from sqlalchemy import JSON, BigInteger, Column, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+
+from app.models.base import Base
+
+
+class GraphNode(Base):
+    """Node of the relational graph backend (GRAPH_BACKEND=sql)."""
+
+    __tablename__ = "graph_nodes"
+    __table_args__ = (
+        UniqueConstraint("label", "key", name="uq_graph_nodes_label_key"),
+        Index("ix_graph_nodes_label_name", "label", "name"),  # NPC lookups by display name
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    label = Column(String, nullable=False)  # "User" | "NPC" | "Concept" | "Quest" | ...
+    key = Column(String, nullable=False)  # The Kuzu primary key: `name` for Concept/Location, `id` otherwise
+    name = Column(String, nullable=True)
+    properties = Column(JSON, nullable=False, default=dict)
+
+
+class GraphEdge(Base):
+    __tablename__ = "graph_edges"
+    __table_args__ = (
+        UniqueConstraint("from_id", "rel_type", "to_id", name="uq_graph_edges_from_rel_to"),  # Outgoing edges
+        Index("ix_graph_edges_to_rel", "to_id", "rel_type"),  # Incoming edges
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    from_id = Column(Integer, ForeignKey("graph_nodes.id", ondelete="CASCADE"), nullable=False)
+    rel_type = Column(String, nullable=False)  # "KNOWS" | "LIKES" | "REQUIRES" | "COMPLETED" | ...
+    to_id = Column(Integer, ForeignKey("graph_nodes.id", ondelete="CASCADE"), nullable=False)
+    properties = Column(JSON, nullable=False, default=dict)
+
+
+class GraphEvent(Base):
+    __tablename__ = "graph_events"
+    __table_args__ = (Index("ix_graph_events_user_timestamp", "user_id", "timestamp"),)  # History reads
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False)  # Graph User key (not a users.id foreign key)
+    type = Column(String, nullable=False)
+    timestamp = Column(BigInteger, nullable=False)  # Unix seconds, as in the Kuzu Event node
+    event_metadata = Column("metadata", Text, nullable=True)
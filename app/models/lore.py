@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.sql import func
 
 from app.models.base import Base
@@ -19,6 +19,7 @@ class LoreEntry(Base):
 
 class LoreProgress(Base):
     __tablename__ = "lore_progress"
+    __table_args__ = (Index("ix_lore_progress_user_series", "user_id", "series"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -7,7 +7,9 @@ from sqlalchemy import (
     Column,
     Date,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -34,10 +36,12 @@ class QuestStatus(str, enum.Enum):
     PAUSED = "PAUSED"
     DONE = "DONE"
     FAILED = "FAILED"
+    EXPIRED = "EXPIRED"  # Retired by the lifecycle sweeper without being accepted or resumed
 
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (Index("ix_goals_user_id", "user_id"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -51,6 +55,13 @@ class Goal(Base):
 
 class Quest(Base):
     __tablename__ = "quests"
+    # Mirrors migrations so autogenerate does not drop them
+    __table_args__ = (
+        Index("ix_quests_user_scheduled", "user_id", "scheduled_date"),
+        Index("ix_quests_status", "status"),
+        Index("ix_quests_user_created", "user_id", "created_at"),  # Daily/weekly range lookups
+        Index("ix_quests_goal_created", "goal_id", "created_at"),  # Latest quest per goal (executive)
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     goal_id = Column(String, ForeignKey("goals.id"), nullable=True)  # Can have standalone quests
@@ -76,10 +87,12 @@ class Quest(Base):
     meta = Column(JSON, nullable=True)  # Generic metadata (e.g. graph_node_id)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    paused_at = Column(DateTime(timezone=True), nullable=True)  # Set by the rescue protocol; PAUSED expiry age
 
 
 class Rival(Base):
     __tablename__ = "rivals"
+    __table_args__ = (Index("ix_rivals_user_id", "user_id"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(
@@ -91,3 +104,28 @@ class Rival(Base):
     xp = Column(Integer, default=0)
 
     last_updated = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class QuestTemplate(Base):
+    """Parameterized quest pattern mined from historical AI-generated quests."""
+
+    __tablename__ = "quest_templates"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    fingerprint = Column(String, nullable=False, unique=True, index=True)  # Hash of normalized title pattern
+
+    title_pattern = Column(String, nullable=False)  # e.g. "閱讀 {n} 頁"
+    description_pattern = Column(String, nullable=True)
+    params = Column(JSON, nullable=True)  # {"n": [5, 10, 20]} observed slot values
+
+    difficulty_tier = Column(String, nullable=True, index=True)  # F to S
+    xp_reward = Column(Integer, default=20)
+    themes = Column(JSON, nullable=True)  # list[str] e.g. ["INT", "VIT"]
+
+    # Quality stats (recomputed on every mining run)
+    sample_count = Column(Integer, default=0)  # Accepted quests in the cluster
+    completed_count = Column(Integer, default=0)
+    completion_rate = Column(Float, default=0.0)
+
+    last_mined_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
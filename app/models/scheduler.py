@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+
+from app.models.base import Base
+
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    # "dda_scheduler" for the leader lease; "member:<instance_id>" for shard membership
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
@@ -2,7 +2,7 @@ import enum
 from typing import TYPE_CHECKING, List
 
 import sqlalchemy
-from sqlalchemy import JSON, Boolean, Column, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, relationship
 from sqlalchemy.sql import text
 
@@ -142,6 +142,7 @@ class TalentTree(Base):
 
 class UserTalent(Base):
     __tablename__ = "user_talents"
+    __table_args__ = (Index("ix_user_talents_user_talent", "user_id", "talent_id"),)  # Also serves user_id-only lookups
 
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String
+from sqlalchemy import JSON, Boolean, Column, Date, DateTime, Index, Integer, String
 from sqlalchemy.sql import func
 
 from app.models.base import Base
@@ -6,6 +6,7 @@ from app.models.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_tz_rollover", "push_timezone", "last_rollover_date"),)  # Nightly rollover
 
     id = Column(String, primary_key=True, index=True)  # Line User ID
     name = Column(String, nullable=True)
@@ -70,6 +71,8 @@ class User(Base):
     )
     streak_count = Column(Integer, default=0)
     last_active_date = Column(DateTime(timezone=True), nullable=True)  # Tracks the *day* of last activity
+    last_rollover_date = Column(Date, nullable=True)  # Last local day closed by the nightly rollover
+    last_pulse_date = Column(Date, nullable=True)  # Local day the once-per-day message checks last ran
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -44,7 +44,11 @@ class BossService:
         await session.commit()
         return f"⚠️ 首領現身：{boss_name}（1000 HP）"
 
-    async def deal_damage(self, session: AsyncSession, user_id: str, damage: int):
+    async def deal_damage(self, session: AsyncSession, user_id: str, damage: int, uow=None):
+        """
+        Applies damage to the active boss. With a `uow` (SqlAlchemyUnitOfWork), nothing is
+        committed here and the defeat graph sync is queued until the caller's commit.
+        """
         boss = await self.get_boss(session, user_id)
         if not boss:
             return None
@@ -65,33 +69,41 @@ class BossService:
                 user.gold = (user.gold or 0) + 500
 
             # --- Graph Sync ---
-            try:
-                from app.core.container import container
-
-                adapter = container.graph_service.adapter
-
-                if adapter:
-                    # Ensure Boss Node
-                    adapter.add_node("Boss", {"id": str(boss.id), "name": boss.name, "level": str(boss.level)})
-
-                    import datetime
-
-                    await adapter.add_relationship(
-                        "User",
-                        user_id,
-                        "DEFEATED",
-                        "Boss",
-                        str(boss.id),
-                        {"timestamp": datetime.datetime.now().isoformat()},
-                        from_key_field="id",
-                        to_key_field="id",
-                    )
-            except Exception as e:
-                print(f"Graph Sync Failed: {e}")
+            boss_node = {"id": str(boss.id), "name": boss.name, "level": str(boss.level)}
+            if uow is not None:
+                uow.add_post_commit(self._sync_defeat, user_id, boss_node)
+            else:
+                await self._sync_defeat(user_id, boss_node)
 
-        await session.commit()
+        if uow is None:
+            await session.commit()
         return msg
 
+    async def _sync_defeat(self, user_id: str, boss_node: dict):
+        try:
+            from app.core.container import container
+
+            adapter = container.graph_service.adapter
+
+            if adapter:
+                # Ensure Boss Node
+                adapter.add_node("Boss", boss_node)
+
+                import datetime
+
+                await adapter.add_relationship(
+                    "User",
+                    user_id,
+                    "DEFEATED",
+                    "Boss",
+                    boss_node["id"],
+                    {"timestamp": datetime.datetime.now().isoformat()},
+                    from_key_field="id",
+                    to_key_field="id",
+                )
+        except Exception as e:
+            print(f"Graph Sync Failed: {e}")
+
     async def generate_attack_challenge(self) -> str:
         # Static for MVP or AI-generated
         challenges = [
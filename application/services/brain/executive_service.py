@@ -1,10 +1,10 @@
 import datetime
 import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from pydantic import BaseModel
-from sqlalchemy import select
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, func, or_, select
 
 from application.services.ai_engine import ai_engine
 
@@ -17,40 +17,110 @@ class AgentSystemAction(BaseModel):
     reason: str
 
 
+class StagnantGoal(BaseModel):
+    goal_id: str
+    title: str
+    days_since: int
+
+
+class StagnationReport(BaseModel):
+    user_id: str
+    stale_quests: int = 0
+    goals: List[StagnantGoal] = Field(default_factory=list)  # Oldest goal first
+
+
 class ExecutiveService:
     """
     Handles System-Level Judgment, Rules, and Automated Interventions.
     """
 
+    STALE_AFTER_DAYS = 3  # Active quest at least this many days old counts toward overwhelm
+    OVERWHELM_STALE_QUESTS = 2
+    BRIDGE_AFTER_DAYS = 7  # Goal without a new quest for more days than this gets a bridge quest
+    CHECKMATE_AFTER_DAYS = 30
+
+    async def detect_stagnation(
+        self, session, user_ids: Optional[Sequence[str]] = None, now: Optional[datetime.datetime] = None
+    ) -> Dict[str, StagnationReport]:
+        """
+        Set-based detection for all users (or `user_ids`) in two queries:
+        stale active quests per user, and active goals whose latest quest
+        (ROW_NUMBER over goal_id by created_at) or creation is older than the
+        bridge threshold. Only users with findings are returned.
+        """
+        from app.models.quest import Goal, GoalStatus, Quest, QuestStatus
+
+        now = now or datetime.datetime.now()
+        if now.tzinfo:
+            now = now.replace(tzinfo=None)
+        reports: Dict[str, StagnationReport] = {}
+
+        # 1. Stale active quests per user
+        stmt = (
+            select(Quest.user_id, func.count(Quest.id))
+            .where(
+                Quest.status == QuestStatus.ACTIVE.value,
+                Quest.created_at <= now - datetime.timedelta(days=self.STALE_AFTER_DAYS),
+            )
+            .group_by(Quest.user_id)
+            .having(func.count(Quest.id) >= self.OVERWHELM_STALE_QUESTS)
+        )
+        if user_ids is not None:
+            stmt = stmt.where(Quest.user_id.in_(list(user_ids)))
+        for user_id, stale in (await session.execute(stmt)).all():
+            reports[str(user_id)] = StagnationReport(user_id=str(user_id), stale_quests=stale)
+
+        # 2. Latest quest per goal, joined back to the active goals
+        ranked = select(
+            Quest.goal_id,
+            Quest.created_at,
+            func.row_number().over(partition_by=Quest.goal_id, order_by=Quest.created_at.desc()).label("rn"),
+        ).where(Quest.goal_id.is_not(None))
+        if user_ids is not None:
+            ranked = ranked.where(Quest.user_id.in_(list(user_ids)))
+        ranked = ranked.subquery()
+
+        last_activity = func.coalesce(ranked.c.created_at, Goal.created_at)
+        stmt = (
+            select(Goal.id, Goal.user_id, Goal.title, last_activity)
+            .outerjoin(ranked, and_(ranked.c.goal_id == Goal.id, ranked.c.rn == 1))
+            .where(
+                Goal.status == GoalStatus.ACTIVE.value,
+                or_(
+                    last_activity.is_(None),
+                    last_activity <= now - datetime.timedelta(days=self.BRIDGE_AFTER_DAYS + 1),
+                ),
+            )
+            .order_by(Goal.user_id, Goal.created_at)
+        )
+        if user_ids is not None:
+            stmt = stmt.where(Goal.user_id.in_(list(user_ids)))
+        for goal_id, user_id, title, last_at in (await session.execute(stmt)).all():
+            days_since = 999
+            if last_at:
+                if last_at.tzinfo:
+                    last_at = last_at.replace(tzinfo=None)
+                days_since = (now - last_at).days
+            report = reports.setdefault(str(user_id), StagnationReport(user_id=str(user_id)))
+            report.goals.append(StagnantGoal(goal_id=str(goal_id), title=title, days_since=days_since))
+        return reports
+
     async def execute_system_judgment(self, session, user_id: str) -> Optional[AgentSystemAction]:
         """
         The Autonomous Executive Loop.
         Analyzes performance metrics and decides on system-level interventions.
         """
-        from app.models.quest import Goal, GoalStatus, Quest, QuestStatus
+        reports = await self.detect_stagnation(session, [user_id])
+        return await self.remediate(session, user_id, reports.get(str(user_id)))
+
+    async def remediate(self, session, user_id: str, report: Optional[StagnationReport]) -> Optional[AgentSystemAction]:
+        """Applies the first matching intervention for a user's detection result (None = nothing found)."""
         from application.services.quest_service import quest_service
 
-        # 1. Gather Metrics (Last 3 Days)
-        stmt = select(Quest).where(Quest.user_id == user_id, Quest.status == QuestStatus.ACTIVE.value)
-        active_quests = (await session.execute(stmt)).scalars().all()
-
-        fail_streak = 0
-        oldest_active = 0
-        now = datetime.datetime.now()
-
-        # Check staleness
-        for q in active_quests:
-            if q.created_at:
-                created = q.created_at
-                if created.tzinfo:
-                    created = created.replace(tzinfo=None)
-                age = (now - created).days
-                if age > 2:
-                    fail_streak += 1
-                oldest_active = max(oldest_active, age)
-
-        # 2. Judge (The Algorithm)
-        if fail_streak >= 2:
+        report = report or StagnationReport(user_id=str(user_id))
+
+        # 1. Overwhelm (Stale Quests)
+        if report.stale_quests >= self.OVERWHELM_STALE_QUESTS:
             logger.info(f"Executive Judgment: User {user_id} is overwhelmed. Downgrading difficulty.")
             count = await quest_service.bulk_adjust_difficulty(session, user_id, target_tier="E")
             return AgentSystemAction(
@@ -59,51 +129,29 @@ class ExecutiveService:
                 reason="Overwhelm Detected (Stale Quests)",
             )
 
-        # 3. Momentum Check (Last Active)
-        if not active_quests:
-            pass
-
-        # 4. Goal Stagnation Check (The Bridge)
-        stmt = select(Goal).where(Goal.user_id == user_id, Goal.status == GoalStatus.ACTIVE.value)
-        active_goals = (await session.execute(stmt)).scalars().all()
-
-        for goal in active_goals:
-            q_stmt = select(Quest).where(Quest.goal_id == goal.id).order_by(Quest.created_at.desc()).limit(1)
-            last_quest = (await session.execute(q_stmt)).scalars().first()
-
-            days_since = 999
-            if last_quest and last_quest.created_at:
-                created = last_quest.created_at
-                if created.tzinfo:
-                    created = created.replace(tzinfo=None)
-                days_since = (now - created).days
-            elif goal.created_at:
-                created = goal.created_at
-                if created.tzinfo:
-                    created = created.replace(tzinfo=None)
-                days_since = (now - created).days
-
-            if days_since > 30:
+        # 2. Goal Stagnation Check (The Bridge)
+        for goal in report.goals:
+            if goal.days_since > self.CHECKMATE_AFTER_DAYS:
                 logger.warning(
-                    f"Executive Judgment: Goal {goal.title} ignored for {days_since}d. TRIGGERING CHECKMATE."
+                    f"Executive Judgment: Goal {goal.title} ignored for {goal.days_since}d. TRIGGERING CHECKMATE."
                 )
                 return AgentSystemAction(
                     action_type="PUSH_QUEST",
                     details={"title": f"BOSS: Reclaim {goal.title}", "diff": "S", "type": "REDEMPTION"},
-                    reason=f"CHECKMATE (Goal ignored {days_since} days)",
+                    reason=f"CHECKMATE (Goal ignored {goal.days_since} days)",
                 )
 
-            if days_since > 7:
-                logger.info(f"Executive Judgment: Goal {goal.title} is stagnant ({days_since}d). Building Bridge.")
-                bridge_quest = await quest_service.create_bridge_quest(session, user_id, goal.id)
+            if goal.days_since > self.BRIDGE_AFTER_DAYS:
+                logger.info(f"Executive Judgment: Goal {goal.title} is stagnant ({goal.days_since}d). Building Bridge.")
+                bridge_quest = await quest_service.create_bridge_quest(session, user_id, goal.goal_id)
                 if bridge_quest:
                     return AgentSystemAction(
                         action_type="BRIDGE_GEN",
                         details={"quest_title": bridge_quest.title, "goal": goal.title},
-                        reason=f"Goal Stagnation ({days_since} days)",
+                        reason=f"Goal Stagnation ({goal.days_since} days)",
                     )
 
-        # 5. Reality Sync
+        # 3. Reality Sync
         external_load = await self._get_external_load(user_id)
         if external_load > 0.8:
             logger.info("Executive Judgment: External High Load detected. Adjusting difficulty.")
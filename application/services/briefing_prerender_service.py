@@ -0,0 +1,116 @@
+"""
+Pre-rendered Briefings
+
+Morning briefings (quest generation, flex rendering, TTS audio) used to be
+built at fire time, when every user sharing the 08:00 slot is handled at
+once. The scheduler now renders them during the `PUSH_PRERENDER_LEAD_MINUTES`
+before the slot and stores the ready-to-send LINE messages here; at fire time
+the push is delivery only.
+
+A prepared row belongs to one `push_schedules.next_push_at`. It is used only
+if that is still the time being fired (settings changes move the schedule and
+orphan the row) and is deleted when taken. Users without a prepared row are
+rendered inline as before.
+"""
+
+import datetime
+import logging
+from typing import Any, List, Sequence
+
+from linebot.v3.messaging import Message
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.dda import PreparedBriefing, PushSchedule
+from application.services.push_schedule_service import _as_utc
+
+logger = logging.getLogger(__name__)
+
+
+class BriefingPrerenderService:
+    PRERENDER_LIMIT = 1000  # Schedules picked up per prerender tick
+    PRERENDER_TYPES = ("morning",)  # Midday/night are cheap and depend on the day's progress
+
+    def lead(self) -> datetime.timedelta:
+        return datetime.timedelta(minutes=max(0, settings.PUSH_PRERENDER_LEAD_MINUTES))
+
+    async def pending(self, session: AsyncSession, now: datetime.datetime | None = None) -> List[PushSchedule]:
+        """Schedules firing within the lead window that have no payload prepared for that fire time yet."""
+        now = _as_utc(now or datetime.datetime.now(datetime.timezone.utc))
+        prepared = (
+            select(PreparedBriefing.id)
+            .where(
+                PreparedBriefing.user_id == PushSchedule.user_id,
+                PreparedBriefing.push_type == PushSchedule.push_type,
+                PreparedBriefing.fire_at == PushSchedule.next_push_at,
+            )
+            .exists()
+        )
+        stmt = (
+            select(PushSchedule)
+            .where(
+                PushSchedule.next_push_at > now,
+                PushSchedule.next_push_at <= now + self.lead(),
+                PushSchedule.push_type.in_(self.PRERENDER_TYPES),
+                ~prepared,
+            )
+            .order_by(PushSchedule.next_push_at)
+            .limit(self.PRERENDER_LIMIT)
+        )
+        return list((await session.execute(stmt)).scalars().all())
+
+    async def store(
+        self, session: AsyncSession, user_id: str, push_type: str, fire_at: datetime.datetime, messages: List[Any]
+    ) -> PreparedBriefing:
+        """Keeps one payload per user and push type; a newer render replaces the old one."""
+        payload = [m.to_dict() if hasattr(m, "to_dict") else m for m in messages]
+        stmt = select(PreparedBriefing).where(
+            PreparedBriefing.user_id == user_id, PreparedBriefing.push_type == push_type
+        )
+        row = (await session.execute(stmt)).scalars().first()
+        if row is None:
+            row = PreparedBriefing(user_id=user_id, push_type=push_type)
+            session.add(row)
+        row.fire_at = fire_at
+        row.messages = payload
+        row.rendered_at = datetime.datetime.now(datetime.timezone.utc)
+        return row
+
+    async def take(
+        self, session: AsyncSession, user_id: str, push_type: str, fire_at: datetime.datetime | None
+    ) -> List[Any] | None:
+        """Removes and returns the prepared messages if they were built for `fire_at`."""
+        stmt = select(PreparedBriefing).where(
+            PreparedBriefing.user_id == user_id, PreparedBriefing.push_type == push_type
+        )
+        row = (await session.execute(stmt)).scalars().first()
+        if row is None:
+            return None
+        await session.delete(row)
+        if fire_at is None or _as_utc(row.fire_at) != _as_utc(fire_at):
+            logger.info("Discarding prepared %s briefing for %s (schedule moved)", push_type, user_id)
+            return None
+        try:
+            return [Message.from_dict(m) for m in row.messages or []]
+        except Exception as e:
+            logger.error(f"Prepared briefing for {user_id} could not be restored: {e}")
+            return None
+
+    async def prepared_user_ids(self, session: AsyncSession, user_ids: Sequence[str], push_type: str) -> set[str]:
+        if not user_ids:
+            return set()
+        stmt = select(PreparedBriefing.user_id).where(
+            PreparedBriefing.user_id.in_(list(user_ids)), PreparedBriefing.push_type == push_type
+        )
+        return set((await session.execute(stmt)).scalars().all())
+
+    async def purge_expired(self, session: AsyncSession, now: datetime.datetime | None = None) -> int:
+        """Drops payloads whose fire time passed the catch-up grace window without being sent."""
+        now = _as_utc(now or datetime.datetime.now(datetime.timezone.utc))
+        cutoff = now - datetime.timedelta(minutes=settings.PUSH_CATCHUP_GRACE_MINUTES)
+        result = await session.execute(delete(PreparedBriefing).where(PreparedBriefing.fire_at < cutoff))
+        return result.rowcount or 0
+
+
+briefing_prerender_service = BriefingPrerenderService()
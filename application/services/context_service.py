@@ -6,7 +6,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from adapters.persistence.kuzu.adapter import get_kuzu_adapter
+from adapters.persistence.graph import get_graph_adapter
 from app.models.action_log import ActionLog
 from app.models.user import User
 
@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 
 class ContextService:
     def __init__(self):
-        self.kuzu = get_kuzu_adapter()
+        self.graph = get_graph_adapter()
 
     async def get_working_memory(self, session: AsyncSession, user_id: str) -> Dict[str, Any]:
         """
@@ -32,10 +32,10 @@ class ContextService:
         short_term_logs = await self._get_recent_actions(session, user_id)
         short_term_str = "\n".join([f"- {log.action_text} ({log.timestamp})" for log in short_term_logs])
 
-        # 2. Long Term Context (Graph) - kuzu methods are sync, wrap in to_thread
+        # 2. Long Term Context (Graph) - graph adapter methods are sync, wrap in to_thread
         import asyncio
 
-        long_term_data = await asyncio.to_thread(self.kuzu.query_recent_context, user_id, 5)
+        long_term_data = await asyncio.to_thread(self.graph.query_recent_context, user_id, 5)
 
         # 3. User State & Time
         user_state = await self._get_user_state(session, user_id)
@@ -126,7 +126,7 @@ class ContextService:
         Fetch semantic identity (Who am I?) and values (What matters?) from Graph.
         """
         try:
-            # Placeholder: In future, use self.kuzu.query(...) to find (User)-[:VALUES]->(Value)
+            # Placeholder: In future, use self.graph to find (User)-[:VALUES]->(Value)
             return {"core_values": ["Growth", "Autonomy"], "identity_tags": ["Seeker", "Architect"]}
         except Exception:
             return {}
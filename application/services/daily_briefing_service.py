@@ -12,6 +12,7 @@ from linebot.v3.messaging import (
 )
 from sqlalchemy.future import select
 
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
 from app.models.dda import DailyOutcome
 from app.models.quest import Quest, QuestStatus, Rival
@@ -38,7 +39,10 @@ class DailyBriefingService:
             if not user:
                 return
 
-            rival = await rival_service.advance_daily_briefing(session, user)
+            if settings.DAILY_ROLLOVER_ACTIVE:  # Growth is applied by the nightly rollover
+                rival = await rival_service.get_or_create_rival(session, user.id, initial_level=user.level or 1)
+            else:
+                rival = await rival_service.advance_daily_briefing(session, user)
 
             result = await session.execute(
                 select(Quest).where(
@@ -0,0 +1,226 @@
+"""
+Nightly Daily Rollover
+
+Daily effects used to be computed lazily on every interaction (HP drain in the
+pulse, rival encounter in the game loop, rival growth and daily outcome in the
+night push), each costing a few queries per message. The rollover closes a
+local day once per timezone bucket with a handful of set-based statements:
+
+1. Global `DailyOutcome` for the day (done = had quests and finished all of
+   them) plus `users.penalty_pending`.
+2. Inactivity penalties for users not active that day: a debuff when their
+   rival outlevels them, 5% XP/gold theft, 10 HP drain (status/hollowed state
+   updated in the same UPDATE).
+3. Rival progression: daily growth for everyone, +100 XP for each inactive
+   user, leveling every 500 XP.
+
+`users.last_rollover_date` makes it idempotent: every statement only touches
+users whose last closed day is before the one being closed, and the marker is
+moved last, in the same transaction. Per-user rescue handling (dungeon start
+for hollowed users) stays in the game loop.
+"""
+
+import datetime
+import logging
+import random
+import time
+from typing import Dict, List
+
+from sqlalchemy import Integer, and_, case, cast, exists, func, insert, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.time_utils import DEFAULT_TIMEZONE, local_day_range, safe_zoneinfo
+from app.models.dda import DailyOutcome
+from app.models.gamification import UserBuff
+from app.models.quest import Quest, QuestStatus, Rival
+from app.models.user import User
+from domain.rules.health_rules import HPStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DailyRolloverService:
+    DRAIN_PER_MISSED_DAY = 10
+    THEFT_RATE = 0.05
+    RIVAL_INACTIVITY_XP = 100
+    RIVAL_GROWTH_RANGE = (30, 80)  # Daily rival XP, drawn once per bucket run
+    RIVAL_LEVEL_XP = 500
+    DEBUFF_TARGETS = ("STR", "VIT", "INT")
+    DEBUFF_MULTIPLIER = 0.8
+    DEBUFF_HOURS = 24
+
+    def _tz_column(self):
+        return func.coalesce(User.push_timezone, DEFAULT_TIMEZONE)
+
+    def closing_day(self, tz_name: str, now: datetime.datetime) -> datetime.date:
+        """The local day that most recently ended in `tz_name`."""
+        return now.astimezone(safe_zoneinfo(tz_name)).date() - datetime.timedelta(days=1)
+
+    async def buckets(self, session: AsyncSession) -> List[str]:
+        stmt = select(self._tz_column()).distinct()
+        return [tz for tz in (await session.execute(stmt)).scalars().all() if tz]
+
+    async def run_due(self, session: AsyncSession, now: datetime.datetime | None = None) -> Dict[str, dict]:
+        """Closes the previous local day in every timezone bucket that has not been closed yet."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        results = {}
+        for tz_name in await self.buckets(session):
+            stats = await self.rollover_bucket(session, tz_name, self.closing_day(tz_name, now), now)
+            if stats["users"]:
+                results[tz_name] = stats
+        return results
+
+    async def rollover_bucket(
+        self,
+        session: AsyncSession,
+        tz_name: str,
+        day: datetime.date,
+        now: datetime.datetime | None = None,
+        growth: int | None = None,
+    ) -> dict:
+        """Applies the daily effects of local `day` to every not-yet-rolled user in `tz_name` (one commit)."""
+        t0 = time.perf_counter()
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        growth = growth if growth is not None else random.randint(*self.RIVAL_GROWTH_RANGE)
+        day_start, day_end = local_day_range(day, tz_name)
+        day_key = day.isoformat()
+
+        pending = and_(
+            self._tz_column() == tz_name,
+            or_(User.last_rollover_date.is_(None), User.last_rollover_date < day),
+        )
+        pending_ids = select(User.id).where(pending)
+        inactive = and_(pending, User.last_active_date.is_not(None), User.last_active_date < day_start)
+        inactive_ids = select(User.id).where(inactive)
+        stats = {"tz": tz_name, "day": day_key}
+
+        # 1. Daily outcomes
+        def quest_count(*conditions):
+            return (
+                select(func.count(Quest.id))
+                .where(
+                    Quest.user_id == User.id,
+                    Quest.created_at >= day_start,
+                    Quest.created_at < day_end,
+                    *conditions,
+                )
+                .scalar_subquery()
+            )
+
+        total, unfinished = quest_count(), quest_count(Quest.status != QuestStatus.DONE.value)
+        all_done = and_(total > 0, unfinished == 0)
+        outcome_done = select(all_done).where(User.id == DailyOutcome.user_id).scalar_subquery()
+        result = await session.execute(
+            update(DailyOutcome)
+            .where(
+                DailyOutcome.user_id.in_(pending_ids),
+                DailyOutcome.date == day,
+                DailyOutcome.is_global.is_(True),
+            )
+            .values(done=outcome_done)
+            .execution_options(synchronize_session=False)
+        )
+        stats["outcomes_updated"] = result.rowcount or 0
+
+        has_outcome = exists().where(
+            DailyOutcome.user_id == User.id, DailyOutcome.date == day, DailyOutcome.is_global.is_(True)
+        )
+        result = await session.execute(
+            insert(DailyOutcome).from_select(
+                ["id", "user_id", "date", "done", "is_global", "rescue_used"],
+                select(
+                    User.id + literal(f":outcome:{day_key}"),
+                    User.id,
+                    literal(day),
+                    all_done,
+                    literal(True),
+                    literal(False),
+                ).where(pending, ~has_outcome),
+            )
+        )
+        stats["outcomes_inserted"] = result.rowcount or 0
+
+        await session.execute(
+            update(User)
+            .where(pending)
+            .values(penalty_pending=and_(total > 0, unfinished > 0))
+            .execution_options(synchronize_session=False)
+        )
+
+        # 2. Inactivity penalties (debuff checks the rival level before today's growth)
+        await session.execute(
+            insert(Rival).from_select(
+                ["id", "user_id", "name", "level", "xp"],
+                select(
+                    User.id + literal(":rival"),
+                    User.id,
+                    literal("Viper"),
+                    func.coalesce(User.level, 1),
+                    literal(0),
+                ).where(pending, ~exists().where(Rival.user_id == User.id)),
+            )
+        )
+        rival_level = select(func.max(Rival.level)).where(Rival.user_id == User.id).scalar_subquery()
+        target = self.DEBUFF_TARGETS[day.toordinal() % len(self.DEBUFF_TARGETS)]
+        result = await session.execute(
+            insert(UserBuff).from_select(
+                ["id", "user_id", "target_attribute", "multiplier", "expires_at"],
+                select(
+                    User.id + literal(f":viper:{day_key}"),
+                    User.id,
+                    literal(target),
+                    literal(self.DEBUFF_MULTIPLIER),
+                    literal(now + datetime.timedelta(hours=self.DEBUFF_HOURS)),
+                ).where(inactive, rival_level > func.coalesce(User.level, 1)),
+            )
+        )
+        stats["debuffs"] = result.rowcount or 0
+
+        hp = func.coalesce(User.hp, 0) - self.DRAIN_PER_MISSED_DAY
+        was_hollowed = or_(User.is_hollowed.is_(True), User.hp_status == HPStatus.HOLLOWED.value)
+        result = await session.execute(
+            update(User)
+            .where(inactive)
+            .values(
+                xp=func.coalesce(User.xp, 0) - cast(func.coalesce(User.xp, 0) * self.THEFT_RATE, Integer),
+                gold=func.coalesce(User.gold, 0) - cast(func.coalesce(User.gold, 0) * self.THEFT_RATE, Integer),
+                hp=case((hp < 0, 0), else_=hp),
+                hp_status=case(
+                    (hp <= 0, HPStatus.HOLLOWED.value),
+                    (was_hollowed, HPStatus.RECOVERING.value),
+                    (hp < 30, HPStatus.CRITICAL.value),
+                    else_=HPStatus.HEALTHY.value,
+                ),
+                is_hollowed=hp <= 0,
+                hollowed_at=case((hp <= 0, func.coalesce(User.hollowed_at, now)), else_=None),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        stats["inactive"] = result.rowcount or 0
+
+        # 3. Rival progression
+        gain = growth + case((Rival.user_id.in_(inactive_ids), self.RIVAL_INACTIVITY_XP), else_=0)
+        rival_xp = func.coalesce(Rival.xp, 0) + gain
+        result = await session.execute(
+            update(Rival)
+            .where(Rival.user_id.in_(pending_ids))
+            .values(
+                level=func.coalesce(Rival.level, 1) + rival_xp // self.RIVAL_LEVEL_XP,
+                xp=rival_xp % self.RIVAL_LEVEL_XP,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        stats["rivals"] = result.rowcount or 0
+
+        result = await session.execute(
+            update(User).where(pending).values(last_rollover_date=day).execution_options(synchronize_session=False)
+        )
+        stats["users"] = result.rowcount or 0
+        await session.commit()
+        stats["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+        if stats["users"]:
+            logger.info("Daily rollover: %s", stats)
+        return stats
+
+
+daily_rollover_service = DailyRolloverService()
@@ -4,6 +4,7 @@ from typing import Any, Dict, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.container import container
 
 # Dispatcher is imported inside method to avoid circular imports during refactor?
@@ -13,6 +14,7 @@ from app.core.dispatcher import dispatcher
 from application.services.audio_service import audio_service
 from application.services.hp_service import hp_service
 from application.services.persona_service import persona_service
+from application.services.pulse_service import pulse_service
 from application.services.rival_service import rival_service
 from domain.models.game_result import GameResult
 
@@ -51,10 +53,9 @@ class GameLoop:
 
             # 3. Environment (Rival)
             rival_log = ""
-            try:
-                rival_log = await rival_service.process_encounter(session, user)
-            except Exception as e:
-                logger.warning(f"Rival encounter failed: {e}")
+            if not settings.DAILY_ROLLOVER_ACTIVE:  # Otherwise applied by the nightly rollover
+                pulse = await pulse_service.run(session, user)  # First message of the user's day only
+                rival_log = pulse["rival_log"] if pulse else ""
 
             # 4. Dispatch Input
             result_obj = await dispatcher.dispatch(session, user_id, text)
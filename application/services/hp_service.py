@@ -2,7 +2,7 @@ import datetime
 import enum
 import logging
 
-from sqlalchemy import update
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.quest import Quest, QuestStatus
@@ -94,11 +94,13 @@ class HPService:
             await self.trigger_rescue_protocol(session, user)
         return drain
 
-    async def restore_by_difficulty(self, session: AsyncSession, user: User, difficulty: str | None) -> int:
+    async def restore_by_difficulty(
+        self, session: AsyncSession, user: User, difficulty: str | None, commit: bool = True
+    ) -> int:
         from domain.rules.health_rules import HealthRules
 
         delta = HealthRules.calculate_recovery(difficulty)
-        await self.apply_hp_change(session, user, delta, source="quest_complete")
+        await self.apply_hp_change(session, user, delta, source="quest_complete", commit=commit)
         return delta
 
     async def restore_hp_from_quest(self, session: AsyncSession, user: User, difficulty: str | None) -> User:
@@ -112,7 +114,7 @@ class HPService:
         await session.execute(
             update(Quest)
             .where(Quest.user_id == user.id, Quest.status == QuestStatus.ACTIVE.value)
-            .values(status=QuestStatus.PAUSED.value)
+            .values(status=QuestStatus.PAUSED.value, paused_at=func.now())
         )
         await session.commit()
 
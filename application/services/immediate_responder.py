@@ -89,7 +89,7 @@ class ImmediateResponder:
             
             # Send Push (Await to ensure delivery, usually < 100ms)
             logger.info(f"⚡ sending immediate feedback for {intent} to {user_id}")
-            success = await line_client.send_push(user_id, result)
+            success = await line_client.queue_push(user_id, result)
             return success
         except Exception as e:
             logger.error(f"Immediate send failed: {e}")
@@ -77,14 +77,8 @@ class PerceptionService(PerceptionPort):
         # Minimal Logic: Just get all NPCs for now or filter by event type relation if we had it
         # Future: MATCH (n:NPC)-[:CARES_ABOUT]->(e:EventType {name: event.type})
         try:
-            # Using cursor wrapper from GraphService
-            # GraphPort.query returns List[Any] (rows), not a cursor
-            result_rows = await self.graph.query("MATCH (n:NPC) RETURN n.name, n.role")
-            npcs = []
-            for row in result_rows:
-                if row:
-                    npcs.append(f"{row[0]} ({row[1]})")
-            return npcs
+            # Served from the adapter's NPC catalog, not a graph round-trip per event
+            return [f"{npc['name']} ({npc['role']})" for npc in await self.graph.get_all_npcs()]
         except Exception as e:
             logger.error(f"Graph Query Failed: {e}")
             return []
@@ -0,0 +1,112 @@
+"""
+Daily Pulse Marker
+
+The per-user daily checks (rival inactivity encounter, HP drain) can only
+change their answer once per local day, yet they ran on every message. The
+pulse runs them on the first message of the user's day and records
+`users.last_pulse_date`; later messages short-circuit on the column (already
+loaded with the user row) or on an in-process mirror, without any query.
+
+The mirror is claimed before the checks run, so concurrent messages from the
+same user in one process cannot apply the penalties twice.
+"""
+
+import collections
+import datetime
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.time_utils import local_today
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class PulseService:
+    MIRROR_SIZE = 50_000  # Users remembered per process (LRU)
+
+    def __init__(self):
+        self._mirror: "collections.OrderedDict[str, tuple[datetime.date, int]]" = collections.OrderedDict()
+        self._counters = {"messages": 0, "pulses": 0, "skipped_mirror": 0, "skipped_column": 0, "pulse_queries": 0}
+
+    def _remember(self, user_id: str, day: datetime.date, drain: int = 0) -> None:
+        self._mirror[user_id] = (day, drain)
+        self._mirror.move_to_end(user_id)
+        while len(self._mirror) > self.MIRROR_SIZE:
+            self._mirror.popitem(last=False)
+
+    def is_due(self, user: User, now: datetime.datetime | None = None) -> bool:
+        """True only for the user's first message of their local day."""
+        today = local_today(user.push_timezone, now)
+        cached = self._mirror.get(str(user.id))
+        if cached and cached[0] == today:
+            self._counters["skipped_mirror"] += 1
+            return False
+        if user.last_pulse_date == today:
+            self._remember(str(user.id), today)
+            self._counters["skipped_column"] += 1
+            return False
+        return True
+
+    def todays_drain(self, user: User, now: datetime.datetime | None = None) -> int:
+        """HP drained by today's pulse (0 if it ran in another process or drained nothing)."""
+        cached = self._mirror.get(str(user.id))
+        return cached[1] if cached and cached[0] == local_today(user.push_timezone, now) else 0
+
+    async def run(
+        self, session: AsyncSession, user: User, now: datetime.datetime | None = None
+    ) -> Dict[str, Any] | None:
+        """
+        Runs the daily checks once per user-day. Returns {"rival_log", "drain"} on the
+        first message of the day, None afterwards.
+        """
+        from application.services.hp_service import hp_service
+        from application.services.rival_service import rival_service
+
+        self._counters["messages"] += 1
+        if not self.is_due(user, now):
+            return None
+
+        today = local_today(user.push_timezone, now)
+        self._remember(str(user.id), today)  # Claim before awaiting
+        queries = []
+
+        def counter(_orm_execute_state):
+            queries.append(1)
+
+        event.listen(session.sync_session, "do_orm_execute", counter)
+        result = {"rival_log": "", "drain": 0}
+        try:
+            try:
+                result["drain"] = await hp_service.calculate_daily_drain(session, user)
+            except Exception as e:
+                logger.warning(f"Daily drain failed: {e}")
+            try:
+                result["rival_log"] = await rival_service.process_encounter(session, user)
+            except Exception as e:
+                logger.warning(f"Rival encounter failed: {e}")
+            user.last_pulse_date = today
+            session.add(user)
+            await session.commit()
+        finally:
+            event.remove(session.sync_session, "do_orm_execute", counter)
+        self._remember(str(user.id), today, result["drain"])
+        self._counters["pulses"] += 1
+        self._counters["pulse_queries"] += len(queries)
+        return result
+
+    def metrics(self) -> Dict[str, float]:
+        """Counters plus the per-message ORM queries avoided (skips x measured queries per pulse)."""
+        snapshot = dict(self._counters)
+        per_pulse = snapshot["pulse_queries"] / snapshot["pulses"] if snapshot["pulses"] else 0.0
+        skipped = snapshot["skipped_mirror"] + snapshot["skipped_column"]
+        snapshot["queries_per_pulse"] = round(per_pulse, 2)
+        snapshot["queries_saved"] = round(skipped * per_pulse)
+        snapshot["mirror_size"] = len(self._mirror)
+        return snapshot
+
+
+pulse_service = PulseService()
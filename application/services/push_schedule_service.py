@@ -0,0 +1,158 @@
+"""
+Push Due-Time Index
+
+Every push-enabled user has one `PushSchedule` row per push type holding the
+next send time in UTC. The scheduler tick reads only rows with
+`next_push_at <= now` (an index range scan) instead of loading every user and
+comparing local `HH:MM` strings. A late tick still sends anything that fell due
+within `PUSH_CATCHUP_GRACE_MINUTES`; older entries are skipped and moved to
+their next occurrence so a morning briefing is never delivered at night.
+
+Rows are (re)built by `sync_user`; call it after changing a user's push
+settings. Users without rows are picked up by `backfill` on the next tick.
+"""
+
+import datetime
+import logging
+from typing import Dict, List
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.time_utils import safe_zoneinfo
+from app.models.dda import PushProfile, PushSchedule
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PUSH_TYPES = ("morning", "midday", "night")
+DEFAULT_PUSH_TIMES = {"morning": "08:00", "midday": "12:30", "night": "21:00"}
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)  # SQLite drops tzinfo
+    return value.astimezone(datetime.timezone.utc)
+
+
+class PushScheduleService:
+    BACKFILL_LIMIT = 500  # Users without rows synced per tick
+
+    def resolve_push_times(self, user: User, profile: PushProfile | None) -> Dict[str, str]:
+        """User-level times win over the push profile, then the defaults."""
+        times = user.push_times or {}
+        return {
+            push_type: times.get(push_type)
+            or (getattr(profile, f"{push_type}_time", None) if profile else None)
+            or DEFAULT_PUSH_TIMES[push_type]
+            for push_type in PUSH_TYPES
+        }
+
+    def next_occurrence(
+        self,
+        hhmm: str,
+        tz_name: str | None,
+        after: datetime.datetime,
+        skip_date: datetime.date | None = None,
+    ) -> datetime.datetime | None:
+        """UTC instant of the next local `hhmm` at or after `after`, never on local `skip_date`."""
+        try:
+            hour, minute = (int(part) for part in hhmm.split(":"))
+            target = datetime.time(hour, minute)
+        except (AttributeError, ValueError):
+            return None
+        tz = safe_zoneinfo(tz_name)
+        local_after = _as_utc(after).astimezone(tz)
+        day = local_after.date()
+        for _ in range(3):
+            candidate = datetime.datetime.combine(day, target, tzinfo=tz)
+            if candidate >= local_after and day != skip_date:
+                return candidate.astimezone(datetime.timezone.utc)
+            day += datetime.timedelta(days=1)
+        return None
+
+    def is_stale(self, schedule: PushSchedule, now: datetime.datetime) -> bool:
+        grace = datetime.timedelta(minutes=settings.PUSH_CATCHUP_GRACE_MINUTES)
+        return _as_utc(now) - _as_utc(schedule.next_push_at) > grace
+
+    def _local_today(self, user: User, now: datetime.datetime) -> datetime.date:
+        return _as_utc(now).astimezone(safe_zoneinfo(user.push_timezone)).date()
+
+    async def sync_user(
+        self,
+        session: AsyncSession,
+        user: User,
+        profile: PushProfile | None = None,
+        now: datetime.datetime | None = None,
+    ) -> List[PushSchedule]:
+        """Rebuilds the user's rows from current settings (pushes already sent today stay sent)."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        if not user.push_enabled:
+            await self.clear_user(session, str(user.id))
+            return []
+        if profile is None:
+            result = await session.execute(select(PushProfile).where(PushProfile.user_id == user.id))
+            profile = result.scalars().first()
+
+        existing = {
+            s.push_type: s
+            for s in (await session.execute(select(PushSchedule).where(PushSchedule.user_id == user.id))).scalars()
+        }
+        times = self.resolve_push_times(user, profile)
+        today = self._local_today(user, now)
+        rows = []
+        for push_type in PUSH_TYPES:
+            last_sent = getattr(profile, f"last_{push_type}_date", None) if profile else None
+            row = existing.get(push_type)
+            if row is None:
+                row = PushSchedule(user_id=user.id, push_type=push_type)
+                session.add(row)
+            row.next_push_at = self.next_occurrence(
+                times[push_type], user.push_timezone, now, skip_date=today if last_sent == today else None
+            )
+            rows.append(row)
+        return rows
+
+    async def clear_user(self, session: AsyncSession, user_id: str) -> None:
+        await session.execute(delete(PushSchedule).where(PushSchedule.user_id == user_id))
+
+    def reschedule(
+        self,
+        schedule: PushSchedule,
+        user: User,
+        profile: PushProfile | None,
+        now: datetime.datetime | None = None,
+        sent: bool = False,
+    ) -> None:
+        """Moves a due row to its next occurrence (after today's, if it was just sent)."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        hhmm = self.resolve_push_times(user, profile)[schedule.push_type]
+        skip_date = self._local_today(user, now) if sent else None
+        schedule.next_push_at = self.next_occurrence(hhmm, user.push_timezone, now, skip_date=skip_date)
+
+    async def backfill(self, session: AsyncSession, now: datetime.datetime | None = None) -> int:
+        """Creates rows for push-enabled users that have none (new users, re-enabled pushes)."""
+        has_rows = select(PushSchedule.id).where(PushSchedule.user_id == User.id).exists()
+        stmt = select(User).where(User.push_enabled.is_(True), ~has_rows).limit(self.BACKFILL_LIMIT)
+        users = list((await session.execute(stmt)).scalars().all())
+        if not users:
+            return 0
+        profiles = {
+            p.user_id: p
+            for p in (
+                await session.execute(select(PushProfile).where(PushProfile.user_id.in_([u.id for u in users])))
+            ).scalars()
+        }
+        for user in users:
+            await self.sync_user(session, user, profiles.get(user.id), now)
+        await session.commit()
+        return len(users)
+
+    async def due(self, session: AsyncSession, now: datetime.datetime | None = None) -> List[PushSchedule]:
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        stmt = select(PushSchedule).where(PushSchedule.next_push_at <= _as_utc(now)).order_by(PushSchedule.next_push_at)
+        return list((await session.execute(stmt)).scalars().all())
+
+
+push_schedule_service = PushScheduleService()
@@ -0,0 +1,253 @@
+"""
+Batched Quest Generation
+
+Scheduled runs (e.g. the morning push) generate quests for many users at once.
+Instead of one `ai_engine.generate_json` call per user, K compact user profiles
+are packed into a single prompt that returns a JSON object keyed per profile.
+Each section is validated on its own; only users whose section fails fall back
+to the single-user path in `QuestService._generate_daily_batch`.
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.time_utils import local_day_range, local_today
+from app.models.dda import DailyOutcome
+from app.models.quest import Goal, GoalStatus, Quest, QuestStatus, Rival
+from app.models.user import User
+from application.services.ai_engine import ai_engine
+from application.services.quest_service import quest_service
+
+logger = logging.getLogger(__name__)
+
+
+class QuestBatchService:
+    HISTORY_TITLES = 10  # Recent titles used to derive themes
+
+    def _is_single_path(self, user: User, rival: Rival | None) -> bool:
+        """Hollowed and Boss Mode users get special quests that the batch prompt cannot express."""
+        hp = getattr(user, "hp", None)
+        if getattr(user, "is_hollowed", False) is True or getattr(user, "hp_status", "") == "HOLLOWED":
+            return True
+        if isinstance(hp, (int, float)) and hp <= 0:
+            return True
+        return bool(rival and (rival.level or 1) >= (user.level or 1) + 2)
+
+    async def _slots_for_tier(self, session: AsyncSession, tier: str, cache: Dict[str, int]) -> int:
+        """AI slots left after the template library fills what it can (see `_generate_daily_batch`)."""
+        if tier in cache:
+            return cache[tier]
+        count = quest_service.DAILY_QUEST_COUNT
+        slots = count
+        if settings.QUEST_TEMPLATE_LIBRARY_ENABLED:
+            try:
+                from application.services.quest_template_service import quest_template_service
+
+                slots = count - len(await quest_template_service.pick_templates(session, count - 1, tier))
+            except Exception as e:
+                logger.warning(f"Template slot estimate failed: {e}")
+        cache[tier] = max(1, slots)
+        return cache[tier]
+
+    async def build_profiles(self, session: AsyncSession, users: List[User]) -> tuple[Dict[str, Dict], List[User]]:
+        """
+        Builds compact profiles keyed by alias (p0, p1, ...). Aliases keep raw user IDs out of the prompt.
+        Returns (profiles, single_path_users).
+        """
+        ids = [str(u.id) for u in users]
+        yesterdays = {str(u.id): local_today(u.push_timezone) - datetime.timedelta(days=1) for u in users}
+
+        rivals = {
+            r.user_id: r for r in (await session.execute(select(Rival).where(Rival.user_id.in_(ids)))).scalars().all()
+        }
+        goals: Dict[str, str] = {}
+        for g in (
+            await session.execute(select(Goal).where(Goal.user_id.in_(ids), Goal.status == GoalStatus.ACTIVE.value))
+        ).scalars():
+            goals.setdefault(g.user_id, g.title)
+        struggling = {
+            o.user_id
+            for o in (
+                await session.execute(
+                    select(DailyOutcome).where(
+                        DailyOutcome.user_id.in_(ids),
+                        DailyOutcome.date.in_(set(yesterdays.values())),
+                        DailyOutcome.is_global.is_(True),
+                        DailyOutcome.done.is_(False),
+                    )
+                )
+            ).scalars()
+            if o.date == yesterdays.get(o.user_id)
+        }
+
+        # Last HISTORY_TITLES titles per user in one query instead of one per user
+        ranked = (
+            select(
+                Quest.user_id,
+                Quest.title,
+                func.row_number().over(partition_by=Quest.user_id, order_by=Quest.created_at.desc()).label("rn"),
+            )
+            .where(Quest.user_id.in_(ids))
+            .subquery()
+        )
+        recent_titles: Dict[str, List[str]] = {}
+        for user_id, title in (
+            await session.execute(select(ranked.c.user_id, ranked.c.title).where(ranked.c.rn <= self.HISTORY_TITLES))
+        ).all():
+            recent_titles.setdefault(str(user_id), []).append(title)
+
+        profiles: Dict[str, Dict] = {}
+        single: List[User] = []
+        slot_cache: Dict[str, int] = {}
+        for user in users:
+            uid = str(user.id)
+            if self._is_single_path(user, rivals.get(uid)):
+                single.append(user)
+                continue
+
+            themes = set()
+            for title in recent_titles.get(uid, []):
+                themes.update(quest_service._extract_themes_from_text(title))
+
+            tier = "E" if uid in struggling else "D"
+            profiles[f"p{len(profiles)}"] = {
+                "user_id": uid,
+                "lv": user.level or 1,
+                "tier": tier,
+                "themes": sorted(themes),
+                "goal": goals.get(uid, ""),
+                "n": await self._slots_for_tier(session, tier, slot_cache),
+            }
+        return profiles, single
+
+    def build_prompt(self, profiles: Dict[str, Dict], time_context: str = "Morning") -> tuple[str, str]:
+        system_prompt = (
+            "Generate Daily Tactical Side-Quests for MULTIPLE players. "
+            f"Time Context: {time_context} (Customize tasks for this time). "
+            "Theme: Cyberpunk/Gamified Life. "
+            "Each profile has: lv (level), tier (target difficulty; E = struggling, give EASIER recovery tasks), "
+            "themes (recent focus), goal (current objective), n (EXACT number of quests). "
+            "Language: ALWAYS use Traditional Chinese (繁體中文). "
+            "Output ONE JSON object keyed by profile key ONLY: "
+            "{ 'p0': [ { 'title': 'str', 'desc': 'str', 'diff': 'tier', 'xp': 20 } ], 'p1': [...] }"
+        )
+        compact = {key: {k: v for k, v in p.items() if k != "user_id"} for key, p in profiles.items()}
+        user_prompt = f"Profiles: {json.dumps(compact, ensure_ascii=False, separators=(',', ':'))}"
+        return system_prompt, user_prompt
+
+    def validate_section(self, section, profile: Dict) -> List[Dict] | None:
+        """A section is usable only if it yields at least `n` valid quests."""
+        normalized = quest_service._normalize_ai_quests(section, profile["tier"])
+        if len(normalized) < profile["n"]:
+            return None
+        return normalized
+
+    async def _generate_chunk(self, profiles: Dict[str, Dict], time_context: str) -> Dict[str, List[Dict] | None]:
+        system_prompt, user_prompt = self.build_prompt(profiles, time_context)
+        try:
+            ai_data = await asyncio.wait_for(
+                ai_engine.generate_json(system_prompt, user_prompt),
+                timeout=settings.QUEST_BATCH_TIMEOUT_SECONDS,
+            )
+        except (Exception, asyncio.TimeoutError) as e:
+            logger.warning(f"Batch Quest Gen failed for {len(profiles)} profiles: {e}")
+            ai_data = {}
+        if not isinstance(ai_data, dict) or ai_data.get("error"):
+            ai_data = {}
+        return {key: self.validate_section(ai_data.get(key), profile) for key, profile in profiles.items()}
+
+    async def _count_active_today(self, session: AsyncSession, users: List[User]) -> Dict[str, int]:
+        """Active quests created during each user's local day."""
+        ranges = {str(u.id): local_day_range(tz_name=u.push_timezone) for u in users}
+        if not ranges:
+            return {}
+        # One range scan covering every timezone, then exact per-user bounds in Python
+        stmt = select(Quest.user_id, Quest.created_at).where(
+            Quest.user_id.in_(list(ranges)),
+            Quest.status == QuestStatus.ACTIVE.value,
+            Quest.created_at >= min(start for start, _ in ranges.values()),
+            Quest.created_at < max(end for _, end in ranges.values()),
+        )
+        counts: Dict[str, int] = {}
+        for uid, created_at in (await session.execute(stmt)).all():
+            start, end = ranges[uid]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=datetime.timezone.utc)  # SQLite drops tzinfo
+            if start <= created_at < end:
+                counts[uid] = counts.get(uid, 0) + 1
+        return counts
+
+    async def generate_for_users(
+        self,
+        session: AsyncSession,
+        users: List[User],
+        time_context: str = "Morning",
+        batch_size: int | None = None,
+    ) -> Dict[str, int]:
+        """
+        Generates the daily batch for every user in `users` using one LLM call per K users.
+        Users that already have a full batch today are skipped (same rule as `trigger_push_quests`).
+        Returns run stats.
+        """
+        t0 = time.perf_counter()
+        batch_size = max(1, batch_size or settings.QUEST_BATCH_SIZE)
+        stats = {"users": 0, "batched": 0, "fallback": 0, "skipped": 0, "batch_calls": 0}
+
+        active = await self._count_active_today(session, users)
+        pending = []
+        for u in users:
+            if active.get(str(u.id), 0) >= quest_service.DAILY_QUEST_COUNT:
+                stats["skipped"] += 1
+            else:
+                pending.append(u)
+        stats["users"] = len(pending)
+        if not pending:
+            return stats
+
+        profiles, single = await self.build_profiles(session, pending)
+        keys = list(profiles)
+        chunks = [{k: profiles[k] for k in keys[i : i + batch_size]} for i in range(0, len(keys), batch_size)]
+
+        # LLM calls do not touch the session, so chunks can run concurrently
+        sections: Dict[str, List[Dict] | None] = {}
+        for result in await asyncio.gather(*(self._generate_chunk(c, time_context) for c in chunks)):
+            sections.update(result)
+        stats["batch_calls"] = len(chunks)
+
+        users_by_id = {str(u.id): u for u in pending}
+        for key, profile in profiles.items():
+            section = sections.get(key)
+            if section is None:
+                single.append(users_by_id[profile["user_id"]])
+                continue
+            try:
+                await quest_service._generate_daily_batch(
+                    session, profile["user_id"], time_context=time_context, prefetched=section
+                )
+                stats["batched"] += 1
+            except Exception as e:
+                logger.error(f"Batched quest apply failed for {profile['user_id']}: {e}")
+                single.append(users_by_id[profile["user_id"]])
+
+        # Single-user fallback only for sections that failed (and Boss/Hollowed users)
+        for user in single:
+            try:
+                await quest_service._generate_daily_batch(session, str(user.id), time_context=time_context)
+                stats["fallback"] += 1
+            except Exception as e:
+                logger.error(f"Single quest gen failed for {user.id}: {e}")
+
+        stats["elapsed_ms"] = int((time.perf_counter() - t0) * 1000)
+        logger.info(f"Batch Quest Gen: {stats}")
+        return stats
+
+
+quest_batch_service = QuestBatchService()
@@ -0,0 +1,126 @@
+"""
+Quest Lifecycle Sweeper
+
+Nothing used to retire quests: daily batches nobody accepted stayed PENDING,
+abandoned quests stayed ACTIVE and the rescue protocol's PAUSED quests were
+never resumed, so every per-user status scan grew with the account's age.
+The sweeper moves them to terminal states once they are past their window:
+
+- PENDING older than `QUEST_PENDING_EXPIRY_DAYS` -> EXPIRED (never accepted)
+- ACTIVE older than `QUEST_ACTIVE_EXPIRY_DAYS` -> FAILED (accepted, not done)
+- PAUSED for longer than `QUEST_PAUSED_EXPIRY_DAYS` -> EXPIRED, counted from
+  `paused_at` (when the rescue protocol paused it), not from creation
+
+Each transition walks its candidates with keyset pagination on `quests.id`
+and applies one UPDATE per chunk of at most `QUEST_SWEEP_BATCH_SIZE` rows,
+committing after every chunk so no transaction holds more than one batch.
+"""
+
+import datetime
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.quest import Quest, QuestStatus
+
+logger = logging.getLogger(__name__)
+
+
+class QuestLifecycleService:
+    def __init__(self):
+        self.last_run: Dict[str, int | float] = {}
+        self._totals = {"runs": 0, "rows": 0, "chunks": 0, "elapsed_ms": 0}
+
+    def transitions(self) -> List[Tuple[str, str, int, ColumnElement]]:
+        """(from_status, to_status, expiry_days, timestamp the age is measured from) in sweep order."""
+        created = Quest.created_at
+        paused = func.coalesce(Quest.paused_at, Quest.created_at)  # Rows paused before paused_at existed
+        return [
+            (QuestStatus.PENDING.value, QuestStatus.EXPIRED.value, settings.QUEST_PENDING_EXPIRY_DAYS, created),
+            (QuestStatus.ACTIVE.value, QuestStatus.FAILED.value, settings.QUEST_ACTIVE_EXPIRY_DAYS, created),
+            (QuestStatus.PAUSED.value, QuestStatus.EXPIRED.value, settings.QUEST_PAUSED_EXPIRY_DAYS, paused),
+        ]
+
+    async def sweep_transition(
+        self,
+        session: AsyncSession,
+        from_status: str,
+        to_status: str,
+        cutoff: datetime.datetime,
+        batch_size: int,
+        since: ColumnElement = Quest.created_at,
+    ) -> Tuple[int, int]:
+        """Moves every `from_status` quest whose `since` is before `cutoff` to `to_status`. Returns (rows, chunks)."""
+        rows = chunks = 0
+        last_id = ""
+        while True:
+            ids = (
+                (
+                    await session.execute(
+                        select(Quest.id)
+                        .where(Quest.status == from_status, since < cutoff, Quest.id > last_id)
+                        .order_by(Quest.id)
+                        .limit(batch_size)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+            if not ids:
+                return rows, chunks
+            last_id = ids[-1]
+            # Re-check the status so a quest completed since the select is left alone
+            result = await session.execute(
+                update(Quest)
+                .where(Quest.id.in_(ids), Quest.status == from_status)
+                .values(status=to_status)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            rows += result.rowcount or 0
+            chunks += 1
+            if len(ids) < batch_size:
+                return rows, chunks
+
+    async def sweep(self, session: AsyncSession, now: datetime.datetime | None = None) -> Dict[str, int | float]:
+        """Runs every transition once and records the run's throughput."""
+        t0 = time.perf_counter()
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        batch_size = max(1, settings.QUEST_SWEEP_BATCH_SIZE)
+        stats: Dict[str, int | float] = {"rows": 0, "chunks": 0}
+        for from_status, to_status, days, since in self.transitions():
+            if days <= 0:
+                continue  # 0 disables the transition
+            cutoff = now - datetime.timedelta(days=days)
+            rows, chunks = await self.sweep_transition(session, from_status, to_status, cutoff, batch_size, since)
+            stats[f"{from_status.lower()}_to_{to_status.lower()}"] = rows
+            stats["rows"] += rows
+            stats["chunks"] += chunks
+
+        elapsed = time.perf_counter() - t0
+        stats["elapsed_ms"] = int(elapsed * 1000)
+        stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+        self.last_run = stats
+        self._totals["runs"] += 1
+        self._totals["rows"] += stats["rows"]
+        self._totals["chunks"] += stats["chunks"]
+        self._totals["elapsed_ms"] += stats["elapsed_ms"]
+        if stats["rows"]:
+            logger.info("Quest sweep: %s", stats)
+        return stats
+
+    def metrics(self) -> Dict[str, int | float | dict]:
+        """Totals since process start plus the last run."""
+        snapshot: Dict[str, int | float | dict] = dict(self._totals)
+        seconds = snapshot["elapsed_ms"] / 1000
+        snapshot["rows_per_sec"] = round(snapshot["rows"] / seconds, 1) if seconds else 0.0
+        snapshot["last_run"] = dict(self.last_run)
+        return snapshot
+
+
+quest_lifecycle_service = QuestLifecycleService()
@@ -11,9 +11,9 @@ from unittest.mock import AsyncMock, MagicMock, Mock
 
 from sqlalchemy import delete, select, text, desc
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import func
 
 from app.core.config import settings
+from app.core.time_utils import local_day_range, local_range, local_today
 from app.models.quest import Goal, GoalStatus, Quest, QuestStatus, QuestType
 from application.services.ai_engine import ai_engine
 from application.services.brain.flow_controller import flow_controller
@@ -74,25 +74,33 @@ class QuestService:
         await session.commit()
         return q
 
+    async def _user_timezone(self, session: AsyncSession, user_id: str) -> str | None:
+        """User's push timezone; day boundaries for quest queries follow it."""
+        from app.models.user import User
+
+        try:
+            result = await session.execute(select(User.push_timezone).where(User.id == user_id))
+            tz_name = result.scalar_one_or_none()
+            return tz_name if isinstance(tz_name, str) else None
+        except Exception as e:
+            logger.warning(f"Timezone lookup failed for {user_id}: {e}")
+            return None
+
     async def get_daily_quests(self, session: AsyncSession, user_id: str):
         """
         Fetches active quests for today.
         If none exist, generates a fresh batch (Daily Reset).
         """
-        today = datetime.datetime.now(datetime.timezone.utc).date()
-
-        # 1. Fetch Existing Quests for Today (or Active ones)
-        # We look for quests scheduled for today OR active pending ones?
-        # For simplicity: "Daily Quests" are those created today date or scheduled for today.
-        today_start = datetime.datetime.combine(today, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
-        today_end = datetime.datetime.combine(today, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+        # 1. Fetch Existing Quests for Today
+        # "Daily Quests" are those created during the user's local day (half-open UTC range, index-friendly).
+        today_start, today_end = local_day_range(tz_name=await self._user_timezone(session, user_id))
 
         stmt = (
             select(Quest)
             .where(
                 Quest.user_id == user_id,
                 Quest.created_at >= today_start,
-                Quest.created_at <= today_end,
+                Quest.created_at < today_end,
             )
             .order_by(Quest.created_at.asc())
         )
@@ -337,8 +345,17 @@ class QuestService:
             await session.commit()
         return count
 
-    async def _generate_daily_batch(self, session: AsyncSession, user_id: str, time_context: str = "Daily"):
-        """Generates quests. Checks for BOSS MODE first."""
+    async def _generate_daily_batch(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        time_context: str = "Daily",
+        prefetched: list | None = None,
+    ):
+        """
+        Generates quests. Checks for BOSS MODE first.
+        `prefetched` is a pre-generated AI quest list (from a multi-user batch); when given, the LLM call is skipped.
+        """
         from app.core.container import container
         from application.services.rival_service import rival_service
 
@@ -428,10 +445,10 @@ class QuestService:
         # DDA Check (Feature 3)
         from app.models.dda import DailyOutcome
 
-        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        yesterday = local_today(await self._user_timezone(session, user_id)) - datetime.timedelta(days=1)
         dda_stmt = select(DailyOutcome).where(
             DailyOutcome.user_id == user_id,
-            func.date(DailyOutcome.date) == yesterday,
+            DailyOutcome.date == yesterday,
             DailyOutcome.is_global.is_(True),
         )
         dda_res = (await session.execute(dda_stmt)).scalars().first()
@@ -500,6 +517,41 @@ class QuestService:
         except Exception as e:
             logger.error(f"Graph Quest Injection Failed: {e}")
 
+        # --- Template Library Fill ---
+        # Fill all but one slot from mined templates; the LLM only writes the novel slot.
+        if count >= 2 and settings.QUEST_TEMPLATE_LIBRARY_ENABLED:
+            try:
+                from application.services.quest_template_service import quest_template_service
+
+                recent_stmt = (
+                    select(Quest.title)
+                    .where(Quest.user_id == user_id)
+                    .order_by(Quest.created_at.desc())
+                    .limit(self.DAILY_QUEST_COUNT * 2)
+                )
+                recent = list((await session.execute(recent_stmt)).scalars().all())
+                picks = await quest_template_service.pick_templates(session, count - 1, target_diff, recent)
+                for t in picks:
+                    t_quest = Quest(
+                        user_id=user_id,
+                        title=t["title"],
+                        description=t["desc"],
+                        difficulty_tier=t["diff"],
+                        xp_reward=t["xp"],
+                        quest_type=QuestType.SIDE.value,
+                        status=QuestStatus.ACTIVE.value,
+                        scheduled_date=datetime.date.today(),
+                        created_at=datetime.datetime.now(datetime.timezone.utc),
+                        meta={"template_id": t["template_id"]},
+                    )
+                    session.add(t_quest)
+                    new_quests.append(t_quest)
+                    count -= 1  # Reduce AI count
+                if picks:
+                    logger.info(f"Template library filled {len(picks)} slot(s) for {user_id}")
+            except Exception as e:
+                logger.error(f"Template Library Fill Failed: {e}")
+
         system_prompt = (
             f"Generate EXACTLY {count} Daily Tactical Side-Quests. {dda_modifier} "
             f"Time Context: {time_context} (Customize tasks for this time). "
@@ -511,43 +563,24 @@ class QuestService:
         user_prompt = f"Context: {topic}. Generate tasks."
 
         try:
-            # Enforce configured timeout for responsiveness
-            t0 = time.perf_counter()
-            ai_data = await asyncio.wait_for(
-                ai_engine.generate_json(system_prompt, user_prompt),
-                timeout=settings.AI_REQUEST_TIMEOUT_SECONDS,
-            )
-            t1 = time.perf_counter()
-            logger.info(f"[Perf] AI Quest Gen took {t1 - t0:.4f}s")
+            if prefetched is not None:
+                # Section already generated by a multi-user batch call
+                ai_data = prefetched
+            else:
+                # Enforce configured timeout for responsiveness
+                t0 = time.perf_counter()
+                ai_data = await asyncio.wait_for(
+                    ai_engine.generate_json(system_prompt, user_prompt),
+                    timeout=settings.AI_REQUEST_TIMEOUT_SECONDS,
+                )
+                t1 = time.perf_counter()
+                logger.info(f"[Perf] AI Quest Gen took {t1 - t0:.4f}s")
 
             if isinstance(ai_data, dict) and ai_data.get("error"):
                 # Fallback logic...
                 raise ValueError("AI Error")
 
-            quest_list = ai_data if isinstance(ai_data, list) else ai_data.get("quests", [])
-            if isinstance(ai_data, dict) and not quest_list:
-                # Try to parse single object or flat dict
-                if "title" in ai_data:
-                    quest_list = [ai_data]
-
-            def _contains_cjk(text: str) -> bool:
-                return any("\u4e00" <= ch <= "\u9fff" for ch in text)
-
-            normalized = []
-            for t in quest_list:
-                if not isinstance(t, dict):
-                    continue
-                title = (t.get("title") or "").strip()
-                desc = (t.get("desc") or "").strip()
-                diff = t.get("diff", target_diff)
-                xp = t.get("xp", 20)
-
-                if not title or not _contains_cjk(title):
-                    continue
-                if desc and not _contains_cjk(desc):
-                    desc = "完成一個短任務（10-20 分鐘）。"
-
-                normalized.append({"title": title, "desc": desc, "diff": diff, "xp": xp})
+            normalized = self._normalize_ai_quests(ai_data, target_diff)
 
             # === FEATURE 4.5: Multi-Objective Ranking ===
             # Fetch recent history for Diversity/Exploration
@@ -695,10 +728,11 @@ class QuestService:
         await session.commit()
         return new_quests
 
-    async def complete_quest(self, session: AsyncSession, user_id: str, quest_id: str) -> dict:
+    async def complete_quest(self, session: AsyncSession, user_id: str, quest_id: str, uow=None) -> dict:
         """
         Marks a quest as DONE and returns Reward Data (RPE integrated).
         Returns Dict with quest and reward details.
+        Runs as one unit of work; pass `uow` to join a caller's transaction instead of committing here.
         """
         stmt = select(Quest).where(Quest.id == quest_id, Quest.user_id == user_id)
         # Fast path for mocked sessions in unit tests
@@ -748,7 +782,11 @@ class QuestService:
             quest = await quest
 
         if quest and quest.status != QuestStatus.DONE.value:
-            try:
+            from adapters.persistence.sqlite.unit_of_work import SqlAlchemyUnitOfWork
+
+            # One commit for status, loot, boss damage and HP; graph sync runs after it
+            uow = uow or SqlAlchemyUnitOfWork(session=session)
+            async with uow:
                 quest.status = QuestStatus.DONE.value
 
                 # --- Loot & RPE Logic ---
@@ -778,33 +816,16 @@ class QuestService:
                     user.gold = (user.gold or 0) + loot.gold
                     user.last_active_date = datetime.datetime.now(datetime.timezone.utc)
 
-                await self._maybe_await(session.commit())
-
-                # --- Graph Sync ---
+                # --- Graph Sync (post-commit) ---
                 if quest.meta and "graph_node_id" in quest.meta:
-                    try:
-                        from app.core.container import container
-
-                        graph_node_id = quest.meta["graph_node_id"]
-                        success = await container.graph_service.adapter.add_relationship(
-                            "User",
-                            user_id,
-                            "COMPLETED",
-                            "Quest",
-                            graph_node_id,
-                            {"timestamp": datetime.datetime.now().isoformat()},
-                            from_key_field="id",
-                            to_key_field="id",
-                        )
-                        if success:
-                            logger.info(f"Synced Quest {quest.title} completion to Graph Node {graph_node_id}")
-                    except Exception as e:
-                        logger.error(f"Graph Sync Failed: {e}")
+                    uow.add_post_commit(
+                        self._sync_completion_to_graph, user_id, quest.title, quest.meta["graph_node_id"]
+                    )
 
                 # Passive Boss Damage
                 from application.services.boss_service import boss_service
 
-                await self._maybe_await(boss_service.deal_damage(session, user_id, 50))  # 50 dmg per quest
+                await self._maybe_await(boss_service.deal_damage(session, user_id, 50, uow=uow))  # 50 dmg per quest
 
                 # Hollowed recovery
                 if user and quest.quest_type == QuestType.REDEMPTION.value:
@@ -820,36 +841,52 @@ class QuestService:
                                     user,
                                     delta,
                                     source="rescue_quest",
+                                    commit=False,
                                     trigger_rescue=False,
                                 )
                             )
                 elif user:
                     from application.services.hp_service import hp_service
 
-                    await self._maybe_await(hp_service.restore_by_difficulty(session, user, quest.difficulty_tier))
-
-                return {"quest": quest, "loot": loot}
-            except TypeError:
-                from application.services.loot_service import LootResult
+                    await self._maybe_await(
+                        hp_service.restore_by_difficulty(session, user, quest.difficulty_tier, commit=False)
+                    )
 
-                fallback_loot = LootResult(xp=10, gold=0)
-                quest.status = QuestStatus.DONE.value
-                if "user" in locals() and user:
-                    user.xp = (getattr(user, "xp", 0) or 0) + fallback_loot.xp
-                    user.gold = (getattr(user, "gold", 0) or 0) + fallback_loot.gold
-                return {"quest": quest, "loot": fallback_loot}
+            return {"quest": quest, "loot": loot}
         return None
 
+    async def _sync_completion_to_graph(self, user_id: str, quest_title: str, graph_node_id: str):
+        try:
+            from app.core.container import container
+
+            success = await container.graph_service.adapter.add_relationship(
+                "User",
+                user_id,
+                "COMPLETED",
+                "Quest",
+                graph_node_id,
+                {"timestamp": datetime.datetime.now().isoformat()},
+                from_key_field="id",
+                to_key_field="id",
+            )
+            if success:
+                logger.info(f"Synced Quest {quest_title} completion to Graph Node {graph_node_id}")
+        except Exception as e:
+            logger.error(f"Graph Sync Failed: {e}")
+
     async def get_completed_quests_this_week(self, session: AsyncSession, user_id: str) -> list[Quest]:
         """
         Returns completed quests for the current week (Mon-Sun).
         """
-        today = datetime.date.today()
+        tz_name = await self._user_timezone(session, user_id)
+        today = local_today(tz_name)
         start_of_week = today - datetime.timedelta(days=today.weekday())
+        week_start, week_end = local_range(start_of_week, today + datetime.timedelta(days=1), tz_name)
         stmt = select(Quest).where(
             Quest.user_id == user_id,
             Quest.status == QuestStatus.DONE.value,
-            func.date(Quest.created_at) >= start_of_week,
+            Quest.created_at >= week_start,
+            Quest.created_at < week_end,
         )
         result = await session.execute(stmt)
         return result.scalars().all()
@@ -862,11 +899,12 @@ class QuestService:
         # 1. Check if we already have quests generated for this block?
         # Actually _generate_daily_batch logic creates a batch.
         # If we want granular pushes, we should check if ACTIVE quests exist.
-        today = datetime.date.today()
+        today_start, today_end = local_day_range(tz_name=await self._user_timezone(session, user_id))
         stmt = select(Quest).where(
             Quest.user_id == user_id,
             Quest.status == QuestStatus.ACTIVE.value,
-            func.date(Quest.created_at) == today,
+            Quest.created_at >= today_start,
+            Quest.created_at < today_end,
         )
         exec_res = await session.execute(stmt)
         existing = exec_res.scalars().all()
@@ -909,17 +947,14 @@ class QuestService:
         # 2. Deduct Gold
         user.gold = gold_balance - cost
 
-        today = target_date or datetime.datetime.now(datetime.timezone.utc).date()
-
         # Archive old ones
-        # Archive old ones
-        today_start = datetime.datetime.combine(today, datetime.time.min).replace(tzinfo=datetime.timezone.utc)
-        today_end = datetime.datetime.combine(today, datetime.time.max).replace(tzinfo=datetime.timezone.utc)
+        tz_name = getattr(user, "push_timezone", None)
+        today_start, today_end = local_day_range(target_date, tz_name if isinstance(tz_name, str) else None)
 
         stmt = select(Quest).where(
             Quest.user_id == user_id,
             Quest.created_at >= today_start,
-            Quest.created_at <= today_end,
+            Quest.created_at < today_end,
             Quest.status != QuestStatus.DONE.value,
         )
         result = await session.execute(stmt)
@@ -953,7 +988,7 @@ class QuestService:
         delete_stmt = delete(Quest).where(
             Quest.user_id == user_id,
             Quest.created_at >= today_start,
-            Quest.created_at <= today_end,
+            Quest.created_at < today_end,
             Quest.status != QuestStatus.DONE.value,
         )
         delete_result = await session.execute(delete_stmt, execution_options={"synchronize_session": False})
@@ -965,7 +1000,7 @@ class QuestService:
                         select(Quest).where(
                             Quest.user_id == user_id,
                             Quest.created_at >= today_start,
-                            Quest.created_at <= today_end,
+                            Quest.created_at < today_end,
                             Quest.status != QuestStatus.DONE.value,
                         )
                     )
@@ -1064,6 +1099,38 @@ class QuestService:
         habits = sorted(habits, key=habit_sort)
         return habits[:target]
 
+    def _normalize_ai_quests(self, ai_data, target_diff: str = "D") -> List[Dict]:
+        """Extracts valid quest dicts (CJK title required) from a raw AI JSON payload."""
+        if isinstance(ai_data, list):
+            quest_list = ai_data
+        elif isinstance(ai_data, dict):
+            quest_list = ai_data.get("quests", [])
+            if not quest_list and "title" in ai_data:
+                # Single object or flat dict
+                quest_list = [ai_data]
+        else:
+            quest_list = []
+
+        def _contains_cjk(text: str) -> bool:
+            return any("\u4e00" <= ch <= "\u9fff" for ch in text)
+
+        normalized = []
+        for t in quest_list:
+            if not isinstance(t, dict):
+                continue
+            title = (t.get("title") or "").strip()
+            desc = (t.get("desc") or "").strip()
+            diff = t.get("diff", target_diff)
+            xp = t.get("xp", 20)
+
+            if not title or not _contains_cjk(title):
+                continue
+            if desc and not _contains_cjk(desc):
+                desc = "完成一個短任務（10-20 分鐘）。"
+
+            normalized.append({"title": title, "desc": desc, "diff": diff, "xp": xp})
+        return normalized
+
     def _calculate_diversity_score(self, candidate: Dict, history: List[str]) -> float:
         """
         DPP (Determinantal Point Process) approximation.
@@ -0,0 +1,220 @@
+"""
+Quest Template Library
+
+Mines parameterized quest templates from historical AI-generated quests and
+serves them back to daily generation, so most slots can be filled without an
+LLM call. Completion rates are recomputed on every mining run, which keeps the
+library's quality measurable (template-served quests carry meta.template_id).
+"""
+
+import datetime
+import hashlib
+import logging
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.quest import Quest, QuestStatus, QuestTemplate, QuestType
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r"\d+")
+_RARE_PREFIX = "稀有｜"
+_FALLBACK_MARKER = "（備援）"
+
+
+class QuestTemplateService:
+    MINING_WINDOW_DAYS = 60
+    MIN_SUPPORT = 3  # Accepted quests needed before a cluster becomes a template
+    MIN_COMPLETION_RATE = 0.3
+    ACCEPTED_STATUSES = (QuestStatus.ACTIVE.value, QuestStatus.DONE.value, QuestStatus.FAILED.value)
+
+    # --- Normalization ---
+
+    def normalize_title(self, title: str) -> tuple[str, list[int]]:
+        """
+        Reduces a quest title to its pattern.
+        Numbers become ordered slots ({n0}, {n1}, ...) and their values are returned.
+        """
+        text = (title or "").strip()
+        if text.startswith(_RARE_PREFIX):
+            text = text[len(_RARE_PREFIX) :]
+        text = text.strip("【】 ").strip()
+
+        values: list[int] = []
+
+        def _slot(match: re.Match) -> str:
+            values.append(int(match.group(0)))
+            return f"{{n{len(values) - 1}}}"
+
+        pattern = _NUMBER_RE.sub(_slot, text)
+        return pattern, values
+
+    def normalize_description(self, desc: str, slot_values: list[int]) -> str:
+        """Replaces numbers that also appear in the title with the matching slot."""
+        if not desc:
+            return ""
+
+        def _slot(match: re.Match) -> str:
+            value = int(match.group(0))
+            if value in slot_values:
+                return f"{{n{slot_values.index(value)}}}"
+            return match.group(0)
+
+        return _NUMBER_RE.sub(_slot, desc.strip())
+
+    def fingerprint(self, title_pattern: str) -> str:
+        return hashlib.sha1(title_pattern.encode("utf-8")).hexdigest()[:16]
+
+    def _is_minable(self, quest: Quest) -> bool:
+        if quest.quest_type != QuestType.SIDE.value or quest.is_redemption:
+            return False
+        if quest.meta and "graph_node_id" in quest.meta:
+            return False
+        if _FALLBACK_MARKER in (quest.description or ""):
+            return False
+        return bool((quest.title or "").strip())
+
+    # --- Mining ---
+
+    async def mine_templates(self, session: AsyncSession, now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+        """
+        Clusters accepted quests by normalized title and upserts one template per
+        cluster with enough support. Returns mining stats.
+        """
+        from application.services.quest_service import quest_service
+
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        since = now - datetime.timedelta(days=self.MINING_WINDOW_DAYS)
+
+        stmt = select(Quest).where(
+            Quest.status.in_(self.ACCEPTED_STATUSES),
+            Quest.created_at >= since,
+        )
+        quests = (await session.execute(stmt)).scalars().all()
+
+        clusters: Dict[str, list] = defaultdict(list)
+        for quest in quests:
+            if not self._is_minable(quest):
+                continue
+            pattern, values = self.normalize_title(quest.title)
+            if not pattern:
+                continue
+            clusters[pattern].append((quest, values))
+
+        existing_rows = (await session.execute(select(QuestTemplate))).scalars().all()
+        existing = {t.fingerprint: t for t in existing_rows}
+
+        created = updated = 0
+        for pattern, members in clusters.items():
+            if len(members) < self.MIN_SUPPORT:
+                continue
+
+            completed = sum(1 for q, _ in members if q.status == QuestStatus.DONE.value)
+            params: Dict[str, list] = defaultdict(set)
+            descriptions: Counter = Counter()
+            tiers: Counter = Counter()
+            xp_values: Counter = Counter()
+            themes: set = set()
+
+            for quest, values in members:
+                for idx, value in enumerate(values):
+                    params[f"n{idx}"].add(value)
+                descriptions[self.normalize_description(quest.description or "", values)] += 1
+                tiers[quest.difficulty_tier or "D"] += 1
+                xp_values[quest.xp_reward or 20] += 1
+                themes.update(quest_service._extract_themes_from_text(f"{quest.title} {quest.description or ''}"))
+
+            fp = self.fingerprint(pattern)
+            template = existing.get(fp)
+            if template is None:
+                template = QuestTemplate(fingerprint=fp, title_pattern=pattern)
+                session.add(template)
+                existing[fp] = template
+                created += 1
+            else:
+                updated += 1
+
+            template.description_pattern = descriptions.most_common(1)[0][0]
+            template.params = {slot: sorted(vals) for slot, vals in params.items()}
+            template.difficulty_tier = tiers.most_common(1)[0][0]
+            template.xp_reward = xp_values.most_common(1)[0][0]
+            template.themes = sorted(themes)
+            template.sample_count = len(members)
+            template.completed_count = completed
+            template.completion_rate = round(completed / len(members), 4)
+            template.last_mined_at = now
+
+        await session.commit()
+        stats = {"scanned": len(quests), "clusters": len(clusters), "created": created, "updated": updated}
+        logger.info(f"Quest template mining: {stats}")
+        return stats
+
+    # --- Serving ---
+
+    def render(self, template: QuestTemplate) -> Dict:
+        """Fills template slots with observed values and returns a quest dict."""
+        values = {slot: random.choice(vals) for slot, vals in (template.params or {}).items() if vals}
+        try:
+            title = template.title_pattern.format(**values)
+            desc = (template.description_pattern or "").format(**values)
+        except (KeyError, IndexError, ValueError):
+            title = template.title_pattern
+            desc = template.description_pattern or ""
+        return {
+            "title": title,
+            "desc": desc,
+            "diff": template.difficulty_tier or "D",
+            "xp": template.xp_reward or 20,
+            "template_id": template.id,
+        }
+
+    async def pick_templates(
+        self,
+        session: AsyncSession,
+        count: int,
+        target_diff: str = "D",
+        exclude_titles: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """
+        Returns up to `count` rendered quests from the library, preferring the
+        target difficulty and higher completion rates. Easy mode (E) never borrows
+        harder tiers.
+        """
+        if count <= 0:
+            return []
+
+        stmt = (
+            select(QuestTemplate)
+            .where(
+                QuestTemplate.sample_count >= self.MIN_SUPPORT,
+                QuestTemplate.completion_rate >= self.MIN_COMPLETION_RATE,
+            )
+            .order_by(QuestTemplate.completion_rate.desc())
+            .limit(count * 8)
+        )
+        rows = (await session.execute(stmt)).scalars().all()
+
+        # Skip patterns the user has seen recently, not just identical renders
+        exclude = {self.normalize_title(t)[0] for t in (exclude_titles or [])}
+        candidates = [t for t in rows if t.difficulty_tier == target_diff]
+        if target_diff != "E":
+            candidates += [t for t in rows if t.difficulty_tier != target_diff]
+
+        picks: List[Dict] = []
+        seen_patterns: set = set()
+        for template in candidates:
+            if len(picks) >= count:
+                break
+            if template.title_pattern in seen_patterns or template.title_pattern in exclude:
+                continue
+            seen_patterns.add(template.title_pattern)
+            picks.append(self.render(template))
+        return picks
+
+
+quest_template_service = QuestTemplateService()
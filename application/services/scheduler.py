@@ -8,13 +8,14 @@ Supports per-user timezone and custom push times.
 import asyncio
 import datetime
 import logging
+import time
+from typing import Callable
 from zoneinfo import ZoneInfo
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from linebot.v3.messaging import (
     PostbackAction,
-    PushMessageRequest,
     QuickReply,
     QuickReplyItem,
 )
@@ -23,12 +24,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
-from app.models.dda import DailyOutcome, PushProfile
+from app.models.dda import DailyOutcome, PushProfile, PushSchedule
 from app.models.user import User
+from application.services.briefing_prerender_service import briefing_prerender_service
 from application.services.flex_renderer import flex_renderer
 from application.services.line_bot import get_messaging_api
+from application.services.push_schedule_service import _as_utc, push_schedule_service
 from application.services.quest_service import QuestService, quest_service
 from application.services.rival_service import rival_service
+from application.services.scheduler_lease_service import HashRing, scheduler_lease_service
 
 logger = logging.getLogger(__name__)
 
@@ -43,11 +47,18 @@ class DDAScheduler:
     - Night: 21:00 - Daily review and rival advancement
     """
 
+    # Ids per detect_stagnation call; each id is bound in up to three IN lists (asyncpg caps binds at 32767)
+    STAGNATION_ID_CHUNK = 5000
+
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self._is_running = False
         self._lock = asyncio.Lock()
+        self._prerender_lock = asyncio.Lock()  # Separate, so rendering never delays due pushes
         self._last_shop_refresh_date: datetime.date | None = None
+        self.session_factory = AsyncSessionLocal  # Pool workers open one session per task
+        self._is_leader = False
+        self._ring: HashRing | None = None  # Sharded mode only
 
     def start(self):
         """Start the scheduler with all configured jobs."""
@@ -56,6 +67,17 @@ class DDAScheduler:
             return
 
         interval = max(30, settings.SCHEDULER_INTERVAL_SECONDS)
+
+        # Leadership / shard membership first, so the other jobs know their role
+        self.scheduler.add_job(
+            self._lease_heartbeat,
+            IntervalTrigger(seconds=max(10, settings.SCHEDULER_LEASE_TTL_SECONDS // 3)),
+            id="lease_heartbeat",
+            replace_existing=True,
+            next_run_time=datetime.datetime.now(datetime.timezone.utc),
+            misfire_grace_time=30,
+        )
+
         self.scheduler.add_job(
             self._push_tick,
             IntervalTrigger(seconds=interval),
@@ -73,6 +95,61 @@ class DDAScheduler:
             misfire_grace_time=300,
         )
 
+        # Quest Template Mining (Daily)
+        self.scheduler.add_job(
+            self._template_mining_tick,
+            IntervalTrigger(hours=24),
+            id="template_mining_tick",
+            replace_existing=True,
+            misfire_grace_time=3600,
+        )
+
+        self.scheduler.add_job(
+            self._quest_sweep_tick,
+            IntervalTrigger(hours=1),
+            id="quest_sweep_tick",
+            replace_existing=True,
+            misfire_grace_time=1800,
+        )
+
+        # With a graph sidecar, retention runs in the sidecar instead of in every worker
+        kuzu_in_process = settings.GRAPH_BACKEND == "kuzu" and not settings.KUZU_SIDECAR_SOCKET
+        if kuzu_in_process and settings.KUZU_EVENT_RETENTION_DAYS > 0:
+            self.scheduler.add_job(
+                self._graph_retention_tick,
+                IntervalTrigger(hours=24),
+                id="graph_retention_tick",
+                replace_existing=True,
+                misfire_grace_time=3600,
+            )
+
+        if settings.DAILY_ROLLOVER_ACTIVE:
+            self.scheduler.add_job(
+                self._rollover_tick,
+                IntervalTrigger(minutes=15),
+                id="daily_rollover_tick",
+                replace_existing=True,
+                misfire_grace_time=900,
+            )
+
+        if settings.PUSH_PRERENDER_LEAD_MINUTES:
+            self.scheduler.add_job(
+                self._prerender_tick,
+                IntervalTrigger(minutes=5),
+                id="briefing_prerender_tick",
+                replace_existing=True,
+                misfire_grace_time=300,
+            )
+
+        if settings.LINE_DELIVERY_QUEUE_ENABLED:
+            self.scheduler.add_job(
+                self._dead_letter_replay_tick,
+                IntervalTrigger(hours=1),
+                id="line_dead_letter_replay",
+                replace_existing=True,
+                misfire_grace_time=600,
+            )
+
         self.scheduler.start()
         self._is_running = True
         logger.info("DDA Scheduler started with interval job (%ss)", interval)
@@ -84,65 +161,402 @@ class DDAScheduler:
             self._is_running = False
             logger.info("DDA Scheduler shutdown complete")
 
-    async def _get_all_users(self, session: AsyncSession) -> list[User]:
-        """Fetch all users for push preference checks."""
-        stmt = select(User)
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
+    async def release_leases(self):
+        """Hands leadership over right away instead of waiting for the lease TTL."""
+        if not self._is_leader:
+            return
+        try:
+            async with self.session_factory() as session:
+                await scheduler_lease_service.release(session)
+        except Exception as e:
+            logger.warning(f"Scheduler lease release failed: {e}")
+        self._is_leader = False
+
+    async def _lease_heartbeat(self):
+        """Renews the leader lease (and shard membership) outside `_lock` so long ticks cannot lose it."""
+        try:
+            async with self.session_factory() as session:
+                is_leader = await scheduler_lease_service.try_acquire(session)
+                if is_leader != self._is_leader:
+                    logger.info(
+                        "Scheduler leadership %s (%s)",
+                        "acquired" if is_leader else "lost",
+                        scheduler_lease_service.instance_id,
+                    )
+                self._is_leader = is_leader
+                if settings.SCHEDULER_MODE == "sharded":
+                    members = await scheduler_lease_service.heartbeat_member(session)
+                    self._ring = HashRing(members)
+                else:
+                    self._ring = None
+        except Exception as e:
+            # Without coordination no job may assume it is alone
+            logger.error(f"Scheduler lease heartbeat failed: {e}")
+            self._is_leader = False
+            self._ring = None
+
+    def _runs_user_work(self) -> bool:
+        """Leader mode: only the leader. Sharded mode: every live ring member."""
+        if settings.SCHEDULER_MODE == "sharded":
+            return self._ring is not None and scheduler_lease_service.instance_id in self._ring.members
+        return self._is_leader
+
+    def _owns(self, user_id: str) -> bool:
+        if settings.SCHEDULER_MODE != "sharded" or self._ring is None:
+            return True
+        return self._ring.owner(str(user_id)) == scheduler_lease_service.instance_id
 
     async def _push_tick(self):
         """
-        Single scheduler tick that checks per-user local time and sends pushes.
-        Uses batched execution to prevent head-of-line blocking.
+        Single scheduler tick that sends every push whose due time has passed.
+        Reads the `push_schedules` due-time index instead of scanning all users.
         """
-        if self._lock.locked():
+        if self._lock.locked() or not self._runs_user_work():
             return
 
-        BATCH_SIZE = 10  # Process 10 users concurrently
-
         async with self._lock:
             async with AsyncSessionLocal() as session:
-                users = await self._get_all_users(session)
-                await self._maybe_refresh_shop(session, users)
-
-                # Split into chunks for basic rate limiting/batching
-                for i in range(0, len(users), BATCH_SIZE):
-                    chunk = users[i : i + BATCH_SIZE]
-                    tasks = []
-                    for user in chunk:
-                        if not user.push_enabled:
-                            continue
-                        tasks.append(self._process_user_safe(session, user))
-
-                    if tasks:
-                        await asyncio.gather(*tasks)
-
-    async def _process_user_safe(self, session: AsyncSession, user: User):
-        """Wrapper to catch exceptions per user task."""
-        try:
-            await self._process_user(session, user)
-        except Exception as e:
-            logger.error("Push tick failed for %s: %s", user.id, e)
+                if self._is_leader:
+                    await self._maybe_refresh_shop(session)
+                await self._dispatch_due(session, owns=self._owns, backfill=self._is_leader)
+
+    async def _dispatch_due(
+        self,
+        session: AsyncSession,
+        now: datetime.datetime | None = None,
+        owns: Callable[[str], bool] | None = None,
+        backfill: bool = True,
+    ) -> dict:
+        """
+        Sends due pushes. Rows that fell due within the catch-up grace window are sent
+        even if the tick is late; older rows are skipped and moved to their next occurrence.
+        `session` is only used for the index reads; each user is pushed by a pool worker
+        in its own short-lived session. `owns` limits the tick to this shard's users.
+        Returns tick stats.
+        """
+        t0 = time.perf_counter()
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        stats = {"backfilled": 0, "due": 0, "stale": 0, "users": 0, "sent": 0, "failed": 0}
+        if backfill:
+            stats["backfilled"] = await push_schedule_service.backfill(session, now)
+        stats["backfill_ms"] = self._elapsed_ms(t0)
+
+        t_select = time.perf_counter()
+        rows = await push_schedule_service.due(session, now)
+        if owns is not None:
+            rows = [row for row in rows if owns(row.user_id)]
+        if not rows:
+            return stats
+        stats["due"] = len(rows)
+
+        by_user: dict[str, dict[str, PushSchedule]] = {}
+        for row in rows:
+            by_user.setdefault(row.user_id, {})[row.push_type] = row
+        users = {
+            u.id: u for u in (await session.execute(select(User).where(User.id.in_(list(by_user))))).scalars().all()
+        }
+        profiles = {
+            p.user_id: p
+            for p in (
+                await session.execute(select(PushProfile).where(PushProfile.user_id.in_(list(by_user))))
+            ).scalars()
+        }
+
+        due_types: dict[str, set[str]] = {}
+        for user_id, schedules in by_user.items():
+            user = users.get(user_id)
+            if not user or not user.push_enabled:
+                await push_schedule_service.clear_user(session, user_id)
+                continue
+            for push_type, row in schedules.items():
+                if push_schedule_service.is_stale(row, now):
+                    logger.warning("Skipping stale %s push for %s (due %s)", push_type, user_id, row.next_push_at)
+                    push_schedule_service.reschedule(row, user, profiles.get(user_id), now)
+                    stats["stale"] += 1
+                else:
+                    due_types.setdefault(user_id, set()).add(push_type)
+        await session.commit()
+        stats["select_ms"] = self._elapsed_ms(t_select)
+
+        t_prepass = time.perf_counter()
+        morning = [uid for uid, types in due_types.items() if "morning" in types]
+        prepared = await briefing_prerender_service.prepared_user_ids(session, morning, "morning")
+        stats["prepared"] = len(prepared)
+        await self._morning_prepass(session, [users[uid] for uid in morning if uid not in prepared])
+        await session.commit()  # Release the producer's transaction before workers write
+        stats["prepass_ms"] = self._elapsed_ms(t_prepass)
+
+        async def push_one(item: tuple[str, set[str]]) -> str | None:
+            return await self._push_user_task(item[0], item[1], now)
+
+        pool = await self._run_pool(list(due_types.items()), push_one)
+        stats["users"] = pool["items"]
+        stats["sent"] = sum(1 for sent in pool["results"] if sent)
+        stats["failed"] = pool["failed"]
+        stats["dispatch_ms"] = pool["elapsed_ms"]
+        stats["user_p50_ms"] = pool["p50_ms"]
+        stats["user_max_ms"] = pool["max_ms"]
+        stats["elapsed_ms"] = self._elapsed_ms(t0)
+        stats["users_per_sec"] = round(pool["items"] / max(pool["elapsed_ms"] / 1000, 1e-3), 1)
+
+        logger.info("Push tick: %s", stats)
+        return stats
+
+    async def _prerender_tick(self):
+        """Builds morning briefings due within the lead window so the fire-time tick only delivers."""
+        if self._prerender_lock.locked() or not self._runs_user_work() or not settings.PUSH_PRERENDER_LEAD_MINUTES:
+            return
+
+        async with self._prerender_lock:
+            try:
+                async with self.session_factory() as session:
+                    await self._prerender_due(session, owns=self._owns)
+            except Exception as e:
+                logger.error(f"Prerender tick failed: {e}")
+
+    async def _prerender_due(
+        self,
+        session: AsyncSession,
+        now: datetime.datetime | None = None,
+        owns: Callable[[str], bool] | None = None,
+    ) -> dict:
+        t0 = time.perf_counter()
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        stats = {"pending": 0, "rendered": 0, "failed": 0, "skipped": 0}
+        stats["purged"] = await briefing_prerender_service.purge_expired(session, now)
+        rows = await briefing_prerender_service.pending(session, now)
+        if owns is not None:
+            rows = [row for row in rows if owns(row.user_id)]
+        users = {}
+        if rows:
+            stmt = select(User).where(User.id.in_([row.user_id for row in rows]), User.push_enabled.is_(True))
+            users = {u.id: u for u in (await session.execute(stmt)).scalars().all()}
+
+        jobs = []
+        for row in rows:
+            user = users.get(row.user_id)
+            tz = self._safe_timezone(user.push_timezone) if user else None
+            # Quests are generated for "today": never render across local midnight
+            if not user or row.next_push_at is None or now.astimezone(tz).date() != self._local_fire_date(row, tz):
+                stats["skipped"] += 1
+                continue
+            jobs.append((user.id, row.next_push_at))
+        stats["pending"] = len(jobs)
+
+        await self._morning_prepass(session, [users[user_id] for user_id, _ in jobs])
+        await session.commit()
+
+        async def render_one(item: tuple[str, datetime.datetime]) -> bool:
+            return await self._prerender_user_task(item[0], item[1])
+
+        pool = await self._run_pool(jobs, render_one)
+        stats["rendered"] = sum(1 for ok in pool["results"] if ok)
+        stats["failed"] = pool["failed"]
+        stats["elapsed_ms"] = self._elapsed_ms(t0)
+        if jobs:
+            logger.info("Prerender tick: %s", stats)
+        return stats
+
+    def _local_fire_date(self, row: PushSchedule, tz: ZoneInfo) -> datetime.date:
+        return _as_utc(row.next_push_at).astimezone(tz).date()
+
+    async def _prerender_user_task(self, user_id: str, fire_at: datetime.datetime) -> bool:
+        async with self.session_factory() as session:
+            user = await session.get(User, user_id)
+            if not user:
+                return False
+            local_date = _as_utc(fire_at).astimezone(self._safe_timezone(user.push_timezone))
+            messages = await self._build_morning_messages(session, user, local_date.date())
+            await briefing_prerender_service.store(session, user_id, "morning", fire_at, messages)
+            await session.commit()
+            return True
+
+    async def _push_user_task(self, user_id: str, due: set[str], now: datetime.datetime) -> str | None:
+        """One user's push in its own session; failures stay with this user."""
+        async with self.session_factory() as session:
+            user = await session.get(User, user_id)
+            if not user:
+                return None
+            schedules = {
+                s.push_type: s
+                for s in (
+                    await session.execute(
+                        select(PushSchedule).where(PushSchedule.user_id == user_id, PushSchedule.push_type.in_(due))
+                    )
+                ).scalars()
+            }
+            sent = await self._process_user(session, user, due, schedules)
+            await self._reschedule_handled(session, user, schedules, due, sent, now)
+            await session.commit()
+            return sent
+
+    async def _run_pool(self, items: list, handler, concurrency: int | None = None) -> dict:
+        """
+        Producer/consumer pool: a bounded queue feeds `concurrency` workers that await
+        `handler(item)` one item at a time. A failing item is logged and counted; the
+        worker moves on. Returns {items, failed, results, elapsed_ms, p50_ms, max_ms}.
+        """
+        t0 = time.perf_counter()
+        concurrency = max(1, concurrency or settings.SCHEDULER_PUSH_CONCURRENCY)
+        workers = min(concurrency, len(items))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        results: list = []
+        latencies: list[float] = []
+        failed = 0
+
+        async def produce():
+            for item in items:
+                await queue.put(item)
+            for _ in range(workers):
+                await queue.put(None)  # One stop signal per worker
+
+        async def consume():
+            nonlocal failed
+            while (item := await queue.get()) is not None:
+                started = time.perf_counter()
+                try:
+                    results.append(await handler(item))
+                except Exception as e:
+                    failed += 1
+                    logger.error("Scheduler task failed for %s: %s", item, e)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        if workers:
+            await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+
+        latencies.sort()
+        return {
+            "items": len(items),
+            "failed": failed,
+            "results": results,
+            "elapsed_ms": self._elapsed_ms(t0),
+            "p50_ms": int(latencies[len(latencies) // 2]) if latencies else 0,
+            "max_ms": int(latencies[-1]) if latencies else 0,
+        }
+
+    def _elapsed_ms(self, t0: float) -> int:
+        return int((time.perf_counter() - t0) * 1000)
+
+    async def _reschedule_handled(
+        self,
+        session: AsyncSession,
+        user: User,
+        schedules: dict[str, PushSchedule],
+        due: set[str],
+        sent: str | None,
+        now: datetime.datetime,
+    ) -> None:
+        """Moves sent (or already-sent-today) rows forward; unsent rows retry next tick until stale."""
+        profile = await self._get_or_create_profile(session, user.id)
+        now_local = now.astimezone(self._safe_timezone(user.push_timezone))
+        for push_type in due:
+            last_sent = getattr(profile, f"last_{push_type}_date", None) if profile else None
+            if push_type in schedules and (push_type == sent or last_sent == now_local.date()):
+                push_schedule_service.reschedule(schedules[push_type], user, profile, now, sent=True)
 
     async def _executive_tick(self):
         """
         Runs the Executive System Logic for all users.
+        Stagnation is detected for everyone in one set-based pass; the remediation
+        (difficulty downgrade, bridge quest generation) then runs per user in a
+        bounded worker pool, each task with its own session.
         """
-        if self._lock.locked():
+        if self._lock.locked() or not self._runs_user_work():
             return
 
         from application.services.brain_service import brain_service
 
+        executive = brain_service.executive
         async with self._lock:
+            async with self.session_factory() as session:
+                user_ids = [str(uid) for uid in (await session.execute(select(User.id))).scalars() if self._owns(uid)]
+                if settings.SCHEDULER_MODE != "sharded":
+                    reports = await executive.detect_stagnation(session)  # Everyone: no id list to bind
+                else:
+                    reports = {}
+                    for i in range(0, len(user_ids), self.STAGNATION_ID_CHUNK):
+                        chunk = user_ids[i : i + self.STAGNATION_ID_CHUNK]
+                        reports.update(await executive.detect_stagnation(session, chunk))
+
+            async def remediate(user_id: str):
+                async with self.session_factory() as task_session:
+                    action = await executive.remediate(task_session, user_id, reports.get(user_id))
+                if action:
+                    logger.info(f"EXECUTIVE ACTION for {user_id}: {action.action_type} - {action.reason}")
+                return action
+
+            stats = await self._run_pool(user_ids, remediate, concurrency=settings.EXECUTIVE_CONCURRENCY)
+            logger.info(
+                "Executive tick: %s users, %s flagged, %s actions, %s failed in %sms",
+                stats["items"],
+                len(reports),
+                sum(1 for action in stats["results"] if action),
+                stats["failed"],
+                stats["elapsed_ms"],
+            )
+
+    async def _template_mining_tick(self):
+        """Rebuilds the quest template library from recent accepted quests."""
+        from application.services.quest_template_service import quest_template_service
+
+        if not self._is_leader:
+            return
+
+        try:
             async with AsyncSessionLocal() as session:
-                users = await self._get_all_users(session)
-                for user in users:
-                    try:
-                        action = await brain_service.execute_system_judgment(session, str(user.id))
-                        if action:
-                            logger.info(f"EXECUTIVE ACTION for {user.id}: {action.action_type} - {action.reason}")
-                    except Exception as e:
-                        logger.error(f"Executive tick failed for {user.id}: {e}")
+                await quest_template_service.mine_templates(session)
+        except Exception as e:
+            logger.error(f"Template mining tick failed: {e}")
+
+    async def _dead_letter_replay_tick(self):
+        """Re-sends LINE messages that exhausted their retries (e.g. during a LINE outage or quota reset)."""
+        from adapters.perception.line_delivery import line_delivery_queue
+
+        if not self._is_leader:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                queued = await line_delivery_queue.replay_dead_letters(session)
+            if queued:
+                logger.info("Re-queued %s LINE dead letters", queued)
+        except Exception as e:
+            logger.error(f"Dead letter replay tick failed: {e}")
+
+    async def _rollover_tick(self):
+        """Closes the previous local day for every timezone bucket whose midnight has passed (idempotent)."""
+        from application.services.daily_rollover_service import daily_rollover_service
+
+        if not self._is_leader:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                await daily_rollover_service.run_due(session)
+        except Exception as e:
+            logger.error(f"Daily rollover tick failed: {e}")
+
+    async def _quest_sweep_tick(self):
+        """Retires expired PENDING/ACTIVE/PAUSED quests in bounded chunks (leader only)."""
+        from application.services.quest_lifecycle_service import quest_lifecycle_service
+
+        if not self._is_leader:
+            return
+
+        try:
+            async with self.session_factory() as session:
+                await quest_lifecycle_service.sweep(session)
+        except Exception as e:
+            logger.error(f"Quest sweep tick failed: {e}")
+
+    async def _graph_retention_tick(self):
+        """Rolls old graph events into daily summaries. Every process compacts its own embedded graph."""
+        from app.core.container import container
+
+        try:
+            await asyncio.to_thread(container.graph_adapter.compact_events)
+        except Exception as e:
+            logger.error(f"Graph retention tick failed: {e}")
 
     async def _get_or_create_profile(self, session: AsyncSession, user_id: str) -> PushProfile:
         result = await session.execute(select(PushProfile).where(PushProfile.user_id == user_id))
@@ -192,7 +606,7 @@ class DDAScheduler:
             ]
         )
 
-    async def _maybe_refresh_shop(self, session: AsyncSession, users: list[User]) -> None:
+    async def _maybe_refresh_shop(self, session: AsyncSession) -> None:
         now = datetime.datetime.utcnow().date()
         if self._last_shop_refresh_date == now:
             return
@@ -203,67 +617,110 @@ class DDAScheduler:
         if api:
             from linebot.v3.messaging import TextMessage
 
-            for user in users:
-                if not user.push_enabled:
-                    continue
-                try:
-                    await api.push_message(
-                        PushMessageRequest(
-                            to=user.id,
-                            messages=[TextMessage(text="🛒 黑市已更新，稀有貨物已上架。")],
-                        )
-                    )
-                except Exception as exc:
-                    logger.warning("Shop refresh push failed for %s: %s", user.id, exc)
+            from adapters.perception.line_client import line_client
+
+            # Once a day, so the full user read stays out of the per-tick path
+            user_ids = (await session.execute(select(User.id).where(User.push_enabled.is_(True)))).scalars().all()
+            message = TextMessage(text="🛒 黑市已更新，稀有貨物已上架。")
+            stats = await line_client.broadcast_same(list(user_ids), [message])  # Multicast, 500 per call
+            logger.info("Shop refresh delivery: %s", stats)
         self._last_shop_refresh_date = now
 
-    async def _process_user(self, session: AsyncSession, user: User) -> None:
+    def _resolve_push_times(self, user: User, profile: PushProfile) -> tuple[str, str, str]:
+        times = push_schedule_service.resolve_push_times(user, profile)
+        return times["morning"], times["midday"], times["night"]
+
+    def _is_due(
+        self,
+        push_type: str,
+        due: set[str] | None,
+        now_local: datetime.datetime,
+        target_time: str,
+        last_sent: datetime.date | None,
+    ) -> bool:
+        """`due` comes from the due-time index; without it, fall back to the exact-minute check."""
+        if due is None:
+            return self._should_send(now_local, target_time, last_sent)
+        return push_type in due and last_sent != now_local.date()
+
+    async def _morning_prepass(self, session: AsyncSession, users: list[User]) -> None:
+        """
+        Generates quests for every user whose morning push is due this tick with batched LLM calls.
+        `_process_user` then finds the batch already in place and only renders/pushes it.
+        """
+        from application.services.quest_batch_service import quest_batch_service
+
+        due = [user for user in users if user.id]
+        if len(due) < 2:
+            return  # Nothing to batch; the per-user path handles it
+        try:
+            await quest_batch_service.generate_for_users(session, due, time_context="Morning")
+        except Exception as e:
+            logger.error(f"Morning batch generation failed: {e}")
+
+    async def _build_morning_messages(self, session: AsyncSession, user: User, local_date: datetime.date) -> list:
+        """Morning briefing payload: generates today's quests, renders the card and the voice briefing."""
+        await quest_service.trigger_push_quests(session, str(user.id), time_block="Morning")
+        quests = await quest_service.get_daily_quests(session, str(user.id))
+        habits = await quest_service.get_daily_habits(session, str(user.id))
+        dda_hint = await self._daily_hint(session, str(user.id), local_date)
+        flex = flex_renderer.render_push_briefing("🌅 早安任務", quests, habits, dda_hint)
+        flex.quick_reply = self._build_quick_reply()
+
+        # Build messages list
+        messages = [flex]
+
+        # Generate Voice Briefing (Optional)
+        try:
+            from application.services.audio_service import audio_service
+
+            quest_count = len(quests)
+            habit_count = len(habits) if habits else 0
+            summary_text = f"早安，今日有 {quest_count} 個任務和 {habit_count} 個習慣。請開始行動。"
+            audio_msg = await audio_service.generate_briefing_audio(summary_text)
+            if audio_msg:
+                messages.append(audio_msg)
+        except Exception as e:
+            logger.warning(f"Audio briefing skipped: {e}")
+        return messages
+
+    async def _process_user(
+        self,
+        session: AsyncSession,
+        user: User,
+        due: set[str] | None = None,
+        schedules: dict[str, PushSchedule] | None = None,
+    ) -> str | None:
+        """
+        Sends at most one push for `user`; returns the push type sent.
+        A morning briefing prepared for the due schedule row is sent as-is.
+        """
         tz = self._safe_timezone(user.push_timezone)
         now_local = datetime.datetime.now(tz)
 
         profile = await self._get_or_create_profile(session, user.id)
-        times = user.push_times or {}
-        morning_time = times.get("morning") or profile.morning_time or "08:00"
-        midday_time = times.get("midday") or profile.midday_time or "12:30"
-        night_time = times.get("night") or profile.night_time or "21:00"
+        morning_time, midday_time, night_time = self._resolve_push_times(user, profile)
 
         api = get_messaging_api()
         if not api:
-            return
-
-        if self._should_send(now_local, morning_time, profile.last_morning_date):
-            # Explicit cast for mypy if needed, or rely on import
-            # qs: QuestService = quest_service
-            if user.id:
-                await quest_service.trigger_push_quests(session, str(user.id), time_block="Morning")
-                quests = await quest_service.get_daily_quests(session, str(user.id))
-                habits = await quest_service.get_daily_habits(session, str(user.id))
-                dda_hint = await self._daily_hint(session, str(user.id))
-            flex = flex_renderer.render_push_briefing("🌅 早安任務", quests, habits, dda_hint)
-            flex.quick_reply = self._build_quick_reply()
-
-            # Build messages list
-            messages_to_push = [flex]
-
-            # Generate Voice Briefing (Optional)
-            try:
-                from application.services.audio_service import audio_service
-
-                quest_count = len(quests)
-                habit_count = len(habits) if habits else 0
-                summary_text = f"早安，今日有 {quest_count} 個任務和 {habit_count} 個習慣。請開始行動。"
-                audio_msg = await audio_service.generate_briefing_audio(summary_text)
-                if audio_msg:
-                    messages_to_push.append(audio_msg)
-            except Exception as e:
-                logger.warning(f"Audio briefing skipped: {e}")
-
-            await api.push_message(PushMessageRequest(to=user.id, messages=messages_to_push))
+            return None
+        from adapters.perception.line_client import line_client
+
+        if self._is_due("morning", due, now_local, morning_time, profile.last_morning_date):
+            messages_to_push = None
+            if schedules and "morning" in schedules:
+                messages_to_push = await briefing_prerender_service.take(
+                    session, user.id, "morning", schedules["morning"].next_push_at
+                )
+            if not messages_to_push:
+                messages_to_push = await self._build_morning_messages(session, user, now_local.date())
+
+            await line_client.queue_messages(user.id, messages_to_push)
             profile.last_morning_date = now_local.date()
             await session.commit()
-            return
+            return "morning"
 
-        if self._should_send(now_local, midday_time, profile.last_midday_date):
+        if self._is_due("midday", due, now_local, midday_time, profile.last_midday_date):
             # qs: QuestService = quest_service
             await quest_service.trigger_push_quests(session, str(user.id), time_block="Midday")
             quests = await quest_service.get_daily_quests(session, str(user.id))
@@ -275,15 +732,16 @@ class DDAScheduler:
             else:
                 reminder = "中午提醒：今日任務已完成，保持節奏。"
             flex = flex_renderer.render_push_briefing("🧠 中午提醒", incomplete or quests, habits, reminder)
-            await api.push_message(PushMessageRequest(to=user.id, messages=[flex]))
+            await line_client.queue_messages(user.id, [flex])
             profile.last_midday_date = now_local.date()
             await session.commit()
-            return
+            return "midday"
 
-        if self._should_send(now_local, night_time, profile.last_night_date):
+        if self._is_due("night", due, now_local, night_time, profile.last_night_date):
             from application.services.hp_service import hp_service
 
-            await hp_service.calculate_daily_drain(session, user)
+            if not settings.DAILY_ROLLOVER_ACTIVE:
+                await hp_service.calculate_daily_drain(session, user)
             quests = await quest_service.get_daily_quests(session, user.id)
             completed = [q for q in quests if q.status == "DONE"]
             if quests and len(completed) == len(quests):
@@ -291,13 +749,16 @@ class DDAScheduler:
             else:
                 hint = "🌙 尚有任務未完成，請挑選最小步驟完成。"
 
-            all_done = bool(quests) and len(completed) == len(quests)
-            await self._update_daily_outcome(session, user.id, all_done, bool(quests))
-            await rival_service.advance_daily_briefing(session, user)
+            if not settings.DAILY_ROLLOVER_ACTIVE:  # Otherwise closed by the nightly rollover
+                all_done = bool(quests) and len(completed) == len(quests)
+                await self._update_daily_outcome(session, user.id, all_done, bool(quests), now_local.date())
+                await rival_service.advance_daily_briefing(session, user)
             flex = flex_renderer.render_push_briefing("🌙 夜間結算", quests, [], hint)
-            await api.push_message(PushMessageRequest(to=user.id, messages=[flex]))
+            await line_client.queue_messages(user.id, [flex])
             profile.last_night_date = now_local.date()
             await session.commit()
+            return "night"
+        return None
 
     async def trigger_manual_push(self, user_id: str, time_block: str = "Morning"):
         """
@@ -308,8 +769,8 @@ class DDAScheduler:
             await qs.trigger_push_quests(session, user_id, time_block)  # type: ignore[attr-defined]
             logger.info(f"Manual push triggered for user {user_id}, block={time_block}")
 
-    async def _daily_hint(self, session: AsyncSession, user_id: str) -> str | None:
-        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    async def _daily_hint(self, session: AsyncSession, user_id: str, today: datetime.date | None = None) -> str | None:
+        yesterday = (today or datetime.date.today()) - datetime.timedelta(days=1)
         stmt = select(DailyOutcome).where(
             DailyOutcome.user_id == user_id,
             DailyOutcome.is_global.is_(True),
@@ -321,8 +782,16 @@ class DDAScheduler:
             return "偵測到能量低落：今日任務已降階，先穩住連勝。"
         return None
 
-    async def _update_daily_outcome(self, session: AsyncSession, user_id: str, done: bool, has_quests: bool) -> None:
-        today = datetime.date.today()
+    async def _update_daily_outcome(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        done: bool,
+        has_quests: bool,
+        today: datetime.date | None = None,
+    ) -> None:
+        # Outcomes are keyed by the user's local date (DDA checks read "local yesterday")
+        today = today or datetime.date.today()
         stmt = select(DailyOutcome).where(
             DailyOutcome.user_id == user_id,
             DailyOutcome.date == today,
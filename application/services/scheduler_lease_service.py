@@ -0,0 +1,113 @@
+"""
+Scheduler Leadership and Sharding
+
+Every app process starts `dda_scheduler`, so with several workers or replicas
+each job would fire once per process. Coordination goes through the
+`scheduler_leases` table only (no external service):
+
+- Leader lease: one row per lease name. An instance takes it when the row is
+  free or expired and keeps it by renewing `expires_at` (heartbeat). If the
+  leader dies, another instance takes over once the TTL runs out.
+- Sharded mode: every instance also keeps a `member:<instance_id>` row alive.
+  Live members form a consistent-hash ring on `user_id`, so per-user work is
+  spread out and each user has exactly one owner. Membership changes only
+  move the users next to the joining/leaving instance on the ring.
+"""
+
+import bisect
+import datetime
+import hashlib
+import logging
+import os
+import socket
+from typing import Iterable, List
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.scheduler import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "dda_scheduler"
+MEMBER_PREFIX = "member:"
+
+
+def _hash(key: str) -> int:
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes per member."""
+
+    def __init__(self, members: Iterable[str], vnodes: int = 64):
+        self.members = sorted(set(members))
+        self._ring = sorted((_hash(f"{m}#{i}"), m) for m in self.members for i in range(vnodes))
+        self._keys = [h for h, _ in self._ring]
+
+    def owner(self, key: str) -> str | None:
+        if not self._ring:
+            return None
+        idx = bisect.bisect(self._keys, _hash(key)) % len(self._ring)
+        return self._ring[idx][1]
+
+
+class SchedulerLeaseService:
+    def __init__(self, instance_id: str | None = None):
+        self.instance_id = instance_id or settings.SCHEDULER_INSTANCE_ID or f"{socket.gethostname()}:{os.getpid()}"
+
+    def _ttl(self) -> datetime.timedelta:
+        return datetime.timedelta(seconds=max(30, settings.SCHEDULER_LEASE_TTL_SECONDS))
+
+    async def try_acquire(
+        self, session: AsyncSession, name: str = LEADER_LEASE, now: datetime.datetime | None = None
+    ) -> bool:
+        """Takes or renews lease `name`. True if this instance holds it afterwards."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        expires_at = now + self._ttl()
+        stmt = (
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                (SchedulerLease.holder == self.instance_id) | (SchedulerLease.expires_at < now),
+            )
+            .values(holder=self.instance_id, expires_at=expires_at, heartbeat_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            if (await session.execute(stmt)).rowcount == 1:
+                await session.commit()
+                return True
+            session.add(SchedulerLease(name=name, holder=self.instance_id, expires_at=expires_at, heartbeat_at=now))
+            await session.commit()
+            logger.info("Scheduler lease %s created by %s", name, self.instance_id)
+            return True
+        except IntegrityError:
+            await session.rollback()  # Row exists and another live instance holds it
+            return False
+
+    async def release(self, session: AsyncSession, name: str = LEADER_LEASE) -> None:
+        """Expires our lease right away so another instance can take over without waiting for the TTL."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        await session.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == self.instance_id)
+            .values(expires_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    async def heartbeat_member(self, session: AsyncSession, now: datetime.datetime | None = None) -> List[str]:
+        """Renews this instance's membership and returns the live member ids (sorted)."""
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        await self.try_acquire(session, f"{MEMBER_PREFIX}{self.instance_id}", now)
+        stmt = select(SchedulerLease.holder).where(
+            SchedulerLease.name.like(f"{MEMBER_PREFIX}%"),
+            SchedulerLease.expires_at >= now,
+        )
+        return sorted(set((await session.execute(stmt)).scalars().all()))
+
+
+scheduler_lease_service = SchedulerLeaseService()
@@ -1,8 +1,8 @@
+import asyncio
 import logging
-import time
 from typing import Any, Dict, List, Optional
 
-from adapters.persistence.kuzu.adapter import get_kuzu_adapter
+from adapters.persistence.graph import get_graph_adapter
 from app.core.database import AsyncSessionLocal
 from application.services.ai_engine import ai_engine
 
@@ -16,7 +16,7 @@ class SocialService:
     """
 
     def __init__(self):
-        self.kuzu = get_kuzu_adapter()
+        self.graph = get_graph_adapter()
 
     async def interact(self, user_id: str, npc_id: str, text: str) -> Dict[str, Any]:
         """
@@ -70,17 +70,7 @@ class SocialService:
     async def _update_relationship(self, user_id: str, npc_id: str, delta: int):
         # Always update last_interaction, even if delta is 0
         try:
-            # Ensure User and NPC nodes exist, then link them
-            # Using Cypher Update
-            ts = int(time.time())
-            query = (
-                f"MERGE (u:User {{id: '{user_id}'}}) "
-                f"MERGE (n:NPC {{id: '{npc_id}'}}) "
-                f"MERGE (u)-[r:KNOWS]->(n) "
-                f"ON CREATE SET u.name = 'Unknown', n.name = '{npc_id}', r.intimacy = 0, r.last_interaction = {ts} "
-                f"ON MATCH SET r.intimacy = r.intimacy + {delta}, r.last_interaction = {ts}"
-            )
-            await self.kuzu.query(query)
+            await asyncio.to_thread(self.graph.adjust_npc_intimacy, user_id, npc_id, delta)
         except Exception as e:
             logger.error(f"Failed to update relationship: {e}")
 
@@ -230,7 +230,32 @@ class VerificationService:
         }
 
     async def _complete_quest(self, session, user_id: str, quest: Quest) -> dict:
-        result_data = await quest_service.complete_quest(session, user_id, quest.id)
+        from adapters.persistence.sqlite.unit_of_work import SqlAlchemyUnitOfWork
+
+        # Completion commits once; the narrative (LLM call) is queued until after that commit
+        uow = SqlAlchemyUnitOfWork(session=session)
+        narrative: dict = {"story": ""}
+        async with uow:
+            result_data = await quest_service.complete_quest(session, user_id, quest.id, uow=uow)
+            if result_data:
+                loot = result_data.get("loot")
+                xp_awarded = loot.xp if loot else (quest.xp_reward or 0)
+                gold_awarded = (
+                    loot.gold if loot else self.GOLD_REWARD_BY_DIFF.get((quest.difficulty_tier or "E").upper(), 3)
+                )
+                narrative_flavor = loot.narrative_flavor if loot else "Standard"
+
+                user = await container.user_service.get_or_create_user(session, user_id)
+                uow.add_post_commit(
+                    self._narrate_completion,
+                    session,
+                    user_id,
+                    quest,
+                    {"xp": xp_awarded, "diff": quest.difficulty_tier, "flavor": narrative_flavor},
+                    f"User Lv.{user.level}",
+                    narrative,
+                )
+
         if not result_data:
             return {
                 "xp": 0,
@@ -240,34 +265,28 @@ class VerificationService:
                 "message": "⚠️ 任務已完成或不存在。",
             }
 
-        loot = result_data.get("loot")
-        xp_awarded = loot.xp if loot else (quest.xp_reward or 0)
-        gold_awarded = loot.gold if loot else self.GOLD_REWARD_BY_DIFF.get((quest.difficulty_tier or "E").upper(), 3)
-        narrative_flavor = loot.narrative_flavor if loot else "Standard"
+        return {
+            "xp": xp_awarded,
+            "gold": gold_awarded,
+            "story": narrative["story"],
+            "success": True,
+            "message": f"✅ 任務完成！ ({narrative_flavor})",
+        }
 
-        # Feature 4: Epic Feedback (with RPE Flavor)
+    async def _narrate_completion(
+        self, session, user_id: str, quest: Quest, result_data: dict, user_context: str, out: dict
+    ) -> None:
+        """Feature 4: Epic Feedback (with RPE Flavor). The lore entry is saved in its own small commit."""
         from application.services.narrative_service import narrative_service
 
-        # We assume user is already updated by quest_service (it accesses session and user)
-        # But for narrative context we might fetch user?
-        user = await container.user_service.get_or_create_user(session, user_id)
-
-        story = await narrative_service.generate_outcome_story(
+        out["story"] = await narrative_service.generate_outcome_story(
             session=session,
             user_id=user_id,
             action_text=f"Completed Quest: {quest.title}",
-            result_data={"xp": xp_awarded, "diff": quest.difficulty_tier, "flavor": narrative_flavor},
-            user_context=f"User Lv.{user.level}",
+            result_data=result_data,
+            user_context=user_context,
         )
-
         await session.commit()
-        return {
-            "xp": xp_awarded,
-            "gold": gold_awarded,
-            "story": story,
-            "success": True,
-            "message": f"✅ 任務完成！ ({narrative_flavor})",
-        }
 
     async def _generate_hint(self, quest: Quest, verification_type: str, reason: str) -> str:
         """Generate AI-powered hint for failed verifications."""
@@ -2,11 +2,17 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 
 
+class CypherNotSupportedError(NotImplementedError):
+    """Raised by `GraphPort.query` on backends without a Cypher engine (GRAPH_BACKEND=sql)."""
+
+
 class GraphPort(ABC):
     @abstractmethod
-    def query(self, cypher: str) -> List[Any]:
+    def query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Any]:
         """
         Execute a Cypher query and return results.
+        Values should be passed as `$name` parameters rather than formatted into `cypher`.
+        Backends that cannot run Cypher raise CypherNotSupportedError; portable code uses the other methods.
         """
         pass
 
@@ -45,6 +51,22 @@ class GraphPort(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_npc_contexts(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the context of every NPC at once.
+        With `user_id`, each entry also carries the user's intimacy and last_interaction with that NPC.
+        """
+        pass
+
+    @abstractmethod
+    def adjust_npc_intimacy(self, user_id: str, npc_id: str, delta: int) -> bool:
+        """
+        Add `delta` to the user's intimacy with an NPC and stamp last_interaction,
+        creating the user, the NPC and their KNOWS relationship if needed.
+        """
+        pass
+
     @abstractmethod
     def record_user_event(self, user_id: str, event_type: str, metadata: Dict[str, Any]) -> bool:
         """
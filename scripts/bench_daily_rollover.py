@@ -0,0 +1,143 @@
+"""
+Benchmark: per-user daily effects vs the set-based nightly rollover.
+
+Seeds a SQLite file DB with synthetic users (2 quests each, a rival for half,
+a third of them inactive), then times `daily_rollover_service.rollover_bucket`
+over the whole bucket. The legacy per-user path (HP drain, rival encounter,
+rival growth, daily outcome) is timed on a sample and extrapolated.
+
+Usage: python scripts/bench_daily_rollover.py [users ...] [--sample N]
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.quest import Quest, QuestStatus, Rival
+from app.models.user import User
+from application.services.daily_rollover_service import daily_rollover_service
+
+UTC = datetime.timezone.utc
+TZ = "Asia/Taipei"
+DAY = datetime.date(2026, 3, 2)
+NOW = datetime.datetime(2026, 3, 2, 16, 30, tzinfo=UTC)  # 00:30 local, the day after DAY
+ACTIVE_AT = datetime.datetime(2026, 3, 2, 2, 0, tzinfo=UTC)
+IDLE_SINCE = datetime.datetime(2026, 2, 26, 2, 0, tzinfo=UTC)
+CHUNK = 5000
+
+
+async def _seed(path: str, n_users: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for start in range(0, n_users, CHUNK):
+            ids = range(start, min(n_users, start + CHUNK))
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "id": f"bench_{i}",
+                        "name": f"Bench{i}",
+                        "level": 1 + i % 10,
+                        "xp": 1000 + i % 500,
+                        "gold": 300,
+                        "hp": 20 + i % 80,
+                        "max_hp": 100,
+                        "push_timezone": TZ,
+                        "last_active_date": IDLE_SINCE if i % 3 == 0 else ACTIVE_AT,
+                    }
+                    for i in ids
+                ],
+            )
+            await conn.execute(
+                insert(Quest),
+                [
+                    {
+                        "id": f"q_{i}_{k}",
+                        "user_id": f"bench_{i}",
+                        "title": "Bench quest",
+                        "status": QuestStatus.DONE.value if (i + k) % 2 else QuestStatus.ACTIVE.value,
+                        "created_at": ACTIVE_AT,
+                    }
+                    for i in ids
+                    for k in range(2)
+                ],
+            )
+            await conn.execute(
+                insert(Rival),
+                [{"id": f"r_{i}", "user_id": f"bench_{i}", "level": 1 + i % 12, "xp": i % 500} for i in ids if i % 2],
+            )
+    return engine
+
+
+async def run_rollover(n_users: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = await _seed(os.path.join(tmp, "rollover.db"), n_users)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            t0 = time.perf_counter()
+            stats = await daily_rollover_service.rollover_bucket(session, TZ, DAY, now=NOW, growth=50)
+            elapsed = time.perf_counter() - t0
+        await engine.dispose()
+    return {
+        "mode": "set-based",
+        "users": stats["users"],
+        "inactive": stats["inactive"],
+        "elapsed_s": round(elapsed, 2),
+        "users/s": round(n_users / elapsed),
+    }
+
+
+async def run_per_user(n_users: int, sample: int) -> dict:
+    from application.services.hp_service import hp_service
+    from application.services.rival_service import rival_service
+    from application.services.scheduler import dda_scheduler
+
+    sample = min(sample, n_users)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = await _seed(os.path.join(tmp, "per_user.db"), n_users)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as session:
+            users = (await session.execute(select(User).limit(sample))).scalars().all()
+            t0 = time.perf_counter()
+            for user in users:
+                await hp_service.calculate_daily_drain(session, user)
+                await rival_service.process_encounter(session, user)
+                await rival_service.advance_daily_briefing(session, user)
+                await dda_scheduler._update_daily_outcome(session, user.id, False, True, DAY)
+            elapsed = time.perf_counter() - t0
+        await engine.dispose()
+    per_user = elapsed / sample
+    return {
+        "mode": "per-user",
+        "sampled": sample,
+        "elapsed_s(extrapolated)": round(per_user * n_users, 2),
+        "users/s": round(1 / per_user),
+    }
+
+
+async def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sample = 1000
+    if "--sample" in sys.argv:
+        sample = int(sys.argv[sys.argv.index("--sample") + 1])
+        args.remove(str(sample))
+    sizes = [int(a) for a in args] or [10_000, 100_000]
+
+    for n_users in sizes:
+        print(f"=== Daily rollover benchmark: {n_users} users ===")
+        print(await run_rollover(n_users))
+        print(await run_per_user(n_users, sample))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
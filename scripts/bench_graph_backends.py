@@ -0,0 +1,104 @@
+"""
+Benchmark: the same GraphPort workload on the Kuzu and SQL graph backends.
+
+Each backend gets a fresh database (Kuzu in a temp dir; SQL on a temp SQLite
+file, or the URL given as the second argument, e.g. a scratch Postgres
+database) and runs, in order:
+
+- record_user_event: every event written inline (Kuzu write-behind off)
+- get_user_history: 10 newest events per user
+- get_npc_contexts: every NPC with the user's intimacy
+- adjust_npc_intimacy: one KNOWS update per call
+- add_quest_dependency + COMPLETED edges: a chain/join quest DAG per user
+- get_unlockable_templates: per user
+
+Kuzu numbers include its in-process caches (recent events, NPC catalog,
+unlock frontier); the SQL backend has none, since every worker shares its
+tables. Times are ms per call.
+
+Usage: python scripts/bench_graph_backends.py [events] [sql_url]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+from adapters.persistence.kuzu.adapter import KuzuAdapter
+from adapters.persistence.sql_graph.adapter import SqlGraphAdapter
+from app.core.config import settings
+
+USERS = 50
+QUESTS = 40
+READS = 500
+
+
+def _time(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - t0) / calls * 1000, 3)
+
+
+def _user(i: int) -> str:
+    return f"u{i % USERS}"
+
+
+def run_workload(adapter, events: int) -> dict:
+    asyncio.run(adapter.initialize())
+    results = {}
+    results["record_user_event"] = _time(
+        lambda i: adapter.record_user_event(_user(i), "ACTION", {"content": f"did thing {i}"}), events
+    )
+    results["get_user_history"] = _time(lambda i: adapter.get_user_history(_user(i), 10), READS)
+    results["get_npc_contexts"] = _time(lambda i: adapter.get_npc_contexts(user_id=_user(i)), READS)
+    results["adjust_npc_intimacy"] = _time(
+        lambda i: adapter.adjust_npc_intimacy(_user(i), ("viper", "sage", "ember", "shadow")[i % 4], 1), READS
+    )
+
+    def add_quest(i: int) -> None:
+        adapter.add_node("Quest", {"id": f"q{i}", "title": f"Quest {i}"})
+        if i:
+            adapter.add_quest_dependency(f"q{i}", f"q{i - 1}")  # A chain ...
+        if i > 1 and i % 5 == 0:
+            adapter.add_quest_dependency(f"q{i}", f"q{i - 2}")  # ... with joins
+
+    results["add_quest_dependency"] = _time(add_quest, QUESTS)
+
+    async def complete(i: int) -> None:
+        for q in range(i % QUESTS):
+            await adapter.add_relationship("User", _user(i), "COMPLETED", "Quest", f"q{q}", None, "id", "id")
+
+    t0 = time.perf_counter()
+    for i in range(USERS):
+        asyncio.run(complete(i))
+    results["completions_total_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    results["get_unlockable_templates"] = _time(lambda i: adapter.get_unlockable_templates(_user(i)), READS)
+    adapter.close()
+    return results
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    sql_url = sys.argv[2] if len(sys.argv) > 2 else None
+    settings.KUZU_WRITE_BEHIND_ENABLED = False
+
+    print(f"=== Graph backend benchmark: {events} events, {USERS} users, {QUESTS} quests ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "kuzu": KuzuAdapter(db_path=os.path.join(tmp, "graph")),
+            "sql": SqlGraphAdapter(sql_url or f"sqlite:///{os.path.join(tmp, 'graph.db')}"),
+        }
+        results = {name: run_workload(adapter, events) for name, adapter in backends.items()}
+
+    for op in results["kuzu"]:
+        kuzu_ms, sql_ms = results["kuzu"][op], results["sql"][op]
+        ratio = round(sql_ms / kuzu_ms, 2) if kuzu_ms else None
+        print({"op": op, "kuzu_ms": kuzu_ms, "sql_ms": sql_ms, "sql/kuzu": ratio})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: Kuzu parse/plan overhead per call, f-string queries vs prepared statements.
+
+Builds a throwaway graph with the adapter schema (users, events, NPCs), then
+times the hot adapter reads two ways: the old style (values formatted into
+the Cypher text, so every call is parsed and planned again) and the prepared
+style (`PreparedConnection`, planned once, executed with parameters). The
+difference per call is the parse/bind/plan cost the cache removes.
+
+Usage: python scripts/bench_kuzu_prepared.py [calls]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.getcwd())
+
+import kuzu
+
+from adapters.persistence.kuzu.adapter import KuzuAdapter
+from adapters.persistence.kuzu.prepared import PreparedConnection
+
+USERS = 50
+EVENTS = 5000
+
+
+def _seed(adapter: KuzuAdapter) -> None:
+    adapter._write_events_sync(
+        [
+            {"id": f"e{i}", "user_id": f"u{i % USERS}", "type": "ACTION", "timestamp": i, "metadata": "{}"}
+            for i in range(EVENTS)
+        ]
+    )
+
+
+def _time(fn, calls: int) -> float:
+    fn(0)  # Warm up
+    t0 = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - t0) / calls * 1000
+
+
+def run(calls: int) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        adapter = KuzuAdapter(db_path=os.path.join(tmp, "graph"))
+        adapter._init_sync()
+        _seed(adapter)
+        conn = kuzu.Connection(adapter.db)
+        prepared = PreparedConnection(conn)
+
+        history = (
+            "MATCH (e:Event)-[:TRIGGERED_BY]->(u:User {id: $user_id}) "
+            "RETURN e.id, e.type, e.timestamp, e.metadata ORDER BY e.timestamp DESC LIMIT $limit"
+        )
+        npc = "MATCH (n:NPC {name: $name}) RETURN n.name, n.role, n.mood, n.personality"
+        cases = {
+            "get_user_history": (
+                lambda i: conn.execute(
+                    f"MATCH (e:Event)-[:TRIGGERED_BY]->(u:User {{id: 'u{i % USERS}'}}) "
+                    f"RETURN e.id, e.type, e.timestamp, e.metadata ORDER BY e.timestamp DESC LIMIT 10"
+                ).get_all(),
+                lambda i: prepared.execute(history, {"user_id": f"u{i % USERS}", "limit": 10}).get_all(),
+            ),
+            "npc_lookup": (
+                lambda i: conn.execute(
+                    "MATCH (n:NPC {name: 'Viper'}) RETURN n.name, n.role, n.mood, n.personality"
+                ).get_all(),
+                lambda i: prepared.execute(npc, {"name": "Viper"}).get_all(),
+            ),
+        }
+
+        results = []
+        for name, (formatted, cached) in cases.items():
+            before, after = _time(formatted, calls), _time(cached, calls)
+            results.append(
+                {
+                    "query": name,
+                    "calls": calls,
+                    "f-string_ms": round(before, 3),
+                    "prepared_ms": round(after, 3),
+                    "saved_per_call_ms": round(before - after, 3),
+                    "speedup": round(before / after, 2) if after else None,
+                }
+            )
+        results.append({"cache": prepared.stats})
+        adapter.close()
+    return results
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"=== Kuzu prepared statement benchmark: {calls} calls per query ===")
+    for row in run(calls):
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: one-call-per-user vs batched multi-user quest generation.
+
+Uses a stub AI provider (no network) that counts calls and approximates tokens
+(~4 chars per token) with a latency model of fixed overhead + per-output-token cost.
+
+Usage: python scripts/bench_quest_batch.py [users] [batch_size]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+os.environ.setdefault("DISABLE_SERENDIPITY", "1")
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.user import User
+from application.services.quest_batch_service import quest_batch_service
+from application.services.quest_service import quest_service
+
+CALL_OVERHEAD_S = 0.25  # Network + queueing per request
+PER_OUTPUT_TOKEN_S = 0.0005
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubProvider:
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def _quests(self, n: int, tier: str) -> list:
+        return [
+            {"title": f"專注任務 {i + 1}", "desc": "完成一個 15 分鐘的小步驟", "diff": tier, "xp": 20} for i in range(n)
+        ]
+
+    async def generate_json(self, system_prompt: str, user_prompt: str):
+        self.calls += 1
+        self.prompt_tokens += _tokens(system_prompt) + _tokens(user_prompt)
+        if "Profiles: " in user_prompt:
+            profiles = json.loads(user_prompt.split("Profiles: ", 1)[1])
+            result = {key: self._quests(p["n"], p["tier"]) for key, p in profiles.items()}
+        else:
+            result = self._quests(quest_service.DAILY_QUEST_COUNT, "D")
+        out = json.dumps(result, ensure_ascii=False)
+        self.completion_tokens += _tokens(out)
+        await asyncio.sleep(CALL_OVERHEAD_S + PER_OUTPUT_TOKEN_S * _tokens(out))
+        return result
+
+
+async def _fresh_session(n_users: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)()
+    users = [User(id=f"bench_{i}", name=f"Bench{i}", level=1 + i % 10) for i in range(n_users)]
+    session.add_all(users)
+    await session.commit()
+    return engine, session, users
+
+
+async def run_mode(mode: str, n_users: int, batch_size: int) -> dict:
+    engine, session, users = await _fresh_session(n_users)
+    stub = StubProvider()
+    t0 = time.perf_counter()
+    with patch("application.services.ai_engine.ai_engine.generate_json", stub.generate_json):
+        if mode == "per-user":
+            for user in users:
+                await quest_service.trigger_push_quests(session, user.id, time_block="Morning")
+        else:
+            await quest_batch_service.generate_for_users(session, users, "Morning", batch_size=batch_size)
+    elapsed = time.perf_counter() - t0
+    await session.close()
+    await engine.dispose()
+    total_tokens = stub.prompt_tokens + stub.completion_tokens
+    return {
+        "mode": mode,
+        "calls": stub.calls,
+        "tokens/user": round(total_tokens / n_users, 1),
+        "prompt_tokens/user": round(stub.prompt_tokens / n_users, 1),
+        "users/s": round(n_users / elapsed, 1),
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+async def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    print(f"=== Quest generation benchmark: {n_users} users, batch_size={batch_size} ===")
+    for mode in ("per-user", "batched"):
+        print(await run_mode(mode, n_users, batch_size))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
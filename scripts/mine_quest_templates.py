@@ -0,0 +1,33 @@
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.quest import QuestTemplate
+from application.services.quest_template_service import quest_template_service
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    async with AsyncSessionLocal() as session:
+        stats = await quest_template_service.mine_templates(session)
+        print(f"\n=== MINING STATS ===\n{stats}")
+
+        rows = (
+            (await session.execute(select(QuestTemplate).order_by(QuestTemplate.completion_rate.desc())))
+            .scalars()
+            .all()
+        )
+        print(f"\n=== LIBRARY ({len(rows)} templates) ===")
+        for t in rows:
+            print(
+                f"[{t.difficulty_tier}] {t.title_pattern} | n={t.sample_count} rate={t.completion_rate:.2f} {t.themes}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -60,7 +60,9 @@ if FORCE_MOCKS or "google.genai" not in sys.modules:
 # Set test environment variables BEFORE any app imports
 os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite+aiosqlite:///:memory:")
 os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("LINE_DELIVERY_QUEUE_ENABLED", "0")  # Send inline; no background worker in tests
 os.environ.setdefault("KUZU_DATABASE_PATH", "/tmp/test_kuzu_db")
+os.environ.setdefault("KUZU_WRITE_BEHIND_ENABLED", "0")  # Graph events written inline in tests
 
 # Radical Global Mock (Top Level)
 # Patches get_kuzu_adapter immediately to protect Collection Phase imports
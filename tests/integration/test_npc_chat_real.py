@@ -29,7 +29,7 @@ async def real_env_npc():
     adapter = get_kuzu_adapter()
 
     # PATCH Singleton Service to use new Adapter
-    social_service.kuzu = adapter
+    social_service.graph = adapter
 
     yield {"db": db_path, "kuzu": kuzu_path, "adapter": adapter}
 
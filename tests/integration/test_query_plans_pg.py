@@ -0,0 +1,77 @@
+import datetime
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event, text
+
+from app.models.quest import Quest, QuestStatus
+from app.models.user import User
+from application.services.quest_service import quest_service
+
+
+@contextmanager
+def capture_sql(session):
+    captured = []
+
+    def _listener(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    sync_engine = session.bind.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _listener)
+    try:
+        yield captured
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _listener)
+
+
+async def explain(session, statement, parameters) -> str:
+    conn = await session.connection()
+    # Tiny test tables always favour a seq scan; disable it so the plan shows which index is eligible
+    await conn.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = (await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)).all()
+    return "\n".join(r[0] for r in rows)
+
+
+def _matching(captured, table, needle):
+    return [
+        (s, p) for s, p in captured if s.lstrip().upper().startswith("SELECT") and f"FROM {table}" in s and needle in s
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pg_daily_quest_range_queries_use_user_created_index(integration_session):
+    user_id = "pg_plan_user"
+    integration_session.add(User(id=user_id, name="Planner", push_timezone="America/New_York"))
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for i in range(3):
+        integration_session.add(Quest(user_id=user_id, title=f"Q{i}", status=QuestStatus.ACTIVE.value, created_at=now))
+    await integration_session.flush()
+
+    with capture_sql(integration_session) as captured:
+        await quest_service.get_daily_quests(integration_session, user_id)
+        await quest_service.trigger_push_quests(integration_session, user_id)
+        await quest_service.get_completed_quests_this_week(integration_session, user_id)
+
+    range_queries = _matching(captured, "quests", "quests.created_at <")
+    assert len(range_queries) == 3
+    for statement, parameters in range_queries:
+        plan = await explain(integration_session, statement, parameters)
+        assert "ix_quests_user_created" in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_pg_dda_outcome_lookup_uses_composite_index(integration_session):
+    user_id = "pg_plan_dda"
+    integration_session.add(User(id=user_id, name="Planner"))
+    await integration_session.flush()
+
+    with capture_sql(integration_session) as captured:
+        with patch("application.services.quest_service.ai_engine.generate_json", AsyncMock(return_value=[])):
+            await quest_service._generate_daily_batch(integration_session, user_id, time_context="Daily")
+
+    dda_queries = _matching(captured, "daily_outcomes", "daily_outcomes.user_id")
+    assert dda_queries
+    for statement, parameters in dda_queries:
+        plan = await explain(integration_session, statement, parameters)
+        assert "ix_daily_outcomes_user_date_global" in plan, plan
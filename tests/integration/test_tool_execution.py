@@ -3,15 +3,6 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-# --- MOCK KUZU BEFORE IMPORTS ---
-mock_kuzu_mod = MagicMock()
-sys.modules["kuzu"] = mock_kuzu_mod
-mock_adapter_mod = MagicMock()
-sys.modules["adapters.persistence.kuzu.adapter"] = mock_adapter_mod
-
-
-# ----------------------------------------
-
 sys.modules["deepdiff"] = MagicMock()
 sys.modules["chromadb"] = MagicMock()
 sys.modules["adapters.persistence.chroma.adapter"] = MagicMock()
@@ -30,22 +21,22 @@ def mock_tool_kuzu():
     # Patch ContextService
     from application.services.context_service import context_service
 
-    original_kuzu = context_service.kuzu
-    context_service.kuzu = mock_kuzu_instance
+    original_graph = context_service.graph
+    context_service.graph = mock_kuzu_instance
 
     # Patch Container
     import app.core.container
 
-    original_get_adapter = getattr(app.core.container, "get_kuzu_adapter", None)
-    app.core.container.get_kuzu_adapter = MagicMock(return_value=mock_kuzu_instance)
+    original_get_adapter = getattr(app.core.container, "get_graph_adapter", None)
+    app.core.container.get_graph_adapter = MagicMock(return_value=mock_kuzu_instance)
 
     yield
 
-    context_service.kuzu = original_kuzu
+    context_service.graph = original_graph
     if original_get_adapter:
-        app.core.container.get_kuzu_adapter = original_get_adapter
+        app.core.container.get_graph_adapter = original_get_adapter
     else:
-        del app.core.container.get_kuzu_adapter
+        del app.core.container.get_graph_adapter
 
 
 @pytest.mark.asyncio
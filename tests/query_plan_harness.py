@@ -0,0 +1,101 @@
+"""
+Query-plan harness for tests.
+
+`QueryRecorder` captures every SQL statement an engine executes; `explain_sqlite`
+runs EXPLAIN QUERY PLAN on a captured statement; `find_table_scans` flags full
+scans and `advise_index` suggests a composite index from the WHERE/ORDER BY
+columns of the offending statement.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, text
+
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_PRED_RE = r"{table}\.(\w+)\s*(=|IN\b|IS\b|>=|<=|<|>|LIKE\b|BETWEEN\b)"
+_ORDER_RE = r"ORDER BY\s+{table}\.(\w+)"
+
+
+@dataclass
+class CapturedQuery:
+    statement: str
+    parameters: tuple | dict | None
+    plan: list[str] = field(default_factory=list)
+
+    @property
+    def is_select(self) -> bool:
+        return self.statement.lstrip().upper().startswith("SELECT")
+
+
+class QueryRecorder:
+    """Context manager recording (statement, parameters) for every cursor execute on a sync engine."""
+
+    def __init__(self, sync_engine):
+        self.sync_engine = sync_engine
+        self.queries: list[CapturedQuery] = []
+
+    def _listener(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            return  # Bulk INSERT/UPDATE; no plan to check
+        self.queries.append(CapturedQuery(statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.sync_engine, "before_cursor_execute", self._listener)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.sync_engine, "before_cursor_execute", self._listener)
+        return False
+
+    def selects(self) -> list[CapturedQuery]:
+        return [q for q in self.queries if q.is_select]
+
+    def unique_selects(self) -> list[CapturedQuery]:
+        """One entry per distinct statement text (parameters of the first occurrence)."""
+        seen: dict[str, CapturedQuery] = {}
+        for q in self.selects():
+            seen.setdefault(q.statement, q)
+        return list(seen.values())
+
+
+async def explain_sqlite(conn, statement: str, parameters) -> list[str]:
+    """EXPLAIN QUERY PLAN detail lines for a statement on an AsyncConnection."""
+    rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ())).all()
+    return [str(r[-1]) for r in rows]
+
+
+def find_table_scans(plan: list[str]) -> list[str]:
+    """Tables read with a full scan (no index). Subqueries/constant rows are ignored."""
+    tables = []
+    for line in plan:
+        match = _SCAN_RE.match(line.strip())
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+async def table_row_counts(conn, tables) -> dict[str, int]:
+    counts = {}
+    for table in tables:
+        counts[table] = (await conn.execute(text(f'SELECT COUNT(*) FROM "{table}"'))).scalar() or 0
+    return counts
+
+
+def advise_index(statement: str, table: str) -> str | None:
+    """
+    Suggests `CREATE INDEX` for `table`: equality columns first, then one range
+    column, then the ORDER BY column. Returns None if no predicate touches the table.
+    """
+    equality, ranges = [], []
+    for column, op in re.findall(_PRED_RE.format(table=re.escape(table)), statement, flags=re.IGNORECASE):
+        target = equality if op.strip().upper() in ("=", "IN", "IS") else ranges
+        if column not in equality and column not in ranges:
+            target.append(column)
+    columns = equality + ranges[:1]
+    order = re.search(_ORDER_RE.format(table=re.escape(table)), statement, flags=re.IGNORECASE)
+    if order and order.group(1) not in columns:
+        columns.append(order.group(1))
+    if not columns:
+        return None
+    return f"CREATE INDEX ix_{table}_{'_'.join(columns)} ON {table} ({', '.join(columns)})"
@@ -4,14 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 # --- MOCK DEPENDENCIES BEFORE IMPORTING APP ---
-# This prevents app.main -> ... -> KuzuAdapter from trying to open the locked DB
-mock_kuzu_mod = MagicMock()
-sys.modules["kuzu"] = mock_kuzu_mod
-mock_adapter_mod = MagicMock()
-sys.modules["adapters.persistence.kuzu.adapter"] = mock_adapter_mod
-
-
-# ----------------------------------------
+# The graph adapter is swapped per test on the container (see mock_sim_kuzu); Kuzu is never opened
 sys.modules["deepdiff"] = MagicMock()
 sys.modules["chromadb"] = MagicMock()
 sys.modules["adapters.persistence.chroma.adapter"] = MagicMock()
@@ -32,22 +25,22 @@ def mock_sim_kuzu():
     # Patch ContextService
     from application.services.context_service import context_service
 
-    original_kuzu = context_service.kuzu
-    context_service.kuzu = mock_kuzu_instance
+    original_graph = context_service.graph
+    context_service.graph = mock_kuzu_instance
 
     # Patch Container
     import app.core.container
 
-    original_get_adapter = getattr(app.core.container, "get_kuzu_adapter", None)
-    app.core.container.get_kuzu_adapter = MagicMock(return_value=mock_kuzu_instance)
+    original_get_adapter = getattr(app.core.container, "get_graph_adapter", None)
+    app.core.container.get_graph_adapter = MagicMock(return_value=mock_kuzu_instance)
 
     yield
 
-    context_service.kuzu = original_kuzu
+    context_service.graph = original_graph
     if original_get_adapter:
-        app.core.container.get_kuzu_adapter = original_get_adapter
+        app.core.container.get_graph_adapter = original_get_adapter
     else:
-        del app.core.container.get_kuzu_adapter
+        del app.core.container.get_graph_adapter
 
 
 @pytest.mark.asyncio
@@ -62,6 +55,7 @@ async def test_process_game_logic_attack():
         patch("application.services.game_loop.rival_service"),
         patch("application.services.game_loop.hp_service"),
         patch("app.main.AsyncSessionLocal") as mock_session_cls,
+        patch("application.services.game_loop.pulse_service.run", AsyncMock(return_value=None)),
     ):
         mock_session = AsyncMock()
         mock_session_cls.return_value.__aenter__.return_value = mock_session
@@ -103,6 +97,7 @@ async def test_process_game_logic_defend():
     with (
         patch("application.services.rival_service.rival_service") as mock_rival_svc,
         patch("app.main.AsyncSessionLocal") as mock_session_cls,
+        patch("application.services.game_loop.pulse_service.run", AsyncMock(return_value=None)),
     ):
         mock_session = AsyncMock()
         mock_session_cls.return_value.__aenter__.return_value = mock_session
@@ -133,6 +128,7 @@ async def test_process_game_logic_unknown():
     with (
         patch("application.services.rival_service.rival_service") as mock_rival_svc,
         patch("app.main.AsyncSessionLocal") as mock_session_cls,
+        patch("application.services.game_loop.pulse_service.run", AsyncMock(return_value=None)),
     ):
         mock_session = AsyncMock()
         mock_session_cls.return_value.__aenter__.return_value = mock_session
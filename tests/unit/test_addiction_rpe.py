@@ -3,17 +3,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-# --- MOCK KUZU BEFORE IMPORTS ---
-mock_kuzu_mod = MagicMock()
-sys.modules["kuzu"] = mock_kuzu_mod
-mock_adapter_mod = MagicMock()
-sys.modules["adapters.persistence.kuzu.adapter"] = mock_adapter_mod
-# --------------------------------
-
 import app.core.container as container_mod
 from app.models.quest import Quest, QuestStatus
-
-# --------------------------------
 from application.services.loot_service import LootResult, loot_service
 from application.services.quest_service import quest_service
 
@@ -93,8 +84,8 @@ async def test_quest_service_complete_integration():
     # Patch ContextService Singleton
     from application.services.context_service import context_service
 
-    original_kuzu = context_service.kuzu
-    context_service.kuzu = mock_kuzu_instance
+    original_graph = context_service.graph
+    context_service.graph = mock_kuzu_instance
 
     # Mock GraphService
     mock_graph_svc = MagicMock()
@@ -126,7 +117,7 @@ async def test_quest_service_complete_integration():
             # FORCE PATCH KUZU ON SINGLETON (AIEngine uses it)
             from application.services.context_service import context_service
 
-            context_service.kuzu.query_recent_context = AsyncMock(return_value=[])
+            context_service.graph.query_recent_context = AsyncMock(return_value=[])
 
             result = await quest_service.complete_quest(mock_session, "u1", "q1")
 
@@ -146,5 +137,5 @@ async def test_quest_service_complete_integration():
             assert mock_quest.status == QuestStatus.DONE.value
     finally:
         container_mod.container._user_service = None
-        context_service.kuzu = original_kuzu
+        context_service.graph = original_graph
         graph_patcher.stop()
@@ -0,0 +1,77 @@
+import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from linebot.v3.messaging import AudioMessage, TextMessage
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.dda import PreparedBriefing, PushSchedule
+from app.models.user import User
+from application.services.scheduler import dda_scheduler
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 3, 2, 23, 30, tzinfo=UTC)  # 07:30 in Asia/Taipei
+FIRE_AT = datetime.datetime(2026, 3, 3, 0, 0, tzinfo=UTC)  # 08:00
+
+
+@pytest.mark.asyncio
+async def test_briefing_rendered_ahead_is_delivered_without_rebuilding(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'prerender.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with factory() as session:
+        session.add_all(
+            [
+                User(id="early", name="E", push_enabled=True, push_timezone="Asia/Taipei"),
+                User(id="later", name="L", push_enabled=True, push_timezone="Asia/Taipei"),
+                PushSchedule(user_id="early", push_type="morning", next_push_at=FIRE_AT),
+                PushSchedule(user_id="later", push_type="morning", next_push_at=FIRE_AT + datetime.timedelta(hours=3)),
+            ]
+        )
+        await session.commit()
+
+    rendered = [
+        TextMessage(text="🌅 早安任務"),
+        AudioMessage(original_content_url="https://example.com/briefing.mp3", duration=15000),
+    ]
+    build = AsyncMock(return_value=rendered)
+    with (
+        patch.object(dda_scheduler, "session_factory", factory),
+        patch.object(dda_scheduler, "_build_morning_messages", build),
+        patch.object(dda_scheduler, "_morning_prepass", AsyncMock()),
+    ):
+        async with factory() as session:
+            stats = await dda_scheduler._prerender_due(session, now=NOW)
+        async with factory() as session:
+            again = await dda_scheduler._prerender_due(session, now=NOW + datetime.timedelta(minutes=5))
+
+    assert stats["rendered"] == 1 and build.await_count == 1
+    assert again["pending"] == 0
+
+    # Fire time: the stored payload goes out as-is
+    fire_build = AsyncMock()
+    queue_messages = AsyncMock(return_value=True)
+    async with factory() as session:
+        user = await session.get(User, "early")
+        schedules = {
+            s.push_type: s
+            for s in (await session.execute(select(PushSchedule).where(PushSchedule.user_id == "early"))).scalars()
+        }
+        with (
+            patch("application.services.scheduler.get_messaging_api", return_value=MagicMock()),
+            patch("adapters.perception.line_client.line_client.queue_messages", queue_messages),
+            patch.object(dda_scheduler, "_build_morning_messages", fire_build),
+        ):
+            sent = await dda_scheduler._process_user(session, user, {"morning"}, schedules)
+        remaining = (await session.execute(select(PreparedBriefing))).scalars().all()
+
+    assert sent == "morning"
+    fire_build.assert_not_awaited()
+    messages = queue_messages.await_args.args[1]
+    assert [m.to_dict() for m in messages] == [m.to_dict() for m in rendered]
+    assert remaining == []
+    await engine.dispose()
@@ -0,0 +1,103 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event
+
+from adapters.persistence.sqlite.unit_of_work import SqlAlchemyUnitOfWork
+from app.models.gamification import Boss, BossStatus
+from app.models.quest import Quest, QuestStatus
+from app.models.user import User
+from application.services.quest_service import quest_service
+
+
+def _count_commits(session) -> list:
+    commits = []
+    event.listen(session.sync_session, "after_commit", lambda s: commits.append(1))
+    return commits
+
+
+@pytest.mark.asyncio
+async def test_complete_quest_commits_once_and_syncs_graph_after(db_session):
+    user_id = "uow_hero"
+    db_session.add(User(id=user_id, name="Hero", xp=0, gold=0, hp=50, max_hp=100))
+    db_session.add(Boss(user_id=user_id, name="Sloth", hp=40, max_hp=1000, status=BossStatus.ACTIVE))
+    quest = Quest(
+        user_id=user_id,
+        title="Run",
+        difficulty_tier="C",
+        status=QuestStatus.ACTIVE.value,
+        meta={"graph_node_id": "node-1"},
+    )
+    db_session.add(quest)
+    await db_session.commit()
+
+    commits = _count_commits(db_session)
+    commits_at_sync = []
+    sync = AsyncMock(side_effect=lambda *a: commits_at_sync.append(len(commits)))
+    with (
+        patch.object(quest_service, "_sync_completion_to_graph", sync),
+        patch("application.services.boss_service.boss_service._sync_defeat", AsyncMock()) as defeat_sync,
+    ):
+        result = await quest_service.complete_quest(db_session, user_id, quest.id)
+
+    assert result["quest"].status == QuestStatus.DONE.value
+    assert len(commits) == 1
+    assert commits_at_sync == [1]  # Graph sync ran after the commit
+    defeat_sync.assert_awaited_once()
+
+    user = await db_session.get(User, user_id)
+    boss = (await db_session.execute(Boss.__table__.select().where(Boss.user_id == user_id))).first()
+    assert user.xp == result["loot"].xp
+    assert user.gold == result["loot"].gold + 500  # Boss defeat bonus in the same commit
+    assert user.hp > 50
+    assert boss.status == BossStatus.DEFEATED
+
+
+@pytest.mark.asyncio
+async def test_nested_unit_of_work_commits_at_outer_exit(db_session):
+    commits = _count_commits(db_session)
+    effect = AsyncMock()
+
+    uow = SqlAlchemyUnitOfWork(session=db_session)
+    async with uow:
+        async with uow:
+            db_session.add(User(id="uow_nested", name="N"))
+            uow.add_post_commit(effect, "x")
+        assert commits == []
+        effect.assert_not_awaited()
+
+    assert commits == [1]
+    effect.assert_awaited_once_with("x")
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rollback_drops_side_effects(db_session):
+    effect = AsyncMock()
+    uow = SqlAlchemyUnitOfWork(session=db_session)
+    with pytest.raises(RuntimeError):
+        async with uow:
+            db_session.add(User(id="uow_rollback", name="R"))
+            uow.add_post_commit(effect)
+            raise RuntimeError("boom")
+
+    effect.assert_not_awaited()
+    assert await db_session.get(User, "uow_rollback") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_completion_rolls_back_and_raises(db_session):
+    user_id = "uow_failed"
+    db_session.add(User(id=user_id, name="Hero", xp=0, gold=0, hp=50, max_hp=100))
+    quest = Quest(user_id=user_id, title="Run", difficulty_tier="C", status=QuestStatus.ACTIVE.value)
+    db_session.add(quest)
+    await db_session.commit()
+    quest_id = quest.id
+
+    failing = AsyncMock(side_effect=TypeError("bad boss row"))
+    with patch("application.services.boss_service.boss_service.deal_damage", failing):
+        with pytest.raises(TypeError):
+            await quest_service.complete_quest(db_session, user_id, quest_id)
+
+    db_session.expire_all()
+    assert (await db_session.get(Quest, quest_id)).status == QuestStatus.ACTIVE.value
+    assert (await db_session.get(User, user_id)).xp == 0
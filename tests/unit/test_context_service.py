@@ -46,7 +46,7 @@ async def test_context_aggregation(db_session):
     # Mock Kuzu Async Method
     from unittest.mock import MagicMock
 
-    svc.kuzu.query_recent_context = MagicMock(return_value=[])
+    svc.graph.query_recent_context = MagicMock(return_value=[])
 
     # Execute
     context = await svc.get_working_memory(db_session, "test_u1")
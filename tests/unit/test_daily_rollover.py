@@ -0,0 +1,112 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.dda import DailyOutcome
+from app.models.gamification import UserBuff
+from app.models.quest import Quest, QuestStatus, Rival
+from app.models.user import User
+from application.services.daily_rollover_service import daily_rollover_service
+from application.services.game_loop import game_loop
+
+UTC = datetime.timezone.utc
+DAY = datetime.date(2026, 3, 2)
+NOW = datetime.datetime(2026, 3, 2, 16, 30, tzinfo=UTC)  # 00:30 Mar 3 in Asia/Taipei
+ACTIVE_AT = datetime.datetime(2026, 3, 2, 2, 0, tzinfo=UTC)  # 10:00 Mar 2 local
+IDLE_SINCE = datetime.datetime(2026, 2, 27, 2, 0, tzinfo=UTC)
+
+
+@pytest.mark.asyncio
+async def test_rollover_applies_daily_effects_once_per_bucket(db_session):
+    db_session.add_all(
+        [
+            User(
+                id="busy",
+                name="B",
+                level=5,
+                xp=1000,
+                gold=200,
+                hp=100,
+                push_timezone="Asia/Taipei",
+                last_active_date=ACTIVE_AT,
+            ),
+            User(
+                id="idle",
+                name="I",
+                level=1,
+                xp=1000,
+                gold=200,
+                hp=15,
+                push_timezone="Asia/Taipei",
+                last_active_date=IDLE_SINCE,
+            ),
+            User(id="ny", name="N", xp=1000, push_timezone="America/New_York", last_active_date=IDLE_SINCE),
+            Rival(user_id="idle", level=3, xp=450),
+            Quest(user_id="busy", title="Run", status=QuestStatus.DONE.value, created_at=ACTIVE_AT),
+            Quest(user_id="idle", title="Read", status=QuestStatus.ACTIVE.value, created_at=ACTIVE_AT),
+        ]
+    )
+    await db_session.commit()
+
+    stats = await daily_rollover_service.rollover_bucket(db_session, "Asia/Taipei", DAY, now=NOW, growth=50)
+    again = await daily_rollover_service.rollover_bucket(db_session, "Asia/Taipei", DAY, now=NOW, growth=50)
+
+    assert stats["users"] == 2 and stats["inactive"] == 1 and stats["debuffs"] == 1
+    assert again["users"] == 0  # Idempotent
+
+    db_session.expire_all()
+    busy, idle, ny = [await db_session.get(User, uid) for uid in ("busy", "idle", "ny")]
+    assert (busy.hp, busy.xp, busy.gold, busy.penalty_pending) == (100, 1000, 200, False)
+    assert (idle.hp, idle.hp_status, idle.xp, idle.gold, idle.penalty_pending) == (5, "CRITICAL", 950, 190, True)
+    assert ny.last_rollover_date is None and ny.xp == 1000  # Other bucket untouched
+
+    outcomes = {
+        o.user_id: o.done
+        for o in (await db_session.execute(select(DailyOutcome).where(DailyOutcome.date == DAY))).scalars()
+    }
+    assert outcomes == {"busy": True, "idle": False}
+
+    rivals = {r.user_id: r for r in (await db_session.execute(select(Rival))).scalars()}
+    assert (rivals["idle"].level, rivals["idle"].xp) == (4, 100)  # 450 + 50 growth + 100 inactivity
+    assert (rivals["busy"].level, rivals["busy"].xp) == (5, 50)  # Created at the user's level
+    buffs = (await db_session.execute(select(UserBuff))).scalars().all()
+    assert [b.user_id for b in buffs] == ["idle"]
+
+
+@pytest.mark.asyncio
+async def test_rollover_drain_hollows_at_zero(db_session):
+    db_session.add(User(id="faint", name="F", hp=5, push_timezone="Asia/Taipei", last_active_date=IDLE_SINCE))
+    await db_session.commit()
+
+    await daily_rollover_service.run_due(db_session, now=NOW)
+
+    db_session.expire_all()
+    user = await db_session.get(User, "faint")
+    assert (user.hp, user.hp_status, user.is_hollowed) == (0, "HOLLOWED", True)
+    assert user.hollowed_at is not None and user.last_rollover_date == DAY
+
+
+@pytest.mark.asyncio
+async def test_without_scheduler_messages_still_drain_hp_and_meet_the_rival(db_session):
+    """The rollover job only exists under ENABLE_SCHEDULER, so the default config keeps the per-message path."""
+    db_session.add(User(id="no_scheduler", name="S", hp=100, push_timezone="Asia/Taipei"))
+    await db_session.commit()
+
+    encounter = AsyncMock(return_value="Viper: 2 days offline")
+    drain = AsyncMock(return_value=20)
+    with (
+        patch.object(settings, "ENABLE_SCHEDULER", False),
+        patch.object(settings, "DAILY_ROLLOVER_ENABLED", True),
+        patch("application.services.rival_service.rival_service.process_encounter", encounter),
+        patch("application.services.hp_service.hp_service.calculate_daily_drain", drain),
+        patch("application.services.game_loop.dispatcher.dispatch", AsyncMock(return_value="ok")),
+    ):
+        assert not settings.DAILY_ROLLOVER_ACTIVE
+        result = await game_loop.process_message(db_session, "no_scheduler", "hi")
+
+    encounter.assert_awaited_once()
+    drain.assert_awaited_once()
+    assert result.text.startswith("Viper: 2 days offline")
@@ -39,21 +39,17 @@ async def test_executive_bridge_stagnation(mock_session):
     )
 
     # We need to structure the side effects of session.execute
-    # Call 1: Active Quests -> []
-    # Call 2: Active Goals -> [stagnant_goal]
-    # Call 3: Last Quest for Goal -> None (None found)
+    # Call 1: Stale Quests per user -> []
+    # Call 2: Stagnant Goals (latest quest via ROW_NUMBER, else goal creation) -> [stagnant_goal]
 
     # Mock Setup
-    mock_active_quests = MagicMock()
-    mock_active_quests.scalars.return_value.all.return_value = []
+    mock_stale_quests = MagicMock()
+    mock_stale_quests.all.return_value = []
 
-    mock_active_goals = MagicMock()
-    mock_active_goals.scalars.return_value.all.return_value = [stagnant_goal]
+    mock_stagnant_goals = MagicMock()
+    mock_stagnant_goals.all.return_value = [(stagnant_goal.id, user_id, stagnant_goal.title, stagnant_goal.created_at)]
 
-    mock_last_quest = MagicMock()
-    mock_last_quest.scalars.return_value.first.return_value = None
-
-    mock_session.execute.side_effect = [mock_active_quests, mock_active_goals, mock_last_quest]
+    mock_session.execute.side_effect = [mock_stale_quests, mock_stagnant_goals]
 
     # Mock QuestService
     with patch(
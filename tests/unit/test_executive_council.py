@@ -32,14 +32,10 @@ async def test_checkmate_protocol(mock_session):
     goal = Goal(id="g1", user_id=user_id, title="Ignored Goal", status=GoalStatus.ACTIVE.value, created_at=old_date)
 
     mock_goals = MagicMock()
-    mock_goals.scalars.return_value.all.return_value = [goal]
+    mock_goals.all.return_value = [(goal.id, user_id, goal.title, goal.created_at)]  # No quest: goal creation
 
-    # Side effects: [Active Quests=[], Active Goals=[goal], Last Quest=None]
-    mock_session.execute.side_effect = [
-        MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))),
-        mock_goals,
-        MagicMock(scalars=MagicMock(return_value=MagicMock(first=MagicMock(return_value=None)))),
-    ]
+    # Side effects: [Stale Quests=[], Stagnant Goals=[goal]]
+    mock_session.execute.side_effect = [MagicMock(all=MagicMock(return_value=[])), mock_goals]
 
     action = await brain_service.execute_system_judgment(mock_session, user_id)
 
@@ -59,7 +55,7 @@ async def test_reality_sync_overload(mock_session):
     user_id = "test_user"
 
     # Mock clean state (No quests, No goals)
-    mock_session.execute.return_value.scalars.return_value.all.return_value = []
+    mock_session.execute.return_value.all.return_value = []
 
     # Mock _get_external_load on ExecutiveService
     # We need to access the instance inside brain_service or patch the class method
@@ -13,7 +13,7 @@ def mock_session():
     session = AsyncMock()
     # Mock execute result
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = []
+    mock_result.all.return_value = []
     session.execute.return_value = mock_result
     return session
 
@@ -28,21 +28,14 @@ async def test_executive_judgment_overwhelm(mock_session):
     brain_service = BrainService()
     user_id = "test_user"
 
-    # Mock Active Quests that are OLD (3 days old)
-    old_date = datetime.datetime.now() - datetime.timedelta(days=3)
-    stale_quests = [
-        Quest(id="q1", user_id=user_id, status=QuestStatus.ACTIVE.value, created_at=old_date),
-        Quest(id="q2", user_id=user_id, status=QuestStatus.ACTIVE.value, created_at=old_date),
-    ]
-
     # Mock DB Query Responses
-    # Call 1: Active Quests -> stale_quests
-    # Call 2: Active Goals -> [] (Empty, so we don't trigger bridge logic check)
+    # Call 1: Stale active quests per user -> 2 for this user
+    # Call 2: Stagnant goals -> [] (Empty, so we don't trigger bridge logic check)
     mock_quests_result = MagicMock()
-    mock_quests_result.scalars.return_value.all.return_value = stale_quests
+    mock_quests_result.all.return_value = [(user_id, 2)]
 
     mock_goals_result = MagicMock()
-    mock_goals_result.scalars.return_value.all.return_value = []
+    mock_goals_result.all.return_value = []
 
     mock_session.execute.side_effect = [mock_quests_result, mock_goals_result]
 
@@ -72,19 +65,13 @@ async def test_executive_judgment_normal(mock_session):
     brain_service = BrainService()
     user_id = "test_user"
 
-    # Mock Active Quests that are NEW (0 days old)
-    new_date = datetime.datetime.now()
-    fresh_quests = [
-        Quest(id="q1", user_id=user_id, status=QuestStatus.ACTIVE.value, created_at=new_date),
-    ]
-
-    # Call 1: Active Quests -> fresh_quests
-    # Call 2: Active Goals -> []
+    # Call 1: Stale active quests per user -> none (fresh quests are filtered out in SQL)
+    # Call 2: Stagnant goals -> []
     mock_quests_result = MagicMock()
-    mock_quests_result.scalars.return_value.all.return_value = fresh_quests
+    mock_quests_result.all.return_value = []
 
     mock_goals_result = MagicMock()
-    mock_goals_result.scalars.return_value.all.return_value = []
+    mock_goals_result.all.return_value = []
 
     mock_session.execute.side_effect = [mock_quests_result, mock_goals_result]
 
@@ -94,3 +81,48 @@ async def test_executive_judgment_normal(mock_session):
         action = await brain_service.execute_system_judgment(mock_session, user_id)
         assert action is None
         mock_adjust.assert_not_called()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_detect_stagnation_scans_all_users_in_two_queries(db_session):
+    from sqlalchemy import event
+
+    from app.models.quest import Goal, GoalStatus
+    from application.services.brain.executive_service import ExecutiveService
+
+    now = datetime.datetime(2026, 2, 3, 12, 0)
+    days = lambda n: now - datetime.timedelta(days=n)  # noqa: E731
+    db_session.add_all(
+        [
+            # u1: overwhelmed (2 stale active quests) and a goal last touched 10 days ago
+            Goal(id="g1", user_id="u1", title="Rust", status=GoalStatus.ACTIVE.value, created_at=days(60)),
+            Quest(id="q1", user_id="u1", goal_id="g1", title="old", status="DONE", created_at=days(20)),
+            Quest(id="q2", user_id="u1", goal_id="g1", title="a", status="ACTIVE", created_at=days(10)),
+            Quest(id="q3", user_id="u1", title="b", status="ACTIVE", created_at=days(4)),
+            # u2: goal with a fresh quest, plus an old quest on the same goal
+            Goal(id="g2", user_id="u2", title="Piano", status=GoalStatus.ACTIVE.value, created_at=days(90)),
+            Quest(id="q4", user_id="u2", goal_id="g2", title="c", status="DONE", created_at=days(40)),
+            Quest(id="q5", user_id="u2", goal_id="g2", title="d", status="ACTIVE", created_at=days(1)),
+            # u3: goal without quests, created 40 days ago; archived goals are ignored
+            Goal(id="g3", user_id="u3", title="Run", status=GoalStatus.ACTIVE.value, created_at=days(40)),
+            Goal(id="g4", user_id="u3", title="Old", status=GoalStatus.ARCHIVED.value, created_at=days(400)),
+        ]
+    )
+    await db_session.commit()
+
+    statements = []
+    record = statements.append
+    event.listen(db_session.sync_session, "do_orm_execute", record)
+    reports = await ExecutiveService().detect_stagnation(db_session, now=now)
+    event.remove(db_session.sync_session, "do_orm_execute", record)
+
+    assert len(statements) == 2
+    assert set(reports) == {"u1", "u3"}
+    assert reports["u1"].stale_quests == 2
+    assert [(g.goal_id, g.days_since) for g in reports["u1"].goals] == [("g1", 10)]
+    assert reports["u3"].stale_quests == 0
+    assert [(g.goal_id, g.days_since) for g in reports["u3"].goals] == [("g3", 40)]
+
+    scoped = await ExecutiveService().detect_stagnation(db_session, ["u3"], now=now)
+    assert set(scoped) == {"u3"}
@@ -15,14 +15,7 @@ TEST_DB_PATH = "./test_kuzu_graph_chain_db"
 @pytest.fixture
 @pytest.mark.skipif(os.environ.get("TESTING") == "1", reason="Skipping Kuzu Graph tests in CI/Mock environment")
 def graph_adapter():
-    # Nuclear Isolation: Load Class from Source directly
-    import importlib.util
-
-    adapter_path = os.path.join(os.getcwd(), "adapters/persistence/kuzu/adapter.py")
-    spec = importlib.util.spec_from_file_location("adapters.persistence.kuzu.adapter", adapter_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    KuzuAdapter = module.KuzuAdapter
+    from adapters.persistence.kuzu.adapter import KuzuAdapter
 
     def cleanup():
         if os.path.exists(TEST_DB_PATH):
@@ -89,7 +82,7 @@ def test_get_unlockable_templates(graph_adapter):
     # 4. User Complete Q1
     # Mock completion relationship
     graph_adapter.conn.execute(f"CREATE (u:User {{id: '{user_id}', name: '{user_id}'}})")
-    graph_adapter.conn.execute(
+    graph_adapter.query(
         f"MATCH (u:User {{name: '{user_id}'}}), (q:Quest {{id: 'Q1'}}) CREATE (u)-[:COMPLETED]->(q)"
     )
 
@@ -104,7 +97,7 @@ def test_get_unlockable_templates(graph_adapter):
     assert "Q3" not in ids  # Still locked (needs Q2)
 
     # 5. User Complete Q2
-    graph_adapter.conn.execute(
+    graph_adapter.query(
         f"MATCH (u:User {{name: '{user_id}'}}), (q:Quest {{id: 'Q2'}}) CREATE (u)-[:COMPLETED]->(q)"
     )
 
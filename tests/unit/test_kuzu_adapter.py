@@ -14,14 +14,7 @@ QUERY_PATH = "./test_kuzu_db"
 @pytest.fixture
 def adapter():
     # Setup
-    import importlib.util
-    import os
-
-    adapter_path = os.path.join(os.getcwd(), "adapters/persistence/kuzu/adapter.py")
-    spec = importlib.util.spec_from_file_location("adapters.persistence.kuzu.adapter", adapter_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    KuzuAdapter = module.KuzuAdapter
+    from adapters.persistence.kuzu.adapter import KuzuAdapter
 
     if os.path.exists(QUERY_PATH):
         if os.path.isdir(QUERY_PATH):
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+
+from adapters.persistence.kuzu.event_sink import KuzuEventSink
+
+
+def _event(i: int) -> dict:
+    return {"id": f"e{i}", "user_id": "u1", "type": "ACTION", "timestamp": i, "metadata": "{}"}
+
+
+def test_events_are_written_in_batches_off_the_caller_thread():
+    batches, threads = [], []
+
+    def write(batch):
+        batches.append(list(batch))
+        threads.append(threading.current_thread().name)
+
+    sink = KuzuEventSink(write, flush_interval=0.05, batch_size=100)
+    for i in range(250):
+        assert sink.submit(_event(i))
+    assert sink.flush(5)
+    sink.stop()
+
+    assert sum(len(b) for b in batches) == 250
+    assert len(batches) <= 3  # 100 + 100 + 50, not one write per event
+    assert set(threads) == {"kuzu-graph-writer"}
+    metrics = sink.metrics()
+    assert metrics["written"] == 250 and metrics["queue_depth"] == 0 and metrics["flush_max_ms"] >= 0
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+    sink = KuzuEventSink(lambda batch: release.wait(5), max_queue=2, flush_interval=0.01, batch_size=1)
+
+    accepted = [sink.submit(_event(i)) for i in range(20)]
+    release.set()
+    sink.flush(5)
+    sink.stop()
+
+    assert accepted.count(False) == sink.metrics()["dropped"] > 0
+    assert sink.metrics()["written"] == accepted.count(True)
+
+
+def test_journaled_events_are_replayed_after_a_crash(tmp_path):
+    spill = tmp_path / "events.jsonl"
+    spill.write_text("".join(json.dumps(_event(i)) + "\n" for i in range(3)))  # Left by a crashed process
+    written = []
+
+    sink = KuzuEventSink(written.extend, flush_interval=0.01, spill_path=str(spill))
+    sink.submit(_event(3))
+    assert sink.flush(5)
+    sink.stop()
+
+    assert [e["id"] for e in written] == ["e0", "e1", "e2", "e3"]
+    assert sink.metrics()["replayed"] == 3
+    assert spill.read_text() == ""  # Truncated once the writer caught up
+
+
+def test_failed_write_is_retried_and_the_journal_kept_until_it_succeeds(tmp_path):
+    spill = tmp_path / "events.jsonl"
+    written, failing = [], threading.Event()
+    failing.set()
+
+    def write(batch):
+        if failing.is_set():
+            raise RuntimeError("IO exception: Could not set lock on file")
+        written.extend(batch)
+
+    sink = KuzuEventSink(write, flush_interval=0.01, spill_path=str(spill))
+    sink.submit(_event(0))
+    sink.submit(_event(1))
+    assert not sink.flush(0.2)  # Still failing: nothing written, nothing dropped
+
+    assert sink.metrics()["failed"] >= 1 and written == []
+    assert len(spill.read_text().splitlines()) == 2  # Journal survives the failed writes
+    failing.clear()
+    assert sink.flush(5)
+    sink.stop()
+
+    assert [e["id"] for e in written] == ["e0", "e1"]
+    assert spill.read_text() == ""
+
+
+def test_stop_returns_with_a_full_queue_and_a_failing_writer(tmp_path):
+    spill = tmp_path / "events.jsonl"
+
+    def write(batch):
+        raise RuntimeError("IO exception: Could not set lock on file")
+
+    sink = KuzuEventSink(write, max_queue=5, flush_interval=0.01, spill_path=str(spill))
+    sink.submit(_event(0))
+    for _ in range(200):
+        if sink.metrics()["failed"]:
+            break
+        time.sleep(0.01)
+    accepted = [sink.submit(_event(i)) for i in range(1, 20)]  # Backing off: these stay queued
+    assert accepted.count(False) > 0
+    thread = sink._thread
+
+    stopper = threading.Thread(target=sink.stop, kwargs={"timeout": 2})
+    stopper.start()
+    stopper.join(5)
+
+    assert not stopper.is_alive() and not thread.is_alive()
+    assert len(spill.read_text().splitlines()) == 1 + accepted.count(True)  # Kept for the next start
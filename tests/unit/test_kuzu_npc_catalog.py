@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from adapters.persistence.kuzu.adapter import KuzuAdapter
+
+CATALOG_ROWS = [
+    ["viper", "Viper", "Strict Mentor", "Stern", "Competitor", [["HATES", "Procrastination"], ["LIKES", "Exercise"]]],
+    ["shadow", "Shadow", "Mysterious Guide", "Neutral", "Observer", [[None, None]]],
+]
+
+
+def _adapter():
+    adapter = KuzuAdapter(db_path="unused")
+    adapter._initialized = True
+    adapter.conn = MagicMock()
+    statements = MagicMock()
+
+    def rows(query, params=None):
+        if "KNOWS" in query:
+            return [["viper", [7], [1700000000]], ["shadow", None, None]]
+        return CATALOG_ROWS
+
+    statements.rows.side_effect = rows
+    adapter._statements = lambda: statements
+    return adapter, statements
+
+
+def _catalog_loads(statements: MagicMock) -> int:
+    return sum("collect([label(r)" in c.args[0] for c in statements.rows.call_args_list)
+
+
+def test_catalog_is_loaded_once_for_every_npc():
+    adapter, statements = _adapter()
+
+    first = adapter.get_npc_contexts()
+    adapter.get_npc_contexts()
+
+    assert _catalog_loads(statements) == 1
+    assert first[0]["likes"] == ["Exercise"] and first[0]["hates"] == ["Procrastination"]
+    assert first[1]["likes"] == [] and first[1]["cares_about"] == []
+
+    first[0]["likes"].append("Mutated")  # Callers get copies
+    assert adapter.get_npc_catalog()[0]["likes"] == ["Exercise"]
+
+
+def test_user_relationships_come_from_one_query():
+    adapter, statements = _adapter()
+
+    contexts = {npc["name"]: npc for npc in adapter.get_npc_contexts(user_id="u1")}
+
+    assert sum("KNOWS" in c.args[0] for c in statements.rows.call_args_list) == 1
+    assert contexts["Viper"]["intimacy"] == 7 and contexts["Viper"]["last_interaction"] == 1700000000
+    assert contexts["Shadow"]["intimacy"] == 0 and contexts["Shadow"]["last_interaction"] is None
+
+
+@pytest.mark.asyncio
+async def test_writes_to_npcs_or_concepts_invalidate_the_catalog():
+    adapter, statements = _adapter()
+    assert (await adapter.get_npc_context("Viper"))["role"] == "Strict Mentor"
+
+    adapter.add_node("User", {"id": "u1"})
+    adapter.query("MATCH (n:NPC) RETURN n.name")
+    await adapter.get_npc_context("Viper")
+    assert _catalog_loads(statements) == 1
+
+    adapter.add_node("Concept", {"name": "Focus"})
+    await adapter.get_npc_context("Viper")
+    adapter.query("MERGE (n:NPC {id: $id})", {"id": "nova"})
+    assert (await adapter.get_npc_context("Nova"))["role"] == "Unknown"
+    assert _catalog_loads(statements) == 3
+
+
+def test_intimacy_updates_merge_the_knows_edge_and_track_new_npcs():
+    adapter, statements = _adapter()
+    adapter.get_npc_contexts()
+
+    assert adapter.adjust_npc_intimacy("u1", "viper", 2)
+    cypher, params = statements.execute.call_args.args
+    assert "MERGE (u)-[r:KNOWS]->(n)" in cypher and "r.intimacy = r.intimacy + $delta" in cypher
+    assert params["user_id"] == "u1" and params["npc_id"] == "viper" and params["delta"] == 2
+    adapter.get_npc_contexts()
+    assert _catalog_loads(statements) == 1
+
+    adapter.adjust_npc_intimacy("u1", "nova", 0)  # MERGE creates an NPC the catalog does not have
+    adapter.get_npc_contexts()
+    assert _catalog_loads(statements) == 2
@@ -0,0 +1,69 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from adapters.persistence.kuzu.pool import KuzuConnectionPool, LatencyHistogram
+
+
+def _pool(size: int = 3) -> KuzuConnectionPool:
+    ids = itertools.count()
+    return KuzuConnectionPool(lambda: f"conn-{next(ids)}", size=size)
+
+
+def test_reads_run_in_parallel_on_pinned_connections():
+    pool = _pool(size=3)
+    barrier = threading.Barrier(3, timeout=5)  # Only passes if 3 reads are in flight together
+
+    def read(conn):
+        barrier.wait()
+        return threading.current_thread().name, conn
+
+    results = [f.result(5) for f in [pool.submit("read", read) for _ in range(3)]]
+    pool.shutdown()
+
+    assert len({name for name, _ in results}) == 3
+    assert len({conn for _, conn in results}) == 3
+
+
+def test_writes_go_through_a_single_writer():
+    pool = _pool()
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def write(conn):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.005)
+        with lock:
+            active[0] -= 1
+        return conn
+
+    async def run():
+        return await asyncio.gather(*[pool.run_write(write) for _ in range(10)])
+
+    conns = asyncio.run(run())
+    metrics = pool.metrics()
+    pool.shutdown()
+
+    assert peak[0] == 1 and len(set(conns)) == 1
+    assert metrics["query_ms"]["write"]["count"] == 10 and metrics["pending"]["write"] == 0
+    assert metrics["wait_ms"]["write"]["max_ms"] > 0  # Later writes queued behind earlier ones
+
+
+def test_nested_call_on_the_same_lane_runs_inline():
+    pool = _pool(size=1)
+
+    result = pool.read(lambda conn: pool.read(lambda inner: (conn, inner)))
+    pool.shutdown()
+
+    assert result[0] == result[1]
+
+
+@pytest.mark.parametrize("ms, bucket", [(0.4, "le_1"), (7, "le_10"), (5000, "inf")])
+def test_histogram_buckets(ms, bucket):
+    histogram = LatencyHistogram()
+    histogram.observe(ms)
+    assert histogram.snapshot()["buckets"][bucket] == 1
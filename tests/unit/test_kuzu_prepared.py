@@ -0,0 +1,51 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from adapters.persistence.kuzu.prepared import PreparedConnection, identifier
+
+
+def _conn() -> MagicMock:
+    conn = MagicMock()
+    conn.prepare.side_effect = lambda query: MagicMock(query=query, is_success=MagicMock(return_value=True))
+    return conn
+
+
+def test_statements_are_prepared_once_and_reused_with_new_parameters():
+    conn = _conn()
+    prepared = PreparedConnection(conn)
+    query = "MATCH (u:User {id: $user_id}) RETURN u.name"
+
+    prepared.execute(query, {"user_id": "u1"})
+    prepared.execute(query, {"user_id": "u2"})
+
+    conn.prepare.assert_called_once_with(query)
+    statement = conn.execute.call_args_list[0].args[0]
+    assert [c.args for c in conn.execute.call_args_list] == [
+        (statement, {"user_id": "u1"}),
+        (statement, {"user_id": "u2"}),
+    ]
+    assert prepared.stats == {"hits": 1, "misses": 1}
+
+
+def test_cache_is_bounded_and_failed_prepares_are_not_cached():
+    conn = _conn()
+    prepared = PreparedConnection(conn)
+    prepared.CACHE_SIZE = 2
+    for i in range(3):
+        prepared.prepare(f"RETURN {i}")
+    assert list(prepared._cache) == ["RETURN 1", "RETURN 2"]
+
+    conn.prepare.side_effect = lambda query: MagicMock(
+        is_success=MagicMock(return_value=False), get_error_message=MagicMock(return_value="Parser exception")
+    )
+    with pytest.raises(RuntimeError, match="Parser exception"):
+        prepared.prepare("MATCH (")
+    assert "MATCH (" not in prepared._cache
+
+
+def test_identifier_rejects_anything_but_plain_names():
+    assert identifier("CARES_ABOUT") == "CARES_ABOUT"
+    for bad in ("User {id: 'x'}", "X) DETACH DELETE a //", "", "1abc"):
+        with pytest.raises(ValueError):
+            identifier(bad)
@@ -0,0 +1,102 @@
+import datetime
+import json
+from unittest.mock import MagicMock
+
+from adapters.persistence.kuzu.retention import KuzuEventRetention
+
+DAY = 86400
+T0 = int(datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _adapter(events: list, stored: list, tmp_path) -> MagicMock:
+    """Fake adapter whose graph holds `events`; deletes remove them, summaries are captured."""
+    adapter = MagicMock()
+    adapter.db_path = str(tmp_path / "graph")
+    adapter._run.side_effect = lambda lane, fn, *args: fn(*args)
+    adapter.query.return_value = [["Discipline"], ["Exercise"]]
+    statements = adapter._statements.return_value
+    written = []
+
+    def rows(query, params=None):
+        if "ORDER BY e.timestamp LIMIT" in query:
+            old = sorted((e for e in events if e[3] < params["cutoff"]), key=lambda e: e[3])
+            return old[: params["limit"]]
+        if "DailySummary" in query:
+            return [s for s in stored if s[0] in params["ids"]]
+        return []
+
+    def execute(query, params=None):
+        if "DETACH DELETE" in query:
+            events[:] = [e for e in events if e[0] not in params["ids"]]
+        elif "MERGE (d:DailySummary" in query:
+            written.extend(params["summaries"])
+            for summary in params["summaries"]:
+                stored[:] = [row for row in stored if row[0] != summary["id"]]
+                stored.append([summary["id"], summary["events"], summary["type_counts"], summary["concept_counts"]])
+
+    statements.rows.side_effect = rows
+    statements.execute.side_effect = execute
+    adapter.written = written
+    return adapter
+
+
+def test_old_events_are_rolled_up_per_user_day_and_deleted_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.KUZU_EVENT_RETENTION_DAYS", 30)
+    monkeypatch.setattr("app.core.config.settings.KUZU_EVENT_COMPACTION_BATCH_SIZE", 2)
+    events = [
+        ["e1", "u1", "CHAT", T0 + 10, "{'text': 'more discipline'}"],
+        ["e2", "u1", "CHAT", T0 + 20, "{}"],
+        ["e3", "u1", "QUEST_DONE", T0 + 30, "{'tags': 'Exercise, discipline'}"],
+        ["e4", "u2", "CHAT", T0 + DAY, "{}"],
+        ["recent", "u1", "CHAT", T0 + 100 * DAY, "{}"],
+    ]
+    adapter = _adapter(events, [], tmp_path)
+
+    stats = KuzuEventRetention(adapter).run(now=datetime.datetime.fromtimestamp(T0 + 60 * DAY, datetime.timezone.utc))
+
+    assert [e[0] for e in events] == ["recent"]
+    assert stats["events_deleted"] == 4 and stats["chunks"] == 2 and stats["users"] == 2
+    final = {s["id"]: s for s in adapter.written}  # u1's day is split across both chunks
+    u1 = final["u1:2026-01-01"]
+    assert u1["events"] == 3
+    assert json.loads(u1["type_counts"]) == {"CHAT": 2, "QUEST_DONE": 1}
+    assert json.loads(u1["concept_counts"]) == {"Discipline": 2, "Exercise": 1}
+    assert {c.args[0] for c in adapter.recent_events.invalidate.call_args_list} == {"u1", "u2"}
+    assert json.loads(final["u2:2026-01-02"]["type_counts"]) == {"CHAT": 1}
+
+
+def test_concepts_are_counted_from_whole_words_of_the_metadata(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.KUZU_EVENT_RETENTION_DAYS", 30)
+    events = [
+        ["e1", "u1", "ACTION", T0, "{'text': 'Exercise'}"],
+        ["e2", "u1", "ACTION", T0 + 10, "{'text': 'an interaction, then action'}"],
+    ]
+    adapter = _adapter(events, [], tmp_path)
+    adapter.query.return_value = [["Action"], ["Exercise"]]
+
+    KuzuEventRetention(adapter).run(now=datetime.datetime.fromtimestamp(T0 + 60 * DAY, datetime.timezone.utc))
+
+    (summary,) = adapter.written
+    assert json.loads(summary["concept_counts"]) == {"Exercise": 1, "Action": 1}
+
+
+def test_chunk_folds_into_the_stored_summary(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.KUZU_EVENT_RETENTION_DAYS", 30)
+    monkeypatch.setattr("app.core.config.settings.KUZU_EVENT_COMPACTION_BATCH_SIZE", 10)
+    events = [["e1", "u1", "CHAT", T0, "{'text': 'Exercise'}"]]
+    stored = [["u1:2026-01-01", 4, json.dumps({"CHAT": 3, "QUEST_DONE": 1}), json.dumps({"Exercise": 2})]]
+    adapter = _adapter(events, stored, tmp_path)
+
+    KuzuEventRetention(adapter).run(now=datetime.datetime.fromtimestamp(T0 + 60 * DAY, datetime.timezone.utc))
+
+    (summary,) = adapter.written
+    assert summary["events"] == 5
+    assert json.loads(summary["type_counts"]) == {"CHAT": 4, "QUEST_DONE": 1}
+    assert json.loads(summary["concept_counts"]) == {"Exercise": 3}
+    conn = adapter._statements.return_value.conn
+    assert [c.args[0] for c in conn.execute.call_args_list] == [
+        "CHECKPOINT",
+        "BEGIN TRANSACTION",
+        "COMMIT",
+        "CHECKPOINT",
+    ]
@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+from adapters.persistence.kuzu import schema
+
+
+class FakeStatements:
+    """PreparedConnection stand-in: a stored marker version (None = no marker table) and recorded writes."""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.reads = 0
+        self.writes = []
+        self.conn = MagicMock()
+
+    def rows(self, query, params=None):
+        self.reads += 1
+        if self.version is None:
+            raise RuntimeError("Binder exception: Table SchemaVersion does not exist.")
+        return [[self.version]]
+
+    def execute(self, query, params=None):
+        self.writes.append((query, params))
+
+
+def _marker_versions(statements):
+    return [params["version"] for query, params in statements.writes if "SchemaVersion" in query]
+
+
+def test_fresh_graph_applies_every_migration_and_records_each_step():
+    statements, timings = FakeStatements(), {}
+
+    applied = schema.migrate(statements, timings)
+
+    assert [m.version for m in applied] == [1, 2, 3]
+    assert _marker_versions(statements) == [1, 2, 3]
+    ddl = [c.args[0] for c in statements.conn.execute.call_args_list]
+    assert ddl[0].startswith("CREATE NODE TABLE IF NOT EXISTS SchemaVersion")
+    assert all("IF NOT EXISTS" in statement for statement in ddl)
+    assert {"schema_version", "migration_1_core_schema", "migration_3_seed_npcs_and_concepts"} <= set(timings)
+
+
+def test_up_to_date_graph_is_a_single_read():
+    statements, timings = FakeStatements(version=schema.LATEST_VERSION), {}
+
+    assert schema.migrate(statements, timings) == []
+    assert statements.reads == 1 and statements.writes == []
+    statements.conn.execute.assert_not_called()
+    assert list(timings) == ["schema_version"]
+
+
+def test_only_missing_steps_are_applied():
+    statements = FakeStatements(version=2)
+
+    applied = schema.migrate(statements, {})
+
+    assert [m.name for m in applied] == ["seed_npcs_and_concepts"]
+    assert _marker_versions(statements) == [3]
+    # Seeding is data only; the one DDL statement is the marker table guard
+    assert statements.conn.execute.call_count == 1
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adapters.persistence.kuzu.ipc import encode_frame, read_frame
+from adapters.persistence.kuzu.sidecar import KuzuSidecarServer
+from adapters.persistence.kuzu.sidecar_client import KuzuSidecarClient, KuzuSidecarError
+
+
+class FakeAdapter:
+    """Stands in for KuzuAdapter: slow reads, recorded writes."""
+
+    def __init__(self):
+        self.events = []
+        self.batch_sizes = []
+        self.closed = False
+
+    async def initialize(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def record_user_event(self, user_id, event_type, metadata):
+        self.events.append((user_id, event_type, metadata))
+        return True
+
+    def get_user_history(self, user_id, limit=10):
+        time.sleep(0.2)
+        return [{"id": str(i), "type": e[1], "metadata": e[2]} for i, e in enumerate(self.events) if e[0] == user_id]
+
+    def query(self, cypher, params=None):
+        raise RuntimeError("Parser exception")
+
+    async def get_npc_context(self, npc_name):
+        return {"name": npc_name, "role": "Mentor"}
+
+
+@pytest.fixture
+def sidecar(tmp_path):
+    adapter = FakeAdapter()
+    server = KuzuSidecarServer(adapter, str(tmp_path / "graph.sock"))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    client = KuzuSidecarClient(server.socket_path, timeout=5)
+    yield adapter, server, client
+    client.close()
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    assert adapter.closed
+
+
+@pytest.mark.asyncio
+async def test_frames_round_trip():
+    reader = asyncio.StreamReader()
+    reader.feed_data(encode_frame({"id": 1, "op": "query", "args": ["MATCH (n) RETURN n", {"名": "值"}]}))
+    reader.feed_eof()
+
+    assert (await read_frame(reader))["args"][1] == {"名": "值"}
+    assert await read_frame(reader) is None  # Clean EOF between frames
+
+
+def test_events_are_batched_and_flushed_before_history_reads(sidecar):
+    adapter, server, client = sidecar
+    for i in range(20):
+        assert client.record_user_event("u1", "CHAT", {"n": i})
+
+    history = client.get_user_history("u1")
+
+    assert len(history) == 20 and history[3]["metadata"] == "{'n': 3}"
+    assert server.stats["batched_calls"] == 20 and client.stats["batches"] == 1
+
+
+def test_pipelined_reads_share_one_connection(sidecar):
+    adapter, server, client = sidecar
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: client.get_user_history(f"u{i}"), range(8)))
+
+    assert results == [[]] * 8
+    assert time.perf_counter() - t0 < 8 * 0.2 / 2  # Served concurrently, not one after another
+    assert client.stats["connects"] == 1 and server.stats["connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_come_back_to_the_caller(sidecar):
+    adapter, server, client = sidecar
+
+    with pytest.raises(KuzuSidecarError, match="Parser exception"):
+        await asyncio.to_thread(client.query, "MATCH (n) RETURN n")
+    with pytest.raises(KuzuSidecarError, match="Unsupported"):
+        await asyncio.to_thread(client._call, "close")
+    assert (await client.get_npc_context("Viper"))["role"] == "Mentor"
+    assert await asyncio.to_thread(client.get_unlockable_templates, "u1") == []  # Unsupported by the fake
@@ -0,0 +1,157 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from linebot.v3.messaging import TextMessage
+from linebot.v3.messaging.exceptions import ApiException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from adapters.perception.line_delivery import LineDeliveryQueue, TokenBucket
+from app.core.config import settings
+from app.models.delivery import LineDeadLetter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _api_error(status: int, headers: dict | None = None) -> ApiException:
+    error = ApiException(status=status, reason="error")
+    error.headers = headers or {}
+    return error
+
+
+def _api(push_side_effect=None, quota_type="none", quota_value=0, used=0) -> MagicMock:
+    api = MagicMock()
+    api.push_message = AsyncMock(side_effect=push_side_effect)
+    api.get_message_quota = AsyncMock(return_value=MagicMock(type=quota_type, value=quota_value))
+    api.get_message_quota_consumption = AsyncMock(return_value=MagicMock(total_usage=used))
+    return api
+
+
+def _queue(api, clock, db_session=None) -> LineDeliveryQueue:
+    factory = async_sessionmaker(db_session.bind, expire_on_commit=False) if db_session else None
+    return LineDeliveryQueue(api_factory=lambda: api, session_factory=factory, sleep=clock.sleep, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_calls_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+
+    for _ in range(25):
+        await bucket.acquire()
+
+    assert clock.now == pytest.approx(2.0)  # 5 from the burst, then 20 at 10/s
+
+
+@pytest.mark.asyncio
+async def test_429_waits_for_retry_after_then_sends():
+    clock = FakeClock()
+    api = _api(push_side_effect=[_api_error(429, {"Retry-After": "7"}), None])
+    queue = _queue(api, clock)
+
+    queue.push("U1", [TextMessage(text="hi")])
+    await queue.drain()
+    await queue.stop()
+
+    assert api.push_message.await_count == 2
+    assert 7.0 in clock.sleeps
+    assert queue.stats["sent"] == 1 and queue.stats["retried"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_block_the_queue():
+    clock = FakeClock()
+    release = asyncio.Event()
+
+    async def sleep(seconds: float) -> None:
+        clock.sleeps.append(seconds)
+        if seconds >= 30:
+            await release.wait()  # The failed push's backoff
+        clock.now += seconds
+
+    api = _api(push_side_effect=[_api_error(503, {"Retry-After": "30"}), None, None])
+    queue = LineDeliveryQueue(api_factory=lambda: api, sleep=sleep, clock=clock)
+
+    queue.push("U1", [TextMessage(text="first")])
+    queue.push("U2", [TextMessage(text="second")])
+    for _ in range(100):
+        if api.push_message.await_count == 2:
+            break
+        await asyncio.sleep(0)
+
+    assert [c.args[0].to for c in api.push_message.await_args_list] == ["U1", "U2"]
+    release.set()
+    await queue.drain()
+    await queue.stop()
+
+    assert api.push_message.await_args.args[0].to == "U1"
+    assert queue.stats["sent"] == 2 and queue.stats["retried"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_push_is_dead_lettered_but_not_replayed(db_session):
+    clock = FakeClock()
+    api = _api(push_side_effect=[_api_error(403)])
+    queue = _queue(api, clock, db_session)
+
+    queue.push("U1", [TextMessage(text="night report")])
+    await queue.drain()
+    await queue.stop()
+
+    row = (await db_session.execute(select(LineDeadLetter))).scalars().one()
+    assert row.recipients == ["U1"] and row.status_code == 403 and row.replayed_at is None
+    assert await queue.replay_dead_letters(db_session) == 0  # Blocked user / bad payload: not worth retrying
+
+
+@pytest.mark.asyncio
+async def test_retryable_dead_letters_are_replayed_up_to_the_cap(db_session):
+    clock = FakeClock()
+    api = _api()
+    queue = _queue(api, clock, db_session)
+    payload = [TextMessage(text="night report").to_dict()]
+    row = LineDeadLetter(kind="push", recipients=["U1"], messages=payload, status_code=503, attempts=5)
+    spent = LineDeadLetter(
+        kind="push",
+        recipients=["U2"],
+        messages=payload,
+        status_code=503,
+        replays=settings.LINE_DEAD_LETTER_MAX_REPLAYS,
+    )
+    db_session.add_all([row, spent])
+    await db_session.commit()
+
+    assert await queue.replay_dead_letters(db_session) == 1
+    await queue.drain()
+    await queue.stop()
+
+    await db_session.refresh(row)
+    assert row.replayed_at is not None and row.replays == 1
+    assert api.push_message.await_args.args[0].messages[0].text == "night report"
+    assert api.push_message.await_args.args[0].to == "U1"
+
+
+@pytest.mark.asyncio
+async def test_exhausted_quota_dead_letters_without_calling_push(db_session):
+    clock = FakeClock()
+    api = _api(quota_type="limited", quota_value=200, used=200)
+    queue = _queue(api, clock, db_session)
+
+    queue.push("U1", [TextMessage(text="hi")])
+    await queue.drain()
+    await queue.stop()
+
+    api.push_message.assert_not_awaited()
+    row = (await db_session.execute(select(LineDeadLetter))).scalars().one()
+    assert row.error == "quota_exhausted"
@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from linebot.v3.messaging import AsyncApiClient, AsyncMessagingApi, Configuration, TextMessage
+
+from adapters.perception.line_client import LineClient
+
+
+class FakeLineServer:
+    """Minimal LINE Messaging API stand-in that records every outbound call."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, dict]] = []
+        self.runner = None
+        self.base_url = ""
+
+    async def _multicast(self, request: web.Request) -> web.Response:
+        self.calls.append(("multicast", await request.json()))
+        return web.json_response({})
+
+    async def _push(self, request: web.Request) -> web.Response:
+        self.calls.append(("push", await request.json()))
+        return web.json_response({"sentMessages": [{"id": "1", "quoteToken": "q"}]})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/v2/bot/message/multicast", self._multicast)
+        app.router.add_post("/v2/bot/message/push", self._push)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def test_plan_groups_identical_payloads_and_splits_at_limit():
+    client = LineClient()
+    same = [TextMessage(text="🛒 黑市已更新")]
+    deliveries = [(f"U{i}", same) for i in range(1001)] + [("Ux", [TextMessage(text="hi Ux")])]
+
+    multicasts, pushes = client.plan_delivery(deliveries)
+
+    assert [len(to) for to, _ in multicasts] == [500, 500, 1]
+    assert pushes == [("Ux", deliveries[-1][1])]
+
+
+@pytest.mark.asyncio
+async def test_deliver_uses_multicast_against_fake_line_server():
+    shop = [TextMessage(text="🛒 黑市已更新，稀有貨物已上架。")]
+    deliveries = [(f"U{i:04d}", [TextMessage(text="🛒 黑市已更新，稀有貨物已上架。")]) for i in range(1203)]
+    deliveries += [("Ualice", [TextMessage(text="早安 Alice")]), ("Ubob", [TextMessage(text="早安 Bob")])]
+
+    async with FakeLineServer() as server:
+        api_client = AsyncApiClient(Configuration(host=server.base_url, access_token="test"))
+        try:
+            with patch("adapters.perception.line_client.get_messaging_api", return_value=AsyncMessagingApi(api_client)):
+                stats = await LineClient().deliver(deliveries)
+        finally:
+            await api_client.close()
+
+    multicasts = [body for kind, body in server.calls if kind == "multicast"]
+    pushes = [body for kind, body in server.calls if kind == "push"]
+    assert len(server.calls) == 5  # Instead of 1205 pushes
+    assert [len(body["to"]) for body in multicasts] == [500, 500, 203]
+    assert multicasts[0]["messages"] == [m.to_dict() for m in shop]
+    assert sorted(body["to"] for body in pushes) == ["Ualice", "Ubob"]
+    assert stats == {"recipients": 1205, "multicast_calls": 3, "push_calls": 2, "failed": 0}
@@ -19,15 +19,7 @@ def mock_dependencies():
     ):
         # Mock Graph (via Container)
         mock_graph_service = MagicMock()
-        mock_cursor = MagicMock()
-        mock_cursor.has_next.side_effect = [True, False]
-        mock_cursor.get_next.return_value = ["Viper", "Mentor"]
-        # query returns list now, not cursor wrapper?
-        # Check graph_service.query -> GraphPort.query.
-        # Refactored graph_service.query returns list via adapter.
-        # But old test used cursor wrapper mock.
-        # Let's mock query to return a list
-        mock_graph_service.query.return_value = [["Viper", "Mentor"]]
+        mock_graph_service.get_all_npcs = AsyncMock(return_value=[{"name": "Viper", "role": "Mentor"}])
 
         mock_container.graph_service = mock_graph_service
 
@@ -50,7 +42,7 @@ async def test_perception_service_flow(mock_dependencies):
     result = await service.process_event(event)
 
     assert result.text == "Test Narrative"
-    mock_graph.query.assert_called_once()
+    mock_graph.get_all_npcs.assert_called_once()
     mock_vector.search_memories.assert_called_once()
     mock_brain.think.assert_called_once()
 
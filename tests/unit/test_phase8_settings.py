@@ -1,17 +1,7 @@
-import sys
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
-
-# --- MOCK KUZU BEFORE IMPORTS ---
-mock_kuzu_mod = MagicMock()
-sys.modules["kuzu"] = mock_kuzu_mod
-mock_adapter_mod = MagicMock()
-sys.modules["adapters.persistence.kuzu.adapter"] = mock_adapter_mod
-# --------------------------------
-
-
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -43,13 +33,13 @@ async def mock_kuzu():
     # Patch ContextService
     from application.services.context_service import context_service
 
-    original_kuzu = context_service.kuzu
-    context_service.kuzu = mock_kuzu_instance
+    original_graph = context_service.graph
+    context_service.graph = mock_kuzu_instance
 
     yield mock_kuzu_instance
 
     # Teardown
-    context_service.kuzu = original_kuzu
+    context_service.graph = original_graph
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,65 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.user import User
+from application.services.pulse_service import PulseService
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 3, 2, 4, 0, tzinfo=UTC)  # 12:00 in Asia/Taipei
+
+
+@pytest.mark.asyncio
+async def test_daily_checks_run_once_per_user_day(db_session):
+    user = User(id="pulse_user", name="P", hp=100, push_timezone="Asia/Taipei")
+    db_session.add(user)
+    await db_session.commit()
+
+    service = PulseService()
+    encounter = AsyncMock(return_value="⚠️ Viper 偵測到 2 日離線。")
+    drain = AsyncMock(return_value=20)
+    with (
+        patch("application.services.rival_service.rival_service.process_encounter", encounter),
+        patch("application.services.hp_service.hp_service.calculate_daily_drain", drain),
+    ):
+        first = await service.run(db_session, user, now=NOW)
+        repeats = [await service.run(db_session, user, now=NOW + datetime.timedelta(hours=h)) for h in (1, 2, 3)]
+        tomorrow = await service.run(db_session, user, now=NOW + datetime.timedelta(days=1))
+
+    assert first == {"rival_log": "⚠️ Viper 偵測到 2 日離線。", "drain": 20}
+    assert repeats == [None, None, None]
+    assert tomorrow is not None
+    assert encounter.await_count == 2 and drain.await_count == 2
+    assert user.last_pulse_date == datetime.date(2026, 3, 3)
+    assert service.todays_drain(user, now=NOW + datetime.timedelta(days=1)) == 20
+
+    metrics = service.metrics()
+    assert metrics["messages"] == 5 and metrics["pulses"] == 2 and metrics["skipped_mirror"] == 3
+
+
+@pytest.mark.asyncio
+async def test_column_short_circuits_without_mirror(db_session):
+    """Another process already pulsed today: the loaded row is enough, no queries."""
+    user = User(id="pulse_other", name="O", push_timezone="Asia/Taipei", last_pulse_date=datetime.date(2026, 3, 2))
+    db_session.add(user)
+    await db_session.commit()
+
+    service = PulseService()
+    assert await service.run(db_session, user, now=NOW) is None
+    assert service.metrics()["skipped_column"] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_queries_saved(db_session):
+    user = User(id="pulse_metrics", name="M", hp=100, push_timezone="Asia/Taipei")
+    db_session.add(user)
+    await db_session.commit()
+
+    service = PulseService()
+    for _ in range(10):
+        await service.run(db_session, user, now=NOW)
+
+    metrics = service.metrics()
+    assert metrics["pulses"] == 1 and metrics["queries_per_pulse"] >= 1
+    assert metrics["queries_saved"] == 9 * metrics["queries_per_pulse"]
@@ -0,0 +1,84 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.dda import PushSchedule
+from app.models.user import User
+from application.services.push_schedule_service import push_schedule_service
+from application.services.scheduler import dda_scheduler
+
+UTC = datetime.timezone.utc
+# 08:20 in Asia/Taipei
+NOW = datetime.datetime(2026, 3, 2, 0, 20, tzinfo=UTC)
+TOMORROW_MORNING = datetime.datetime(2026, 3, 3, 0, 0, tzinfo=UTC)
+
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+def test_next_occurrence_uses_local_time_and_skip_date():
+    after = datetime.datetime(2026, 3, 1, 23, 30, tzinfo=UTC)  # 07:30 Taipei
+    assert push_schedule_service.next_occurrence("08:00", "Asia/Taipei", after) == datetime.datetime(
+        2026, 3, 2, 0, 0, tzinfo=UTC
+    )
+    skip = datetime.date(2026, 3, 2)
+    assert push_schedule_service.next_occurrence("08:00", "Asia/Taipei", after, skip_date=skip) == TOMORROW_MORNING
+    assert push_schedule_service.next_occurrence("bad", "Asia/Taipei", after) is None
+
+
+@pytest.mark.asyncio
+async def test_dispatch_catches_up_late_rows_and_skips_stale(db_session):
+    db_session.add_all(
+        [
+            User(id="late", name="L", push_enabled=True),
+            User(id="stale", name="S", push_enabled=True),
+            User(id="future", name="F", push_enabled=True),
+            PushSchedule(user_id="late", push_type="morning", next_push_at=NOW - datetime.timedelta(minutes=20)),
+            PushSchedule(user_id="stale", push_type="morning", next_push_at=NOW - datetime.timedelta(hours=3)),
+            PushSchedule(user_id="future", push_type="morning", next_push_at=NOW + datetime.timedelta(minutes=5)),
+        ]
+    )
+    await db_session.commit()
+
+    process = AsyncMock(return_value="morning")
+    with (
+        patch.object(dda_scheduler, "_process_user", process),
+        patch.object(dda_scheduler, "_morning_prepass", AsyncMock()),
+        patch.object(push_schedule_service, "backfill", AsyncMock(return_value=0)),
+        patch.object(dda_scheduler, "session_factory", async_sessionmaker(db_session.bind, expire_on_commit=False)),
+    ):
+        stats = await dda_scheduler._dispatch_due(db_session, now=NOW)
+
+    assert stats["due"] == 2 and stats["sent"] == 1 and stats["stale"] == 1
+    process.assert_awaited_once()
+    assert process.await_args.args[1].id == "late"
+    assert process.await_args.args[2] == {"morning"}
+
+    db_session.expire_all()
+    rows = {r.user_id: r for r in (await db_session.execute(select(PushSchedule))).scalars()}
+    assert _naive_utc(rows["late"].next_push_at) == _naive_utc(TOMORROW_MORNING)
+    assert _naive_utc(rows["stale"].next_push_at) == _naive_utc(TOMORROW_MORNING)
+    assert _naive_utc(rows["future"].next_push_at) == _naive_utc(NOW + datetime.timedelta(minutes=5))
+
+
+@pytest.mark.asyncio
+async def test_backfill_creates_rows_and_due_query_uses_index(db_session):
+    db_session.add_all([User(id="fresh", name="N", push_enabled=True), User(id="muted", name="M", push_enabled=False)])
+    await db_session.commit()
+
+    assert await push_schedule_service.backfill(db_session, now=NOW) == 1
+    rows = (await db_session.execute(select(PushSchedule).where(PushSchedule.user_id == "fresh"))).scalars().all()
+    assert {r.push_type for r in rows} == {"morning", "midday", "night"}
+    assert await push_schedule_service.backfill(db_session, now=NOW) == 0
+
+    plan = (
+        await db_session.execute(
+            text("EXPLAIN QUERY PLAN SELECT * FROM push_schedules WHERE next_push_at <= :now ORDER BY next_push_at"),
+            {"now": NOW},
+        )
+    ).all()
+    assert any("ix_push_schedules_next_push_at" in str(row[-1]) for row in plan)
@@ -0,0 +1,98 @@
+import datetime
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event
+
+from app.models.quest import Quest, QuestStatus
+from app.models.user import User
+from application.services.quest_service import quest_service
+
+
+@contextmanager
+def capture_sql(session):
+    """Records (statement, parameters) for every cursor execute on the session's engine."""
+    captured = []
+
+    def _listener(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _listener)
+    try:
+        yield captured
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _listener)
+
+
+async def explain(session, statement, parameters) -> str:
+    conn = await session.connection()
+    rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+    return " | ".join(str(r[-1]) for r in rows)
+
+
+def _matching(captured, table, needle):
+    return [
+        (s, p) for s, p in captured if s.lstrip().upper().startswith("SELECT") and f"FROM {table}" in s and needle in s
+    ]
+
+
+@pytest.mark.asyncio
+async def test_daily_quest_range_queries_use_user_created_index(db_session):
+    user_id = "u_plan"
+    db_session.add(User(id=user_id, name="Planner", push_timezone="America/New_York"))
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for i in range(3):
+        db_session.add(Quest(user_id=user_id, title=f"Q{i}", status=QuestStatus.ACTIVE.value, created_at=now))
+    await db_session.commit()
+
+    with capture_sql(db_session) as captured:
+        await quest_service.get_daily_quests(db_session, user_id)
+        await quest_service.trigger_push_quests(db_session, user_id)
+        await quest_service.get_completed_quests_this_week(db_session, user_id)
+
+    range_queries = _matching(captured, "quests", "quests.created_at <")
+    assert len(range_queries) == 3
+    for statement, parameters in range_queries:
+        assert "date(" not in statement.lower()
+        plan = await explain(db_session, statement, parameters)
+        assert "USING INDEX ix_quests_user_created" in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_dda_outcome_lookup_uses_composite_index(db_session):
+    user_id = "u_plan_dda"
+    db_session.add(User(id=user_id, name="Planner"))
+    await db_session.commit()
+
+    with capture_sql(db_session) as captured:
+        with patch("application.services.quest_service.ai_engine.generate_json", AsyncMock(return_value=[])):
+            await quest_service._generate_daily_batch(db_session, user_id, time_context="Daily")
+
+    dda_queries = _matching(captured, "daily_outcomes", "daily_outcomes.user_id")
+    assert dda_queries
+    for statement, parameters in dda_queries:
+        plan = await explain(db_session, statement, parameters)
+        assert "USING INDEX ix_daily_outcomes_user_date_global" in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_daily_quests_respect_user_timezone(db_session):
+    user_id = "u_plan_tz"
+    db_session.add(User(id=user_id, name="Planner", push_timezone="Asia/Taipei"))
+    # Half an hour either side of local (Taipei, UTC+8) midnight
+    local_midnight = datetime.datetime.combine(
+        datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=8))).date(),
+        datetime.time.min,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=8)),
+    )
+    # Stored in UTC like every created_at in the app
+    inside = (local_midnight + datetime.timedelta(minutes=30)).astimezone(datetime.timezone.utc)
+    outside = (local_midnight - datetime.timedelta(minutes=30)).astimezone(datetime.timezone.utc)
+    db_session.add(Quest(user_id=user_id, title="today", status=QuestStatus.ACTIVE.value, created_at=inside))
+    db_session.add(Quest(user_id=user_id, title="yesterday", status=QuestStatus.ACTIVE.value, created_at=outside))
+    await db_session.commit()
+
+    quests = await quest_service.get_daily_quests(db_session, user_id)
+    assert [q.title for q in quests] == ["today"]
@@ -0,0 +1,92 @@
+import datetime
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event, select
+
+from app.models.quest import Quest
+from app.models.user import User
+from application.services.quest_batch_service import quest_batch_service
+
+
+def _quests(tag, n=3):
+    return [{"title": f"{tag}任務{i}", "desc": "完成一個短任務", "diff": "D", "xp": 20} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_batch_generation_falls_back_only_for_failed_sections(db_session):
+    users = [User(id=f"u_batch_{i}", name=f"Hero{i}", level=i + 1) for i in range(3)]
+    db_session.add_all(users)
+    await db_session.commit()
+
+    calls = {"batch": 0, "single": 0}
+
+    async def fake_generate_json(system_prompt, user_prompt):
+        if "MULTIPLE players" in system_prompt:
+            calls["batch"] += 1
+            profiles = json.loads(user_prompt.split("Profiles: ", 1)[1])
+            assert set(profiles) == {"p0", "p1", "p2"}
+            assert "u_batch_0" not in user_prompt  # Raw IDs stay out of the prompt
+            # p1 comes back malformed
+            return {"p0": _quests("甲"), "p1": [{"title": "bad"}], "p2": _quests("丙")}
+        calls["single"] += 1
+        return _quests("單")
+
+    with patch("application.services.ai_engine.ai_engine.generate_json", AsyncMock(side_effect=fake_generate_json)):
+        stats = await quest_batch_service.generate_for_users(db_session, users, "Morning", batch_size=8)
+
+    assert calls == {"batch": 1, "single": 1}
+    assert stats["batched"] == 2
+    assert stats["fallback"] == 1
+
+    for user in users:
+        rows = (await db_session.execute(select(Quest).where(Quest.user_id == user.id))).scalars().all()
+        assert len(rows) == 3
+    p1_titles = (await db_session.execute(select(Quest.title).where(Quest.user_id == "u_batch_1"))).scalars().all()
+    assert all(t.startswith("單") for t in p1_titles)
+
+    # Second run skips users that already have today's batch
+    stats = await quest_batch_service.generate_for_users(db_session, users, "Morning")
+    assert stats["skipped"] == 3
+    assert calls["batch"] == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_themes_come_from_recent_titles_in_one_query(db_session):
+    users = [User(id=f"u_prof_{i}", name=f"Hero{i}", level=1) for i in range(4)]
+    db_session.add_all(users)
+    start = datetime.datetime(2026, 1, 1)
+    for i, user in enumerate(users):
+        # An old reading quest falls outside the HISTORY_TITLES window behind newer runs
+        db_session.add(Quest(user_id=user.id, title="閱讀", created_at=start))
+        for n in range(quest_batch_service.HISTORY_TITLES):
+            db_session.add(
+                Quest(
+                    user_id=user.id,
+                    title="跑步" if i % 2 else "喝水",
+                    created_at=start + datetime.timedelta(hours=n + 1),
+                )
+            )
+    await db_session.commit()
+
+    statements = []
+    engine = db_session.bind.sync_engine
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        profiles, single = await quest_batch_service.build_profiles(db_session, users)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert single == []
+    assert {p["user_id"]: p["themes"] for p in profiles.values()} == {
+        "u_prof_0": ["VIT"],
+        "u_prof_1": ["STR"],
+        "u_prof_2": ["VIT"],
+        "u_prof_3": ["STR"],
+    }
+    assert sum("quests.title" in stmt for stmt in statements) == 1
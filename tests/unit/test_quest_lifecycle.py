@@ -0,0 +1,101 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.quest import Quest, QuestStatus
+from application.services.quest_lifecycle_service import QuestLifecycleService
+
+NOW = datetime.datetime(2026, 2, 3, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _quest(quest_id: str, status: str, age_days: int, paused_days: int | None = None) -> Quest:
+    return Quest(
+        id=quest_id,
+        user_id="u1",
+        title=quest_id,
+        status=status,
+        created_at=NOW - datetime.timedelta(days=age_days),
+        paused_at=NOW - datetime.timedelta(days=paused_days) if paused_days is not None else None,
+    )
+
+
+async def _statuses(session) -> dict:
+    rows = (await session.execute(select(Quest.id, Quest.status))).all()
+    return dict(rows)
+
+
+@pytest.mark.asyncio
+async def test_sweep_retires_expired_quests_in_chunks(db_session):
+    db_session.add_all(
+        [_quest(f"p{i}", QuestStatus.PENDING.value, 3) for i in range(5)]
+        + [
+            _quest("p_fresh", QuestStatus.PENDING.value, 1),
+            _quest("a_old", QuestStatus.ACTIVE.value, 20),
+            _quest("a_fresh", QuestStatus.ACTIVE.value, 5),
+            _quest("paused", QuestStatus.PAUSED.value, 30, paused_days=20),
+            _quest("paused_today", QuestStatus.PAUSED.value, 30, paused_days=0),  # Rescue still running
+            _quest("done", QuestStatus.DONE.value, 60),
+        ]
+    )
+    await db_session.commit()
+
+    with patch.object(settings, "QUEST_SWEEP_BATCH_SIZE", 2):
+        stats = await QuestLifecycleService().sweep(db_session, now=NOW)
+
+    statuses = await _statuses(db_session)
+    assert all(statuses[f"p{i}"] == QuestStatus.EXPIRED.value for i in range(5))
+    assert statuses["p_fresh"] == QuestStatus.PENDING.value
+    assert statuses["a_old"] == QuestStatus.FAILED.value
+    assert statuses["a_fresh"] == QuestStatus.ACTIVE.value
+    assert statuses["paused"] == QuestStatus.EXPIRED.value
+    assert statuses["paused_today"] == QuestStatus.PAUSED.value
+    assert statuses["done"] == QuestStatus.DONE.value
+
+    assert stats["pending_to_expired"] == 5 and stats["active_to_failed"] == 1 and stats["paused_to_expired"] == 1
+    assert stats["rows"] == 7
+    assert stats["chunks"] == 5  # 2 + 2 + 1 pending, 1 active, 1 paused
+
+
+@pytest.mark.asyncio
+async def test_sweep_is_idempotent_and_respects_disabled_transitions(db_session):
+    db_session.add_all([_quest("a_old", QuestStatus.ACTIVE.value, 20), _quest("paused", QuestStatus.PAUSED.value, 30)])
+    await db_session.commit()
+    service = QuestLifecycleService()
+
+    with patch.object(settings, "QUEST_ACTIVE_EXPIRY_DAYS", 0):
+        first = await service.sweep(db_session, now=NOW)
+        second = await service.sweep(db_session, now=NOW)
+
+    statuses = await _statuses(db_session)
+    assert statuses == {"a_old": QuestStatus.ACTIVE.value, "paused": QuestStatus.EXPIRED.value}
+    assert first["rows"] == 1 and second["rows"] == 0
+    assert service.metrics()["runs"] == 2 and service.metrics()["rows"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rescue_pause_restarts_the_expiry_window(db_session):
+    from app.models.user import User
+    from application.services.hp_service import hp_service
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    created = now - datetime.timedelta(days=settings.QUEST_PAUSED_EXPIRY_DAYS - 1)
+    user = User(id="u1", name="Hero", is_hollowed=True)
+    db_session.add_all(
+        [user, Quest(id="q", user_id="u1", title="Run", status=QuestStatus.ACTIVE.value, created_at=created)]
+    )
+    await db_session.commit()
+    with patch("application.services.dungeon_service.dungeon_service.start_dungeon", AsyncMock(return_value={})):
+        await hp_service.trigger_rescue_protocol(db_session, user)
+    assert (await db_session.execute(select(Quest.paused_at))).scalar_one() is not None
+
+    # Past QUEST_PAUSED_EXPIRY_DAYS since creation, but paused only two days ago
+    await QuestLifecycleService().sweep(db_session, now=now + datetime.timedelta(days=2))
+    assert await _statuses(db_session) == {"q": QuestStatus.PAUSED.value}
+
+    await QuestLifecycleService().sweep(
+        db_session, now=now + datetime.timedelta(days=settings.QUEST_PAUSED_EXPIRY_DAYS + 1)
+    )
+    assert await _statuses(db_session) == {"q": QuestStatus.EXPIRED.value}
@@ -0,0 +1,99 @@
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from app.models.quest import Quest, QuestStatus, QuestTemplate, QuestType
+from app.models.user import User
+from application.services.quest_service import quest_service
+from application.services.quest_template_service import quest_template_service
+
+
+def _quest(user_id, title, desc, status, diff="D", meta=None):
+    return Quest(
+        user_id=user_id,
+        title=title,
+        description=desc,
+        difficulty_tier=diff,
+        xp_reward=20,
+        quest_type=QuestType.SIDE.value,
+        status=status,
+        created_at=datetime.datetime.now(datetime.timezone.utc),
+        meta=meta,
+    )
+
+
+async def _seed_history(session, user_id="u_tpl"):
+    session.add(User(id=user_id, name="Miner"))
+    rows = [
+        _quest(user_id, "閱讀 10 頁", "專注閱讀 10 頁技術書", QuestStatus.DONE.value),
+        _quest(user_id, "閱讀 20 頁", "專注閱讀 20 頁技術書", QuestStatus.DONE.value),
+        _quest(user_id, "稀有｜閱讀 5 頁", "專注閱讀 5 頁技術書", QuestStatus.FAILED.value),
+        _quest(user_id, "散步 15 分鐘", "離開螢幕散步", QuestStatus.DONE.value, diff="E"),
+        _quest(user_id, "散步 30 分鐘", "離開螢幕散步", QuestStatus.DONE.value, diff="E"),
+        _quest(user_id, "散步 10 分鐘", "離開螢幕散步", QuestStatus.ACTIVE.value, diff="E"),
+        # Not minable: pending (never accepted), fallback, graph quest
+        _quest(user_id, "閱讀 30 頁", "專注閱讀", QuestStatus.PENDING.value),
+        _quest(user_id, "系統重啟", "5 分鐘深呼吸或走動（備援）", QuestStatus.DONE.value),
+        _quest(user_id, "系統重啟", "5 分鐘深呼吸或走動（備援）", QuestStatus.DONE.value),
+        _quest(user_id, "系統重啟", "5 分鐘深呼吸或走動（備援）", QuestStatus.DONE.value),
+        _quest(user_id, "【基礎訓練】", "", QuestStatus.DONE.value, meta={"graph_node_id": "g1"}),
+    ]
+    session.add_all(rows)
+    await session.commit()
+    return user_id
+
+
+def test_normalize_title_extracts_slots():
+    pattern, values = quest_template_service.normalize_title("稀有｜伏地挺身 20 下，休息 60 秒")
+    assert pattern == "伏地挺身 {n0} 下，休息 {n1} 秒"
+    assert values == [20, 60]
+    assert quest_template_service.normalize_description("做 20 下", values) == "做 {n0} 下"
+
+
+@pytest.mark.asyncio
+async def test_mine_templates_clusters_and_scores(db_session):
+    await _seed_history(db_session)
+
+    stats = await quest_template_service.mine_templates(db_session)
+    assert stats["created"] == 2
+
+    rows = (await db_session.execute(select(QuestTemplate))).scalars().all()
+    by_pattern = {t.title_pattern: t for t in rows}
+    assert set(by_pattern) == {"閱讀 {n0} 頁", "散步 {n0} 分鐘"}
+
+    reading = by_pattern["閱讀 {n0} 頁"]
+    assert reading.sample_count == 3
+    assert reading.completed_count == 2
+    assert reading.completion_rate == pytest.approx(2 / 3, abs=1e-3)
+    assert reading.params == {"n0": [5, 10, 20]}
+    assert reading.description_pattern == "專注閱讀 {n0} 頁技術書"
+    assert "INT" in reading.themes
+
+    # Re-mining updates in place instead of duplicating
+    stats = await quest_template_service.mine_templates(db_session)
+    assert stats == {**stats, "created": 0, "updated": 2}
+
+
+@pytest.mark.asyncio
+async def test_daily_batch_asks_llm_for_one_novel_slot(db_session):
+    await _seed_history(db_session)
+    await quest_template_service.mine_templates(db_session)
+
+    # Library is shared: a fresh user benefits from other users' history
+    user_id = "u_fresh"
+    db_session.add(User(id=user_id, name="Fresh"))
+    await db_session.commit()
+
+    ai_mock = AsyncMock(return_value=[{"title": "新任務：整理筆記", "desc": "整理今日筆記", "diff": "D", "xp": 20}])
+
+    with patch("application.services.quest_service.ai_engine.generate_json", ai_mock):
+        quests = await quest_service._generate_daily_batch(db_session, user_id, time_context="Daily")
+
+    assert len(quests) == quest_service.DAILY_QUEST_COUNT
+    system_prompt = ai_mock.call_args[0][0]
+    assert "EXACTLY 1 " in system_prompt
+
+    templated = [q for q in quests if q.meta and "template_id" in q.meta]
+    assert len(templated) == quest_service.DAILY_QUEST_COUNT - 1
@@ -0,0 +1,48 @@
+from adapters.persistence.kuzu.recent_events import RecentEventCache
+
+
+def _event(i: int, metadata: str = "{}") -> dict:
+    return {"id": f"e{i}", "type": "CHAT", "timestamp": i, "metadata": metadata}
+
+
+def test_cold_buffers_miss_then_warm_merges_appended_events():
+    cache = RecentEventCache(per_user=3)
+    cache.append("u1", _event(5))  # Accepted, not flushed to the graph yet
+    assert cache.get("u1", 2) is None
+
+    warmed = cache.warm("u1", [_event(4), _event(3), _event(2), _event(1)][:3])
+    assert [e["id"] for e in warmed] == ["e5", "e4", "e3"]
+
+    cache.append("u1", _event(6))
+    assert [e["id"] for e in cache.get("u1", 2)] == ["e6", "e5"]
+    assert cache.get("u1", 4) is None  # Beyond the ring's capacity: read the graph
+    assert cache.metrics()["hits"] == 1
+
+
+def test_memory_budget_evicts_least_recently_used_users():
+    big = "x" * 2000
+    cache = RecentEventCache(per_user=2, max_bytes=6000)
+    for user in ("u1", "u2"):
+        cache.warm(user, [_event(1, big)])
+    cache.get("u1", 1)  # u1 is now more recent than u2
+    cache.warm("u3", [_event(1, big)])
+
+    assert cache.get("u2", 1) is None
+    assert cache.get("u1", 1) is not None and cache.get("u3", 1) is not None
+    snapshot = cache.metrics()
+    assert snapshot["evictions"] == 1 and snapshot["bytes"] <= 6000
+
+
+def test_ring_keeps_byte_accounting_exact_and_invalidate_drops_buffers():
+    one = RecentEventCache(per_user=2)
+    one.append("u1", _event(0))
+
+    cache = RecentEventCache(per_user=2)
+    cache.warm("u1", [])
+    for i in range(10):
+        cache.append("u1", _event(i))
+    assert [e["id"] for e in cache.get("u1", 2)] == ["e9", "e8"]
+    assert cache.metrics()["bytes"] == 2 * one.metrics()["bytes"]
+
+    cache.invalidate()
+    assert cache.metrics()["bytes"] == 0 and cache.get("u1", 1) is None
@@ -0,0 +1,60 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from application.services.scheduler import dda_scheduler
+from application.services.scheduler_lease_service import HashRing, SchedulerLeaseService
+
+NOW = datetime.datetime(2026, 3, 2, 0, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_leader_lease_is_exclusive_until_it_expires(db_session):
+    a = SchedulerLeaseService("instance-a")
+    b = SchedulerLeaseService("instance-b")
+
+    assert await a.try_acquire(db_session, now=NOW)
+    assert not await b.try_acquire(db_session, now=NOW)
+    assert await a.try_acquire(db_session, now=NOW + datetime.timedelta(seconds=60))  # Heartbeat renews
+
+    later = NOW + datetime.timedelta(seconds=60 + settings.SCHEDULER_LEASE_TTL_SECONDS + 1)
+    assert await b.try_acquire(db_session, now=later)  # A stopped renewing
+    assert not await a.try_acquire(db_session, now=later)
+
+
+@pytest.mark.asyncio
+async def test_members_form_ring_from_live_leases(db_session):
+    a = SchedulerLeaseService("instance-a")
+    b = SchedulerLeaseService("instance-b")
+    await a.heartbeat_member(db_session, now=NOW)
+    assert await b.heartbeat_member(db_session, now=NOW) == ["instance-a", "instance-b"]
+
+    expired = NOW + datetime.timedelta(seconds=settings.SCHEDULER_LEASE_TTL_SECONDS + 1)
+    assert await b.heartbeat_member(db_session, now=expired) == ["instance-b"]
+
+
+def test_hash_ring_spreads_users_and_moves_few_on_leave():
+    users = [f"U{i:05d}" for i in range(3000)]
+    ring = HashRing(["a", "b", "c"])
+    owners = {u: ring.owner(u) for u in users}
+    counts = {m: list(owners.values()).count(m) for m in "abc"}
+    assert all(600 < c < 1400 for c in counts.values())
+
+    smaller = HashRing(["a", "b"])
+    moved = [u for u in users if owners[u] != "c" and smaller.owner(u) != owners[u]]
+    assert moved == []  # Only the leaving member's users are reassigned
+
+
+def test_scheduler_owns_only_its_shard():
+    ring = HashRing(["me", "other"])
+    with (
+        patch.object(settings, "SCHEDULER_MODE", "sharded"),
+        patch.object(dda_scheduler, "_ring", ring),
+        patch("application.services.scheduler.scheduler_lease_service.instance_id", "me"),
+    ):
+        mine = [u for u in (f"U{i}" for i in range(200)) if dda_scheduler._owns(u)]
+        assert mine and len(mine) < 200
+        assert all(ring.owner(u) == "me" for u in mine)
+        assert dda_scheduler._runs_user_work()
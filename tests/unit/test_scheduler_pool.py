@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.dda import PushSchedule
+from app.models.user import User
+from application.services.push_schedule_service import push_schedule_service
+from application.services.scheduler import dda_scheduler
+
+UTC = datetime.timezone.utc
+NOW = datetime.datetime(2026, 3, 2, 0, 20, tzinfo=UTC)  # 08:20 in Asia/Taipei
+
+
+@pytest.mark.asyncio
+async def test_run_pool_bounds_concurrency_and_isolates_failures():
+    in_flight = 0
+    peak = 0
+
+    async def handler(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if item == 3:
+            raise RuntimeError("boom")
+        return item
+
+    stats = await dda_scheduler._run_pool(list(range(10)), handler, concurrency=3)
+
+    assert peak == 3
+    assert stats["items"] == 10 and stats["failed"] == 1
+    assert sorted(stats["results"]) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+
+@pytest.mark.asyncio
+async def test_push_workers_use_isolated_sessions(tmp_path):
+    # File DB so every worker session gets its own connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    user_ids = ["ok_1", "ok_2", "boom"]
+    async with factory() as session:
+        for uid in user_ids:
+            session.add(User(id=uid, name=uid, push_enabled=True))
+            session.add(PushSchedule(user_id=uid, push_type="night", next_push_at=NOW - datetime.timedelta(minutes=1)))
+        await session.commit()
+
+    sessions = {}
+
+    async def process(session, user, due, schedules=None):
+        sessions[user.id] = id(session)
+        if user.id == "boom":
+            raise RuntimeError("LINE down")
+        return "night"
+
+    async with factory() as session:
+        with (
+            patch.object(dda_scheduler, "session_factory", factory),
+            patch.object(dda_scheduler, "_process_user", side_effect=process),
+            patch.object(dda_scheduler, "_morning_prepass", AsyncMock()),
+            patch.object(push_schedule_service, "backfill", AsyncMock(return_value=0)),
+        ):
+            stats = await dda_scheduler._dispatch_due(session, now=NOW)
+
+    assert len(set(sessions.values())) == 3
+    assert stats["users"] == 3 and stats["sent"] == 2 and stats["failed"] == 1
+    assert "users_per_sec" in stats and "dispatch_ms" in stats
+
+    async with factory() as session:
+        rows = {r.user_id: r for r in (await session.execute(select(PushSchedule))).scalars()}
+    assert rows["ok_1"].next_push_at > NOW.replace(tzinfo=None)
+    assert rows["boom"].next_push_at < NOW.replace(tzinfo=None)  # Retried next tick
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_executive_tick_binds_user_ids_only_in_sharded_chunks(tmp_path):
+    from application.services.brain_service import brain_service
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'exec.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([User(id=f"exec_{i}", name=f"exec_{i}") for i in range(7)])
+        await session.commit()
+
+    executive = brain_service.executive
+    detect = AsyncMock(return_value={})
+    with (
+        patch.object(dda_scheduler, "session_factory", factory),
+        patch.object(dda_scheduler, "_runs_user_work", return_value=True),
+        patch.object(dda_scheduler, "_owns", return_value=True),
+        patch.object(dda_scheduler, "STAGNATION_ID_CHUNK", 3),
+        patch.object(executive, "detect_stagnation", detect),
+        patch.object(executive, "remediate", AsyncMock(return_value=None)) as remediate,
+    ):
+        with patch("application.services.scheduler.settings.SCHEDULER_MODE", "leader"):
+            await dda_scheduler._executive_tick()
+        assert [c.args[1:] for c in detect.await_args_list] == [()]  # Everyone, without an IN list
+
+        detect.reset_mock()
+        with patch("application.services.scheduler.settings.SCHEDULER_MODE", "sharded"):
+            await dda_scheduler._executive_tick()
+        assert [len(c.args[1]) for c in detect.await_args_list] == [3, 3, 1]
+        assert remediate.await_count == 14
+    await engine.dispose()
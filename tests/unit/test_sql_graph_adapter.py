@@ -0,0 +1,84 @@
+import pytest
+
+from adapters.persistence.sql_graph.adapter import SqlGraphAdapter, sync_database_url
+from application.services.graph_service import GraphService
+from domain.ports.graph_port import CypherNotSupportedError
+
+
+@pytest.fixture
+def adapter(tmp_path):
+    adapter = SqlGraphAdapter(f"sqlite+aiosqlite:///{tmp_path / 'graph.db'}")
+    yield adapter
+    adapter.close()
+
+
+def _ids(adapter: SqlGraphAdapter, user_id: str = "u1") -> list:
+    return [t["id"] for t in adapter.get_unlockable_templates(user_id)]
+
+
+def test_async_urls_are_mapped_to_sync_drivers():
+    assert sync_database_url("sqlite+aiosqlite:///./data/game.db") == "sqlite:///./data/game.db"
+    assert sync_database_url("postgresql+asyncpg://u:p@db/lifgame") == "postgresql+psycopg://u:p@db/lifgame"
+
+
+@pytest.mark.asyncio
+async def test_seeded_npc_knowledge_and_user_intimacy(adapter):
+    await adapter.initialize()
+    await adapter.initialize()  # Idempotent: no duplicate seed rows
+
+    viper = await adapter.get_npc_context("Viper")
+    assert viper["role"] == "Strict Mentor" and viper["hates"] == ["Procrastination"]
+    assert viper["likes"] == ["Discipline", "Exercise"]
+    assert (await adapter.get_npc_context("Nobody"))["role"] == "Unknown"
+
+    assert adapter.adjust_npc_intimacy("u1", "viper", 5)  # New edge starts at 0, as in Kuzu
+    assert adapter.adjust_npc_intimacy("u1", "viper", 3)
+    contexts = {npc["id"]: npc for npc in adapter.get_npc_contexts(user_id="u1")}
+    assert contexts["viper"]["intimacy"] == 3 and contexts["viper"]["last_interaction"] is not None
+    assert contexts["sage"]["intimacy"] == 0 and contexts["sage"]["last_interaction"] is None
+    assert len(contexts) == 4
+
+    assert await adapter.add_relationship("User", "u1", "INTERACTED_WITH", "NPC", "Sage", {"n": 1}, "id", "name")
+    assert not await adapter.add_relationship("User", "ghost", "KNOWS", "NPC", "Sage", None, "id", "name")
+
+
+def test_history_is_newest_first_per_user(adapter):
+    for i in range(5):
+        adapter.record_user_event("u1", f"E{i}", {"i": i})
+    adapter.record_user_event("u2", "OTHER", {})
+
+    history = adapter.get_user_history("u1", limit=3)
+    assert len(history) == 3 and {e["type"] for e in history} <= {f"E{i}" for i in range(5)}
+    assert all(set(e) == {"id", "type", "timestamp", "metadata"} for e in history)
+    assert [e["type"] for e in adapter.query_recent_context("u2", 10)] == ["OTHER"]
+
+
+@pytest.mark.asyncio
+async def test_unlocks_follow_dependencies_and_completions(adapter):
+    # Q1 -> Q2 -> Q3, Q4 needs both Q1 and Q2, Q5 stands alone
+    for quest_id in ("Q1", "Q2", "Q3", "Q4", "Q5"):
+        adapter.add_node("Quest", {"id": quest_id, "title": f"Quest {quest_id}"})
+    for child, parent in (("Q2", "Q1"), ("Q3", "Q2"), ("Q4", "Q1"), ("Q4", "Q2")):
+        assert adapter.add_quest_dependency(child, parent)
+    assert not adapter.add_quest_dependency("Q1", "Q3")  # Q3 already requires Q1 through Q2
+    assert adapter.add_node("User", {"id": "u1"})
+
+    assert _ids(adapter) == ["Q1", "Q5"]
+    for quest_id in ("Q1", "Q2"):
+        await adapter.add_relationship("User", "u1", "COMPLETED", "Quest", quest_id, None, "id", "id")
+    assert _ids(adapter) == ["Q3", "Q4", "Q5"]
+    assert adapter.get_unlockable_templates("u1")[1] == {
+        "id": "Q4",
+        "title": "Quest Q4",
+        "type": "CHAIN",
+        "prereq_count": 2,
+        "chain": True,
+    }
+    assert _ids(adapter, "someone-else") == ["Q1", "Q5"]
+
+
+@pytest.mark.asyncio
+async def test_cypher_queries_raise_a_documented_error(adapter):
+    with pytest.raises(CypherNotSupportedError, match="does not run Cypher"):
+        await GraphService(adapter).query("MATCH (n) RETURN n")
+    assert issubclass(CypherNotSupportedError, NotImplementedError)  # Existing NotImplementedError handlers still apply
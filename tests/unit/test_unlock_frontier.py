@@ -0,0 +1,59 @@
+from adapters.persistence.kuzu.unlock_frontier import UnlockFrontier
+
+# Q1 -> Q2 -> Q3, Q4 needs both Q1 and Q2, Q5 stands alone
+QUESTS = [
+    ("Q1", "Base Q1", [None]),
+    ("Q2", "Chain Q2", ["Q1"]),
+    ("Q3", "Chain Q3", ["Q2"]),
+    ("Q4", "Join Q4", ["Q1", "Q2"]),
+    ("Q5", "Base Q5", [None]),
+]
+
+
+def _frontier(completed=()) -> UnlockFrontier:
+    frontier = UnlockFrontier()
+    frontier.load(QUESTS)
+    frontier.seed_user("u1", completed)
+    return frontier
+
+
+def _ids(frontier: UnlockFrontier, user_id: str = "u1") -> list:
+    return [t["id"] for t in frontier.unlockable(user_id)]
+
+
+def test_completions_unlock_dependents_once_all_prerequisites_are_done():
+    frontier = _frontier()
+    assert _ids(frontier) == ["Q1", "Q5"]
+
+    frontier.complete("u1", "Q1")
+    assert _ids(frontier) == ["Q2", "Q5"]
+
+    frontier.complete("u1", "Q2")
+    frontier.complete("u1", "Q2")  # Duplicate edges do not double-decrement
+    assert _ids(frontier) == ["Q3", "Q4", "Q5"]
+    q4 = frontier.unlockable("u1")[1]
+    assert q4 == {"id": "Q4", "title": "Join Q4", "type": "CHAIN", "prereq_count": 2, "chain": True}
+
+
+def test_seeding_from_completed_matches_incremental_updates():
+    incremental = _frontier()
+    for quest_id in ("Q1", "Q2", "Q5"):
+        incremental.complete("u1", quest_id)
+
+    assert _ids(_frontier(completed=["Q1", "Q2", "Q5"])) == _ids(incremental) == ["Q3", "Q4"]
+    assert incremental.unlockable("someone-else") is None  # Not seeded yet
+
+
+def test_new_quests_and_dependencies_update_seeded_users():
+    frontier = _frontier(completed=["Q1"])
+
+    frontier.add_quest("Q6", "Fresh")
+    assert "Q6" in _ids(frontier)
+
+    frontier.add_dependency("Q6", "Q3")
+    assert "Q6" not in _ids(frontier)
+    frontier.add_dependency("Q5", "Q1")  # Already satisfied
+    assert "Q5" in _ids(frontier)
+
+    frontier.invalidate()
+    assert frontier.unlockable("u1") is None